@@ -0,0 +1,88 @@
+// app/src/catalogEvents.ts
+import { useEffect, useRef } from 'react';
+
+/* -------------------------------------------------------------
+   Live catalog changes – GET /api/catalog/events/ (Server-Sent Events)
+   ------------------------------------------------------------- */
+export type CatalogEvent =
+  | { kind: 'game.created' | 'game.updated'; data: { id: number; game_name: string } }
+  | { kind: 'game.deleted'; data: { id: number } }
+  | { kind: 'game.whitelist_count'; data: { id: number; whitelist_count: number } }
+  /** Events were missed – refetch the list, then carry on */
+  | { kind: 'reset'; data: Record<string, never> };
+
+const STREAM_PATH = '/api/catalog/events/';
+
+/**
+ * Calls `onEvent` for every catalog change while the component is mounted.
+ *
+ * React Native has no EventSource, so the stream is read through
+ * XMLHttpRequest progress events.  When the server ends the stream (or the
+ * connection drops) it reconnects after the server's `retry:` delay and
+ * sends `Last-Event-ID`, so no change is lost in between.
+ */
+export function useCatalogEvents(serverRoot: string, onEvent: (event: CatalogEvent) => void) {
+  // The latest callback, without reconnecting on every render
+  const handler = useRef(onEvent);
+  handler.current = onEvent;
+
+  useEffect(() => {
+    let closed = false;
+    let request: XMLHttpRequest | null = null;
+    let timer: ReturnType<typeof setTimeout> | null = null;
+    let lastEventId = '';
+    let retryMs = 3000;
+
+    const dispatch = (block: string) => {
+      let kind = 'message';
+      let data = '';
+      for (const line of block.split('\n')) {
+        if (!line || line.startsWith(':')) continue; // ": ping" heartbeats
+        const colon = line.indexOf(':');
+        const field = colon < 0 ? line : line.slice(0, colon);
+        const value = colon < 0 ? '' : line.slice(colon + 1).replace(/^ /, '');
+        if (field === 'id') lastEventId = value;
+        else if (field === 'event') kind = value;
+        else if (field === 'data') data += (data ? '\n' : '') + value;
+        else if (field === 'retry' && /^\d+$/.test(value)) retryMs = Number(value);
+      }
+      if (!data) return;
+      try {
+        handler.current({ kind, data: JSON.parse(data) } as CatalogEvent);
+      } catch (e) {
+        console.warn('catalog event', e);
+      }
+    };
+
+    const connect = () => {
+      if (closed) return;
+      const xhr = new XMLHttpRequest();
+      let seen = 0;
+      let buffer = '';
+      xhr.open('GET', `${serverRoot}${STREAM_PATH}`);
+      xhr.setRequestHeader('Accept', 'text/event-stream');
+      if (lastEventId) xhr.setRequestHeader('Last-Event-ID', lastEventId);
+      xhr.withCredentials = true;
+      xhr.onprogress = () => {
+        const text = xhr.responseText;
+        buffer += text.slice(seen).replace(/\r\n?/g, '\n');
+        seen = text.length;
+        const blocks = buffer.split('\n\n');
+        buffer = blocks.pop() ?? '';
+        blocks.forEach(dispatch);
+      };
+      xhr.onloadend = () => {
+        if (!closed) timer = setTimeout(connect, retryMs);
+      };
+      xhr.send();
+      request = xhr;
+    };
+
+    connect();
+    return () => {
+      closed = true;
+      if (timer) clearTimeout(timer);
+      request?.abort();
+    };
+  }, [serverRoot]);
+}
@@ -11,6 +11,7 @@ import {
   Alert,
 } from "react-native";
 import { Picker } from "@react-native-picker/picker";
+import { CatalogEvent, useCatalogEvents } from "../catalogEvents";
 
 const SERVER_ROOT = "http://192.168.42.41:8000";
 const GAMES_ENDPOINT = `${SERVER_ROOT}/api/games/`;
@@ -114,6 +115,28 @@ const fetchLookup = async (
     fetchLookup(`${SERVER_ROOT}/api/stores/`, "store", setStores);
   }, []);
 
+  // -----------------------------------------------------------------
+  // Live updates – other editors' changes show up without a refresh
+  // -----------------------------------------------------------------
+  useCatalogEvents(SERVER_ROOT, (event: CatalogEvent) => {
+    switch (event.kind) {
+      case "game.created":
+      case "reset":
+        loadGames();
+        break;
+      case "game.updated":
+        setGames((prev) =>
+          prev?.map((g) =>
+            g.id === event.data.id ? { ...g, game_name: event.data.game_name } : g
+          ) ?? null
+        );
+        break;
+      case "game.deleted":
+        setGames((prev) => prev?.filter((g) => g.id !== event.data.id) ?? null);
+        break;
+    }
+  });
+
   // -----------------------------------------------------------------
   // Create a new game (POST)
   // -----------------------------------------------------------------
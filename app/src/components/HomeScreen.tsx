@@ -1,5 +1,5 @@
 // app/components/HomeScreen.tsx
-import React, { useEffect, useState } from 'react';
+import React, { useCallback, useEffect, useState } from 'react';
 import {
   View,
   Text,
@@ -10,6 +10,7 @@ import {
   Switch,
   Alert,
 } from 'react-native';
+import { CatalogEvent, useCatalogEvents } from '../catalogEvents';
 
 /* -------------------------------------------------------------
    1️⃣  URL constants – keep the games endpoint under /api,
@@ -51,22 +52,62 @@ export default function HomeScreen({ user }: Props) {
   /* -------------------------------------------------------------
      3️⃣  Load games list – use the /api/games/ endpoint
      ------------------------------------------------------------- */
+  const load = useCallback(async () => {
+    try {
+      const r = await fetch(GAMES_ENDPOINT, {
+        headers: { Accept: 'application/json' },
+      });
+      const data: Game[] = await r.json();
+      setGames(data);
+    } catch (e) {
+      console.warn(e);
+    } finally {
+      setLoading(false);
+    }
+  }, []);
+
   useEffect(() => {
-    const load = async () => {
-      try {
-        const r = await fetch(GAMES_ENDPOINT, {
-          headers: { Accept: 'application/json' },
-        });
-        const data: Game[] = await r.json();
-        setGames(data);
-      } catch (e) {
-        console.warn(e);
-      } finally {
-        setLoading(false);
-      }
-    };
     load();
-  }, []);
+  }, [load]);
+
+  /* -------------------------------------------------------------
+     3️⃣b Live updates – patch the list as games change on the server
+     ------------------------------------------------------------- */
+  const loadOne = async (gameId: number) => {
+    try {
+      const r = await fetch(`${GAMES_ENDPOINT}${gameId}/`, {
+        headers: { Accept: 'application/json' },
+        credentials: 'include', // is_whitelisted of the logged-in user
+      });
+      if (r.status === 404) return; // deleted in the meantime
+      if (!r.ok) throw new Error(`HTTP ${r.status}`);
+      const game: Game = await r.json();
+      setGames(prev => {
+        if (!prev) return prev;
+        return prev.some(g => g.id === game.id)
+          ? prev.map(g => (g.id === game.id ? game : g))
+          : [...prev, game];
+      });
+    } catch (e) {
+      console.warn('Loading game failed', e);
+    }
+  };
+
+  useCatalogEvents(SERVER_ROOT, (event: CatalogEvent) => {
+    switch (event.kind) {
+      case 'game.created':
+      case 'game.updated':
+        // The event names the game only – genre / platform / store come from the API
+        loadOne(event.data.id);
+        break;
+      case 'game.deleted':
+        setGames(prev => prev?.filter(g => g.id !== event.data.id) ?? null);
+        break;
+      case 'reset':
+        load();
+        break;
+    }
+  });
 
   /* -------------------------------------------------------------
      4️⃣  Client‑side filtering
@@ -0,0 +1,21 @@
+# accounts/backends.py
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+from .user_cache import get_cached_user
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ``ModelBackend`` whose ``get_user`` – called by ``AuthenticationMiddleware``
+    on every request with a session – is served from ``accounts.user_cache``
+    instead of a ``SELECT`` on the user table.
+    """
+
+    def get_user(self, user_id):
+        UserModel = get_user_model()
+        try:
+            user = get_cached_user(user_id)
+        except UserModel.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
@@ -0,0 +1,44 @@
+# accounts/signals.py
+"""
+Bump the user cache version whenever a user row or a whitelist changes
+(see ``accounts.user_cache``).  Connected from ``AccountsConfig.ready()``.
+"""
+from django.contrib.auth import get_user_model
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from .user_cache import bump_user_version, forget_whitelist
+
+UserModel = get_user_model()
+
+
+def _user_changed(sender, instance, **kwargs):
+    bump_user_version(instance.pk)
+
+
+def _whitelist_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        # user.whitelisted_games.add/remove/clear(...)
+        if action.startswith("post_"):
+            bump_user_version(instance.pk)
+            forget_whitelist(instance)
+        return
+
+    # game.whitelisted_by.…(...) – the affected rows are users
+    if action == "pre_clear":
+        instance._whitelisted_by_before_clear = list(
+            instance.whitelisted_by.values_list("pk", flat=True)
+        )
+    elif action == "post_clear":
+        pk_set = instance.__dict__.pop("_whitelisted_by_before_clear", ())
+    if action.startswith("post_"):
+        for pk in pk_set or ():
+            bump_user_version(pk)
+
+
+post_save.connect(_user_changed, sender=UserModel, dispatch_uid="user-cache-save")
+post_delete.connect(_user_changed, sender=UserModel, dispatch_uid="user-cache-delete")
+m2m_changed.connect(
+    _whitelist_changed,
+    sender=UserModel.whitelisted_games.through,
+    dispatch_uid="user-cache-whitelist",
+)
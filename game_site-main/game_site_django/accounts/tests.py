@@ -1,3 +1,100 @@
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.functional import SimpleLazyObject
 
-# Create your tests here.
+from .user_cache import bump_user_version, get_cached_user, user_version, whitelist_ids
+
+UserModel = get_user_model()
+
+CACHED = {"USER_CACHE_ENABLED": True, "SESSION_ENGINE": "django.contrib.sessions.backends.cached_db"}
+
+
+@override_settings(**CACHED)
+class UserCacheTests(TestCase):
+    """Cached users hold no password, version bumps invalidate, requests skip the session and user tables."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserModel.objects.create_user("gamer", "gamer@example.com", "pw")
+
+    def setUp(self):
+        # Pks repeat between tests – start from a fresh version
+        bump_user_version(self.user.pk)
+
+    def test_password_is_not_cached(self):
+        get_cached_user(self.user.pk)
+        values, session_auth_hash = cache.get(f"user:{self.user.pk}:{user_version(self.user.pk)}:fields")
+        self.assertNotIn(self.user.password, values)
+        user = get_cached_user(self.user.pk)
+        self.assertIn("password", user.get_deferred_fields())
+        self.assertEqual(user.get_session_auth_hash(), self.user.get_session_auth_hash())
+
+    def new_game(self):
+        from game_site.models import Developer, Game, Genre, Platform, Store
+
+        genre = Genre.objects.create(genre_ID=1, Genre_Name="Genre", Genre_Popularity="high")
+        return Game.objects.create(
+            game_name="Game",
+            genre=genre,
+            platform=Platform.objects.create(platform_ID=1, Platform_Name="Platform"),
+            store=Store.objects.create(store_ID=1, Store_Name="Store"),
+            developer=Developer.objects.create(
+                developer_ID=1, first_name="Ada", last_name="Lovelace", gender="f", country="UK"
+            ),
+        )
+
+    def test_version_bump_invalidates_user_and_whitelist(self):
+        game = self.new_game()
+        self.assertEqual(whitelist_ids(get_cached_user(self.user.pk)), frozenset())
+        # Changes that send no signal stay invisible until the version moves
+        UserModel.objects.filter(pk=self.user.pk).update(first_name="Renamed")
+        UserModel.whitelisted_games.through.objects.create(customuser_id=self.user.pk, game_id=game.pk)
+        self.assertEqual(get_cached_user(self.user.pk).first_name, "")
+        self.assertEqual(whitelist_ids(get_cached_user(self.user.pk)), frozenset())
+
+        bump_user_version(self.user.pk)
+        self.assertEqual(get_cached_user(self.user.pk).first_name, "Renamed")
+        self.assertEqual(whitelist_ids(get_cached_user(self.user.pk)), {game.pk})
+
+    def test_whitelist_change_is_seen_by_the_same_request(self):
+        game = self.new_game()
+        # What AuthenticationMiddleware sets as request.user
+        user = SimpleLazyObject(lambda: get_cached_user(self.user.pk))
+        self.assertEqual(whitelist_ids(user), frozenset())
+        user.whitelisted_games.add(game)
+        self.assertEqual(whitelist_ids(user), {game.pk})
+        user.whitelisted_games.remove(game)
+        self.assertEqual(whitelist_ids(user), frozenset())
+
+    def test_authenticated_list_reads_no_session_or_user(self):
+        self.client.force_login(self.user)
+        url = reverse("game-list")
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.wsgi_request.user.is_authenticated)
+        tables = ("django_session", UserModel._meta.db_table)
+        self.assertFalse([q["sql"] for q in queries.captured_queries if any(t in q["sql"] for t in tables)])
+
+    def test_password_change_logs_out_other_sessions(self):
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(reverse("me")).status_code, 200)
+        self.user.set_password("new-pw")
+        self.user.save()
+        self.assertEqual(self.client.get(reverse("me")).status_code, 302)   # to the login page
+
+
+@override_settings(USER_CACHE_ENABLED=False)
+class UserCacheDisabledTests(TestCase):
+    """Without a shared cache every read goes to the database."""
+
+    def test_reads_from_database(self):
+        user = UserModel.objects.create_user("gamer", "gamer@example.com", "pw")
+        get_cached_user(user.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(get_cached_user(user.pk).password, user.password)
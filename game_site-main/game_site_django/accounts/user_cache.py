@@ -0,0 +1,109 @@
+# accounts/user_cache.py
+"""
+Cached user rows and whitelist id sets.
+
+Entries are stored under a per-user *version* key; bumping the version
+(``bump_user_version``) orphans every cached entry for that user at once.
+The receivers in ``accounts.signals`` bump it whenever the user row or
+their whitelist changes, so reads never have to delete keys one by one.
+
+A cached user holds every column but the password – a deferred field,
+loaded from the database if something reads it – plus the session auth
+hash derived from it, which ``CustomUser.get_session_auth_hash`` returns.
+
+Only used with ``settings.USER_CACHE_ENABLED`` (a cache shared by every
+worker); otherwise users and whitelists are read from the database.
+"""
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import router
+
+
+def _timeout():
+    return getattr(settings, "USER_CACHE_TIMEOUT", 300)
+
+
+def enabled():
+    return getattr(settings, "USER_CACHE_ENABLED", False)
+
+
+def _cached_fields(model):
+    return [f.attname for f in model._meta.concrete_fields if f.attname != "password"]
+
+
+def _version_key(pk):
+    return f"user:{pk}:version"
+
+
+def user_version(pk):
+    """Current cache version of user ``pk``."""
+    version = cache.get(_version_key(pk))
+    if version is None:
+        # Start from the clock so an evicted counter never reuses an old version
+        cache.add(_version_key(pk), time.time_ns(), None)
+        version = cache.get(_version_key(pk))
+    return version
+
+
+def bump_user_version(pk):
+    """Invalidate every cached entry of user ``pk``."""
+    if not enabled():
+        return
+    try:
+        cache.incr(_version_key(pk))
+    except ValueError:
+        cache.set(_version_key(pk), time.time_ns(), None)
+
+
+def get_cached_user(pk):
+    """
+    Return the user row for ``pk`` from the cache, loading it on a miss.
+    Raises ``DoesNotExist`` like ``Model.objects.get``.
+    """
+    UserModel = get_user_model()
+    if not enabled():
+        return UserModel._default_manager.get(pk=pk)
+    key = f"user:{pk}:{user_version(pk)}:fields"
+    names = _cached_fields(UserModel)
+    entry = cache.get(key)
+    if entry is None:
+        user = UserModel._default_manager.get(pk=pk)
+        cache.set(key, (tuple(getattr(user, name) for name in names), user.get_session_auth_hash()), _timeout())
+        return user
+    values, session_auth_hash = entry
+    user = UserModel.from_db(router.db_for_read(UserModel), names, values)
+    user._session_auth_hash = session_auth_hash
+    return user
+
+
+def whitelist_ids(user):
+    """
+    ``frozenset`` of the game ids ``user`` has whitelisted.
+
+    Memoized on the user object for the rest of the request, cached across
+    requests under the user's version key (with ``USER_CACHE_ENABLED``).
+    Anonymous users get an empty set.
+    """
+    if not user.is_authenticated:
+        return frozenset()
+    # request.user is a SimpleLazyObject – memoize on the user it wraps, the
+    # instance the m2m signal hands to forget_whitelist()
+    user = getattr(user, "_wrapped", user)
+    ids = user.__dict__.get("_whitelist_ids")
+    if ids is None:
+        key = f"user:{user.pk}:{user_version(user.pk)}:whitelist" if enabled() else None
+        ids = cache.get(key) if key else None
+        if ids is None:
+            ids = frozenset(user.whitelisted_games.values_list("pk", flat=True))
+            if key:
+                cache.set(key, ids, _timeout())
+        user.__dict__["_whitelist_ids"] = ids
+    return ids
+
+
+def forget_whitelist(user):
+    """Drop the per-request memo after the whitelist of ``user`` changed."""
+    user.__dict__.pop("_whitelist_ids", None)
@@ -8,6 +8,8 @@ from django.contrib.auth import authenticate, login, logout
 from django.http import JsonResponse  
 from django.contrib.auth.decorators import login_required
 
+from game_site.throttling import throttle
+
 # Import the form we just created
 from .forms import SignUpForm
 
@@ -46,6 +48,7 @@ class SignUpView(CreateView):
     
     
 @csrf_exempt
+@throttle("login")
 def api_login(request):
     """
     POST /accounts/login/
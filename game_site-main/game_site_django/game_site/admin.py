@@ -1,4 +1,10 @@
+from django.conf import settings
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db.models import Max
+from django.utils.functional import cached_property
+from . import jobs
+from .lookups import LOOKUP_TABLES, TABLE_FOR_MODEL
 from .models import (
     Platform,
     Store,
@@ -19,31 +25,168 @@ from .models import (
     Award,
     Language,
     Genre,
-    Game
+    Game,
+    Job,
+    OutboxEvent,
+    CoverArt,
 )
 from django.contrib.auth.admin import UserAdmin
 from .models import CustomUser
 
-admin.site.register(Platform)
-admin.site.register(Store)
-admin.site.register(Size)
-admin.site.register(Developer)
-admin.site.register(Publisher)
-admin.site.register(DLC)
-admin.site.register(GameMode)
-admin.site.register(License)
-admin.site.register(SystemRequirement)
-admin.site.register(Review)
-admin.site.register(Multimedia)
-admin.site.register(Status)
-admin.site.register(SalesHistory)
-admin.site.register(GameLog)
-admin.site.register(Rating)
-admin.site.register(OnlineStatus)
-admin.site.register(Award)
-admin.site.register(Language)
-admin.site.register(Genre)
-admin.site.register(Game)
+
+# --------------------------------------------------------------
+#  Large changelists
+# --------------------------------------------------------------
+class EstimatedCountPaginator(Paginator):
+    """
+    Counts an unfiltered changelist by its highest primary key – one index
+    lookup instead of a COUNT(*) over the whole table – once that passes
+    ``ADMIN_EXACT_COUNT_LIMIT``.  Rows deleted since make it an
+    overestimate, so the last pages may come out short.  Searches and
+    filters are counted exactly.
+    """
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, "query", None)
+        if query is not None and not query.where and not query.distinct and not query.combinator:
+            model = self.object_list.model
+            estimate = model._default_manager.using(self.object_list.db).aggregate(n=Max("pk"))["n"] or 0
+            if estimate >= getattr(settings, "ADMIN_EXACT_COUNT_LIMIT", 10000):
+                return estimate
+        return super().count
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """No full-table COUNT(*) on the changelist, ordered by the primary key."""
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    ordering = ("pk",)
+
+
+class LookupAdmin(LargeTableAdmin):
+    """
+    A lookup table (game_site.lookups) – searchable by the prefix of the
+    columns its label is built from, which the Game form's autocomplete
+    widgets use.
+    """
+    list_display = ("id", "__str__")
+
+    def __init__(self, model, admin_site):
+        self.search_fields = tuple(f"^{field}" for field in LOOKUP_TABLES[TABLE_FOR_MODEL[model]].fields)
+        super().__init__(model, admin_site)
+
+
+admin.site.register(
+    [Size, Developer, Publisher, DLC, GameMode, License, SystemRequirement, Review, Multimedia, Status,
+     SalesHistory, GameLog, Rating, OnlineStatus, Award, Language],
+    LookupAdmin,
+)
+
+
+@admin.register(Game)
+class GameAdmin(LargeTableAdmin):
+    """
+    The change form picks its lookup rows with autocomplete widgets (and
+    the telemetry rows / cover by id) instead of ``<select>``s listing
+    every row; the changelist loads its page with the genre, platform and
+    store in one query.  The name search is a prefix match served by the
+    ``game_name_nocase`` index; a number also matches the id.
+    """
+    list_display = ("id", "game_name", "genre", "platform", "store", "rating_mean", "review_count")
+    list_display_links = ("id", "game_name")
+    list_select_related = ("genre", "platform", "store")
+    list_filter = ("genre", "platform", "store")
+    list_per_page = 100
+    search_fields = ("^game_name",)
+    autocomplete_fields = (
+        "genre", "platform", "store", "size", "developer", "publisher", "dlc", "game_mode", "license",
+        "system_requirements", "multimedia", "status", "rating", "award", "language",
+    )
+    raw_id_fields = ("review", "sales_history", "game_log", "online_status", "cover")
+    readonly_fields = ("review_count", "rating_mean", "rating_bayes")
+    actions = ("delete_in_background", "recompute_ratings")
+
+    def get_search_results(self, request, queryset, search_term):
+        results, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        if search_term.strip().isdigit():
+            results |= queryset.filter(pk=int(search_term))
+        return results, may_have_duplicates
+
+    def get_actions(self, request):
+        # The stock bulk delete loads every cascaded row for its confirmation page
+        actions = super().get_actions(request)
+        actions.pop("delete_selected", None)
+        return actions
+
+    @admin.action(description="Delete selected games in the background", permissions=["delete"])
+    def delete_in_background(self, request, queryset):
+        ids = list(queryset.values_list("pk", flat=True))
+        job = jobs.enqueue("catalog.delete_games", {"ids": ids}, user=request.user)
+        self.message_user(request, f"{len(ids)} games are deleted in the background (job #{job.pk}).")
+
+    @admin.action(description="Recompute the ratings of selected games", permissions=["change"])
+    def recompute_ratings(self, request, queryset):
+        ids = list(queryset.values_list("pk", flat=True))
+        job = jobs.enqueue("reviews.recompute", {"ids": ids}, user=request.user)
+        self.message_user(request, f"The ratings of {len(ids)} games are recomputed in the background (job #{job.pk}).")
+
+
+@admin.register(Genre, Platform, Store)
+class QueuedDeleteAdmin(LookupAdmin):
+    """
+    Deleting a genre / platform / store cascades to every game using it –
+    that runs as a background job (game_site.jobs) instead of inside the
+    request.
+    """
+
+    def _enqueue_delete(self, request, obj):
+        job = jobs.enqueue(
+            "catalog.delete_lookup", {"table": TABLE_FOR_MODEL[type(obj)], "pk": obj.pk}, user=request.user
+        )
+        self.message_user(request, f"“{obj}” and its games are deleted in the background (job #{job.pk}).")
+
+    def delete_model(self, request, obj):
+        self._enqueue_delete(request, obj)
+
+    def delete_queryset(self, request, queryset):
+        for obj in queryset:
+            self._enqueue_delete(request, obj)
+
+    def get_deleted_objects(self, objs, request):
+        # The default confirmation page would load every cascaded game – count them instead
+        games = Game.objects.filter(**{f"{TABLE_FOR_MODEL[self.model]}__in": list(objs)}).count()
+        perms_needed = set()
+        if games and not request.user.has_perm("game_site.delete_game"):
+            perms_needed.add(Game._meta.verbose_name)
+        summary = [str(obj) for obj in objs] + [f"{games} games (deleted in the background)"]
+        counts = {self.model._meta.verbose_name_plural: len(objs), Game._meta.verbose_name_plural: games}
+        return summary, counts, perms_needed, []
+
+
+@admin.register(Job)
+class JobAdmin(LargeTableAdmin):
+    list_display = ("id", "name", "status", "attempts", "progress_done", "progress_total", "created_at", "finished_at")
+    list_filter = ("status", "name")
+    raw_id_fields = ("created_by",)
+    ordering = ("-pk",)
+    readonly_fields = ("attempts", "progress_done", "progress_total", "result", "error", "started_at",
+                       "finished_at", "heartbeat_at", "worker")
+
+
+@admin.register(CoverArt)
+class CoverArtAdmin(LargeTableAdmin):
+    list_display = ("sha256", "format", "width", "height", "size_bytes", "created_at")
+    readonly_fields = ("sha256", "format", "width", "height", "size_bytes", "created_at")
+    search_fields = ("^sha256",)
+
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(LargeTableAdmin):
+    list_display = ("id", "kind", "game_id", "created_at", "dispatched_at", "attempts")
+    list_filter = ("kind", ("dispatched_at", admin.EmptyFieldListFilter))
+    readonly_fields = ("kind", "game_id", "data", "created_at", "dispatched_at", "delivered_to", "attempts", "error")
+    ordering = ("-pk",)
 
 @admin.register(CustomUser)
 class CustomUserAdmin(UserAdmin):
@@ -1,16 +1,39 @@
 # game_site/api_urls.py
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
-from .api_views import GameViewSet, GenreViewSet, PlatformViewSet, StoreViewSet
+from .api_views import (
+    CompatibilityViewSet,
+    GameEventViewSet,
+    GameViewSet,
+    GenreViewSet,
+    JobViewSet,
+    LookupViewSet,
+    PlatformViewSet,
+    PlayerCountViewSet,
+    RecommendationViewSet,
+    StatsViewSet,
+    StoreViewSet,
+    cache_stats_view,
+    replica_status_view,
+)
 
 router = DefaultRouter()
 router.register(r"games", GameViewSet, basename="game")
 router.register(r"genres", GenreViewSet, basename="genre")
 router.register(r"platforms", PlatformViewSet, basename="platform")
 router.register(r"stores", StoreViewSet, basename="store")
+router.register(r"lookups", LookupViewSet, basename="lookup")
+router.register(r"recommendations", RecommendationViewSet, basename="recommendation")
+router.register(r"stats", StatsViewSet, basename="stats")
+router.register(r"compatibility", CompatibilityViewSet, basename="compatibility")
+router.register(r"player-counts", PlayerCountViewSet, basename="player-count")
+router.register(r"game-events", GameEventViewSet, basename="game-event")
+router.register(r"jobs", JobViewSet, basename="job")
 
 urlpatterns = [
     path("", include(router.urls)),
+    path("replica/", replica_status_view, name="replica-status"),
+    path("cache/", cache_stats_view, name="cache-stats"),
     # No extra endpoints – the router already provides:
     #   POST   /api/games/
     #   DELETE /api/games/<pk>/
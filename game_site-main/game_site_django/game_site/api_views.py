@@ -1,17 +1,45 @@
 # -----------------------------------------
 # game_site/api_views.py
 # -----------------------------------------------
+import hmac
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
 
-from rest_framework import viewsets, permissions
+from rest_framework import mixins, viewsets, permissions
 from rest_framework.authentication import SessionAuthentication
+from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError
+from rest_framework.pagination import CursorPagination
+from rest_framework.parsers import FormParser, MultiPartParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from accounts.user_cache import whitelist_ids
 
 # ---------------------------------------------------------------
 #  Import models and the (new) serializers
 # -----------------------------------------------------------
-from .models import Game, Genre, Platform, Store
-from .serializers import GameSerializer, SimpleNameSerializer
+from . import cover_art, game_events, jobs, lookups, page_cache, player_counts, recommendations, rollups, tiered_cache
+from .catalog import game_details_data, hardware_limits
+from .db_routers import pinned_to_primary, route_reads_to_replica
+from .replica import replica_status
+from .models import CatalogRollup, Game, GameEvent, GameReview, Genre, Job, Platform, SimilarGame, Store
+from .serializers import (
+    GameEventSerializer,
+    GameReviewSerializer,
+    GameSerializer,
+    JobSerializer,
+    simple_name_serializer,
+)
+from .suggest import suggest as suggest_titles
+from .throttling import EndpointThrottle
 
 
 # ----------------------------------------
@@ -23,15 +51,57 @@ class CsrfExemptSessionAuthentication(SessionAuthentication):
         return
 
 
+# ----------------------------------------------------------------
+#  Read‑replica routing for read‑only actions
+# ----------------------------------------------------------
+class ReplicaReadMixin:
+    """
+    Route the ORM reads of the listed actions to the read replica
+    (see ``game_site.db_routers``).  Authentication runs first, so the
+    session / user lookup still hits the primary.
+    """
+    replica_actions = ("list", "retrieve", "batch", "similar", "suggest", "reviews", "players", "events")
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if self.action in self.replica_actions:
+            route_reads_to_replica()
+
+
+# -----------------------------------------------------------------
+#  Keyset pagination for review lists (no OFFSET scans on deep pages)
+# -----------------------------------------------------------------
+class ReviewCursorPagination(CursorPagination):
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = "page_size"
+    ordering = ("-created_at", "-id")
+
+
+class EventCursorPagination(CursorPagination):
+    page_size = 50
+    max_page_size = 500
+    page_size_query_param = "page_size"
+    ordering = ("-occurred_at", "-id")
+
+
 # -----------------------------------------------------------------
 #  Game view‑set – unchanged except for import paths
 # -----------------------------------------------------------------
 @method_decorator(csrf_exempt, name="dispatch")
-class GameViewSet(viewsets.ModelViewSet):
+class GameViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """
     API endpoints (all under /api/games/):
         GET    /api/games/            → list all games
         GET    /api/games/<pk>/       → retrieve a single game
+        GET    /api/games/suggest/?q= → title autocomplete
+        GET    /api/games/batch/?ids=3,1,2 → detail payloads of several games, in that order
+        GET    /api/games/<pk>/reviews/ → reviews, newest first (cursor pages)
+        POST   /api/games/<pk>/reviews/ → add or replace your review {"rating": 1‑10, "text": …}
+        GET    /api/games/<pk>/players/?resolution=hour&since=… → player-count history
+        GET    /api/games/<pk>/events/?kind= → event log, newest first (cursor pages)
+        POST   /api/games/<pk>/cover/ → upload cover art (multipart, field "image")
+        DELETE /api/games/<pk>/cover/ → remove the game's cover art
         POST   /api/games/            → create a new game
         DELETE /api/games/<pk>/       → delete a game
         (PUT / PATCH are also available if you need them)
@@ -41,12 +111,14 @@ class GameViewSet(viewsets.ModelViewSet):
         "platform",
         "store",
         "review",
-        "online_status",
         "language",
         "award",
-        "sales_history",
+        "cover",
+        # online_status / sales_history are telemetry rows that may live in
+        # another database (game_site.db_routers) – never join them here
     )
     serializer_class = GameSerializer
+    throttle_scope = "games"
 
     authentication_classes = [CsrfExemptSessionAuthentication]
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
@@ -56,42 +128,613 @@ class GameViewSet(viewsets.ModelViewSet):
         ctx["request"] = self.request
         return ctx
 
+    # GET /api/games/ → anonymous JSON lists come from game_site.page_cache
+    def list(self, request, *args, **kwargs):
+        if not (page_cache.cacheable(request) and request.accepted_renderer.format == "json"):
+            return super().list(request, *args, **kwargs)
+        content = page_cache.get_or_build(
+            page_cache.page_key("api-games"),
+            lambda: JSONRenderer().render(
+                self.get_serializer(self.filter_queryset(self.get_queryset()), many=True).data
+            ),
+            request,
+        )
+        return HttpResponse(content, content_type="application/json")
+
+    # GET /api/games/<pk>/ → shared payload from the "games" cache namespace
+    def retrieve(self, request, *args, **kwargs):
+        data = page_cache.game_detail(
+            f"api:{kwargs['pk']}",
+            lambda: super(GameViewSet, self).retrieve(request, *args, **kwargs).data,
+        )
+        return Response(dict(data, is_whitelisted=data["id"] in whitelist_ids(request.user)))
+
+    # GET /api/games/batch/?ids=3,1,2 → ``/game/<id>/json/`` payloads from the
+    # same cache entries: one multi-get, the misses in one joined query
+    @action(detail=False, methods=["get"])
+    def batch(self, request):
+        try:
+            ids = list(dict.fromkeys(
+                int(part) for part in request.query_params.get("ids", "").split(",") if part.strip()
+            ))
+        except ValueError:
+            raise ValidationError({"ids": "Expected comma-separated game ids."})
+        limit = getattr(settings, "GAME_BATCH_MAX_IDS", 100)
+        if not ids or len(ids) > limit:
+            raise ValidationError({"ids": f"Give between 1 and {limit} ids."})
+        keys = {f"json:{pk}": pk for pk in ids}
+        data = page_cache.game_details(
+            list(keys),
+            lambda missing: {
+                f"json:{pk}": payload
+                for pk, payload in game_details_data([keys[key] for key in missing]).items()
+            },
+        )
+        return Response({
+            "games": [{"id": pk, **data[key]} for key, pk in keys.items() if key in data],
+            "missing": [pk for key, pk in keys.items() if key not in data],
+        })
+
+    # GET /api/games/<pk>/similar/ → precomputed "more like this" list
+    @action(detail=True, methods=["get"])
+    def similar(self, request, pk=None):
+        game = self.get_object()
+        entries = SimilarGame.objects.filter(game=game).select_related(
+            "similar__genre", "similar__platform", "similar__store", "similar__cover"
+        )
+        games = self.get_serializer([e.similar for e in entries], many=True).data
+        return Response(
+            [dict(data, score=round(e.score, 4)) for data, e in zip(games, entries)]
+        )
+
+    # GET / POST /api/games/<pk>/reviews/
+    @action(
+        detail=True,
+        methods=["get", "post"],
+        serializer_class=GameReviewSerializer,
+        pagination_class=ReviewCursorPagination,
+    )
+    def reviews(self, request, pk=None):
+        if request.method == "POST":
+            game = self.get_object()
+            # One review per user – posting again replaces it
+            mine = GameReview.objects.filter(game=game, user=request.user, imported_from__isnull=True)
+            review = mine.first()
+            serializer = self.get_serializer(review, data=request.data)
+            serializer.is_valid(raise_exception=True)
+            try:
+                serializer.save(game=game, user=request.user)
+            except IntegrityError:
+                # A concurrent first post of the same user won – replace that one
+                review = mine.get()
+                serializer = self.get_serializer(review, data=request.data)
+                serializer.is_valid(raise_exception=True)
+                serializer.save()
+            return Response(serializer.data, status=201 if review is None else 200)
+
+        # Keyset pages straight off the (game, -created_at, -id) index –
+        # the game itself is not loaded
+        if not Game.objects.filter(pk=pk).exists():
+            raise NotFound()
+        reviews = GameReview.objects.filter(game_id=pk).select_related("user")
+        page = self.paginate_queryset(reviews)
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
+
+    # GET /api/games/<pk>/players/ → downsampled player counts, oldest first
+    @action(detail=True, methods=["get"])
+    def players(self, request, pk=None):
+        resolution = request.query_params.get("resolution", "minute")
+        if resolution not in player_counts.RESOLUTIONS:
+            raise ValidationError({"resolution": f"One of: {', '.join(player_counts.RESOLUTIONS)}"})
+        bounds = {}
+        for name in ("since", "until"):
+            value = request.query_params.get(name)
+            if value is not None:
+                try:
+                    bounds[name] = parse_datetime(value)
+                except ValueError:
+                    bounds[name] = None
+                if bounds[name] is None:
+                    raise ValidationError({name: "Must be an ISO 8601 date-time."})
+                if timezone.is_naive(bounds[name]):
+                    bounds[name] = timezone.make_aware(bounds[name])
+        # Default window: the last 500 buckets
+        since = bounds.get("since") or timezone.now() - timedelta(
+            seconds=500 * player_counts.RESOLUTIONS[resolution]
+        )
+        if not Game.objects.filter(pk=pk).exists():
+            raise NotFound()
+        return Response({
+            "resolution": resolution,
+            "points": player_counts.series(pk, resolution, since, bounds.get("until")),
+        })
+
+    # GET /api/games/<pk>/events/ → append-only event log, newest first
+    @action(
+        detail=True,
+        methods=["get"],
+        serializer_class=GameEventSerializer,
+        pagination_class=EventCursorPagination,
+    )
+    def events(self, request, pk=None):
+        if not Game.objects.filter(pk=pk).exists():
+            raise NotFound()
+        events = GameEvent.objects.filter(game_id=pk)
+        kind = request.query_params.get("kind")
+        if kind:
+            events = events.filter(kind=kind)
+        page = self.paginate_queryset(events)
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
+
+    # POST / DELETE /api/games/<pk>/cover/ → content-addressed cover art
+    @action(
+        detail=True,
+        methods=["post", "delete"],
+        parser_classes=[MultiPartParser, FormParser],
+        throttle_scope="cover_upload",
+    )
+    def cover(self, request, pk=None):
+        game = self.get_object()
+        if request.method == "DELETE":
+            cover = None
+        else:
+            upload = request.FILES.get("image")
+            if upload is None:
+                raise ValidationError({"image": "Attach the image file as \"image\"."})
+            try:
+                cover = cover_art.store(upload)
+            except cover_art.InvalidImage as exc:
+                raise ValidationError({"image": str(exc)})
+            except cover_art.RenderUnavailable:
+                return Response(
+                    {"detail": "Image processing is busy, retry later."},
+                    status=503,
+                    headers={"Retry-After": "5"},
+                )
+        game.cover = cover
+        game.save(update_fields=["cover"])
+        return Response({"id": game.pk, "cover": cover_art.urls(cover)}, status=201 if cover else 200)
+
+    # GET /api/games/suggest/?q=wit → title autocomplete (in‑memory index)
+    @action(detail=False, methods=["get"], throttle_scope="suggest")
+    def suggest(self, request):
+        try:
+            limit = min(max(int(request.query_params.get("limit", 10)), 1), 25)
+        except ValueError:
+            raise ValidationError({"limit": "Must be an integer."})
+        return Response(
+            [
+                {"id": pk, "game_name": name}
+                for pk, name in suggest_titles(request.query_params.get("q", ""), limit)
+            ]
+        )
+
 
 # -----------------------------------------------------------------
 #  Generic read‑only view‑set for the three lookup tables
 # -----------------------------------------------------------------
-class SimpleReadOnlyViewSet(viewsets.ReadOnlyModelViewSet):
+class SimpleReadOnlyViewSet(ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
     """
     Provides only `list` and `retrieve` actions.
     Sub‑classes only need to set `queryset` and `serializer_class`.
+
+    Both are served from the table's ``lookups`` snapshot, like
+    ``LookupViewSet``, with the ``legacy_name`` the old clients read.
     """
     authentication_classes = [CsrfExemptSessionAuthentication]
     permission_classes = [permissions.AllowAny]   # public read‑only
+    throttle_scope = "lookups"
+
+    # Responses are kept in the table's ``lookups.response_cache``
+    def _cached(self, key, build):
+        if pinned_to_primary():
+            return build()
+        table = lookups.TABLE_FOR_MODEL[self.queryset.model]
+        return lookups.response_cache(table).get_or_set(
+            key, build, getattr(settings, "LOOKUP_CACHE_TTL", 300)
+        )
+
+    def _snapshot(self):
+        return lookups.get_table(lookups.TABLE_FOR_MODEL[self.queryset.model])
+
+    @staticmethod
+    def _with_legacy_name(row):
+        return {**row, "legacy_name": row["name"]}
+
+    def list(self, request, *args, **kwargs):
+        return Response(self._cached("list", lambda: [
+            self._with_legacy_name(row) for row in self._snapshot().rows
+        ]))
+
+    def retrieve(self, request, *args, **kwargs):
+        def build():
+            try:
+                row = self._snapshot().row_for(int(kwargs["pk"]))
+            except ValueError:
+                row = None
+            if row is None:
+                raise NotFound()
+            return self._with_legacy_name(row)
+
+        return Response(self._cached(f"pk:{kwargs['pk']}", build))
+
+
+# -----------------------------------------------------------------
+#  DELETE of a cascading lookup row → background job
+# -----------------------------------------------------------------
+class QueuedDestroyMixin:
+    """
+    ``DELETE /api/<table>/<pk>/`` (staff only) answers 202 with a
+    "catalog.delete_lookup" job: the ``on_delete=CASCADE`` over every game
+    of the row runs in ``manage.py run_jobs``, in chunks – poll the job at
+    ``/api/jobs/<id>/``.
+    """
+    lookup_table = None
+
+    def get_permissions(self):
+        if self.action == "destroy":
+            return [permissions.IsAdminUser()]
+        return super().get_permissions()
+
+    def destroy(self, request, pk=None):
+        row = self.get_object()
+        job = jobs.enqueue(
+            "catalog.delete_lookup", {"table": self.lookup_table, "pk": row.pk}, user=request.user
+        )
+        return Response(JobSerializer(job).data, status=202)
 
 
 # ----------------------------------------------------------------
 #  Genre lookup
 # -----------------------------------------------------------------
-class GenreViewSet(SimpleReadOnlyViewSet):
+class GenreViewSet(QueuedDestroyMixin, SimpleReadOnlyViewSet):
+    lookup_table = "genre"
     queryset = Genre.objects.all()
-    serializer_class = SimpleNameSerializer
-    # Tell the generic serializer which concrete model it is handling
-    serializer_class.Meta.model = Genre
+    serializer_class = simple_name_serializer(Genre, "Genre_Name")
 
 
 # -----------------------------------------------------------------
 #  Platform lookup
 # -----------------------------------------------------------------
-class PlatformViewSet(SimpleReadOnlyViewSet):
+class PlatformViewSet(QueuedDestroyMixin, SimpleReadOnlyViewSet):
+    lookup_table = "platform"
     queryset = Platform.objects.all()
-    serializer_class = SimpleNameSerializer
-    serializer_class.Meta.model = Platform
+    serializer_class = simple_name_serializer(Platform, "Platform_Name")
 
 
 # -----------------------------------------------------------------
 #  Store lookup
 # -----------------------------------------------------------------
-class StoreViewSet(SimpleReadOnlyViewSet):
+class StoreViewSet(QueuedDestroyMixin, SimpleReadOnlyViewSet):
+    lookup_table = "store"
     queryset = Store.objects.all()
-    serializer_class = SimpleNameSerializer
-    serializer_class.Meta.model = Store
\ No newline at end of file
+    serializer_class = simple_name_serializer(Store, "Store_Name")
+
+
+# -----------------------------------------------------------------
+#  All 19 lookup tables, served from the in‑memory snapshots
+# -----------------------------------------------------------------
+class LookupViewSet(ReplicaReadMixin, viewsets.ViewSet):
+    """
+    API endpoints (all under /api/lookups/):
+        GET /api/lookups/                        → every lookup table
+        GET /api/lookups/?tables=genre,store     → only the listed tables
+        GET /api/lookups/<name>/                 → one table as a list
+
+    Tables are returned as lists of ``{"id": <int>, "name": <str>}``.
+    """
+    authentication_classes = [CsrfExemptSessionAuthentication]
+    permission_classes = [permissions.AllowAny]
+    throttle_scope = "lookups"
+    lookup_field = "name"
+
+    def list(self, request):
+        tables = request.query_params.get("tables", "")
+        names = [n.strip() for n in tables.split(",") if n.strip()] or list(
+            lookups.LOOKUP_TABLES
+        )
+        unknown = [n for n in names if n not in lookups.LOOKUP_TABLES]
+        if unknown:
+            raise ValidationError(
+                {"tables": f"Unknown lookup table(s): {', '.join(unknown)}"}
+            )
+        return Response(lookups.get_tables(names))
+
+    def retrieve(self, request, name=None):
+        try:
+            return Response(lookups.get_table(name).rows)
+        except KeyError:
+            raise NotFound(f"Unknown lookup table: {name}")
+
+
+# -----------------------------------------------------------------
+#  Personal recommendations from whitelist co‑occurrence
+# -----------------------------------------------------------------
+class RecommendationViewSet(ReplicaReadMixin, viewsets.ViewSet):
+    """
+    API endpoint:
+        GET /api/recommendations/            → games for the logged‑in user
+        GET /api/recommendations/?limit=10   → at most 10 (default 20, max 50)
+
+    Each game is the usual ``GameSerializer`` payload plus ``score``;
+    games already on the user's whitelist are never returned.
+    """
+    authentication_classes = [CsrfExemptSessionAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = "games"
+
+    def list(self, request):
+        try:
+            limit = min(max(int(request.query_params.get("limit", 20)), 1), 50)
+        except ValueError:
+            raise ValidationError({"limit": "Must be an integer."})
+        ranked = recommendations.recommend(whitelist_ids(request.user), limit=limit)
+        games = Game.objects.select_related(
+            "genre", "platform", "store", "review", "language", "award", "cover"
+        ).in_bulk([game_id for game_id, _ in ranked])
+        ranked = [(games[game_id], score) for game_id, score in ranked if game_id in games]
+        data = GameSerializer(
+            [game for game, _ in ranked], many=True, context={"request": request}
+        ).data
+        return Response(
+            [dict(item, score=round(score, 4)) for item, (_, score) in zip(data, ranked)]
+        )
+
+
+# -----------------------------------------------------------------
+#  Catalog analytics from the precomputed rollups
+# -----------------------------------------------------------------
+class StatsViewSet(ReplicaReadMixin, viewsets.ViewSet):
+    """
+    API endpoints (all under /api/stats/):
+        GET /api/stats/                          → catalog totals
+        GET /api/stats/<dimension>/              → one row per genre / platform /
+                                                   publisher / country
+        GET /api/stats/genre/?order=avg_rating   → sorted by another column
+
+    Rows: ``{"key", "label", "games", "units_sold", "active_players",
+    "avg_rating"}``; ``order`` is one of those measures (default
+    ``units_sold``), always descending.
+    """
+    authentication_classes = [CsrfExemptSessionAuthentication]
+    permission_classes = [permissions.AllowAny]
+    throttle_scope = "stats"
+    lookup_field = "dimension"
+    orderings = ("games", "units_sold", "active_players", "avg_rating")
+
+    @staticmethod
+    def _summary(values):
+        """Measures of one rollup row (or of a sum of rows) for the response."""
+        return {
+            "games": values["games"],
+            "units_sold": values["units_sold"],
+            "active_players": values["active_players"],
+            "avg_rating": (
+                round(values["rating_sum"] / values["rating_count"], 2)
+                if values["rating_count"]
+                else None
+            ),
+        }
+
+    def list(self, request):
+        # Every game has a genre, so the genre rows add up to the catalog
+        totals = dict.fromkeys(rollups.MEASURES, 0)
+        for values in CatalogRollup.objects.filter(dimension="genre").values(*rollups.MEASURES):
+            for m in rollups.MEASURES:
+                totals[m] += values[m]
+        return Response(dict(self._summary(totals), dimensions=list(rollups.DIMENSIONS)))
+
+    def retrieve(self, request, dimension=None):
+        if dimension not in rollups.DIMENSIONS:
+            raise NotFound(f"Unknown dimension: {dimension}")
+        order = request.query_params.get("order", "units_sold")
+        if order not in self.orderings:
+            raise ValidationError({"order": f"One of: {', '.join(self.orderings)}"})
+
+        table = lookups.get_table(dimension) if dimension in lookups.LOOKUP_TABLES else None
+        rows = [
+            dict(
+                key=values["key"],
+                label=table.name_for(int(values["key"])) if table else values["key"],
+                **self._summary(values),
+            )
+            for values in CatalogRollup.objects.filter(dimension=dimension).values(
+                "key", *rollups.MEASURES
+            )
+        ]
+        # None (no ratings yet) sorts last
+        rows.sort(key=lambda r: (r[order] is not None, r[order] or 0), reverse=True)
+        return Response(rows)
+
+
+# -----------------------------------------------------------------
+#  "Can I run it" – one machine against the whole catalog
+# -----------------------------------------------------------------
+class CompatibilityViewSet(ReplicaReadMixin, viewsets.ViewSet):
+    """
+    API endpoint:
+        GET /api/compatibility/?ram=16GB&cpu=Ryzen 5&gpu=RTX 3060
+            → {"machine": {"ram_mb": 16384, "cpu_tier": 5, "gpu_tier": 6},
+               "count": 2, "games": [3, 8]}
+
+    ``ram``, ``cpu`` and ``gpu`` describe the user's machine – free text as
+    in the requirements, or tier numbers for ``cpu`` / ``gpu``
+    (game_site.hardware); a part left out is not checked.  ``games`` are
+    the ids, ascending, of every game whose requirement the machine meets,
+    from one query on the ``sysreq_hardware`` index.
+    """
+    authentication_classes = [CsrfExemptSessionAuthentication]
+    permission_classes = [permissions.AllowAny]
+    throttle_scope = "games"
+    parts = {"ram": ("max_ram", "ram_mb"), "cpu": ("cpu_tier", "cpu_tier"), "gpu": ("gpu_tier", "gpu_tier")}
+
+    def list(self, request):
+        params = {param: request.query_params.get(name, "").strip() for name, (param, _) in self.parts.items()}
+        limits = hardware_limits(params)
+        if not limits:
+            raise ValidationError({"detail": "Give at least one of: ram, cpu, gpu."})
+        unknown = {name: "Not recognised." for name, (_, column) in self.parts.items() if limits.get(column) == 0}
+        if unknown:
+            raise ValidationError(unknown)
+        games = list(
+            Game.objects.filter(**{f"system_requirements__{column}__lte": limit for column, limit in limits.items()})
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+        return Response({
+            "machine": {column: limits.get(column) for _, column in self.parts.values()},
+            "count": len(games),
+            "games": games,
+        })
+
+
+# -----------------------------------------------------------------
+#  Telemetry ingestion from game servers (player counts, event log)
+# -----------------------------------------------------------------
+class HasIngestToken(permissions.BasePermission):
+    """``X-Ingest-Token`` matches ``settings.PLAYER_COUNT_INGEST_TOKEN``, or a staff user."""
+
+    def has_permission(self, request, view):
+        token = getattr(settings, "PLAYER_COUNT_INGEST_TOKEN", None)
+        sent = request.headers.get("X-Ingest-Token")
+        if token and sent and hmac.compare_digest(sent.encode(), token.encode()):
+            return True
+        return bool(request.user and request.user.is_staff)
+
+
+class PlayerCountViewSet(viewsets.ViewSet):
+    """
+    API endpoint:
+        POST /api/player-counts/  → {"samples": [{"game": 1, "active_players": 532,
+                                                   "registered_players": 90000,
+                                                   "recorded_at": "2025-01-01T12:00:05Z"}, …]}
+
+    ``registered_players`` and ``recorded_at`` (default: now) are optional.
+    Answers 202 with the number of samples accepted: they are buffered and
+    written in batches (game_site.player_counts), so they show up in
+    ``/api/games/<pk>/players/`` after the next flush.
+    """
+    authentication_classes = [CsrfExemptSessionAuthentication]
+    permission_classes = [HasIngestToken]
+    # One game server posts far more often than a browser – only the
+    # endpoint rate applies
+    throttle_classes = [EndpointThrottle]
+    throttle_scope = "player_counts"
+
+    def create(self, request):
+        items = request.data.get("samples") if isinstance(request.data, dict) else request.data
+        if not isinstance(items, list):
+            raise ValidationError({"samples": "Expected a list of samples."})
+        try:
+            samples = player_counts.parse_samples(items)
+        except ValueError as exc:
+            raise ValidationError({"samples": str(exc)})
+        player_counts.ingest(samples)
+        return Response({"accepted": len(samples)}, status=202)
+
+
+class GameEventViewSet(viewsets.ViewSet):
+    """
+    API endpoint:
+        POST /api/game-events/  → {"events": [{"game": 1, "kind": "match_end",
+                                                "message": "…", "data": {…},
+                                                "occurred_at": "2025-01-01T12:00:05Z"}, …]}
+
+    ``message``, ``data`` and ``occurred_at`` (default: now) are optional.
+    Answers 202 once the events are queued for the background writer
+    (game_site.game_events), or 503 with ``Retry-After`` when the queue
+    stays full – send the same events again later.
+    """
+    authentication_classes = [CsrfExemptSessionAuthentication]
+    permission_classes = [HasIngestToken]
+    throttle_classes = [EndpointThrottle]
+    throttle_scope = "game_events"
+
+    def create(self, request):
+        items = request.data.get("events") if isinstance(request.data, dict) else request.data
+        if not isinstance(items, list):
+            raise ValidationError({"events": "Expected a list of events."})
+        try:
+            events = game_events.parse_events(items)
+        except ValueError as exc:
+            raise ValidationError({"events": str(exc)})
+        try:
+            game_events.ingest(events)
+        except game_events.QueueFull:
+            return Response(
+                {"detail": "Event queue is full, retry later."},
+                status=503,
+                headers={"Retry-After": "1"},
+            )
+        return Response({"accepted": len(events)}, status=202)
+
+
+# -----------------------------------------------------------------
+#  Background jobs – enqueue and poll
+# -----------------------------------------------------------------
+class JobViewSet(
+    mixins.ListModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet
+):
+    """
+    API endpoints (all under /api/jobs/):
+        GET  /api/jobs/              → your latest jobs (staff: everyone's)
+        GET  /api/jobs/?status=failed
+        GET  /api/jobs/<pk>/         → poll one job: status, progress, result
+        POST /api/jobs/              → staff: {"name": "rollups.rebuild", "args": {…}}
+
+    Jobs run in ``manage.py run_jobs`` (game_site.jobs); ``name`` is one of
+    ``jobs.HANDLERS``.
+    """
+    serializer_class = JobSerializer
+    authentication_classes = [CsrfExemptSessionAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = "jobs"
+
+    def get_queryset(self):
+        qs = Job.objects.all()
+        if not self.request.user.is_staff:
+            qs = qs.filter(created_by=self.request.user)
+        status = self.request.query_params.get("status")
+        if status and self.action == "list":
+            qs = qs.filter(status=status)
+        return qs
+
+    def list(self, request):
+        return Response(self.get_serializer(self.get_queryset()[:100], many=True).data)
+
+    def create(self, request):
+        if not request.user.is_staff:
+            raise PermissionDenied()
+        name = request.data.get("name")
+        args = request.data.get("args") or {}
+        if name not in jobs.HANDLERS:
+            raise ValidationError({"name": f"One of: {', '.join(sorted(jobs.HANDLERS))}"})
+        if not isinstance(args, dict):
+            raise ValidationError({"args": "Expected an object."})
+        job = jobs.enqueue(name, args, user=request.user)
+        return Response(self.get_serializer(job).data, status=202)
+
+
+# -----------------------------------------------------------------
+#  Read‑replica health
+# -----------------------------------------------------------------
+@api_view(["GET"])
+@permission_classes([permissions.AllowAny])
+def replica_status_view(request):
+    """
+    GET /api/replica/ → {"configured": …, "last_sync": …, "lag_seconds": …}
+    """
+    return Response(replica_status())
+
+
+# -----------------------------------------------------------------
+#  Cache metrics
+# -----------------------------------------------------------------
+@api_view(["GET"])
+@permission_classes([permissions.IsAdminUser])
+def cache_stats_view(request):
+    """
+    GET /api/cache/ → per-namespace hit rate and latency of the tiered
+    cache in the worker process that answers (staff only)
+    """
+    return Response(tiered_cache.stats())
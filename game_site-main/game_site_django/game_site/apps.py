@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class GameSiteConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'game_site'
+
+    def ready(self):
+        # Connect the cache-invalidation receivers
+        from . import signals  # noqa: F401
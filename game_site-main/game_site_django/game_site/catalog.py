@@ -0,0 +1,205 @@
+# --------------------------------------------------------------
+# game_site/catalog.py
+# --------------------------------------------------------------
+"""
+Shared catalog query used by ``games_view`` and ``games_view_main``:
+query-string parsing, search / filter / sort, and batched loading of the
+telemetry rows (``OnlineStatus``, ``SalesHistory``, ``GameLog``) that may
+live in a different database than ``Game``.  Also the game detail
+payload (``/game/<id>/json/``, ``/api/games/batch/``).
+"""
+from django.shortcuts import get_object_or_404
+
+from . import fuzzy, hardware
+from .db_routers import telemetry_separate
+from .models import Game
+
+# Related rows every catalog row renders (always in the Game database)
+CATALOG_RELATED = ("genre", "platform", "store", "rating")
+
+# Game FKs that point into the telemetry models
+TELEMETRY_FIELDS = ("online_status", "sales_history", "game_log")
+
+# Related rows the game detail payload names (always in the Game database)
+DETAIL_RELATED = (
+    "genre", "platform", "store", "developer", "publisher", "dlc",
+    "game_mode", "license", "system_requirements", "award", "language",
+)
+
+# Cap of the hardware filter values (a PositiveIntegerField's range)
+LIMIT_MAX = 2 ** 31 - 1
+
+
+def catalog_params(request):
+    """Normalized search / filter / sort parameters from the query string."""
+    return {
+        "search": request.GET.get("search", "").strip(),
+        "fuzzy": request.GET.get("fuzzy", "") in ("1", "true", "on", "yes"),
+        "genre": request.GET.get("genre", ""),
+        "platform": request.GET.get("platform", ""),
+        "store": request.GET.get("store", ""),
+        "whitelisted": request.GET.get("whitelisted"),
+        "max_ram": request.GET.get("max_ram", "").strip(),
+        "cpu_tier": request.GET.get("cpu_tier", "").strip(),
+        "gpu_tier": request.GET.get("gpu_tier", "").strip(),
+        "sort": request.GET.get("sort", ""),
+    }
+
+
+def _tier(value, parse):
+    # A tier number, or the name of a part ("RTX 3060")
+    if value.isdigit():
+        return int(value)
+    return parse(value) or 0
+
+
+def hardware_limits(params):
+    """
+    ``{SystemRequirement column: highest value}`` of the "can I run it"
+    filters in ``params`` – the user's RAM (``max_ram``, megabytes or "16 GB")
+    and CPU / GPU (``cpu_tier`` / ``gpu_tier``, a tier or a part's name,
+    see game_site.hardware).  A game matches when its requirement is at
+    most that; games whose requirement was not recognised never match.
+    A value that cannot be read becomes 0 and matches nothing.
+    """
+    limits = {}
+    if params.get("max_ram"):
+        limits["ram_mb"] = hardware.parse_ram(params["max_ram"]) or 0
+    if params.get("cpu_tier"):
+        limits["cpu_tier"] = _tier(params["cpu_tier"], hardware.cpu_tier)
+    if params.get("gpu_tier"):
+        limits["gpu_tier"] = _tier(params["gpu_tier"], hardware.gpu_tier)
+    # Larger numbers would overflow the database's / numpy's integers
+    return {column: min(limit, LIMIT_MAX) for column, limit in limits.items()}
+
+
+def attach_telemetry(games, fields=TELEMETRY_FIELDS):
+    """
+    Fill the FK caches of ``games`` for the telemetry ``fields`` with one
+    ``in_bulk()`` query per model, so that ``game.online_status`` & co.
+    never trigger a per-row query.  Fields already loaded through
+    ``select_related`` are left alone.  Returns ``games``.
+    """
+    for name in fields:
+        field = Game._meta.get_field(name)
+        pending = [g for g in games if not field.is_cached(g)]
+        ids = {getattr(g, field.attname) for g in pending} - {None}
+        rows = field.related_model.objects.in_bulk(ids) if ids else {}
+        for game in pending:
+            field.set_cached_value(game, rows.get(getattr(game, field.attname)))
+    return games
+
+
+def _players_desc(game):
+    # Same order as ORDER BY active_players DESC on SQLite: NULLs last
+    status = game.online_status
+    if status is None:
+        return (1, 0)
+    return (0, -status.active_players)
+
+
+def catalog_games(params, user):
+    """
+    Return the list of games matching ``params`` (see ``catalog_params``),
+    with the related rows the catalog templates render already loaded.
+    """
+    games_qs = Game.objects.select_related(*CATALOG_RELATED)
+    # Same database → a join is cheapest; otherwise batch-load afterwards
+    join_telemetry = not telemetry_separate()
+    if join_telemetry:
+        games_qs = games_qs.select_related("online_status")
+
+    # ---- Searching ----
+    # Fuzzy mode: the trigram index picks (and ranks) the matching games
+    fuzzy_rank = None
+    if params["search"] and params.get("fuzzy"):
+        fuzzy_rank = {pk: i for i, (pk, _) in enumerate(fuzzy.search(params["search"]))}
+        games_qs = games_qs.filter(pk__in=list(fuzzy_rank))
+    elif params["search"]:
+        games_qs = games_qs.filter(game_name__icontains=params["search"])
+
+    # ---- Filtering ----
+    # An id that is no number matches nothing
+    for name in ("genre", "platform", "store"):
+        if params[name]:
+            try:
+                games_qs = games_qs.filter(**{f"{name}_id": int(params[name])})
+            except ValueError:
+                games_qs = games_qs.none()
+    for column, limit in hardware_limits(params).items():
+        games_qs = games_qs.filter(**{f"system_requirements__{column}__lte": limit})
+
+    if user.is_authenticated:
+        if params["whitelisted"] == "yes":
+            games_qs = games_qs.filter(whitelisted_by=user)
+        elif params["whitelisted"] == "no":
+            games_qs = games_qs.exclude(whitelisted_by=user)
+
+    # ---- Sorting ----
+    # Ties broken by id – the order of game_site.catalog_index
+    sort_by = params["sort"]
+    if sort_by == "name":
+        games_qs = games_qs.order_by("game_name", "pk")
+    elif sort_by == "rating":
+        # Bayesian average – a single 10/10 does not outrank fifty 9/10s
+        games_qs = games_qs.order_by("-rating_bayes", "pk")
+    elif sort_by == "players" and join_telemetry:
+        games_qs = games_qs.order_by("-online_status__active_players", "pk")
+    else:
+        games_qs = games_qs.order_by("pk")
+
+    games = attach_telemetry(list(games_qs), fields=("online_status",))
+    if fuzzy_rank is not None and not sort_by:
+        # No explicit sort → best match first
+        games.sort(key=lambda g: fuzzy_rank[g.pk])
+    if sort_by == "players" and not join_telemetry:
+        # Cross-database sort: stable, so ties keep the default order
+        games.sort(key=_players_desc)
+    return games
+
+
+# -----------------------------------------------------------------
+#  Game detail payload
+# -----------------------------------------------------------------
+def _detail_payload(game):
+    return {
+        "name": game.game_name,
+        "genre": game.genre.Genre_Name if game.genre else "",
+        "platform": game.platform.Platform_Name if game.platform else "",
+        "store": game.store.Store_Name if game.store else "",
+        "developer": str(game.developer) if game.developer else "",
+        "publisher": str(game.publisher) if game.publisher else "",
+        "dlc": str(game.dlc) if game.dlc else "None",
+        "mode": game.game_mode.mode_name if game.game_mode else "",
+        "license": game.license.license_name if game.license else "",
+        "system_requirements": {
+            "os": game.system_requirements.operating_system if game.system_requirements else "",
+            "cpu": game.system_requirements.processor if game.system_requirements else "",
+            "ram": game.system_requirements.ram if game.system_requirements else "",
+            "gpu": game.system_requirements.gpu if game.system_requirements else "",
+        },
+        "rating": round(game.rating_mean, 1) if game.rating_mean is not None else "–",
+        "reviews": game.review_count,
+        "players": game.online_status.active_players if game.online_status else "–",
+        "award": game.award.award_name if game.award else "–",
+        "language": game.language.language_name if game.language else "",
+        "sales": game.sales_history.units_sold if game.sales_history else "",
+    }
+
+
+def game_detail_data(game_id):
+    """The detail payload of one game; raises ``Http404`` when there is none."""
+    game = get_object_or_404(Game.objects.select_related(*DETAIL_RELATED), id=game_id)
+    # Telemetry may live in another database – one batched lookup per model
+    attach_telemetry([game])
+    return _detail_payload(game)
+
+
+def game_details_data(ids):
+    """
+    ``{pk: payload}`` of the games among ``ids`` (missing ones are left
+    out): one joined query for the games, one per telemetry model.
+    """
+    games = list(Game.objects.select_related(*DETAIL_RELATED).filter(pk__in=list(ids)))
+    attach_telemetry(games)
+    return {game.pk: _detail_payload(game) for game in games}
@@ -0,0 +1,356 @@
+# --------------------------------------------------------------
+# game_site/catalog_index.py
+# --------------------------------------------------------------
+"""
+Columnar in-memory copy of the catalog that answers the home page's
+search / filter / sort (``games_view_main``) without SQL.
+
+One row per game, in parallel numpy columns:
+
+    pk, genre, platform, store    int64   FK ids
+    rating_bayes                  float64 the "rating" sort key
+    players                       int64   active players (0 when unknown)
+    has_players                   bool    an OnlineStatus row exists
+    ram_mb, cpu_tier, gpu_tier    int64   the system requirement (game_site.hardware),
+                                          UNKNOWN when not recognised
+    live                          bool    cleared when the game is deleted
+
+plus Python lists of the titles (as stored and ASCII-lowercased for
+``icontains``) and the displayed mean rating.
+
+Filters are vectorized equality (hardware: ``<=``) masks combined with ``&``.  Each sort is
+a precomputed permutation of the rows – the same order the ORM path
+produces, ties broken by id – and a query keeps the permutation entries
+whose mask bit is set.  Fuzzy search takes its ranking from
+game_site.fuzzy, the whitelist filter the cached id set of
+``accounts.user_cache``.
+
+Writes patch the loaded index in place (game_site.outbox, game_site.signals
+and game_site.player_counts for the player counts): changed rows are
+overwritten, new ones appended, deleted ones dropped from ``live``, and
+only the permutations whose key changed are recomputed – on the next
+query.  Writes run one at a time, each reading the database after the
+previous one applied its rows, so an older read never overwrites a newer
+one; queries only wait for the in-memory part.  The index is reloaded
+after ``CATALOG_INDEX_TTL`` seconds to pick up writes of other workers
+(and to shed deleted rows).
+"""
+import threading
+import time
+from typing import NamedTuple
+
+import numpy as np
+from django.conf import settings
+
+from accounts.user_cache import whitelist_ids
+
+from . import fuzzy, lookups
+from .catalog import hardware_limits
+from .db_routers import primary_alias
+from .db_utils import chunked
+from .models import Game, OnlineStatus
+
+# Sorts of the catalog page → column whose change invalidates the permutation
+SORTS = {"": "pk", "name": "name", "rating": "rating", "players": "players"}
+
+# SQLite's LIKE folds ASCII letters only – so does the index
+_ASCII_LOWER = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+
+_INT_COLUMNS = ("pk", "genre", "platform", "store", "players", "ram_mb", "cpu_tier", "gpu_tier")
+
+HARDWARE_COLUMNS = ("ram_mb", "cpu_tier", "gpu_tier")
+
+# Hardware value of a game without a recognised requirement – above every limit
+UNKNOWN = np.iinfo(np.int64).max
+
+
+class PlayerCount(NamedTuple):
+    active_players: int
+
+
+class CatalogRow(NamedTuple):
+    """What home.html renders of a game – built from the index, not the ORM."""
+    id: int
+    game_name: str
+    genre: str
+    platform: str
+    store: str
+    rating_mean: float
+    online_status: PlayerCount
+
+    @property
+    def pk(self):
+        return self.id
+
+
+def _fold(name):
+    return name.translate(_ASCII_LOWER)
+
+
+def _as_id(value):
+    """Filter value from the query string → id, or ``None`` when it is no id."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _read_games(pks=None):
+    """
+    ``{pk: (name, genre, platform, store, rating_mean, rating_bayes, players,
+    ram_mb, cpu_tier, gpu_tier)}`` for ``pks`` (every game by default),
+    ``players`` ``None`` without an OnlineStatus row, the hardware columns
+    ``None`` when unknown.  Always reads the primary – a lagging replica would
+    be frozen into the index.
+    """
+    columns = ("pk", "game_name", "genre_id", "platform_id", "store_id",
+               "rating_mean", "rating_bayes",
+               *(f"system_requirements__{name}" for name in HARDWARE_COLUMNS), "online_status_id")
+    games = Game.objects.using(primary_alias(Game))
+    if pks is None:
+        rows = list(games.values_list(*columns).iterator(chunk_size=2000))
+    else:
+        pks = sorted(set(pks))
+        rows = []
+        for chunk in chunked(pks):
+            rows.extend(games.filter(pk__in=chunk).values_list(*columns))
+
+    status_ids = sorted({row[-1] for row in rows} - {None})
+    players = {}
+    statuses = OnlineStatus.objects.using(primary_alias(OnlineStatus))
+    for chunk in chunked(status_ids):
+        players.update(statuses.filter(pk__in=chunk).values_list("pk", "active_players"))
+    return {row[0]: (*row[1:7], players.get(row[-1]), *row[7:-1]) for row in rows}
+
+
+class CatalogIndex:
+    """The columns, their permutations and the pk → row map."""
+
+    def __init__(self, games):
+        pks = sorted(games)
+        self.row_of = {pk: i for i, pk in enumerate(pks)}
+        values = [games[pk] for pk in pks]
+        self.names = [v[0] for v in values]
+        self.folded = [_fold(name) for name in self.names]
+        self.rating_mean = [v[4] for v in values]
+        self.pk = np.array(pks, dtype=np.int64)
+        self.genre = np.array([v[1] for v in values], dtype=np.int64)
+        self.platform = np.array([v[2] for v in values], dtype=np.int64)
+        self.store = np.array([v[3] for v in values], dtype=np.int64)
+        self.rating = np.array([v[5] for v in values], dtype=np.float64)
+        self.players = np.array([v[6] or 0 for v in values], dtype=np.int64)
+        self.has_players = np.array([v[6] is not None for v in values], dtype=bool)
+        for i, name in enumerate(HARDWARE_COLUMNS, 7):
+            setattr(self, name, np.array([UNKNOWN if v[i] is None else v[i] for v in values], dtype=np.int64))
+        self.live = np.ones(len(pks), dtype=bool)
+        self.orders = {}
+        self.loaded_at = time.monotonic()
+        # ``lock`` guards the columns; ``write_lock`` orders writes (held across their SQL)
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()
+
+    @classmethod
+    def load(cls):
+        return cls(_read_games())
+
+    def __len__(self):
+        return int(self.live.sum())
+
+    # ---- permutations ----
+    def _order(self, sort):
+        order = self.orders.get(sort)
+        if order is None:
+            if sort == "name":
+                # Python's str order is SQLite's BINARY collation (code points)
+                order = np.array(
+                    sorted(range(len(self.names)), key=lambda i: (self.names[i], self.pk[i])),
+                    dtype=np.int64,
+                )
+            elif sort == "rating":
+                order = np.lexsort((self.pk, -self.rating))
+            elif sort == "players":
+                # ORDER BY active_players DESC puts games without a count last
+                order = np.lexsort((self.pk, -self.players, ~self.has_players))
+            else:
+                order = np.argsort(self.pk, kind="stable")
+            self.orders[sort] = order
+        return order
+
+    def _invalidate(self, *keys):
+        for sort, key in SORTS.items():
+            if key in keys:
+                self.orders.pop(sort, None)
+
+    # ---- incremental updates ----
+    def _append(self, count):
+        for name in _INT_COLUMNS:
+            setattr(self, name, np.concatenate((getattr(self, name), np.zeros(count, dtype=np.int64))))
+        self.rating = np.concatenate((self.rating, np.zeros(count)))
+        self.has_players = np.concatenate((self.has_players, np.zeros(count, dtype=bool)))
+        self.live = np.concatenate((self.live, np.zeros(count, dtype=bool)))
+        self.names.extend([""] * count)
+        self.folded.extend([""] * count)
+        self.rating_mean.extend([None] * count)
+
+    def refresh(self, pks, games=None):
+        """Re-read ``pks`` (or take their values from ``games``); missing ids are deleted."""
+        pks = set(pks)
+        with self.write_lock:
+            self._apply(pks, _read_games(pks) if games is None else games)
+
+    def _apply(self, pks, games):
+        with self.lock:
+            new = sorted(pk for pk in games if pk not in self.row_of)
+            if new:
+                first = len(self.names)
+                self._append(len(new))
+                for i, pk in enumerate(new, first):
+                    self.row_of[pk] = i
+                    self.pk[i] = pk
+                self._invalidate("pk", "name", "rating", "players")
+            for pk in pks:
+                row = self.row_of.get(pk)
+                if row is None:
+                    continue
+                if pk not in games:
+                    self.live[row] = False
+                    continue
+                name, genre, platform, store, rating_mean, rating_bayes, players, *requirement = games[pk]
+                if self.names[row] != name:
+                    self.names[row], self.folded[row] = name, _fold(name)
+                    self._invalidate("name")
+                if self.rating[row] != rating_bayes:
+                    self.rating[row] = rating_bayes
+                    self._invalidate("rating")
+                if self.players[row] != (players or 0) or self.has_players[row] != (players is not None):
+                    self.players[row], self.has_players[row] = players or 0, players is not None
+                    self._invalidate("players")
+                self.genre[row], self.platform[row], self.store[row] = genre, platform, store
+                self.rating_mean[row] = rating_mean
+                for column, value in zip(HARDWARE_COLUMNS, requirement):
+                    getattr(self, column)[row] = UNKNOWN if value is None else value
+                self.live[row] = True
+
+    def remove(self, pk):
+        with self.write_lock, self.lock:
+            row = self.row_of.get(pk)
+            if row is not None:
+                self.live[row] = False
+
+    # ---- queries ----
+    def query(self, params, whitelist=frozenset()):
+        """
+        Game ids matching ``params`` (``catalog.catalog_params``) in page
+        order.  ``whitelist`` is the user's whitelisted ids – the
+        "whitelisted" filter only applies to signed-in users, pass ``None``
+        for everyone else.
+        """
+        with self.lock:
+            return self.pk[self._query(params, whitelist)].tolist()
+
+    def query_rows(self, params, whitelist=frozenset()):
+        """``CatalogRow``s of the games ``query()`` returns."""
+        with self.lock:
+            return self._rows(self._query(params, whitelist))
+
+    def _query(self, params, whitelist):
+        # Called with the lock held – returns row numbers in page order
+        fuzzy_ids = None
+        if params["search"] and params.get("fuzzy"):
+            fuzzy_ids = np.array([pk for pk, _ in fuzzy.search(params["search"])], dtype=np.int64)
+        mask = self.live.copy()
+        for name in ("genre", "platform", "store"):
+            if params[name]:
+                value = _as_id(params[name])
+                mask &= (getattr(self, name) == value) if value is not None else False
+        for name, limit in hardware_limits(params).items():
+            mask &= getattr(self, name) <= limit
+        if whitelist is not None and params["whitelisted"] in ("yes", "no"):
+            listed = np.isin(self.pk, np.fromiter(whitelist, dtype=np.int64, count=len(whitelist)))
+            mask &= listed if params["whitelisted"] == "yes" else ~listed
+        if fuzzy_ids is not None:
+            mask &= np.isin(self.pk, fuzzy_ids)
+        elif params["search"]:
+            needle = _fold(params["search"])
+            folded = self.folded
+            hits = [i for i in np.flatnonzero(mask).tolist() if needle in folded[i]]
+            mask[:] = False
+            mask[hits] = True
+
+        sort = params["sort"] if params["sort"] in SORTS else ""
+        if fuzzy_ids is not None and not sort:
+            # No explicit sort → best match first
+            rows = [self.row_of.get(pk) for pk in fuzzy_ids.tolist()]
+            return np.array([r for r in rows if r is not None and mask[r]], dtype=np.int64)
+        order = self._order(sort)
+        return order[mask[order]]
+
+    def _rows(self, rows):
+        # Names of the FK ids come from the lookup snapshots, once per distinct id
+        columns = []
+        for table in ("genre", "platform", "store"):
+            ids = getattr(self, table)[rows]
+            snapshot = lookups.get_table(table)
+            names = {pk: snapshot.name_for(pk) for pk in np.unique(ids).tolist()}
+            columns.append([names[pk] for pk in ids.tolist()])
+        players = [
+            PlayerCount(n) if has else None
+            for n, has in zip(self.players[rows].tolist(), self.has_players[rows].tolist())
+        ]
+        titles, rating_mean = self.names, self.rating_mean
+        return [
+            CatalogRow(pk, titles[i], genre, platform, store, rating_mean[i], status)
+            for pk, i, genre, platform, store, status in zip(
+                self.pk[rows].tolist(), rows.tolist(), *columns, players
+            )
+        ]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def _ttl():
+    return getattr(settings, "CATALOG_INDEX_TTL", 300)
+
+
+def get_index():
+    """The process-wide index, (re)loaded when missing or older than the TTL."""
+    global _index
+    index = _index
+    if index is None or time.monotonic() - index.loaded_at > _ttl():
+        with _index_lock:
+            if _index is None or time.monotonic() - _index.loaded_at > _ttl():
+                _index = CatalogIndex.load()
+            index = _index
+    return index
+
+
+def catalog_rows(params, user):
+    """
+    Drop-in for ``catalog.catalog_games`` on the home page: the matching
+    games as ``CatalogRow``s.
+    """
+    whitelist = whitelist_ids(user) if user.is_authenticated else None
+    return get_index().query_rows(params, whitelist)
+
+
+def refresh_games(pks):
+    """Patch the loaded index after ``pks`` were saved or deleted (no-op when not loaded)."""
+    if _index is not None and pks:
+        # Waits for a reload in progress – its read may predate the write
+        with _index_lock:
+            index = _index
+        if index is not None:
+            index.refresh(pks)
+
+
+def remove_game(pk):
+    if _index is not None:
+        _index.remove(pk)
+
+
+def invalidate():
+    global _index
+    with _index_lock:
+        _index = None
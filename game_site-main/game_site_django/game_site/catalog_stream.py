@@ -0,0 +1,288 @@
+# --------------------------------------------------------------
+# game_site/catalog_stream.py
+# --------------------------------------------------------------
+"""
+Catalog change events pushed to clients over Server-Sent Events
+(``GET /api/catalog/events/``), so the game lists refresh without
+polling.
+
+Events (``event:`` field → JSON ``data:``)::
+
+    game.created            {"id", "game_name"}
+    game.updated            {"id", "game_name"}
+    game.deleted            {"id"}
+    game.whitelist_count    {"id", "whitelist_count"}
+    reset                   {}  – events were missed: refetch, then carry on
+
+Game changes are published by a consumer of ``game_site.outbox``,
+whitelist counts by the receivers in ``game_site.signals`` – both after
+commit, to the broker named by ``settings.CATALOG_STREAM_BROKER``:
+
+    InProcessBroker   in-process pub/sub – default, one server process
+
+Another broker (Redis pub/sub, …) only has to implement ``Broker``.
+
+The outbox delivers at least once, so game changes are published with the
+key ``outbox-<OutboxEvent.pk>``; a broker publishes a key it still holds
+only once, and a redelivered event reaches no client twice.
+
+Every event carries an ``id:``; a client that reconnects sends it back as
+``Last-Event-ID`` (browsers' ``EventSource`` do that by themselves) and
+gets the events it missed from the broker's backlog of
+``CATALOG_STREAM_BACKLOG`` events – or a ``reset`` when they are gone or
+were published by an earlier server process.  A comment line every
+``CATALOG_STREAM_HEARTBEAT`` seconds keeps proxies from closing idle
+streams; a stream ends after ``CATALOG_STREAM_MAX_SECONDS`` and the client
+reconnects.
+
+Served as an async iterator under ASGI (one coroutine per client).  Under
+WSGI every open stream holds a worker thread until it ends.
+"""
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from typing import NamedTuple
+
+from django.conf import settings
+from django.db.models import Count
+from django.utils.module_loading import import_string
+
+from .db_utils import chunked
+from .models import CustomUser
+
+# Milliseconds EventSource waits before reconnecting
+RETRY_MS = 3000
+
+
+class Event(NamedTuple):
+    id: str
+    kind: str
+    data: dict
+
+
+class Broker:
+    """
+    Interface of the catalog event brokers.  Ids are opaque strings that
+    sort in publication order within one broker epoch.
+    """
+
+    def publish(self, kind, data, key=None):
+        """
+        Deliver an event to every reader; returns its id.  An event with
+        the ``key`` of one still in the backlog is not delivered again –
+        the earlier one's id is returned.
+        """
+        raise NotImplementedError
+
+    def last_id(self):
+        """Id of the newest event – a reader starting now reads after it."""
+        raise NotImplementedError
+
+    def read(self, after, timeout):
+        """
+        Events published after the id ``after``, waiting up to ``timeout``
+        seconds for the first one (``[]`` when none came).  ``None`` when
+        ``after`` cannot be resumed.
+        """
+        raise NotImplementedError
+
+    async def aread(self, after, timeout):
+        """``read()`` for coroutines – must not block the event loop."""
+        raise NotImplementedError
+
+
+class InProcessBroker(Broker):
+    """
+    Events in a bounded in-memory backlog.  Sync readers wait on a
+    condition variable, coroutines on a future their event loop resolves.
+    """
+
+    def __init__(self, backlog=None):
+        self.backlog = backlog or getattr(settings, "CATALOG_STREAM_BACKLOG", 1000)
+        # Ids of an earlier process must not be mistaken for ours
+        self.epoch = f"{time.time_ns():x}"
+        self._events = deque()
+        self._keys = {}
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._published = threading.Condition(self._lock)
+        self._waiters = set()
+
+    def publish(self, kind, data, key=None):
+        with self._lock:
+            if key is not None and key in self._keys:
+                return self._keys[key]
+            self._seq += 1
+            event = Event(f"{self.epoch}-{self._seq}", kind, data)
+            self._events.append((self._seq, event, key))
+            if key is not None:
+                self._keys[key] = event.id
+            if len(self._events) > self.backlog:
+                _, _, dropped = self._events.popleft()
+                self._keys.pop(dropped, None)
+            self._published.notify_all()
+            waiters, self._waiters = self._waiters, set()
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_resolve, future)
+        return event.id
+
+    def last_id(self):
+        with self._lock:
+            return f"{self.epoch}-{self._seq}"
+
+    def _seq_of(self, event_id):
+        epoch, _, seq = (event_id or "").partition("-")
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        return int(seq)
+
+    def _after(self, seq):
+        # Called with the lock held
+        if seq > self._seq:
+            return None
+        oldest = self._events[0][0] if self._events else self._seq + 1
+        if seq < oldest - 1:
+            return None   # fell out of the backlog
+        return [event for s, event, _ in self._events if s > seq]
+
+    def read(self, after, timeout):
+        seq = self._seq_of(after)
+        if seq is None:
+            return None
+        with self._lock:
+            self._published.wait_for(lambda: self._seq > seq, timeout)
+            return self._after(seq)
+
+    async def aread(self, after, timeout):
+        seq = self._seq_of(after)
+        if seq is None:
+            return None
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._seq > seq:
+                return self._after(seq)
+            waiter = (loop, loop.create_future())
+            self._waiters.add(waiter)
+        try:
+            await asyncio.wait_for(waiter[1], timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
+        with self._lock:
+            return self._after(seq)
+
+
+def _resolve(future):
+    if not future.done():
+        future.set_result(None)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """The process-wide broker named by ``settings.CATALOG_STREAM_BROKER``."""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                path = getattr(settings, "CATALOG_STREAM_BROKER", "game_site.catalog_stream.InProcessBroker")
+                _broker = import_string(path)()
+    return _broker
+
+
+# -----------------------------------------------------------------
+#  Publishing (called after commit by game_site.outbox / game_site.signals)
+# -----------------------------------------------------------------
+def game_saved(pk, name, created, key=None):
+    get_broker().publish("game.created" if created else "game.updated", {"id": pk, "game_name": name}, key)
+
+
+def game_deleted(pk, key=None):
+    get_broker().publish("game.deleted", {"id": pk}, key)
+
+
+def whitelist_changed(game_ids):
+    """Publish the new whitelist counts of ``game_ids``."""
+    through = CustomUser.whitelisted_games.through
+    game_ids = sorted(set(game_ids))
+    counts = dict.fromkeys(game_ids, 0)
+    for chunk in chunked(game_ids):
+        rows = (
+            through.objects.filter(game_id__in=chunk)
+            .values("game_id")
+            .annotate(n=Count("pk"))
+            .values_list("game_id", "n")
+        )
+        counts.update(rows)
+    broker = get_broker()
+    for game_id, count in sorted(counts.items()):
+        broker.publish("game.whitelist_count", {"id": game_id, "whitelist_count": count})
+
+
+# -----------------------------------------------------------------
+#  The SSE stream
+# -----------------------------------------------------------------
+def _format(event):
+    data = json.dumps(event.data, separators=(",", ":"))
+    return f"id: {event.id}\nevent: {event.kind}\ndata: {data}\n\n".encode()
+
+
+def _reset(broker):
+    cursor = broker.last_id()
+    return cursor, f"id: {cursor}\nevent: reset\ndata: {{}}\n\n".encode()
+
+
+def _settings():
+    return (
+        getattr(settings, "CATALOG_STREAM_HEARTBEAT", 15),
+        getattr(settings, "CATALOG_STREAM_MAX_SECONDS", 300),
+    )
+
+
+def _opening(broker, last_event_id):
+    """Cursor to read after (new events only without ``last_event_id``) and the first bytes."""
+    return last_event_id or broker.last_id(), f"retry: {RETRY_MS}\n\n".encode()
+
+
+def stream(last_event_id=None):
+    """Chunks of the SSE stream for a synchronous (WSGI) server."""
+    broker = get_broker()
+    heartbeat, lifetime = _settings()
+    cursor, prelude = _opening(broker, last_event_id)
+    yield prelude
+    deadline = time.monotonic() + lifetime
+    while time.monotonic() < deadline:
+        events = broker.read(cursor, min(heartbeat, max(0.0, deadline - time.monotonic())))
+        if events is None:
+            cursor, chunk = _reset(broker)
+            yield chunk
+        elif events:
+            cursor = events[-1].id
+            yield b"".join(_format(event) for event in events)
+        else:
+            yield b": ping\n\n"
+
+
+async def astream(last_event_id=None):
+    """Chunks of the SSE stream for an ASGI server."""
+    broker = get_broker()
+    heartbeat, lifetime = _settings()
+    cursor, prelude = _opening(broker, last_event_id)
+    yield prelude
+    deadline = time.monotonic() + lifetime
+    while time.monotonic() < deadline:
+        events = await broker.aread(cursor, min(heartbeat, max(0.0, deadline - time.monotonic())))
+        if events is None:
+            cursor, chunk = _reset(broker)
+            yield chunk
+        elif events:
+            cursor = events[-1].id
+            yield b"".join(_format(event) for event in events)
+        else:
+            yield b": ping\n\n"
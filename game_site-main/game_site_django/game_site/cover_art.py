@@ -0,0 +1,261 @@
+# --------------------------------------------------------------
+# game_site/cover_art.py
+# --------------------------------------------------------------
+"""
+Cover art of the games (``POST /api/games/<pk>/cover/``).
+
+Originals are stored on local disk under their SHA-256, so an image
+uploaded for several games – or twice – is stored and thumbnailed once
+and shared by one ``CoverArt`` row:
+
+    COVER_ART_ROOT/originals/ab/abcdef….jpg
+    COVER_ART_ROOT/thumbs/256/ab/abcdef….webp
+
+Checking the upload and rendering one WebP thumbnail per
+``COVER_ART_THUMBNAIL_SIZES`` entry run in a process pool of
+``COVER_ART_WORKERS`` processes (game_site.imaging): the sizes of one
+upload render in parallel and the web workers never decode an image.
+A thumbnail that is missing on disk – a size added later – is rendered
+on its first request.  Work that is not done within ``RENDER_TIMEOUT``,
+or whose pool worker died, raises ``RenderUnavailable`` (HTTP 503); a
+broken pool is replaced on the next use.
+
+URLs contain the hash, so a file never changes under its URL and is
+served with ``Cache-Control: public, max-age=31536000, immutable``.  The
+bytes go out through ``FileResponse`` – the WSGI server's
+``wsgi.file_wrapper``, i.e. ``sendfile()`` under gunicorn / uWSGI – or,
+with ``COVER_ART_SENDFILE_HEADER`` set (``X-Accel-Redirect`` for nginx,
+``X-Sendfile`` for Apache), as an empty response whose header tells the
+front server which file under ``COVER_ART_SENDFILE_PREFIX`` to send.
+"""
+import hashlib
+import multiprocessing
+import os
+import re
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified
+from django.urls import reverse
+
+from . import imaging
+from .models import CoverArt
+
+# Seconds an upload waits for its thumbnails
+RENDER_TIMEOUT = 60
+
+CONTENT_TYPES = {"jpg": "image/jpeg", "png": "image/png", "webp": "image/webp", "gif": "image/gif"}
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+SHA256_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+class InvalidImage(ValueError):
+    """The upload is not an image this site stores."""
+
+
+class RenderUnavailable(RuntimeError):
+    """The process pool did not do the work in time, or a worker died – try again later."""
+
+
+def root():
+    return Path(getattr(settings, "COVER_ART_ROOT", Path(settings.BASE_DIR) / "media" / "covers"))
+
+
+def sizes():
+    return tuple(getattr(settings, "COVER_ART_THUMBNAIL_SIZES", (128, 256, 512)))
+
+
+def _max_pixels():
+    return getattr(settings, "COVER_ART_MAX_PIXELS", 40_000_000)
+
+
+def original_path(sha256, ext):
+    return root() / "originals" / sha256[:2] / f"{sha256}.{ext}"
+
+
+def thumbnail_path(sha256, size):
+    return root() / "thumbs" / str(size) / sha256[:2] / f"{sha256}.webp"
+
+
+# -----------------------------------------------------------------
+#  Process pool
+# -----------------------------------------------------------------
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _executor():
+    """The process-wide pool, started on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # Spawned, not forked – a fork would copy the web worker's
+                # threads and open database connections
+                _pool = ProcessPoolExecutor(
+                    getattr(settings, "COVER_ART_WORKERS", 2),
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _pool
+
+
+def _discard_pool():
+    """Forget the pool – once a worker died it refuses all work; the next use starts a new one."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False)
+
+
+def _submit(fn, *args):
+    try:
+        return _executor().submit(fn, *args)
+    except BrokenProcessPool:
+        _discard_pool()
+        return _executor().submit(fn, *args)
+
+
+def _results(futures, what):
+    """Results of ``futures`` in order.  Raises ``RenderUnavailable``, or a worker's own error."""
+    done, pending = wait(futures, timeout=RENDER_TIMEOUT)
+    for future in pending:
+        future.cancel()
+    if pending:
+        raise RenderUnavailable(f"{what} not done within {RENDER_TIMEOUT} s")
+    try:
+        return [future.result() for future in futures]
+    except BrokenProcessPool:
+        _discard_pool()
+        raise RenderUnavailable(f"A worker died on {what}") from None
+
+
+def _render(cover, missing):
+    src = str(original_path(cover.sha256, cover.format))
+    futures = [
+        _submit(imaging.thumbnail, src, str(thumbnail_path(cover.sha256, size)), size, _max_pixels())
+        for size in missing
+    ]
+    _results(futures, f"the thumbnails of {cover.sha256}")
+
+
+def ensure_thumbnails(cover, only=None):
+    """Render the thumbnails of ``cover`` (or the sizes ``only``) that are not on disk yet."""
+    missing = [size for size in (only or sizes()) if not thumbnail_path(cover.sha256, size).exists()]
+    if missing:
+        _render(cover, missing)
+
+
+# -----------------------------------------------------------------
+#  Uploads
+# -----------------------------------------------------------------
+def store(upload):
+    """
+    Store the uploaded file (a Django ``UploadedFile``) and its thumbnails;
+    returns its ``CoverArt``, the existing one for a known image.  Raises
+    ``InvalidImage`` or ``RenderUnavailable``.
+    """
+    limit = getattr(settings, "COVER_ART_MAX_BYTES", 10 * 1024 * 1024)
+    if upload.size > limit:
+        raise InvalidImage(f"The file is larger than {limit // (1024 * 1024)} MB.")
+    tmp_dir = root() / "tmp"
+    tmp_dir.mkdir(parents=True, exist_ok=True)
+    digest = hashlib.sha256()
+    fd, tmp = tempfile.mkstemp(dir=tmp_dir)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            for chunk in upload.chunks():
+                digest.update(chunk)
+                out.write(chunk)
+        sha256 = digest.hexdigest()
+
+        cover = CoverArt.objects.filter(sha256=sha256).first()
+        if cover is None or not original_path(sha256, cover.format).exists():
+            try:
+                [(fmt, width, height)] = _results([_submit(imaging.probe, tmp, _max_pixels())], "the upload")
+            except ValueError as exc:
+                raise InvalidImage(str(exc)) from None
+            ext = imaging.FORMATS[fmt]
+            dest = original_path(sha256, ext)
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(tmp, dest)
+            if cover is None:
+                try:
+                    cover = CoverArt.objects.create(
+                        sha256=sha256, format=ext, width=width, height=height, size_bytes=upload.size
+                    )
+                except IntegrityError:
+                    # The same image uploaded concurrently – same bytes, same file
+                    cover = CoverArt.objects.get(sha256=sha256)
+    finally:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+    ensure_thumbnails(cover)
+    return cover
+
+
+# -----------------------------------------------------------------
+#  URLs and responses
+# -----------------------------------------------------------------
+def urls(cover):
+    """``{"original", "width", "height", "thumbnails": {size: url}}`` of ``cover`` – ``None`` without one."""
+    if cover is None:
+        return None
+    return {
+        "original": reverse("cover_original", args=[cover.sha256, cover.format]),
+        "width": cover.width,
+        "height": cover.height,
+        "thumbnails": {
+            str(size): reverse("cover_thumbnail", args=[cover.sha256, size]) for size in sizes()
+        },
+    }
+
+
+def file_response(request, path, content_type, etag):
+    """Immutable response for the file at ``path`` – sent by the front server when configured."""
+    if request.headers.get("If-None-Match") == etag:
+        response = HttpResponseNotModified()
+    else:
+        header = getattr(settings, "COVER_ART_SENDFILE_HEADER", None)
+        if header:
+            response = HttpResponse(content_type=content_type)
+            prefix = getattr(settings, "COVER_ART_SENDFILE_PREFIX", "/protected/covers/")
+            response[header] = prefix.rstrip("/") + "/" + path.relative_to(root()).as_posix()
+        else:
+            try:
+                response = FileResponse(open(path, "rb"), content_type=content_type)
+            except FileNotFoundError:
+                raise Http404("No such cover") from None
+    response["Cache-Control"] = IMMUTABLE
+    response["ETag"] = etag
+    return response
+
+
+def serve_original(request, sha256, ext):
+    if not SHA256_RE.match(sha256) or ext not in CONTENT_TYPES:
+        raise Http404("No such cover")
+    return file_response(request, original_path(sha256, ext), CONTENT_TYPES[ext], f'"{sha256}"')
+
+
+def serve_thumbnail(request, sha256, size):
+    if not SHA256_RE.match(sha256) or size not in sizes():
+        raise Http404("No such cover")
+    path = thumbnail_path(sha256, size)
+    if not path.exists():
+        cover = CoverArt.objects.filter(sha256=sha256).first()
+        if cover is None:
+            raise Http404("No such cover")
+        try:
+            ensure_thumbnails(cover, only=[size])
+        except RenderUnavailable:
+            response = HttpResponse("Thumbnail not ready, retry later.", status=503, content_type="text/plain")
+            response["Retry-After"] = "5"
+            return response
+    return file_response(request, path, "image/webp", f'"{sha256}-{size}"')
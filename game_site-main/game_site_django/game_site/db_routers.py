@@ -0,0 +1,156 @@
+# --------------------------------------------------------------
+# game_site/db_routers.py
+# --------------------------------------------------------------
+"""
+Database routers (``settings.DATABASE_ROUTERS``).
+
+``TelemetryRouter`` keeps the write-heavy telemetry models
+(``OnlineStatus``, ``GameLog``, ``SalesHistory``, the player-count
+series ``PlayerCountSample`` / ``PlayerCountRollup`` and the ``GameEvent``
+log) in their own
+``telemetry`` database, so their constant updates no longer take the
+database-wide SQLite lock that ``Game`` writes need.  ``Game`` points at
+them with ``db_constraint=False`` foreign keys; catalog code loads them
+with batched ``in_bulk()`` lookups (``game_site.catalog.attach_telemetry``)
+instead of joins.
+
+``PrimaryReplicaRouter`` sends reads to the ``replica`` alias only when
+the current request opted in with ``route_reads_to_replica()`` (catalog
+views, ``GameViewSet`` list/retrieve, the lookup endpoints) and has not
+been pinned to the primary.  A request is pinned when it is not a safe
+HTTP method, when it writes a catalog row, or when it carries the pin
+cookie set by ``ReplicaPinningMiddleware`` after a recent write – so users
+always read their own writes.  Account bookkeeping (the session, the
+user's ``last_login``, admin log entries) does not pin: no catalog read
+could miss it, and a pinned request skips the replica and the page cache.
+Without a ``replica`` alias everything goes to ``default``.
+"""
+from contextvars import ContextVar
+
+from django.conf import settings
+
+REPLICA_DB = "replica"
+PRIMARY_DB = "default"
+TELEMETRY_DB = "telemetry"
+
+# (app_label, model_name) of the models that live in TELEMETRY_DB
+TELEMETRY_MODELS = {
+    ("game_site", "onlinestatus"),
+    ("game_site", "gamelog"),
+    ("game_site", "saleshistory"),
+    ("game_site", "playercountsample"),
+    ("game_site", "playercountrollup"),
+    ("game_site", "gameevent"),
+}
+
+# Apps whose writes do not pin the request (the user model doesn't either)
+UNPINNED_APPS = {"admin", "auth", "contenttypes", "sessions"}
+
+# Per-request flags, set and reset by ReplicaPinningMiddleware
+_replica_reads = ContextVar("replica_reads", default=False)
+_pinned = ContextVar("pinned_to_primary", default=False)
+_wrote = ContextVar("wrote_to_primary", default=False)
+
+
+def replica_configured():
+    return REPLICA_DB in settings.DATABASES
+
+
+def telemetry_separate():
+    """True when the telemetry models live in their own database."""
+    return TELEMETRY_DB in settings.DATABASES
+
+
+def is_telemetry_model(model):
+    return (model._meta.app_label, model._meta.model_name) in TELEMETRY_MODELS
+
+
+def route_reads_to_replica():
+    """Let the rest of the current request read from the replica."""
+    _replica_reads.set(True)
+
+
+def pin_to_primary():
+    """Force the rest of the current request (and the pin window) to the primary."""
+    _pinned.set(True)
+
+
+def pinned_to_primary():
+    return _pinned.get()
+
+
+def has_written():
+    return _wrote.get()
+
+
+def pins_request(model):
+    """True when writing ``model`` pins the request (and the next ones) to the primary."""
+    return (
+        model._meta.app_label not in UNPINNED_APPS
+        and model._meta.label_lower != settings.AUTH_USER_MODEL.lower()
+    )
+
+
+def primary_alias(model):
+    """
+    Alias that always holds the authoritative rows for ``model``.
+
+    For reads that are cached in memory afterwards (lookup snapshots),
+    where a lagging replica would freeze stale data into the cache.
+    """
+    if telemetry_separate() and is_telemetry_model(model):
+        return TELEMETRY_DB
+    return PRIMARY_DB
+
+
+class TelemetryRouter:
+    """Must come before ``PrimaryReplicaRouter`` in ``DATABASE_ROUTERS``."""
+
+    def db_for_read(self, model, **hints):
+        if telemetry_separate() and is_telemetry_model(model):
+            return TELEMETRY_DB
+        return None
+
+    db_for_write = db_for_read
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Game → telemetry FKs cross databases on purpose (db_constraint=False)
+        # (instances, not type(obj) – request.user arrives as a SimpleLazyObject)
+        if is_telemetry_model(obj1) or is_telemetry_model(obj2):
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if not telemetry_separate():
+            return None
+        is_telemetry = (app_label, model_name) in TELEMETRY_MODELS
+        if db == TELEMETRY_DB:
+            return is_telemetry
+        if is_telemetry:
+            return False
+        return None
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _replica_reads.get() and not _pinned.get() and replica_configured():
+            return REPLICA_DB
+        return PRIMARY_DB
+
+    def db_for_write(self, model, **hints):
+        if pins_request(model):
+            _wrote.set(True)
+            pin_to_primary()
+        return PRIMARY_DB
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {PRIMARY_DB, REPLICA_DB}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica is a byte copy of the primary – never migrate it directly
+        if db == REPLICA_DB:
+            return False
+        return None
@@ -0,0 +1,17 @@
+# --------------------------------------------------------------
+# game_site/db_utils.py
+# --------------------------------------------------------------
+"""
+Query helpers shared by the modules that read or write the catalog in
+bulk.
+"""
+
+# Ids per "IN (...)" query – stays below SQLite's bound-parameter limit
+IN_CHUNK = 900
+
+
+def chunked(ids, size=IN_CHUNK):
+    """``ids`` in lists of at most ``size`` – one list per "IN (...)" query."""
+    ids = list(ids)
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
@@ -0,0 +1,286 @@
+# --------------------------------------------------------------
+# game_site/fuzzy.py
+# --------------------------------------------------------------
+"""
+Typo-tolerant search over game titles (``?search=…&fuzzy=1``).
+
+An in-process trigram index maps every trigram of a normalized text to a
+sorted ``array('i')`` of game ids (its posting list).  Two texts are
+indexed per game: the title and the "credits" (developer and publisher
+names).  A query runs in two steps:
+
+    1. candidates – posting lists of the query trigrams are concatenated
+       and counted with ``numpy.unique``; the Jaccard overlap of trigram
+       sets keeps the best ``CANDIDATES`` games
+    2. re-ranking – edit distance of the query against the best-matching
+       substring of the title (or credits), so "witcer" still finds
+       "The Witcher 3" first
+
+The index loads lazily, reloads after ``settings.FUZZY_INDEX_TTL`` seconds
+(other workers' writes) and is patched in place on game / developer /
+publisher saves and deletes (game_site.outbox).
+"""
+import bisect
+import re
+import threading
+import time
+import unicodedata
+from array import array
+
+import numpy as np
+from django.conf import settings
+
+from .db_utils import chunked
+from .models import Game
+
+# Games that survive candidate generation and get an edit-distance score
+CANDIDATES = 200
+
+# Re-ranked score below which a game is not a match at all
+MIN_SCORE = 0.6
+
+# Credits matches rank below title matches of the same quality
+CREDITS_WEIGHT = 0.8
+
+_NON_WORD = re.compile(r"[^0-9a-z]+")
+
+
+def normalize(text):
+    """Lower-case ASCII words separated by single spaces ("Pokémon: X" → "pokemon x")."""
+    text = unicodedata.normalize("NFKD", text or "").encode("ascii", "ignore").decode()
+    return _NON_WORD.sub(" ", text.lower()).strip()
+
+
+def trigrams(text):
+    """Trigrams of the normalized words, each padded like pg_trgm (``"  w"``, ``" wo"``, …, ``"rd "``)."""
+    grams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def substring_distances(query, texts):
+    """
+    Smallest Levenshtein distance between ``query`` and any substring of
+    each of ``texts`` (Sellers' algorithm: the match may start and end
+    anywhere).  All texts are processed together, one numpy row operation
+    per query character.
+    """
+    if not texts:
+        return np.empty(0, dtype=np.int32)
+    if not query:
+        return np.zeros(len(texts), dtype=np.int32)
+    width = max(len(t) for t in texts)
+    # Texts as a zero-padded byte matrix (normalized text never contains NUL)
+    chars = np.frombuffer("".join(t.ljust(width, "\0") for t in texts).encode(), dtype=np.uint8)
+    chars = chars.reshape(len(texts), width)
+    steps = np.arange(width + 1, dtype=np.int32)
+    previous = np.zeros((len(texts), width + 1), dtype=np.int32)
+    for i, q in enumerate(query.encode(), 1):
+        current = np.empty_like(previous)
+        current[:, 0] = i
+        np.minimum(previous[:, 1:] + 1, previous[:, :-1] + (chars != q), out=current[:, 1:])
+        # Insertions run left to right: current[j] = min_l (current[l] + j - l)
+        previous = np.minimum.accumulate(current - steps, axis=1) + steps
+    # Only columns inside each text count as end points
+    lengths = np.fromiter((len(t) for t in texts), dtype=np.int32, count=len(texts))
+    previous[steps[None, :] > lengths[:, None]] = np.iinfo(np.int32).max
+    return previous.min(axis=1)
+
+
+def match_scores(query, texts):
+    """
+    Per text: 1.0 for an exact substring, falling with every edit; 0 when
+    nothing is alike.  Multi-word queries may also match word by word, so
+    words left out of the query ("zork inquisitor") do not count as edits.
+    """
+    scores = 1.0 - substring_distances(query, texts) / len(query)
+    words = query.split()
+    if len(words) > 1:
+        by_word = sum(1.0 - substring_distances(w, texts) / len(w) for w in words) / len(words)
+        scores = np.maximum(scores, by_word)
+    return np.maximum(scores, 0.0)
+
+
+class TrigramIndex:
+    """
+    Posting lists (trigram → sorted game ids) plus each game's text,
+    trigrams, and trigram count (a numpy array indexed by game id).
+    """
+
+    def __init__(self):
+        self.postings = {}
+        self.texts = {}
+        self.grams = {}
+        self.sizes = np.zeros(1024, dtype=np.int32)
+
+    def add(self, pk, text):
+        self.remove(pk)
+        grams = trigrams(text)
+        self.texts[pk] = text
+        self.grams[pk] = grams
+        if pk >= len(self.sizes):
+            self.sizes = np.concatenate([self.sizes, np.zeros(max(pk + 1, 2 * len(self.sizes)) - len(self.sizes), dtype=np.int32)])
+        self.sizes[pk] = len(grams)
+        for gram in grams:
+            ids = self.postings.get(gram)
+            if ids is None:
+                self.postings[gram] = array("i", [pk])
+            else:
+                position = bisect.bisect_left(ids, pk)
+                if position == len(ids) or ids[position] != pk:
+                    ids.insert(position, pk)
+
+    def remove(self, pk):
+        self.texts.pop(pk, None)
+        for gram in self.grams.pop(pk, ()):
+            ids = self.postings[gram]
+            position = bisect.bisect_left(ids, pk)
+            if position < len(ids) and ids[position] == pk:
+                del ids[position]
+            if not ids:
+                del self.postings[gram]
+
+    def candidates(self, grams, limit, min_shared=1):
+        """
+        ``{game id: Jaccard overlap}`` of the ``limit`` best games sharing
+        at least ``min_shared`` trigrams with the query.
+        """
+        lists = [np.frombuffer(self.postings[g], dtype=np.int32) for g in grams if g in self.postings]
+        if not lists:
+            return {}
+        ids, shared = np.unique(np.concatenate(lists), return_counts=True)
+        del lists   # release the buffers – posting lists cannot grow while exported
+        keep = shared >= min_shared
+        ids, shared = ids[keep], shared[keep]
+        overlap = shared / (len(grams) + self.sizes[ids] - shared)
+        if len(ids) > limit:
+            best = np.argpartition(-overlap, limit - 1)[:limit]
+            ids, overlap = ids[best], overlap[best]
+        return dict(zip(ids.tolist(), overlap.tolist()))
+
+
+class FuzzyIndex:
+    """Title and credits indexes of the whole catalog."""
+
+    def __init__(self):
+        self.titles = TrigramIndex()
+        self.credits = TrigramIndex()
+        self.loaded_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _credits(developer_first, developer_last, publisher):
+        return normalize(" ".join(filter(None, (developer_first, developer_last, publisher))))
+
+    @classmethod
+    def _rows(cls, queryset):
+        rows = queryset.values_list(
+            "pk", "game_name", "developer__first_name", "developer__last_name",
+            "publisher__publisher_name",
+        )
+        for pk, name, first, last, publisher in rows.iterator(chunk_size=2000):
+            yield pk, normalize(name), cls._credits(first, last, publisher)
+
+    @classmethod
+    def load(cls):
+        index = cls()
+        for pk, title, credits in cls._rows(Game.objects.order_by("pk")):
+            index.titles.add(pk, title)
+            if credits:
+                index.credits.add(pk, credits)
+        return index
+
+    def refresh(self, pks):
+        """Re-read ``pks`` from the database; ids that no longer exist are dropped."""
+        pks = sorted(set(pks))
+        found = []
+        for chunk in chunked(pks):
+            found.extend(self._rows(Game.objects.filter(pk__in=chunk)))
+        with self.lock:
+            for pk in set(pks) - {row[0] for row in found}:
+                self.titles.remove(pk)
+                self.credits.remove(pk)
+            for pk, title, credits in found:
+                self.titles.add(pk, title)
+                if credits:
+                    self.credits.add(pk, credits)
+                else:
+                    self.credits.remove(pk)
+
+    def remove(self, pk):
+        with self.lock:
+            self.titles.remove(pk)
+            self.credits.remove(pk)
+
+    def search(self, query, limit=CANDIDATES):
+        """``[(game_id, score), ...]`` best first, scores in ``[MIN_SCORE, 1]``."""
+        query = normalize(query)
+        grams = trigrams(query)
+        if not grams:
+            return []
+        # q-gram lemma: every edit destroys at most three trigrams, so a
+        # game that can still reach MIN_SCORE shares at least this many –
+        # less the three padded ones a match inside a longer word lacks
+        # ("wi" in "witcher" has "  w" and " wi", but not "wi ")
+        max_edits = int((1.0 - MIN_SCORE) * len(query.replace(" ", "")))
+        min_shared = max(1, len(grams) - 3 * max_edits - 3)
+        with self.lock:
+            title_hits = self.titles.candidates(grams, CANDIDATES, min_shared)
+            credit_hits = self.credits.candidates(grams, CANDIDATES, min_shared)
+            pks = sorted(title_hits.keys() | credit_hits.keys())
+            titles = [self.titles.texts.get(pk, "") for pk in pks]
+            credits = [self.credits.texts.get(pk, "") for pk in pks]
+        scores = np.maximum(
+            match_scores(query, titles), CREDITS_WEIGHT * match_scores(query, credits)
+        )
+        scored = []
+        for pk, score in zip(pks, scores.tolist()):
+            if score >= MIN_SCORE:
+                # Ties: the closer overall trigram overlap, then the lower id
+                overlap = max(title_hits.get(pk, 0.0), credit_hits.get(pk, 0.0))
+                scored.append((-score, -overlap, pk))
+        scored.sort()
+        return [(pk, -score) for score, _, pk in scored[:limit]]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def _ttl():
+    return getattr(settings, "FUZZY_INDEX_TTL", 300)
+
+
+def get_index():
+    """The process-wide index, (re)loaded when missing or older than the TTL."""
+    global _index
+    index = _index
+    if index is None or time.monotonic() - index.loaded_at > _ttl():
+        with _index_lock:
+            if _index is None or time.monotonic() - _index.loaded_at > _ttl():
+                _index = FuzzyIndex.load()
+            index = _index
+    return index
+
+
+def search(query, limit=CANDIDATES):
+    return get_index().search(query, limit)
+
+
+def refresh_games(pks):
+    """Patch the loaded index after ``pks`` were saved or deleted (no-op when not loaded)."""
+    if _index is not None and pks:
+        _index.refresh(pks)
+
+
+def remove_game(pk):
+    if _index is not None:
+        _index.remove(pk)
+
+
+def invalidate():
+    global _index
+    with _index_lock:
+        _index = None
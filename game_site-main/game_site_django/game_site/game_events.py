@@ -0,0 +1,278 @@
+# --------------------------------------------------------------
+# game_site/game_events.py
+# --------------------------------------------------------------
+"""
+Write-behind ingestion of the append-only ``GameEvent`` log
+(``POST /api/game-events/``).
+
+Requests only parse their events and hand them to the process-wide
+``EventWriter``: a bounded in-memory queue drained by one background
+thread, which writes up to ``GAME_EVENT_BATCH_SIZE`` events per
+``bulk_create`` – as soon as a full batch is waiting, otherwise every
+``GAME_EVENT_FLUSH_SECONDS``.
+
+Backpressure: the queue holds at most ``GAME_EVENT_QUEUE_SIZE`` events.
+A request whose events do not fit waits up to ``GAME_EVENT_PUT_TIMEOUT``
+seconds for the writer to make room and is then refused with ``QueueFull``
+(HTTP 503 + ``Retry-After``), so a slow database slows producers down
+instead of growing the process without bound.  A request's events are
+queued all together or not at all.
+
+Shutdown: ``close()`` (registered with ``atexit``) lets the thread write
+everything still queued before the process exits.  Events queued but not
+yet written are lost if the process is killed – callers that cannot
+afford that should write ``GameEvent`` rows directly.
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import deque
+from datetime import timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import close_old_connections, connections, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .db_routers import primary_alias
+from .db_utils import chunked
+from .models import Game, GameEvent
+
+logger = logging.getLogger(__name__)
+
+# Accepted clock skew of a game server running ahead of ours
+MAX_FUTURE_SKEW = timedelta(seconds=60)
+
+# Seconds between attempts to write a batch the database refused
+RETRY_DELAYS = (0.1, 0.5, 2.0)
+
+
+class QueueFull(Exception):
+    """The events did not fit into the queue within the timeout."""
+
+
+# -----------------------------------------------------------------
+#  Parsing
+# -----------------------------------------------------------------
+def parse_events(items, now=None):
+    """
+    ``[{"game", "kind", "message"?, "data"?, "occurred_at"?}, …]`` →
+    ``[(game_id, kind, message, data, occurred_at), …]``.  Raises
+    ``ValueError`` naming the first bad item.
+    """
+    now = now or timezone.now()
+    kind_length = GameEvent._meta.get_field("kind").max_length
+    events = []
+    for i, item in enumerate(items):
+        try:
+            if not isinstance(item, dict):
+                raise ValueError("must be an object")
+            game_id = item.get("game")
+            if isinstance(game_id, bool) or not isinstance(game_id, int):
+                raise ValueError("game must be a game id")
+            kind = item.get("kind")
+            if not isinstance(kind, str) or not 0 < len(kind) <= kind_length:
+                raise ValueError(f"kind must be a string of 1–{kind_length} characters")
+            message = item.get("message", "")
+            if not isinstance(message, str):
+                raise ValueError("message must be a string")
+            occurred_at = item.get("occurred_at")
+            if occurred_at is None:
+                occurred_at = now
+            else:
+                try:
+                    occurred_at = parse_datetime(str(occurred_at))
+                except ValueError:
+                    occurred_at = None
+                if occurred_at is None:
+                    raise ValueError("occurred_at must be an ISO 8601 date-time")
+                if timezone.is_naive(occurred_at):
+                    occurred_at = timezone.make_aware(occurred_at, dt_timezone.utc)
+                if occurred_at > now + MAX_FUTURE_SKEW:
+                    raise ValueError("occurred_at is in the future")
+            events.append((game_id, kind, message, item.get("data"), occurred_at))
+        except ValueError as exc:
+            raise ValueError(f"events[{i}]: {exc}") from None
+    return events
+
+
+def write_events(events):
+    """
+    Insert ``[(game_id, kind, message, data, occurred_at), …]`` with one
+    ``bulk_create``.  Events of games that do not exist (any more) are
+    dropped.  Returns the number of rows written.
+    """
+    known = set()
+    for chunk in chunked({event[0] for event in events}):
+        known.update(Game.objects.filter(pk__in=chunk).values_list("pk", flat=True))
+    rows = [
+        GameEvent(game_id=game_id, kind=kind, message=message, data=data, occurred_at=occurred_at)
+        for game_id, kind, message, data, occurred_at in events
+        if game_id in known
+    ]
+    with transaction.atomic(using=primary_alias(GameEvent)):
+        GameEvent.objects.bulk_create(rows)
+    return len(rows)
+
+
+# -----------------------------------------------------------------
+#  Bounded queue + background writer
+# -----------------------------------------------------------------
+class EventWriter:
+    """
+    Events waiting to be written and the daemon thread writing them.
+    ``write(batch)`` does the actual insert (``write_events`` by default).
+    """
+
+    def __init__(self, write=write_events, capacity=None, batch_size=None, flush_seconds=None):
+        self._write = write
+        self.capacity = capacity or getattr(settings, "GAME_EVENT_QUEUE_SIZE", 100000)
+        self.batch_size = batch_size or getattr(settings, "GAME_EVENT_BATCH_SIZE", 2000)
+        self.flush_seconds = flush_seconds or getattr(settings, "GAME_EVENT_FLUSH_SECONDS", 1.0)
+        self._events = deque()
+        self._in_flight = 0
+        self._flush_waiters = 0
+        self._closed = False
+        self._thread = None
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)   # writer waits for events
+        self._not_full = threading.Condition(self._lock)    # producers wait for room
+        self._idle = threading.Condition(self._lock)        # flush() waits for an empty queue
+        self.stats = {"queued": 0, "written": 0, "rejected": 0, "dropped": 0}
+
+    def __len__(self):
+        return len(self._events)
+
+    def put(self, events, timeout=None):
+        """
+        Queue ``events`` (all or none), waiting up to ``timeout`` seconds
+        (``GAME_EVENT_PUT_TIMEOUT``) for room.  Raises ``QueueFull``.
+        """
+        events = list(events)
+        if not events:
+            return
+        if timeout is None:
+            timeout = getattr(settings, "GAME_EVENT_PUT_TIMEOUT", 2.0)
+        with self._lock:
+            closed = self._closed
+            if not closed:
+                self._enqueue(events, timeout)
+        if closed:
+            # Shutting down – nobody is left to drain the queue
+            self._write(events)
+
+    def _enqueue(self, events, timeout):
+        # Called with the lock held
+        if len(events) > self.capacity or not self._not_full.wait_for(
+            lambda: len(self._events) + len(events) <= self.capacity, timeout
+        ):
+            self.stats["rejected"] += len(events)
+            raise QueueFull(f"{len(self._events)} events already queued")
+        self._events.extend(events)
+        self.stats["queued"] += len(events)
+        if self._thread is None or not self._thread.is_alive():
+            # Started lazily: a thread started before a fork would not survive it
+            self._thread = threading.Thread(target=self._run, name="game-event-writer", daemon=True)
+            self._thread.start()
+        if len(self._events) >= self.batch_size:
+            self._not_empty.notify()
+
+    def flush(self, timeout=None):
+        """Have everything queued so far written; ``False`` if ``timeout`` ran out first."""
+        with self._lock:
+            self._flush_waiters += 1
+            self._not_empty.notify()
+            try:
+                return self._idle.wait_for(lambda: not self._events and not self._in_flight, timeout)
+            finally:
+                self._flush_waiters -= 1
+
+    def close(self, timeout=10):
+        """Write what is queued and stop the thread (later ``put()`` calls write directly)."""
+        with self._lock:
+            self._closed = True
+            self._not_empty.notify()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _next_batch(self):
+        with self._lock:
+            deadline = time.monotonic() + self.flush_seconds
+            while (
+                len(self._events) < self.batch_size
+                and not self._closed
+                and not (self._flush_waiters and self._events)
+            ):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._not_empty.wait(remaining)
+            count = min(len(self._events), self.batch_size)
+            batch = [self._events.popleft() for _ in range(count)]
+            self._in_flight = count
+            if count:
+                self._not_full.notify_all()
+            elif self._closed:
+                return None
+            return batch
+
+    def _write_batch(self, batch):
+        for attempt, delay in enumerate((*RETRY_DELAYS, None)):
+            try:
+                self.stats["written"] += self._write(batch)
+                return
+            except Exception:
+                close_old_connections()
+                if delay is None or self._closed:
+                    logger.exception("Dropping %d game events after %d attempts", len(batch), attempt + 1)
+                    self.stats["dropped"] += len(batch)
+                    return
+                time.sleep(delay)
+
+    def _run(self):
+        try:
+            while True:
+                batch = self._next_batch()
+                if batch is None:
+                    return
+                try:
+                    if batch:
+                        self._write_batch(batch)
+                finally:
+                    with self._lock:
+                        self._in_flight = 0
+                        if not self._events:
+                            self._idle.notify_all()
+        finally:
+            connections.close_all()
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer():
+    """The process-wide writer, created on first use."""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = EventWriter()
+    return _writer
+
+
+def ingest(events, timeout=None):
+    get_writer().put(events, timeout)
+
+
+@atexit.register
+def _close_writer():
+    if _writer is not None:
+        _writer.close()
+
+
+def delete_game(game_id):
+    """Drop the log of a deleted game."""
+    GameEvent.objects.filter(game_id=game_id).delete()
@@ -0,0 +1,121 @@
+# --------------------------------------------------------------
+# game_site/hardware.py
+# --------------------------------------------------------------
+"""
+Numbers from the free-text columns of ``SystemRequirement`` – what the
+"can I run it" filters compare:
+
+    parse_ram("8 GB")          → 8192      megabytes
+    cpu_tier("Intel i7")       → 7         1 (slowest) … 10
+    gpu_tier("RTX 3060")       → 6         1 (integrated) … 10
+
+Tiers are coarse on purpose: a CPU is placed by its family (i3 / i5 / …,
+Ryzen 3 / 5 / …, Apple M1 / M2 / …), a GPU by its generation plus its
+class within the generation (xx50 … xx90), so a newer mid-range card
+lands next to an older high-end one.  Text that is not recognised gives
+``None`` – the game then matches no hardware filter.
+
+Plain functions of strings – no Django imports – so the model, the
+backfill command and the request parsing all share them.
+"""
+import re
+
+TIERS = range(1, 11)
+
+_RAM_RE = re.compile(r"\b(\d+(?:[.,]\d+)?)\s*(tb|gb|g|mb|m)?\b", re.IGNORECASE)
+
+_RAM_UNITS = {"tb": 1024 * 1024, "gb": 1024, "g": 1024, "mb": 1, "m": 1}
+
+
+def _clamp(tier):
+    return max(TIERS.start, min(TIERS.stop - 1, tier))
+
+
+def parse_ram(text):
+    """Megabytes of ``text`` ("8 GB", "512MB", "16"); ``None`` without a number."""
+    match = _RAM_RE.search(text or "")
+    if match is None:
+        return None
+    amount = float(match.group(1).replace(",", "."))
+    unit = (match.group(2) or "").lower()
+    if not unit:
+        # A bare number is gigabytes unless it can only be megabytes
+        unit = "gb" if amount <= 256 else "mb"
+    return int(amount * _RAM_UNITS[unit]) or None
+
+
+# -----------------------------------------------------------------
+#  CPUs
+# -----------------------------------------------------------------
+# (pattern, tier) – first match wins, so specific names come first
+_CPU_TIERS = (
+    (re.compile(r"threadripper", re.I), 10),
+    (re.compile(r"core\s*ultra\s*([579])", re.I), lambda m: int(m.group(1)) + 1),
+    (re.compile(r"\bi([3579])\b|\bi([3579])-", re.I), lambda m: int(m.group(1) or m.group(2))),
+    (re.compile(r"ryzen\s*([3579])\b", re.I), lambda m: int(m.group(1))),
+    (re.compile(r"\bm([1-4])(?:\s*(pro|max|ultra))?\b", re.I),
+     lambda m: int(m.group(1)) + 5 + (1 if m.group(2) else 0)),
+    (re.compile(r"xeon", re.I), 6),
+    (re.compile(r"core\s*2|athlon|phenom|\bfx\b|pentium|celeron|atom", re.I), 1),
+)
+
+
+def cpu_tier(text):
+    """Tier of the processor named in ``text``; ``None`` when unknown."""
+    for pattern, tier in _CPU_TIERS:
+        match = pattern.search(text or "")
+        if match:
+            return _clamp(tier(match) if callable(tier) else tier)
+    return None
+
+
+# -----------------------------------------------------------------
+#  GPUs
+# -----------------------------------------------------------------
+# Generation (leading digits of the model number) → base score
+_NVIDIA_GENERATIONS = {6: 0, 7: 0, 9: 1, 10: 2, 16: 2, 20: 3, 30: 4, 40: 5, 50: 6}
+# Line → class offset: a GT card sits below the same number's GTX (GT 1030 < GTX 1050)
+_NVIDIA_LINES = {"gt": -1, "gtx": 0, "rtx": 0}
+_AMD_GENERATIONS = {4: 0, 5: 0, 6: 0}           # RX 4xx / 5xx (three digits)
+_AMD_RDNA_GENERATIONS = {5: 3, 6: 4, 7: 5, 9: 6}  # RX 5xxx … 9xxx
+
+_NVIDIA_RE = re.compile(r"\b(gtx|rtx|gt)\s*(\d{3,4})\b", re.I)
+_AMD_RE = re.compile(r"\brx\s*(\d{3,4})\b", re.I)
+_ARC_RE = re.compile(r"\barc\s*[ab](\d{3})\b", re.I)
+_INTEGRATED_RE = re.compile(r"integrated|intel\s*(?:u?hd|iris)|vega\s*\d+\b|radeon\s*graphics", re.I)
+
+
+def _class_score(digit):
+    # xx50 → 0, xx60 → 1, … xx90 → 4
+    return max(0, min(4, digit - 5))
+
+
+def gpu_tier(text):
+    """Tier of the graphics card named in ``text``; ``None`` when unknown."""
+    text = text or ""
+    match = _NVIDIA_RE.search(text)
+    if match:
+        line, number = match.group(1).lower(), int(match.group(2))
+        base = _NVIDIA_GENERATIONS.get(number // 100)
+        if base is not None:
+            return _clamp(1 + base + _class_score(number % 100 // 10) + _NVIDIA_LINES[line])
+    match = _AMD_RE.search(text)
+    if match:
+        number = int(match.group(1))
+        if number >= 1000:
+            base, digit = _AMD_RDNA_GENERATIONS.get(number // 1000), number % 1000 // 100
+        else:
+            base, digit = _AMD_GENERATIONS.get(number // 100), number % 100 // 10
+        if base is not None:
+            return _clamp(1 + base + _class_score(digit))
+    match = _ARC_RE.search(text)
+    if match:
+        return _clamp(int(match.group(1)) // 100 - 1)
+    if _INTEGRATED_RE.search(text):
+        return 1
+    return None
+
+
+def parse(ram, processor, gpu):
+    """``(ram_mb, cpu_tier, gpu_tier)`` of one requirement's text columns."""
+    return parse_ram(ram), cpu_tier(processor), gpu_tier(gpu)
@@ -0,0 +1,69 @@
+# --------------------------------------------------------------
+# game_site/imaging.py
+# --------------------------------------------------------------
+"""
+Image work run in the process pool of ``game_site.cover_art``.
+
+Plain functions of paths and numbers – no Django imports – so a freshly
+spawned worker process only needs Pillow to run them, and a malformed
+or hostile image can at worst take down a pool worker, never a web
+worker.
+"""
+import os
+import tempfile
+
+# Pillow format → extension of the stored original
+FORMATS = {"JPEG": "jpg", "PNG": "png", "WEBP": "webp", "GIF": "gif"}
+
+THUMBNAIL_FORMAT = "WEBP"
+THUMBNAIL_QUALITY = 80
+
+
+def probe(path, max_pixels):
+    """
+    ``(format, width, height)`` of the image at ``path``.  Raises
+    ``ValueError`` for anything that is not a complete image in one of
+    ``FORMATS`` of at most ``max_pixels`` pixels.
+    """
+    from PIL import Image, UnidentifiedImageError
+
+    Image.MAX_IMAGE_PIXELS = max_pixels
+    try:
+        with Image.open(path) as image:
+            fmt, (width, height) = image.format, image.size
+            if fmt not in FORMATS:
+                raise ValueError(f"Unsupported image format: {fmt}")
+            if width * height > max_pixels:
+                raise ValueError(f"Image too large: {width}×{height} pixels")
+            # Reads the whole file – catches truncated and corrupt images
+            image.verify()
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError):
+        raise ValueError(f"Not a valid {', '.join(FORMATS)} image.") from None
+    return fmt, width, height
+
+
+def thumbnail(src, dest, size, max_pixels):
+    """
+    Write a ``THUMBNAIL_FORMAT`` copy of ``src`` that fits into
+    ``size``×``size`` to ``dest`` (atomically – readers never see half a
+    file).  Returns ``dest``.
+    """
+    from PIL import Image, ImageOps
+
+    Image.MAX_IMAGE_PIXELS = max_pixels
+    with Image.open(src) as image:
+        # JPEG decodes straight at a fraction of the size – much less work
+        image.draft("RGB", (size, size))
+        image = ImageOps.exif_transpose(image)
+        image = image.convert("RGBA" if "A" in image.getbands() or "transparency" in image.info else "RGB")
+        image.thumbnail((size, size), Image.Resampling.LANCZOS)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(dest), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                image.save(out, THUMBNAIL_FORMAT, quality=THUMBNAIL_QUALITY, method=4)
+            os.replace(tmp, dest)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+    return dest
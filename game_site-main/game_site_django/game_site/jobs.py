@@ -0,0 +1,317 @@
+# --------------------------------------------------------------
+# game_site/jobs.py
+# --------------------------------------------------------------
+"""
+Durable background jobs kept in the database – no external broker.
+
+    enqueue("rollups.rebuild")              → a ``Job`` row, status "queued"
+    python manage.py run_jobs --threads 4   → a worker that claims and runs them
+
+Handlers are plain functions registered under a name with ``@handler``.
+They receive a ``JobContext`` (``ctx.progress(done, total)``) followed by
+the job's ``args`` as keyword arguments and return a JSON-serializable
+result, which is stored on the row.
+
+Claiming is an optimistic ``UPDATE … WHERE status = 'queued'`` of the
+oldest due row, so several worker processes can share the table on any
+database backend.  A handler that raises is retried up to the job's
+``max_attempts`` with exponential backoff (``JOB_RETRY_BACKOFF``).  The
+worker refreshes ``heartbeat_at`` of the jobs it runs; a running job
+whose heartbeat is older than ``JOB_STALE_SECONDS`` (its worker died) is
+queued again – handlers must be safe to re-run.
+"""
+import logging
+import os
+import signal
+import socket
+import threading
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import player_counts, prerender, recommendations, reviews, rollups, similarity
+from .lookups import LOOKUP_TABLES
+from .models import Game, Job
+
+logger = logging.getLogger(__name__)
+
+# Lookup tables whose rows CASCADE to their games – deleted by a job
+CASCADE_TABLES = ("genre", "platform", "store")
+
+HANDLERS = {}
+
+
+def handler(name, max_attempts=3):
+    """Register the decorated function as the handler of jobs called ``name``."""
+    def decorator(fn):
+        fn.max_attempts = max_attempts
+        HANDLERS[name] = fn
+        return fn
+    return decorator
+
+
+def enqueue(name, args=None, user=None, delay=0):
+    """
+    Queue a ``name`` job with keyword ``args``; it runs once a worker is
+    free, at least ``delay`` seconds from now.  Raises ``KeyError`` for
+    unknown names.
+    """
+    fn = HANDLERS[name]
+    return Job.objects.create(
+        name=name,
+        args=args or {},
+        max_attempts=fn.max_attempts,
+        created_by=user if user is not None and user.is_authenticated else None,
+        run_after=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+class JobContext:
+    """Handed to a handler: progress reporting for the running ``job``."""
+    # Seconds between progress writes
+    INTERVAL = 0.5
+
+    def __init__(self, job):
+        self.job = job
+        self._written_at = 0.0
+
+    def progress(self, done, total=None):
+        self.job.progress_done = done = int(done)
+        if total is not None:
+            self.job.progress_total = int(total)
+        finished = self.job.progress_total is not None and done >= self.job.progress_total
+        if finished or time.monotonic() - self._written_at >= self.INTERVAL:
+            Job.objects.filter(pk=self.job.pk).update(
+                progress_done=done, progress_total=self.job.progress_total, heartbeat_at=timezone.now()
+            )
+            self._written_at = time.monotonic()
+
+
+# -----------------------------------------------------------------
+#  Claiming and running
+# -----------------------------------------------------------------
+def claim(worker):
+    """Claim the oldest due job for ``worker``.  ``None`` when nothing is due."""
+    while True:
+        now = timezone.now()
+        pk = (
+            Job.objects.filter(status=Job.QUEUED, run_after__lte=now)
+            .order_by("run_after", "id")
+            .values_list("pk", flat=True)
+            .first()
+        )
+        if pk is None:
+            return None
+        # Another worker may have taken it since the SELECT – then try the next one
+        if Job.objects.filter(pk=pk, status=Job.QUEUED).update(
+            status=Job.RUNNING, worker=worker, started_at=now, heartbeat_at=now,
+            attempts=F("attempts") + 1,
+        ):
+            return Job.objects.get(pk=pk)
+
+
+def _backoff(attempts):
+    return timedelta(seconds=getattr(settings, "JOB_RETRY_BACKOFF", 30) * 2 ** (attempts - 1))
+
+
+def run(job_id):
+    """Run a claimed job and record the outcome.  Returns the final status."""
+    try:
+        job = Job.objects.get(pk=job_id)
+        mine = Job.objects.filter(pk=job.pk, status=Job.RUNNING, worker=job.worker)
+        fn = HANDLERS.get(job.name)
+        try:
+            if fn is None:
+                raise LookupError(f"No handler registered for {job.name!r}")
+            result = fn(JobContext(job), **job.args)
+        except Exception:
+            logger.exception("Job #%s (%s) failed, attempt %s", job.pk, job.name, job.attempts)
+            now = timezone.now()
+            if fn is not None and job.attempts < job.max_attempts:
+                status, changes = Job.QUEUED, {"run_after": now + _backoff(job.attempts)}
+            else:
+                status, changes = Job.FAILED, {"finished_at": now}
+            # Only while still ours – a job requeued as stale belongs to someone else now
+            mine.update(status=status, error=traceback.format_exc()[-5000:], heartbeat_at=None, **changes)
+            return status
+        mine.update(status=Job.SUCCEEDED, result=result, error="", finished_at=timezone.now())
+        return Job.SUCCEEDED
+    finally:
+        close_old_connections()
+
+
+def heartbeat(job_ids, worker):
+    Job.objects.filter(pk__in=list(job_ids), status=Job.RUNNING, worker=worker).update(
+        heartbeat_at=timezone.now()
+    )
+
+
+def requeue_stale():
+    """Queue again (or fail, when out of attempts) running jobs whose worker went silent."""
+    now = timezone.now()
+    stale = Job.objects.filter(
+        status=Job.RUNNING,
+        heartbeat_at__lt=now - timedelta(seconds=getattr(settings, "JOB_STALE_SECONDS", 300)),
+    )
+    failed = stale.filter(attempts__gte=F("max_attempts")).update(
+        status=Job.FAILED, finished_at=now, error="The worker running this job stopped responding."
+    )
+    return failed + stale.update(status=Job.QUEUED, worker="", heartbeat_at=None)
+
+
+def _init_process():
+    import django
+    django.setup()
+    # Ctrl-C reaches the whole process group – only the worker reacts to it
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+class Worker:
+    """
+    Claims due jobs and runs up to ``concurrency`` of them at once on a
+    thread pool, or on a process pool for CPU-bound handlers.
+    """
+
+    def __init__(self, concurrency=1, processes=False, poll=1.0, name=None):
+        self.concurrency = concurrency
+        self.processes = processes
+        self.poll = poll
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+        self._stop = threading.Event()
+
+    def stop(self):
+        """Claim nothing more; ``run()`` returns when the running jobs finish."""
+        self._stop.set()
+
+    def _executor(self):
+        if self.processes:
+            # Forked children must not share the parent's database connections
+            connections.close_all()
+            return ProcessPoolExecutor(self.concurrency, initializer=_init_process)
+        return ThreadPoolExecutor(self.concurrency, thread_name_prefix="job")
+
+    def run(self, once=False):
+        """Work until ``stop()`` – or, with ``once``, until nothing is due."""
+        interval = getattr(settings, "JOB_HEARTBEAT_SECONDS", 30)
+        running = {}
+        beat_at = 0.0
+        executor = self._executor()
+        try:
+            while not self._stop.is_set():
+                for future in [f for f in running if f.done()]:
+                    job_id = running.pop(future)
+                    if future.exception() is not None:
+                        # run() records handler errors itself – this is the pool failing
+                        logger.error("Job #%s crashed its worker: %r", job_id, future.exception())
+                if time.monotonic() - beat_at >= interval:
+                    heartbeat(running.values(), self.name)
+                    requeue_stale()
+                    beat_at = time.monotonic()
+                while len(running) < self.concurrency and not self._stop.is_set():
+                    job = claim(self.name)
+                    if job is None:
+                        break
+                    running[executor.submit(run, job.pk)] = job.pk
+                if running:
+                    wait(running, timeout=min(self.poll, interval), return_when=FIRST_COMPLETED)
+                elif once:
+                    break
+                else:
+                    self._stop.wait(self.poll)
+        finally:
+            executor.shutdown(wait=True)
+            close_old_connections()
+
+
+# -----------------------------------------------------------------
+#  Handlers
+# -----------------------------------------------------------------
+@handler("catalog.delete_lookup")
+def delete_lookup(ctx, table, pk, chunk_size=500):
+    """
+    Delete a genre / platform / store row and – its ``on_delete=CASCADE`` –
+    every game using it, ``chunk_size`` games per transaction.
+    """
+    if table not in CASCADE_TABLES:
+        raise ValueError(f"Not a cascading lookup table: {table}")
+    games = Game.objects.filter(**{f"{table}_id": pk}).order_by("pk")
+    total = games.count()
+    done = 0
+    ctx.progress(done, total + 1)
+    while True:
+        chunk = list(games.values_list("pk", flat=True)[:chunk_size])
+        if not chunk:
+            break
+        with transaction.atomic():
+            Game.objects.filter(pk__in=chunk).delete()
+        done += len(chunk)
+        ctx.progress(done, max(total, done) + 1)
+    LOOKUP_TABLES[table].model.objects.filter(pk=pk).delete()
+    ctx.progress(done + 1, done + 1)
+    return {"games_deleted": done}
+
+
+@handler("catalog.delete_games")
+def delete_games(ctx, ids, chunk_size=500):
+    """Delete the games ``ids`` (the admin's bulk delete), ``chunk_size`` per transaction."""
+    ids = sorted(ids)
+    deleted = 0
+    ctx.progress(0, len(ids))
+    for start in range(0, len(ids), chunk_size):
+        chunk = ids[start:start + chunk_size]
+        with transaction.atomic():
+            _, counts = Game.objects.filter(pk__in=chunk).delete()
+        deleted += counts.get(Game._meta.label, 0)
+        ctx.progress(start + len(chunk))
+    return {"games_deleted": deleted}
+
+
+@handler("rollups.rebuild")
+def rebuild_rollups(ctx):
+    return {"games": rollups.rebuild()}
+
+
+@handler("reviews.recompute")
+def recompute_reviews(ctx, ids=None, chunk_size=500):
+    """Recompute the review aggregates of the games ``ids`` – of every game by default."""
+    if ids is None:
+        return {"games": reviews.recompute()}
+    updated = 0
+    ctx.progress(0, len(ids))
+    for start in range(0, len(ids), chunk_size):
+        chunk = ids[start:start + chunk_size]
+        updated += reviews.recompute(Game.objects.filter(pk__in=chunk))
+        ctx.progress(start + len(chunk))
+    return {"games": updated}
+
+
+@handler("recommendations.rebuild")
+def rebuild_cooccurrence(ctx):
+    return {"rows": recommendations.rebuild(progress=ctx.progress)}
+
+
+@handler("similarity.rebuild")
+def rebuild_similar_games(ctx):
+    return {"games": similarity.rebuild_all(progress=ctx.progress)}
+
+
+@handler("similarity.refresh")
+def refresh_similar_games(ctx, ids=(), lists=()):
+    """The lists a save of the games ``ids`` can change, plus the lists ``lists`` (queued by the outbox)."""
+    return {"games": similarity.refresh_for_games(ids, lists)}
+
+
+@handler("player_counts.prune")
+def prune_player_counts(ctx):
+    return player_counts.prune()
+
+
+@handler("catalog.prerender", max_attempts=1)
+def prerender_catalog(ctx, full=False):
+    return prerender.run(full=full)
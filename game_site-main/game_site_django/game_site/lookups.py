@@ -0,0 +1,178 @@
+# --------------------------------------------------------------
+# game_site/lookups.py
+# --------------------------------------------------------------
+"""
+In-memory registry of the 19 lookup tables that hang off ``Game``.
+
+Every table is described once in ``LOOKUP_TABLES`` (model, the columns
+that make up its human-readable name and a format string that mirrors
+the model's ``__str__``).  The first read of a table loads it with a
+single ``values_list`` query and keeps the result as two parallel
+arrays – ids and names – plus the ready-to-serialize rows.
+
+The cached snapshot is dropped by the ``post_save`` / ``post_delete``
+receivers in ``game_site.signals`` and, as a safety net for other
+worker processes, after ``LOOKUP_CACHE_TTL`` seconds.  The same
+receivers bump the ``game_site.tiered_cache`` namespace of the API
+responses built from the table (``response_cache``), in every process.
+"""
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass
+
+from django.conf import settings
+
+from . import tiered_cache
+from .db_routers import primary_alias
+from .models import (
+    Genre,
+    Platform,
+    Store,
+    Size,
+    Developer,
+    Publisher,
+    DLC,
+    GameMode,
+    License,
+    SystemRequirement,
+    Review,
+    Multimedia,
+    Status,
+    SalesHistory,
+    GameLog,
+    Rating,
+    OnlineStatus,
+    Award,
+    Language,
+)
+
+
+@dataclass(frozen=True)
+class LookupTable:
+    """Describes how to turn one lookup model into ``(id, name)`` pairs."""
+    model: type
+    fields: tuple
+    label: str = "{0}"
+
+    def format(self, values):
+        return self.label.format(*values)
+
+
+# --------------------------------------------------------------
+#  Public table names → model description (same order as ``Game``)
+# --------------------------------------------------------------
+LOOKUP_TABLES = {
+    "genre": LookupTable(Genre, ("Genre_Name",)),
+    "platform": LookupTable(Platform, ("Platform_Name",)),
+    "store": LookupTable(Store, ("Store_Name",)),
+    "size": LookupTable(Size, ("size_type",)),
+    "developer": LookupTable(Developer, ("first_name", "last_name"), "{0} {1}"),
+    "publisher": LookupTable(Publisher, ("publisher_name",)),
+    "dlc": LookupTable(DLC, ("dlc_name",)),
+    "game_mode": LookupTable(GameMode, ("mode_name",)),
+    "license": LookupTable(License, ("license_name",)),
+    "system_requirements": LookupTable(
+        SystemRequirement, ("operating_system", "processor"), "{0}, {1}"
+    ),
+    "review": LookupTable(Review, ("rating",), "Rating: {0}"),
+    "multimedia": LookupTable(Multimedia, ("website",)),
+    "status": LookupTable(Status, ("status_name",)),
+    "sales_history": LookupTable(SalesHistory, ("units_sold",), "Sold: {0}"),
+    "game_log": LookupTable(GameLog, ("log_ID",), "Log {0}"),
+    "rating": LookupTable(Rating, ("rating_name",)),
+    "online_status": LookupTable(
+        OnlineStatus,
+        ("active_players", "registered_players"),
+        "Active: {0}, Registered: {1}",
+    ),
+    "award": LookupTable(Award, ("award_name",)),
+    "language": LookupTable(Language, ("language_name",)),
+}
+
+# Reverse map used by the signal receivers
+TABLE_FOR_MODEL = {table.model: name for name, table in LOOKUP_TABLES.items()}
+
+
+@dataclass(frozen=True)
+class LookupSnapshot:
+    """Precomputed contents of one table, ordered by primary key."""
+    ids: array
+    names: tuple
+    rows: tuple
+    loaded_at: float
+
+    def name_for(self, pk):
+        """Binary search on the sorted id array; ``""`` for unknown ids."""
+        i = bisect_left(self.ids, pk)
+        if i < len(self.ids) and self.ids[i] == pk:
+            return self.names[i]
+        return ""
+
+    def row_for(self, pk):
+        """The ``{"id", "name"}`` row of ``pk``; ``None`` for unknown ids."""
+        i = bisect_left(self.ids, pk)
+        if i < len(self.ids) and self.ids[i] == pk:
+            return self.rows[i]
+        return None
+
+
+_snapshots = {}
+_lock = threading.Lock()
+
+
+def _ttl():
+    return getattr(settings, "LOOKUP_CACHE_TTL", 300)
+
+
+def _load(name):
+    table = LOOKUP_TABLES[name]
+    ids = array("q")
+    names = []
+    # Always read the primary: a lagging replica would be frozen into the snapshot
+    qs = table.model.objects.using(primary_alias(table.model))
+    for pk, *values in qs.order_by("pk").values_list("pk", *table.fields):
+        ids.append(pk)
+        names.append(table.format(values))
+    rows = tuple({"id": pk, "name": n} for pk, n in zip(ids, names))
+    return LookupSnapshot(ids, tuple(names), rows, time.monotonic())
+
+
+def get_table(name):
+    """
+    Return the ``LookupSnapshot`` for ``name``.
+
+    Raises ``KeyError`` for names that are not in ``LOOKUP_TABLES``.
+    """
+    if name not in LOOKUP_TABLES:
+        raise KeyError(name)
+
+    snapshot = _snapshots.get(name)
+    if snapshot is None or time.monotonic() - snapshot.loaded_at > _ttl():
+        with _lock:
+            snapshot = _snapshots.get(name)
+            if snapshot is None or time.monotonic() - snapshot.loaded_at > _ttl():
+                snapshot = _snapshots[name] = _load(name)
+    return snapshot
+
+
+def get_tables(names):
+    """Return ``{name: rows}`` for every requested table name."""
+    return {name: get_table(name).rows for name in names}
+
+
+def response_cache(name):
+    """``tiered_cache`` namespace of the API responses built from table ``name``."""
+    return tiered_cache.namespace(f"lookup-{name}")
+
+
+def invalidate(name=None):
+    """Forget one table (or all of them when ``name`` is ``None``)."""
+    with _lock:
+        if name is None:
+            _snapshots.clear()
+        else:
+            _snapshots.pop(name, None)
+    for table in LOOKUP_TABLES if name is None else (name,):
+        response_cache(table).bump()
@@ -0,0 +1,152 @@
+"""
+Home page catalog query: the ORM path (``catalog.catalog_games``) against
+the columnar in-memory index (``catalog_index``).
+
+    python manage.py bench_catalog_index --games 20000 --queries 10
+
+Both read synthetic games from a scratch SQLite file: for the duration of
+the run the "default" connection points at it, so the project database is
+never touched.  The query mix follows the home page's filter bar – no
+filter, one to three FK filters, a title search – with each sort.
+Reported per mix: milliseconds per query of both paths (the index path
+includes building the rows the template renders) and the rows returned,
+then the index load time and the cost of an incremental update.
+"""
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from game_site import catalog_index, lookups
+from game_site.catalog import catalog_games
+from game_site.db_routers import telemetry_separate
+from game_site.models import Game, Genre, OnlineStatus, Platform, Store
+
+# Game and every table its foreign keys point at – SQLite checks they exist
+MODELS = (
+    *dict.fromkeys(f.related_model for f in Game._meta.concrete_fields if f.is_relation),
+    Game,
+)
+
+WORDS = ("dark", "souls", "witcher", "quest", "star", "racer", "legend", "city", "night", "zero")
+
+
+def _params(**kw):
+    return dict(dict(search="", fuzzy=False, genre="", platform="", store="", whitelisted=None, sort=""), **kw)
+
+
+class Command(BaseCommand):
+    help = "Compare the ORM catalog query with the in-memory columnar index."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--games", type=int, default=20000)
+        parser.add_argument("--queries", type=int, default=10)
+
+    def handle(self, *args, **opts):
+        if telemetry_separate():
+            raise CommandError("Run without GAME_SITE_TELEMETRY_DB – the scratch data is one file.")
+        original = connections["default"]
+        with tempfile.TemporaryDirectory() as tmp:
+            scratch = original.__class__(
+                {**original.settings_dict, "NAME": str(Path(tmp) / "catalog.sqlite3")}, "default"
+            )
+            connections["default"] = scratch
+            try:
+                self._populate(opts["games"])
+                self._run(opts["queries"])
+            finally:
+                scratch.close()
+                connections["default"] = original
+                lookups.invalidate()
+                catalog_index.invalidate()
+
+    def _populate(self, games):
+        rng = random.Random(0)
+        with connections["default"].schema_editor() as editor:
+            for model in MODELS:
+                editor.create_model(model)
+        Genre.objects.bulk_create(
+            Genre(genre_ID=i, Genre_Name=f"Genre {i}", Genre_Popularity="") for i in range(1, 41)
+        )
+        Platform.objects.bulk_create(Platform(platform_ID=i, Platform_Name=f"Platform {i}") for i in range(1, 11))
+        Store.objects.bulk_create(Store(store_ID=i, Store_Name=f"Store {i}") for i in range(1, 9))
+        OnlineStatus.objects.bulk_create(
+            (OnlineStatus(active_players=rng.randint(0, 100000), registered_players=0) for _ in range(games)),
+            batch_size=5000,
+        )
+        rows = []
+        for i in range(1, games + 1):
+            rated = rng.random() < 0.7
+            rows.append(Game(
+                game_name=" ".join(rng.sample(WORDS, 2)).title() + f" {i}",
+                genre_id=rng.randint(1, 40),
+                platform_id=rng.randint(1, 10),
+                store_id=rng.randint(1, 8),
+                # A fifth of the games without a player count – sorted last
+                online_status_id=i if rng.random() < 0.8 else None,
+                rating_mean=round(rng.uniform(1, 10), 2) if rated else None,
+                rating_bayes=rng.uniform(5, 8),
+            ))
+        Game.objects.bulk_create(rows, batch_size=2000)
+        lookups.invalidate()
+        catalog_index.invalidate()
+
+    def _time(self, fn, queries):
+        times = []
+        for _ in range(queries):
+            start = time.perf_counter()
+            result = fn()
+            times.append(time.perf_counter() - start)
+        return statistics.median(times) * 1000, len(result)
+
+    def _run(self, queries):
+        anonymous = AnonymousUser()
+        start = time.perf_counter()
+        index = catalog_index.get_index()
+        self.stdout.write(f"index load     {(time.perf_counter() - start) * 1000:9.1f} ms  ({len(index)} games)")
+
+        mixes = {
+            "all": _params(),
+            "genre": _params(genre="7"),
+            "genre+platform": _params(genre="7", platform="3"),
+            "genre+plat+store": _params(genre="7", platform="3", store="2"),
+            "search": _params(search="witcher"),
+        }
+        self.stdout.write(f"{'query':<26}{'ORM ms':>10}{'index ms':>10}{'speed-up':>10}{'rows':>8}")
+        for label, params in mixes.items():
+            for sort in ("", "name", "rating", "players"):
+                p = dict(params, sort=sort)
+                orm_ms, orm_rows = self._time(lambda: catalog_games(p, anonymous), queries)
+                index_ms, index_rows = self._time(lambda: catalog_index.catalog_rows(p, anonymous), queries)
+                assert orm_rows == index_rows, (label, sort, orm_rows, index_rows)
+                self.stdout.write(
+                    f"{label + (' / ' + sort if sort else ''):<26}{orm_ms:10.2f}{index_ms:10.3f}"
+                    f"{orm_ms / index_ms:9.0f}x{index_rows:8}"
+                )
+
+        # One game re-rated: in-place column update, then the first sorted
+        # query recomputes the "rating" permutation
+        rng = random.Random(1)
+        pks = index.pk.tolist()
+        updates, resorts = [], []
+        for _ in range(200):
+            pk = rng.choice(pks)
+            row = index.row_of[pk]
+            values = (index.names[row], int(index.genre[row]), int(index.platform[row]), int(index.store[row]),
+                      index.rating_mean[row], rng.uniform(5, 8),
+                      int(index.players[row]) if index.has_players[row] else None,
+                      *(None if getattr(index, name)[row] == catalog_index.UNKNOWN else int(getattr(index, name)[row])
+                        for name in catalog_index.HARDWARE_COLUMNS))
+            start = time.perf_counter()
+            index.refresh({pk}, games={pk: values})
+            updates.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            index.query(_params(sort="rating", genre="7"))
+            resorts.append(time.perf_counter() - start)
+        self.stdout.write(f"row update     {statistics.median(updates) * 1e6:9.1f} µs (in memory)")
+        self.stdout.write(f"re-sort query  {statistics.median(resorts) * 1000:9.2f} ms (first query after a rating change)")
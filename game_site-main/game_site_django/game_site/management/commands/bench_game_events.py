@@ -0,0 +1,130 @@
+"""
+Throughput of the write-behind game event log against one ``create()``
+per event.
+
+    python manage.py bench_game_events --events 20000 --producers 4
+
+Both runs write ``GameEvent`` rows into a scratch SQLite file (production
+pragmas, ``settings.SQLITE_PRODUCTION_PRAGMAS``) through a temporary
+database alias; the project database is never touched.
+
+  create  – producer threads call ``GameEvent.objects.create()`` for every
+            event, one transaction each
+  queued  – producer threads ``put()`` the same requests into an
+            ``EventWriter``, whose thread writes them with ``bulk_create``
+
+Each producer call carries ``--per-request`` events, like one POST to
+``/api/game-events/``.  Reported: events/s until every row is committed
+and the p50 / p99 time of one producer call – what a request waits.
+"""
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+from django.utils import timezone
+
+from game_site.game_events import EventWriter
+from game_site.models import GameEvent
+
+ALIAS = "bench_game_events"
+
+
+def _open_scratch(path):
+    """Register ``ALIAS`` for the SQLite file ``path`` and create the table."""
+    pragmas = "".join(f"PRAGMA {k}={v};" for k, v in settings.SQLITE_PRODUCTION_PRAGMAS.items())
+    connections.settings[ALIAS] = connections.configure_settings({
+        **settings.DATABASES,
+        ALIAS: {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": str(path),
+            "OPTIONS": {"init_command": pragmas, "transaction_mode": "IMMEDIATE"},
+        }
+    })[ALIAS]
+    with connections[ALIAS].schema_editor() as editor:
+        editor.create_model(GameEvent)
+
+
+def _close_scratch():
+    connections[ALIAS].close()
+    del connections[ALIAS]
+    del connections.settings[ALIAS]
+
+
+def _bulk_write(batch):
+    rows = [
+        GameEvent(game_id=game_id, kind=kind, message=message, data=data, occurred_at=occurred_at)
+        for game_id, kind, message, data, occurred_at in batch
+    ]
+    with transaction.atomic(using=ALIAS):
+        GameEvent.objects.using(ALIAS).bulk_create(rows)
+    return len(rows)
+
+
+class Command(BaseCommand):
+    help = "Compare per-event create() with the batched background event writer."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--events", type=int, default=20000)
+        parser.add_argument("--producers", type=int, default=4)
+        parser.add_argument("--per-request", type=int, default=10)
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **opts):
+        self.stdout.write(
+            f"{opts['events']} events, {opts['producers']} producers, "
+            f"{opts['per_request']} events per request"
+        )
+        for mode in ("create", "queued"):
+            with tempfile.TemporaryDirectory() as tmp:
+                _open_scratch(Path(tmp) / "events.sqlite3")
+                try:
+                    seconds, latencies, rows = self._run(mode, **opts)
+                finally:
+                    _close_scratch()
+            ms = sorted(x * 1000 for x in latencies) or [0.0]
+            self.stdout.write(
+                f"{mode:>7}: {rows / seconds:9.0f} events/s  "
+                f"request p50 {statistics.median(ms):7.3f} ms  "
+                f"p99 {ms[min(len(ms) - 1, int(len(ms) * 0.99))]:8.3f} ms  ({rows} rows)"
+            )
+
+    def _run(self, mode, *, events, producers, per_request, batch_size, **_):
+        now = timezone.now()
+        requests_per_producer = max(1, events // (producers * per_request))
+        writer = EventWriter(write=_bulk_write, capacity=10 * batch_size, batch_size=batch_size)
+        latencies, lock = [], threading.Lock()
+
+        def produce(seed):
+            own = []
+            for r in range(requests_per_producer):
+                request = [
+                    (seed * 1000 + i % 1000, "match_end", f"request {r}", {"score": i}, now)
+                    for i in range(per_request)
+                ]
+                start = time.perf_counter()
+                if mode == "create":
+                    for game_id, kind, message, data, occurred_at in request:
+                        GameEvent.objects.using(ALIAS).create(
+                            game_id=game_id, kind=kind, message=message, data=data, occurred_at=occurred_at
+                        )
+                else:
+                    writer.put(request, timeout=60)
+                own.append(time.perf_counter() - start)
+            connections[ALIAS].close()
+            with lock:
+                latencies.extend(own)
+
+        threads = [threading.Thread(target=produce, args=(i,)) for i in range(producers)]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        writer.close(timeout=600)
+        seconds = time.perf_counter() - start
+        return seconds, latencies, GameEvent.objects.using(ALIAS).count()
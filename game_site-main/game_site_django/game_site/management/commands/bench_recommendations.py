@@ -0,0 +1,72 @@
+"""
+Cost of the co-occurrence recommender on a synthetic whitelist matrix.
+
+    python manage.py bench_recommendations --users 100000 --games 5000
+
+Builds ``C = Xᵀ X`` in user chunks exactly like ``build_cooccurrence``
+(no database involved), then times ``score()`` for random users with the
+rows held in memory the way ``RowCache`` keeps them.  Game popularity
+follows a Zipf-like curve so a few titles are on most whitelists.
+"""
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from game_site.recommendations import ROW_LIMIT, USER_CHUNK, cooccurrence_matrix, score
+
+
+class Command(BaseCommand):
+    help = "Measure co-occurrence build time and per-user recommendation latency."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=100000)
+        parser.add_argument("--games", type=int, default=5000)
+        parser.add_argument("--per-user", type=int, default=20, help="mean whitelist size")
+        parser.add_argument("--queries", type=int, default=500)
+
+    def handle(self, *args, **opts):
+        rng = np.random.default_rng(0)
+        n_users, n_games = opts["users"], opts["games"]
+        sizes = rng.poisson(opts["per_user"], n_users).clip(1, n_games)
+        weights = 1.0 / np.arange(1, n_games + 1) ** 0.8
+        weights /= weights.sum()
+        users = np.repeat(np.arange(n_users), sizes)
+        games = rng.choice(n_games, size=len(users), p=weights)
+        # A user whitelists a game at most once
+        pairs = np.unique(np.stack([users, games], axis=1), axis=0)
+        users, games = pairs[:, 0], pairs[:, 1]
+        self.stdout.write(f"{n_users} users, {n_games} games, {len(users)} whitelist rows")
+
+        start = time.perf_counter()
+        bounds = np.searchsorted(users, np.arange(0, n_users + USER_CHUNK, USER_CHUNK))
+        C = cooccurrence_matrix(
+            ((users[lo:hi], games[lo:hi]) for lo, hi in zip(bounds[:-1], bounds[1:])), n_games
+        ).tocsr()
+        self.stdout.write(f"build      {time.perf_counter() - start:8.2f} s   ({C.nnz} non-zero)")
+
+        popularity = C.diagonal().astype(np.float64)
+        rows = {}
+        for g in range(n_games):
+            cols = C.indices[C.indptr[g]:C.indptr[g + 1]]
+            counts = C.data[C.indptr[g]:C.indptr[g + 1]].astype(np.float64)
+            keep = cols != g
+            cols, counts = cols[keep].astype(np.int64), counts[keep]
+            if len(counts) > ROW_LIMIT:
+                top = np.argpartition(-counts, ROW_LIMIT - 1)[:ROW_LIMIT]
+                cols, counts = cols[top], counts[top]
+            rows[g] = (cols, counts)
+
+        user_starts = np.searchsorted(users, np.arange(n_users + 1))
+        sample = rng.choice(n_users, size=opts["queries"], replace=False)
+        timings = []
+        for u in sample:
+            whitelist = set(games[user_starts[u]:user_starts[u + 1]].tolist())
+            start = time.perf_counter()
+            score(whitelist, rows, lambda ids: popularity[ids])
+            timings.append(time.perf_counter() - start)
+        timings = np.array(timings) * 1000
+        self.stdout.write(
+            f"recommend  p50 {np.percentile(timings, 50):6.2f} ms   "
+            f"p99 {np.percentile(timings, 99):6.2f} ms"
+        )
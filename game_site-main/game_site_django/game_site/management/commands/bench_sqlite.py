@@ -0,0 +1,156 @@
+"""
+Concurrency benchmark for the SQLite database profiles.
+
+    python manage.py bench_sqlite --seconds 5 --readers 4
+
+For both the "dev" profile (rollback journal, Python's default busy
+handler) and the "production" profile (``settings.SQLITE_PRODUCTION_PRAGMAS``)
+a scratch database shaped like ``game_site_game`` is created in a temp
+directory.  One writer thread commits small update transactions in a loop
+while ``--readers`` threads run the catalog list query; the command reports
+read throughput, read latency and "database is locked" errors per profile.
+The project database is never touched.
+"""
+import random
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+SCHEMA = """
+CREATE TABLE game (
+    id INTEGER PRIMARY KEY,
+    game_name VARCHAR(30) NOT NULL,
+    genre_id INTEGER NOT NULL,
+    platform_id INTEGER NOT NULL,
+    store_id INTEGER NOT NULL,
+    active_players INTEGER NOT NULL
+);
+CREATE INDEX game_genre ON game (genre_id);
+"""
+
+READ_SQL = (
+    "SELECT id, game_name, genre_id, platform_id, store_id, active_players "
+    "FROM game WHERE genre_id = ? ORDER BY active_players DESC LIMIT 50"
+)
+WRITE_SQL = "UPDATE game SET active_players = active_players + 1 WHERE genre_id = ?"
+
+
+def _connect(path, pragmas):
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    for name, value in pragmas.items():
+        conn.execute(f"PRAGMA {name}={value}")
+    return conn
+
+
+class Command(BaseCommand):
+    help = "Measure SQLite read throughput while a writer is active (dev vs production pragmas)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seconds", type=float, default=5.0)
+        parser.add_argument("--readers", type=int, default=4)
+        parser.add_argument("--rows", type=int, default=20000)
+        parser.add_argument(
+            "--write-hold-ms",
+            type=float,
+            default=2.0,
+            help="Time the writer keeps its transaction open before COMMIT.",
+        )
+
+    def handle(self, *args, **opts):
+        profiles = {
+            "dev": {},
+            "production": settings.SQLITE_PRODUCTION_PRAGMAS,
+        }
+        self.stdout.write(
+            f"{opts['readers']} readers, 1 writer, {opts['rows']} rows, "
+            f"{opts['seconds']}s per profile"
+        )
+        for name, pragmas in profiles.items():
+            with tempfile.TemporaryDirectory() as tmp:
+                result = self._run(Path(tmp) / "bench.sqlite3", pragmas, **opts)
+            self.stdout.write(
+                f"{name:>10}: {result['reads'] / opts['seconds']:10.0f} reads/s  "
+                f"p50 {result['p50']:7.3f} ms  p99 {result['p99']:7.3f} ms  "
+                f"locked {result['locked']:5d}  "
+                f"writes/s {result['writes'] / opts['seconds']:8.0f}"
+            )
+
+    # -----------------------------------------------------------------
+    def _run(self, path, pragmas, *, seconds, readers, rows, write_hold_ms, **_):
+        setup = _connect(path, pragmas)
+        setup.executescript(SCHEMA)
+        rnd = random.Random(0)
+        setup.execute("BEGIN")
+        setup.executemany(
+            "INSERT INTO game (game_name, genre_id, platform_id, store_id, active_players) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (
+                (f"Game {i}", rnd.randint(1, 10), rnd.randint(1, 10), rnd.randint(1, 10), 0)
+                for i in range(rows)
+            ),
+        )
+        setup.execute("COMMIT")
+        setup.close()
+
+        stop = threading.Event()
+        lock = threading.Lock()
+        totals = {"reads": 0, "writes": 0, "locked": 0}
+        latencies = []
+
+        def reader(seed):
+            conn = _connect(path, pragmas)
+            rnd = random.Random(seed)
+            reads, locked, lat = 0, 0, []
+            while not stop.is_set():
+                start = time.perf_counter()
+                try:
+                    conn.execute(READ_SQL, (rnd.randint(1, 10),)).fetchall()
+                except sqlite3.OperationalError:
+                    locked += 1
+                    continue
+                lat.append(time.perf_counter() - start)
+                reads += 1
+            conn.close()
+            with lock:
+                totals["reads"] += reads
+                totals["locked"] += locked
+                latencies.extend(lat)
+
+        def writer():
+            conn = _connect(path, pragmas)
+            rnd = random.Random(-1)
+            writes = 0
+            while not stop.is_set():
+                try:
+                    conn.execute("BEGIN IMMEDIATE")
+                    conn.execute(WRITE_SQL, (rnd.randint(1, 10),))
+                    time.sleep(write_hold_ms / 1000)
+                    conn.execute("COMMIT")
+                    writes += 1
+                except sqlite3.OperationalError:
+                    if conn.in_transaction:
+                        conn.execute("ROLLBACK")
+            conn.close()
+            with lock:
+                totals["writes"] += writes
+
+        threads = [threading.Thread(target=writer)]
+        threads += [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+        for t in threads:
+            t.start()
+        time.sleep(seconds)
+        stop.set()
+        for t in threads:
+            t.join()
+
+        latencies.sort()
+        ms = [x * 1000 for x in latencies] or [0.0]
+        totals["p50"] = statistics.median(ms)
+        totals["p99"] = ms[min(len(ms) - 1, int(len(ms) * 0.99))]
+        return totals
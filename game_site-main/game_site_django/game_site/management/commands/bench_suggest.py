@@ -0,0 +1,60 @@
+"""
+Server-side latency of the title autocomplete index.
+
+    python manage.py bench_suggest --games 100000 --queries 20000
+
+Builds a ``SuggestIndex`` from synthetic titles (no database involved)
+with Zipf-like popularity, then times ``suggest()`` for prefixes of one to
+six characters taken from real titles – short prefixes match the most
+entries and are the worst case.  Also times single-title updates.
+"""
+import random
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from game_site.suggest import SuggestIndex
+
+
+class Command(BaseCommand):
+    help = "Measure title autocomplete latency in microseconds per query."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--games", type=int, default=100000)
+        parser.add_argument("--queries", type=int, default=20000)
+
+    def handle(self, *args, **opts):
+        rng = random.Random(0)
+        n = opts["games"]
+        words = [
+            "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(3, 9)))
+            for _ in range(5000)
+        ]
+        titles = [(pk, " ".join(rng.sample(words, rng.randint(1, 4))).title()) for pk in range(1, n + 1)]
+
+        start = time.perf_counter()
+        index = SuggestIndex.from_titles(titles)
+        self.stdout.write(f"build         {time.perf_counter() - start:8.2f} s   ({len(index.keys)} keys)")
+
+        weights = np.zeros(n + 1)
+        weights[1:] = 1000.0 / np.arange(1, n + 1) ** 0.8
+        popularity = weights.__getitem__
+
+        for length in range(1, 7):
+            prefixes = [titles[rng.randrange(n)][1][:length] for _ in range(opts["queries"])]
+            start = time.perf_counter()
+            for prefix in prefixes:
+                index.suggest(prefix, 10, popularity)
+            took = (time.perf_counter() - start) / len(prefixes)
+            self.stdout.write(f"prefix len {length}  {took * 1e6:8.1f} µs/query")
+
+        updates = 1000
+        start = time.perf_counter()
+        for i in range(updates):
+            pk = rng.randrange(1, n + 1)
+            with index.lock:
+                index._remove(pk)
+                index._add(pk, f"{rng.choice(words)} {rng.choice(words)}")
+        took = (time.perf_counter() - start) / updates
+        self.stdout.write(f"title update  {took * 1e6:8.1f} µs")
@@ -0,0 +1,136 @@
+"""
+Lock-contention benchmark for moving telemetry into its own database.
+
+    python manage.py bench_telemetry_split --seconds 5 --telemetry-writers 2
+
+Runs the same workload twice on scratch SQLite files using the production
+pragmas (``settings.SQLITE_PRODUCTION_PRAGMAS``):
+
+  shared  – game and online_status tables in one file (current layout)
+  split   – online_status in a second file (GAME_SITE_TELEMETRY_DB)
+
+Telemetry writer threads update ``active_players`` as fast as they can
+while one catalog writer updates games; the catalog write rate and
+latency show how much the telemetry traffic stalls catalog writes.
+"""
+import random
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+GAME_SCHEMA = """
+CREATE TABLE game (id INTEGER PRIMARY KEY, game_name VARCHAR(30), online_status_id INTEGER);
+"""
+TELEMETRY_SCHEMA = """
+CREATE TABLE online_status (id INTEGER PRIMARY KEY, active_players INTEGER, registered_players INTEGER);
+"""
+
+
+def _connect(path, pragmas):
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+    for name, value in pragmas.items():
+        conn.execute(f"PRAGMA {name}={value}")
+    return conn
+
+
+class Command(BaseCommand):
+    help = "Compare catalog write throughput with telemetry in the same vs a separate SQLite file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seconds", type=float, default=5.0)
+        parser.add_argument("--rows", type=int, default=5000)
+        parser.add_argument("--telemetry-writers", type=int, default=2)
+        parser.add_argument("--batch", type=int, default=50, help="Telemetry rows updated per transaction.")
+
+    def handle(self, *args, **opts):
+        self.stdout.write(
+            f"1 catalog writer, {opts['telemetry_writers']} telemetry writers, "
+            f"{opts['seconds']}s per layout"
+        )
+        for layout in ("shared", "split"):
+            with tempfile.TemporaryDirectory() as tmp:
+                game_db = Path(tmp) / "game.sqlite3"
+                telemetry_db = game_db if layout == "shared" else Path(tmp) / "telemetry.sqlite3"
+                r = self._run(game_db, telemetry_db, **opts)
+            self.stdout.write(
+                f"{layout:>7}: catalog {r['catalog'] / opts['seconds']:8.0f} writes/s  "
+                f"p50 {r['p50']:7.3f} ms  p99 {r['p99']:8.3f} ms  | "
+                f"telemetry {r['telemetry'] / opts['seconds']:8.0f} tx/s"
+            )
+
+    def _run(self, game_db, telemetry_db, *, seconds, rows, telemetry_writers, batch, **_):
+        pragmas = settings.SQLITE_PRODUCTION_PRAGMAS
+        conn = _connect(game_db, pragmas)
+        conn.executescript(GAME_SCHEMA)
+        conn.execute("BEGIN")
+        conn.executemany(
+            "INSERT INTO game (id, game_name, online_status_id) VALUES (?, ?, ?)",
+            ((i, f"Game {i}", i) for i in range(1, rows + 1)),
+        )
+        conn.execute("COMMIT")
+        conn.close()
+        conn = _connect(telemetry_db, pragmas)
+        conn.executescript(TELEMETRY_SCHEMA)
+        conn.execute("BEGIN")
+        conn.executemany(
+            "INSERT INTO online_status (id, active_players, registered_players) VALUES (?, 0, 0)",
+            ((i,) for i in range(1, rows + 1)),
+        )
+        conn.execute("COMMIT")
+        conn.close()
+
+        stop = threading.Event()
+        lock = threading.Lock()
+        result = {"catalog": 0, "telemetry": 0}
+        latencies = []
+
+        def telemetry_writer(seed):
+            c = _connect(telemetry_db, pragmas)
+            rnd = random.Random(seed)
+            done = 0
+            while not stop.is_set():
+                c.execute("BEGIN IMMEDIATE")
+                c.executemany(
+                    "UPDATE online_status SET active_players = ? WHERE id = ?",
+                    ((rnd.randint(0, 10000), rnd.randint(1, rows)) for _ in range(batch)),
+                )
+                c.execute("COMMIT")
+                done += 1
+            c.close()
+            with lock:
+                result["telemetry"] += done
+
+        def catalog_writer():
+            c = _connect(game_db, pragmas)
+            rnd = random.Random(-1)
+            while not stop.is_set():
+                start = time.perf_counter()
+                c.execute("BEGIN IMMEDIATE")
+                c.execute(
+                    "UPDATE game SET game_name = ? WHERE id = ?",
+                    (f"Game {rnd.random():.6f}"[:30], rnd.randint(1, rows)),
+                )
+                c.execute("COMMIT")
+                latencies.append(time.perf_counter() - start)
+            c.close()
+
+        threads = [threading.Thread(target=catalog_writer)]
+        threads += [threading.Thread(target=telemetry_writer, args=(i,)) for i in range(telemetry_writers)]
+        for t in threads:
+            t.start()
+        time.sleep(seconds)
+        stop.set()
+        for t in threads:
+            t.join()
+
+        ms = sorted(x * 1000 for x in latencies) or [0.0]
+        result["catalog"] = len(latencies)
+        result["p50"] = statistics.median(ms)
+        result["p99"] = ms[min(len(ms) - 1, int(len(ms) * 0.99))]
+        return result
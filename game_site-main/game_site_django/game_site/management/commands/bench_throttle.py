@@ -0,0 +1,76 @@
+"""
+Per-request overhead of the sliding-window throttles.
+
+    python manage.py bench_throttle --requests 200000 --clients 1000
+
+Times ``hit()`` on both counter stores and the full DRF throttle stack
+(``REST_FRAMEWORK["DEFAULT_THROTTLE_CLASSES"]``) on a synthetic request,
+spreading the traffic over ``--clients`` distinct IPs.  The store runs use
+an unreachable limit and the stack run stays under the configured rates,
+so every call takes the full read-estimate-increment path.
+
+Every run counts in a private store – a ``CacheCounterStore`` under its own
+key prefix – so real clients' counters are neither read nor cleared.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from game_site.api_views import GameViewSet
+from game_site import throttling
+from game_site.throttling import CacheCounterStore, LocalCounterStore, get_store
+
+
+class Command(BaseCommand):
+    help = "Measure the per-request cost of the sliding-window throttles in microseconds."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200000)
+        parser.add_argument("--clients", type=int, default=1000)
+
+    def handle(self, *args, **opts):
+        n, clients = opts["requests"], opts["clients"]
+        keys = [f"bench:ip10.0.{i // 256}.{i % 256}" for i in range(clients)]
+
+        for name, store in (
+            ("LocalCounterStore", LocalCounterStore()),
+            ("CacheCounterStore", CacheCounterStore(prefix="bench-throttle")),
+        ):
+            runs = n if name == "LocalCounterStore" else n // 10
+            start = time.perf_counter()
+            for i in range(runs):
+                store.hit(keys[i % clients], 10**9, 60)
+            took = time.perf_counter() - start
+            store.clear()
+            self.stdout.write(f"{name:>22}.hit   {took / runs * 1e6:7.2f} µs/request")
+
+        # Full DRF throttle stack as GameViewSet runs it on every request
+        factory = RequestFactory()
+        requests = [
+            Request(factory.get("/api/games/", REMOTE_ADDR=f"10.1.{i // 256}.{i % 256}"))
+            for i in range(clients)
+        ]
+        view = GameViewSet()     # throttle_scope = "games"
+        throttle_classes = api_settings.DEFAULT_THROTTLE_CLASSES
+        runs = n // 10
+        # Same store class as the site, swapped in for the run only
+        cls = type(get_store())
+        store = cls(prefix="bench-throttle") if issubclass(cls, CacheCounterStore) else cls()
+        live, throttling._store = throttling._store, store
+        try:
+            start = time.perf_counter()
+            for i in range(runs):
+                request = requests[i % clients]
+                for throttle_class in throttle_classes:
+                    throttle_class().allow_request(request, view)
+            took = time.perf_counter() - start
+        finally:
+            throttling._store = live
+            store.clear()
+        self.stdout.write(
+            f"{'DRF throttle stack':>22}       {took / runs * 1e6:7.2f} µs/request "
+            f"({len(throttle_classes)} throttles, {type(store).__name__})"
+        )
@@ -0,0 +1,29 @@
+"""
+Recompute the whitelist co-occurrence matrix from scratch.
+
+    python manage.py build_cooccurrence [--user-chunk 5000]
+
+Whitelist changes keep the table current incrementally (game_site.signals);
+run this after bulk imports or to repair drift.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from game_site import recommendations
+
+
+class Command(BaseCommand):
+    help = "Rebuild the GameCooccurrence table from every user's whitelist."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user-chunk", type=int, default=recommendations.USER_CHUNK)
+
+    def handle(self, *args, **opts):
+        started = time.perf_counter()
+
+        def progress(done, total):
+            self.stdout.write(f"\r{done}/{total} users", ending="")
+
+        rows = recommendations.rebuild(user_chunk=opts["user_chunk"], progress=progress)
+        self.stdout.write(f"\n{rows} co-occurrence rows in {time.perf_counter() - started:.2f}s")
@@ -0,0 +1,23 @@
+"""
+Recompute the catalog analytics rollups (/api/stats/) from scratch.
+
+    python manage.py build_rollups
+
+Normal edits keep the rollups current incrementally (game_site.signals);
+run this after bulk imports, raw SQL or bulk ``update()`` calls, which
+send no signals.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from game_site import rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild CatalogRollup and GameRollupState for every game."
+
+    def handle(self, *args, **opts):
+        started = time.perf_counter()
+        total = rollups.rebuild()
+        self.stdout.write(f"{total} games in {time.perf_counter() - started:.2f}s")
@@ -0,0 +1,29 @@
+"""
+Recompute the precomputed "similar games" lists from scratch.
+
+    python manage.py build_similar_games
+
+Normal edits keep the lists current incrementally (game_site.signals);
+run this after bulk imports or after changing FEATURE_WEIGHTS / top-k.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from game_site import similarity
+
+
+class Command(BaseCommand):
+    help = "Rebuild the SimilarGame table for every game."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=similarity.BATCH_SIZE)
+
+    def handle(self, *args, **opts):
+        started = time.perf_counter()
+
+        def progress(done, total):
+            self.stdout.write(f"\r{done}/{total}", ending="")
+
+        total = similarity.rebuild_all(batch_size=opts["batch_size"], progress=progress)
+        self.stdout.write(f"\n{total} games in {time.perf_counter() - started:.2f}s")
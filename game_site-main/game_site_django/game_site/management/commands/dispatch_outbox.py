@@ -0,0 +1,31 @@
+"""
+Retry undelivered catalog outbox events and prune delivered ones.
+
+    python manage.py dispatch_outbox              # sweep every 10 s until Ctrl‑C
+    python manage.py dispatch_outbox --once       # single sweep (cron friendly)
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from game_site.outbox import sweep
+
+
+class Command(BaseCommand):
+    help = "Deliver catalog outbox events still pending after OUTBOX_RETRY_SECONDS and delete old ones."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--interval", type=float, default=10.0, help="Seconds between sweeps.")
+        parser.add_argument("--once", action="store_true", help="Sweep once and exit.")
+
+    def handle(self, *args, **opts):
+        while True:
+            dispatched, deleted = sweep()
+            if dispatched or deleted or opts["once"]:
+                self.stdout.write(f"{dispatched} events dispatched, {deleted} deleted")
+            if opts["once"]:
+                return
+            try:
+                time.sleep(opts["interval"])
+            except KeyboardInterrupt:
+                return
@@ -0,0 +1,41 @@
+"""
+Copy the telemetry rows (OnlineStatus, GameLog, SalesHistory, the
+player-count series and GameEvent) from the main database into the dedicated telemetry
+database, keeping primary keys so ``Game``'s foreign keys stay valid.
+
+    GAME_SITE_TELEMETRY_DB=telemetry.sqlite3 python manage.py migrate --database telemetry
+    GAME_SITE_TELEMETRY_DB=telemetry.sqlite3 python manage.py move_telemetry
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from game_site.db_routers import PRIMARY_DB, TELEMETRY_DB, telemetry_separate
+from game_site.models import (
+    GameEvent,
+    GameLog,
+    OnlineStatus,
+    PlayerCountRollup,
+    PlayerCountSample,
+    SalesHistory,
+)
+
+
+class Command(BaseCommand):
+    help = "Copy telemetry rows from the default database into the telemetry database."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **opts):
+        if not telemetry_separate():
+            raise CommandError("No 'telemetry' database configured – set GAME_SITE_TELEMETRY_DB.")
+
+        for model in (
+            OnlineStatus, GameLog, SalesHistory, PlayerCountSample, PlayerCountRollup, GameEvent
+        ):
+            rows = list(model.objects.using(PRIMARY_DB).order_by("pk"))
+            with transaction.atomic(using=TELEMETRY_DB):
+                model.objects.using(TELEMETRY_DB).bulk_create(
+                    rows, batch_size=opts["batch_size"], ignore_conflicts=True
+                )
+            self.stdout.write(f"{model.__name__}: {len(rows)} rows copied")
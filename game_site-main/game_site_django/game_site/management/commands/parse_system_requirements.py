@@ -0,0 +1,51 @@
+"""
+Fill the numeric hardware columns of every SystemRequirement from its text.
+
+    python manage.py parse_system_requirements              # rows not parsed yet
+    python manage.py parse_system_requirements --all        # every row (parser changed)
+
+New and edited rows are parsed on save; run this once after migrating and
+whenever game_site.hardware learns new parts.
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from game_site import outbox
+from game_site.models import SystemRequirement
+
+
+class Command(BaseCommand):
+    help = "Parse RAM / CPU / GPU of the system requirements into ram_mb, cpu_tier and gpu_tier."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Re-parse rows that were parsed before.")
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **opts):
+        rows = SystemRequirement.objects.order_by("pk")
+        if not opts["all"]:
+            rows = rows.filter(Q(ram_mb__isnull=True) | Q(cpu_tier__isnull=True) | Q(gpu_tier__isnull=True))
+        changed, unknown, after = 0, 0, 0
+        while True:
+            batch = list(rows.filter(pk__gt=after)[:opts["batch_size"]])
+            if not batch:
+                break
+            after = batch[-1].pk
+            updates = []
+            for row in batch:
+                before = tuple(getattr(row, name) for name in SystemRequirement.HARDWARE_FIELDS)
+                row.parse_hardware()
+                parsed = tuple(getattr(row, name) for name in SystemRequirement.HARDWARE_FIELDS)
+                unknown += None in parsed
+                if parsed != before:
+                    updates.append(row)
+            if updates:
+                with transaction.atomic():
+                    SystemRequirement.objects.bulk_update(updates, SystemRequirement.HARDWARE_FIELDS)
+                changed += len(updates)
+        if changed:
+            # bulk_update sends no signals – tell the catalog index and caches once
+            with transaction.atomic():
+                outbox.record("lookup.changed", data={"table": "system_requirements"})
+        self.stdout.write(f"{changed} requirements updated, {unknown} with parts not recognised")
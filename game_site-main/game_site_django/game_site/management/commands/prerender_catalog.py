@@ -0,0 +1,39 @@
+"""
+Write static HTML / JSON snapshots of the anonymous catalog for a file
+server or CDN (game_site.prerender).
+
+    python manage.py prerender_catalog                 # re-render what changed
+    python manage.py prerender_catalog --full          # re-render everything
+    python manage.py prerender_catalog --max-pages 200 --no-details
+
+Run it from cron after sync_replica / dispatch_outbox; an unchanged
+catalog costs a few queries and no rendering.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from game_site import prerender
+
+
+class Command(BaseCommand):
+    help = "Pre-render the home page, its filter combinations and the game details into PRERENDER_ROOT."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--full", action="store_true", help="Ignore the saved state and render every page.")
+        parser.add_argument("--max-pages", type=int, default=None, help="Catalog pages (default PRERENDER_MAX_PAGES).")
+        parser.add_argument("--no-details", action="store_true", help="Skip the per-game detail snapshots.")
+        parser.add_argument("--verbose-pages", action="store_true", help="Print every rendered file.")
+
+    def handle(self, *args, **opts):
+        started = time.perf_counter()
+        stats = prerender.run(
+            max_pages=opts["max_pages"],
+            full=opts["full"],
+            details=not opts["no_details"],
+            out=self.stdout.write if opts["verbose_pages"] else None,
+        )
+        self.stdout.write(
+            f"{stats['rendered']} rendered, {stats['unchanged']} unchanged, {stats['deleted']} deleted "
+            f"in {time.perf_counter() - started:.2f}s → {prerender.root()}"
+        )
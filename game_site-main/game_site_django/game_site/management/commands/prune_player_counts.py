@@ -0,0 +1,25 @@
+"""
+Delete player-count samples and rollups older than their retention
+(``settings.PLAYER_COUNT_RETENTION_DAYS``).  Meant for cron:
+
+    python manage.py prune_player_counts
+
+Rows go in time slices, oldest first, so no single delete holds the
+telemetry database's write lock for long.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from game_site import player_counts
+
+
+class Command(BaseCommand):
+    help = "Apply the retention of the player-count history."
+
+    def handle(self, *args, **opts):
+        started = time.perf_counter()
+        deleted = player_counts.prune()
+        for level, rows in deleted.items():
+            self.stdout.write(f"{level}: {rows} rows deleted")
+        self.stdout.write(f"done in {time.perf_counter() - started:.2f}s")
@@ -0,0 +1,23 @@
+"""
+Recompute every game's rating aggregates from its reviews.
+
+    python manage.py rebuild_review_stats
+
+Review writes keep the aggregates current (game_site.signals); run this
+after changing REVIEW_PRIOR_MEAN / REVIEW_PRIOR_WEIGHT or after bulk
+edits of GameReview that sent no signals.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from game_site import reviews
+
+
+class Command(BaseCommand):
+    help = "Recompute review_count, review_sum, rating_mean and rating_bayes of every game."
+
+    def handle(self, *args, **opts):
+        started = time.perf_counter()
+        total = reviews.recompute()
+        self.stdout.write(f"{total} games in {time.perf_counter() - started:.2f}s")
@@ -0,0 +1,44 @@
+"""
+Run background jobs (game_site.jobs) from the database queue.
+
+    python manage.py run_jobs                  # one job at a time, until stopped
+    python manage.py run_jobs --threads 4      # four jobs at once on threads
+    python manage.py run_jobs --processes 4    # … on processes (CPU-bound jobs)
+    python manage.py run_jobs --once           # drain what is due, then exit
+
+SIGTERM / Ctrl-C stop claiming new jobs and wait for the running ones.
+Several workers – on one or more machines sharing the database – may run
+side by side.
+"""
+import signal
+
+from django.core.management.base import BaseCommand, CommandError
+
+from game_site.jobs import Worker
+
+
+class Command(BaseCommand):
+    help = "Claim and run queued background jobs."
+
+    def add_arguments(self, parser):
+        pool = parser.add_mutually_exclusive_group()
+        pool.add_argument("--threads", type=int, help="Run this many jobs at once on threads (default 1).")
+        pool.add_argument("--processes", type=int, help="Run this many jobs at once on processes.")
+        parser.add_argument("--poll", type=float, default=1.0, help="Seconds between looks at an empty queue.")
+        parser.add_argument("--once", action="store_true", help="Exit when no job is due.")
+
+    def handle(self, *args, **opts):
+        concurrency = opts["processes"] or opts["threads"] or 1
+        if concurrency < 1:
+            raise CommandError("Need at least one thread / process.")
+        worker = Worker(concurrency, processes=bool(opts["processes"]), poll=opts["poll"])
+
+        def stop(signum, frame):
+            self.stdout.write("Stopping – waiting for running jobs …")
+            worker.stop()
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+        pool = "processes" if opts["processes"] else "threads"
+        self.stdout.write(f"Worker {worker.name}: {concurrency} {pool}")
+        worker.run(once=opts["once"])
@@ -0,0 +1,40 @@
+"""
+Keep the local SQLite read replica current.
+
+    python manage.py sync_replica              # copy every 5 s until Ctrl‑C
+    python manage.py sync_replica --once       # single copy (cron friendly)
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from game_site.db_routers import replica_configured
+from game_site.replica import sync_replica
+
+
+class Command(BaseCommand):
+    help = "Copy the primary SQLite database into the replica with the online backup API."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--interval", type=float, default=5.0, help="Seconds between copies.")
+        parser.add_argument("--once", action="store_true", help="Copy once and exit.")
+        parser.add_argument(
+            "--pages",
+            type=int,
+            default=-1,
+            help="Pages copied per backup step (-1 = whole database in one step).",
+        )
+
+    def handle(self, *args, **opts):
+        if not replica_configured():
+            raise CommandError("No 'replica' database configured – set GAME_SITE_REPLICA_DB.")
+
+        while True:
+            took = sync_replica(pages=opts["pages"])
+            self.stdout.write(f"replica synced in {took * 1000:.1f} ms")
+            if opts["once"]:
+                return
+            try:
+                time.sleep(opts["interval"])
+            except KeyboardInterrupt:
+                return
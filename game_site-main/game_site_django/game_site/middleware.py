@@ -0,0 +1,44 @@
+# --------------------------------------------------------------
+# game_site/middleware.py
+# --------------------------------------------------------------
+from django.conf import settings
+
+from . import db_routers
+
+PIN_COOKIE = "pin_primary"
+
+
+class ReplicaPinningMiddleware:
+    """
+    Scopes the replica routing flags to one request.
+
+    • unsafe methods (POST/PUT/PATCH/DELETE) are pinned to the primary
+    • a request that wrote sets a short‑lived cookie so the follow‑up
+      GET (e.g. the redirect after "Add Game") also reads the primary
+    """
+    SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        unsafe = request.method not in self.SAFE_METHODS
+        reads_token = db_routers._replica_reads.set(False)
+        pinned_token = db_routers._pinned.set(unsafe or PIN_COOKIE in request.COOKIES)
+        wrote_token = db_routers._wrote.set(False)
+        try:
+            response = self.get_response(request)
+            wrote = unsafe or db_routers.has_written()
+            if wrote and db_routers.replica_configured():
+                response.set_cookie(
+                    PIN_COOKIE,
+                    "1",
+                    max_age=getattr(settings, "REPLICA_PIN_SECONDS", 5),
+                    httponly=True,
+                    samesite="Lax",
+                )
+            return response
+        finally:
+            db_routers._replica_reads.reset(reads_token)
+            db_routers._pinned.reset(pinned_token)
+            db_routers._wrote.reset(wrote_token)
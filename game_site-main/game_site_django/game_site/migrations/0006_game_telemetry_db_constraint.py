@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game_site', '0005_customuser_whitelisted_games'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='game',
+            name='game_log',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, to='game_site.gamelog'),
+        ),
+        migrations.AlterField(
+            model_name='game',
+            name='online_status',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, to='game_site.onlinestatus'),
+        ),
+        migrations.AlterField(
+            model_name='game',
+            name='sales_history',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, to='game_site.saleshistory'),
+        ),
+    ]
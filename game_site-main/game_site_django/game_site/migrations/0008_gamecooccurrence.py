@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game_site', '0007_similargame'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GameCooccurrence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('game', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cooccurrences', to='game_site.game')),
+                ('other', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='game_site.game')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('game', 'other'), name='cooccurrence_game_other')],
+            },
+        ),
+    ]
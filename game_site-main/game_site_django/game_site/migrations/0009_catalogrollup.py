@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game_site', '0008_gamecooccurrence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GameRollupState',
+            fields=[
+                ('game_id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('genre_id', models.BigIntegerField(null=True)),
+                ('platform_id', models.BigIntegerField(null=True)),
+                ('publisher_id', models.BigIntegerField(null=True)),
+                ('country', models.CharField(max_length=30, null=True)),
+                ('units_sold', models.BigIntegerField(default=0)),
+                ('active_players', models.BigIntegerField(default=0)),
+                ('rating', models.IntegerField(null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CatalogRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(choices=[('genre', 'Genre'), ('platform', 'Platform'), ('publisher', 'Publisher'), ('country', 'Publisher country')], max_length=10)),
+                ('key', models.CharField(max_length=50)),
+                ('games', models.PositiveIntegerField(default=0)),
+                ('units_sold', models.BigIntegerField(default=0)),
+                ('active_players', models.BigIntegerField(default=0)),
+                ('rating_sum', models.BigIntegerField(default=0)),
+                ('rating_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('dimension', 'key'), name='catalogrollup_dimension_key')],
+            },
+        ),
+    ]
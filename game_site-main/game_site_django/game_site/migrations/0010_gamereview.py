@@ -0,0 +1,100 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:18
+
+import django.core.validators
+import django.db.models.deletion
+import django.utils.timezone
+import game_site.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+def copy_legacy_reviews(apps, schema_editor):
+    """
+    One GameReview per legacy ``Game.review`` plus the aggregates, and the
+    matching rating columns of the rollup state (the rollup totals already
+    count one rating per reviewed game).
+    """
+    Game = apps.get_model("game_site", "Game")
+    GameReview = apps.get_model("game_site", "GameReview")
+    GameRollupState = apps.get_model("game_site", "GameRollupState")
+    mean = float(getattr(settings, "REVIEW_PRIOR_MEAN", 6.0))
+    weight = float(getattr(settings, "REVIEW_PRIOR_WEIGHT", 5))
+    now = django.utils.timezone.now()
+
+    games = Game.objects.exclude(review=None).values_list("pk", "review_id", "review__rating", "review__text")
+    copies = []
+    for game_id, review_id, rating, text in games.iterator():
+        # GameReview takes 1–10; the legacy column was never checked
+        rating = min(max(rating, 1), 10)
+        copies.append(GameReview(game_id=game_id, rating=rating, text=text, created_at=now, imported_from_id=review_id))
+        Game.objects.filter(pk=game_id).update(
+            review_count=1,
+            review_sum=rating,
+            rating_mean=float(rating),
+            rating_bayes=(weight * mean + rating) / (weight + 1),
+        )
+        GameRollupState.objects.filter(pk=game_id).update(rating_sum=rating, rating_count=1)
+    GameReview.objects.bulk_create(copies, batch_size=1000)
+    Game.objects.filter(review=None).update(rating_bayes=mean)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game_site', '0009_catalogrollup'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='gamerollupstate',
+            name='rating',
+        ),
+        migrations.AddField(
+            model_name='game',
+            name='rating_bayes',
+            field=models.FloatField(db_index=True, default=game_site.models.default_rating_bayes, editable=False),
+        ),
+        migrations.AddField(
+            model_name='game',
+            name='rating_mean',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='game',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='game',
+            name='review_sum',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='gamerollupstate',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='gamerollupstate',
+            name='rating_sum',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='GameReview',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rating', models.PositiveSmallIntegerField(validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(10)])),
+                ('text', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('game', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reviews', to='game_site.game')),
+                ('imported_from', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='game_site.review')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='game_reviews', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ('-created_at', '-id'),
+                'indexes': [models.Index(fields=['game', '-created_at', '-id'], name='gamereview_game_created')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('imported_from__isnull', False)), fields=('game', 'imported_from'), name='gamereview_game_imported')],
+            },
+        ),
+        migrations.RunPython(copy_legacy_reviews, migrations.RunPython.noop),
+    ]
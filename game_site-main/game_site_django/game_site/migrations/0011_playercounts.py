@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game_site', '0010_gamereview'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='onlinestatus',
+            name='sampled_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.CreateModel(
+            name='PlayerCountRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resolution', models.PositiveIntegerField(choices=[(60, 'minute'), (3600, 'hour'), (86400, 'day')])),
+                ('bucket_start', models.DateTimeField()),
+                ('samples', models.PositiveIntegerField()),
+                ('active_sum', models.BigIntegerField()),
+                ('active_min', models.PositiveIntegerField()),
+                ('active_max', models.PositiveIntegerField()),
+                ('registered_max', models.PositiveIntegerField(blank=True, null=True)),
+                ('game', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='game_site.game')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['resolution', 'bucket_start'], name='playerrollup_retention')],
+                'constraints': [models.UniqueConstraint(fields=('game', 'resolution', 'bucket_start'), name='playerrollup_bucket')],
+            },
+        ),
+        migrations.CreateModel(
+            name='PlayerCountSample',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recorded_at', models.DateTimeField()),
+                ('active_players', models.PositiveIntegerField()),
+                ('registered_players', models.PositiveIntegerField(blank=True, null=True)),
+                ('game', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='game_site.game')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['game', 'recorded_at'], name='playersample_game_time'), models.Index(fields=['recorded_at'], name='playersample_time')],
+            },
+        ),
+    ]
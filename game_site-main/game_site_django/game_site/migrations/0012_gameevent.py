@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game_site', '0011_playercounts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GameEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=40)),
+                ('message', models.TextField(blank=True)),
+                ('data', models.JSONField(blank=True, null=True)),
+                ('occurred_at', models.DateTimeField()),
+                ('game', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='game_site.game')),
+            ],
+            options={
+                'ordering': ('-occurred_at', '-id'),
+                'indexes': [models.Index(fields=['game', '-occurred_at', '-id'], name='gameevent_game_time')],
+            },
+        ),
+    ]
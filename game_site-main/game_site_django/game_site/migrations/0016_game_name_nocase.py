@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:53
+
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game_site', '0015_coverart'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(django.db.models.functions.comparison.Collate('game_name', 'NOCASE'), name='game_name_nocase'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game_site', '0016_game_name_nocase'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='systemrequirement',
+            name='cpu_tier',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='systemrequirement',
+            name='gpu_tier',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='systemrequirement',
+            name='ram_mb',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='systemrequirement',
+            index=models.Index(fields=['ram_mb', 'gpu_tier', 'cpu_tier'], name='sysreq_hardware'),
+        ),
+    ]
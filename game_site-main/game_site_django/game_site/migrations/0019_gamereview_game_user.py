@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:10
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, Sum
+
+
+def drop_duplicate_reviews(apps, schema_editor):
+    """
+    Keep the newest review of every (game, user) before the constraint is
+    added, and recompute the aggregates of the games that lost reviews.
+    /api/stats/ picks the change up with the game's next rollup refresh
+    (or ``manage.py build_rollups``).
+    """
+    Game = apps.get_model("game_site", "Game")
+    GameReview = apps.get_model("game_site", "GameReview")
+    mean = float(getattr(settings, "REVIEW_PRIOR_MEAN", 6.0))
+    weight = float(getattr(settings, "REVIEW_PRIOR_WEIGHT", 5))
+    own = GameReview.objects.filter(imported_from__isnull=True, user__isnull=False)
+    duplicates = (
+        own.values("game_id", "user_id").annotate(n=Count("pk"), newest=Max("pk")).filter(n__gt=1)
+    )
+    games = set()
+    for row in duplicates.iterator():
+        own.filter(game_id=row["game_id"], user_id=row["user_id"]).exclude(pk=row["newest"]).delete()
+        games.add(row["game_id"])
+    for game_id in games:
+        totals = GameReview.objects.filter(game_id=game_id).aggregate(n=Count("pk"), s=Sum("rating"))
+        count, total = totals["n"], totals["s"] or 0
+        Game.objects.filter(pk=game_id).update(
+            review_count=count,
+            review_sum=total,
+            rating_mean=total / count if count else None,
+            rating_bayes=(weight * mean + total) / (weight + count),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game_site', '0018_outboxevent_delivered_to'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicate_reviews, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='gamereview',
+            constraint=models.UniqueConstraint(condition=models.Q(('imported_from__isnull', True)), fields=('game', 'user'), name='gamereview_game_user'),
+        ),
+    ]
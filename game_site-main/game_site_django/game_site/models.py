@@ -1,9 +1,14 @@
 import datetime
 import uuid
-from django.db import models
+from django.conf import settings
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db import DatabaseError, models, transaction
+from django.db.models.functions import Collate
 from django.utils import timezone
 from django.contrib.auth.models import AbstractUser
 
+from . import hardware
+
 class CustomUser(AbstractUser):
     """Extended user with a role selector and a whitelist relationship."""
     USER_TYPE_CHOICES = (
@@ -25,6 +30,13 @@ class CustomUser(AbstractUser):
         blank=True,
         help_text="Games this user has marked as ‘whitelisted’ (favorite).",
     )
+
+    def get_session_auth_hash(self):
+        # accounts.user_cache keeps the hash instead of the password; a
+        # password loaded or set since then wins
+        if "password" in self.get_deferred_fields() and "_session_auth_hash" in self.__dict__:
+            return self._session_auth_hash
+        return super().get_session_auth_hash()
     
 
 class Genre(models.Model):
@@ -109,6 +121,28 @@ class SystemRequirement(models.Model):
     ram = models.CharField(max_length=20)
     gpu = models.CharField(max_length=50)
 
+    # Parsed from the text columns above on save (game_site.hardware) –
+    # None when the text is not recognised
+    ram_mb = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    cpu_tier = models.PositiveSmallIntegerField(null=True, blank=True, editable=False)
+    gpu_tier = models.PositiveSmallIntegerField(null=True, blank=True, editable=False)
+    HARDWARE_FIELDS = ("ram_mb", "cpu_tier", "gpu_tier")
+
+    class Meta:
+        indexes = [
+            # "Can I run it": a range on RAM, the tiers checked in the index
+            models.Index(fields=["ram_mb", "gpu_tier", "cpu_tier"], name="sysreq_hardware"),
+        ]
+
+    def parse_hardware(self):
+        self.ram_mb, self.cpu_tier, self.gpu_tier = hardware.parse(self.ram, self.processor, self.gpu)
+
+    def save(self, *args, **kwargs):
+        self.parse_hardware()
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = {*kwargs["update_fields"], *self.HARDWARE_FIELDS}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.operating_system}, {self.processor}"
 
@@ -164,6 +198,8 @@ class Rating(models.Model):
 class OnlineStatus(models.Model):
     active_players = models.IntegerField()
     registered_players = models.IntegerField()
+    # Time of the player-count sample last copied in (game_site.player_counts)
+    sampled_at = models.DateTimeField(null=True, blank=True, editable=False)
 
     def __str__(self):
         return f"Active: {self.active_players}, Registered: {self.registered_players}"
@@ -184,6 +220,28 @@ class Language(models.Model):
     def __str__(self):
         return self.language_name
         
+class CoverArt(models.Model):
+    """
+    An uploaded cover image, stored once per distinct content under its
+    SHA-256 by game_site.cover_art and shared by every game using it.
+    """
+    sha256 = models.CharField(max_length=64, unique=True)
+    # Extension of the stored original: jpg / png / webp / gif
+    format = models.CharField(max_length=4)
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    size_bytes = models.PositiveIntegerField()
+    created_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.sha256[:12]}.{self.format} ({self.width}×{self.height})"
+
+
+def default_rating_bayes():
+    """Bayesian average of a game without reviews: the prior mean."""
+    return float(getattr(settings, "REVIEW_PRIOR_MEAN", 6.0))
+
+
 class Game(models.Model):
     game_name = models.CharField(max_length=30)
 
@@ -200,15 +258,345 @@ class Game(models.Model):
     review = models.ForeignKey(Review, on_delete=models.SET_NULL, null=True, blank=True)
     multimedia = models.ForeignKey(Multimedia, on_delete=models.SET_NULL, null=True, blank=True)
     status = models.ForeignKey(Status, on_delete=models.SET_NULL, null=True)
-    sales_history = models.ForeignKey(SalesHistory, on_delete=models.SET_NULL, null=True, blank=True)
-    game_log = models.ForeignKey(GameLog, on_delete=models.SET_NULL, null=True, blank=True)
+    # Telemetry rows may live in their own database (game_site.db_routers),
+    # so these three references cannot be enforced by the database and the
+    # SET_NULL on delete is done by a receiver in game_site.signals.
+    sales_history = models.ForeignKey(SalesHistory, on_delete=models.DO_NOTHING, null=True, blank=True, db_constraint=False)
+    game_log = models.ForeignKey(GameLog, on_delete=models.DO_NOTHING, null=True, blank=True, db_constraint=False)
     rating = models.ForeignKey(Rating, on_delete=models.SET_NULL, null=True)
-    online_status = models.ForeignKey(OnlineStatus, on_delete=models.SET_NULL, null=True, blank=True)
+    online_status = models.ForeignKey(OnlineStatus, on_delete=models.DO_NOTHING, null=True, blank=True, db_constraint=False)
     award = models.ForeignKey(Award, on_delete=models.SET_NULL, null=True, blank=True)
     language = models.ForeignKey(Language, on_delete=models.SET_NULL, null=True)
+    cover = models.ForeignKey(CoverArt, on_delete=models.SET_NULL, null=True, blank=True, related_name="games")
+
+    # Aggregates of ``reviews`` (GameReview) – maintained by game_site.reviews.
+    # ``review`` above is the legacy single review; it is mirrored into
+    # ``reviews`` and no longer read for ratings.
+    review_count = models.PositiveIntegerField(default=0, editable=False)
+    review_sum = models.PositiveIntegerField(default=0, editable=False)
+    rating_mean = models.FloatField(null=True, blank=True, editable=False)
+    rating_bayes = models.FloatField(default=default_rating_bayes, db_index=True, editable=False)
+    AGGREGATE_FIELDS = ("review_count", "review_sum", "rating_mean", "rating_bayes")
+
+    def save(self, *args, **kwargs):
+        # The post_save receivers record the change in the outbox
+        # (game_site.outbox) – one transaction for the row and its event.
+        with transaction.atomic():
+            if self._state.adding or kwargs.get("update_fields") is not None or kwargs.get("force_insert"):
+                super().save(*args, **kwargs)
+                return
+            # The aggregates change through F() updates only – saving a
+            # loaded (possibly stale) instance must not write them back.
+            fields = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in self.AGGREGATE_FIELDS
+            ]
+            try:
+                with transaction.atomic():
+                    super().save(*args, update_fields=fields, **kwargs)
+                return
+            except DatabaseError:
+                rows = type(self)._base_manager.using(kwargs.get("using") or self._state.db)
+                if kwargs.get("force_update") or rows.filter(pk=self.pk).exists():
+                    raise
+            # Deleted since it was loaded – like a plain Model.save(), insert
+            # it again, without the reviews that went with the old row
+            for name in self.AGGREGATE_FIELDS:
+                setattr(self, name, self._meta.get_field(name).get_default())
+            super().save(*args, force_insert=True, **kwargs)
+
+    class Meta:
+        indexes = [
+            # Case-insensitive prefix search (the admin's "^game_name"):
+            # SQLite serves "LIKE 'abc%'" from an index with NOCASE collation
+            models.Index(Collate("game_name", "NOCASE"), name="game_name_nocase"),
+        ]
 
     def __str__(self):
         return self.game_name
 
 
+class SimilarGame(models.Model):
+    """
+    Precomputed "more like this" neighbours of a game, best first.
+    Maintained by game_site.similarity – do not edit by hand.
+    """
+    game = models.ForeignKey(Game, on_delete=models.CASCADE, related_name="similar_entries")
+    similar = models.ForeignKey(Game, on_delete=models.CASCADE, related_name="+")
+    score = models.FloatField()
+    rank = models.PositiveSmallIntegerField()
+
+    class Meta:
+        ordering = ("game", "rank")
+        constraints = [
+            models.UniqueConstraint(fields=("game", "rank"), name="similargame_game_rank"),
+        ]
+
+    def __str__(self):
+        return f"{self.game_id} → {self.similar_id} ({self.score:.3f})"
+
+
+class GameCooccurrence(models.Model):
+    """
+    Sparse game × game whitelist co-occurrence matrix: ``count`` users have
+    whitelisted both ``game`` and ``other``.  Stored in both directions;
+    the diagonal (``game == other``) holds the game's whitelist count.
+    Maintained by game_site.recommendations.
+    """
+    game = models.ForeignKey(Game, on_delete=models.CASCADE, related_name="cooccurrences")
+    other = models.ForeignKey(Game, on_delete=models.CASCADE, related_name="+")
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=("game", "other"), name="cooccurrence_game_other"),
+        ]
+
+    def __str__(self):
+        return f"{self.game_id} × {self.other_id}: {self.count}"
+
+
+class CatalogRollup(models.Model):
+    """
+    Precomputed catalog aggregates per ``dimension`` value (a genre,
+    platform or publisher id, or a publisher country).
+    Maintained by game_site.rollups – do not edit by hand.
+    """
+    DIMENSION_CHOICES = (
+        ("genre", "Genre"),
+        ("platform", "Platform"),
+        ("publisher", "Publisher"),
+        ("country", "Publisher country"),
+    )
+    dimension = models.CharField(max_length=10, choices=DIMENSION_CHOICES)
+    key = models.CharField(max_length=50)
+    games = models.PositiveIntegerField(default=0)
+    units_sold = models.BigIntegerField(default=0)
+    active_players = models.BigIntegerField(default=0)
+    rating_sum = models.BigIntegerField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=("dimension", "key"), name="catalogrollup_dimension_key"),
+        ]
+
+    def __str__(self):
+        return f"{self.dimension}={self.key}: {self.games} games"
+
+
+class GameRollupState(models.Model):
+    """
+    What each game currently contributes to ``CatalogRollup`` – the next
+    change is applied as the difference to this row.  Keyed by the plain
+    game id so the row outlives a deleted game until it was subtracted.
+    """
+    game_id = models.BigIntegerField(primary_key=True)
+    genre_id = models.BigIntegerField(null=True)
+    platform_id = models.BigIntegerField(null=True)
+    publisher_id = models.BigIntegerField(null=True)
+    country = models.CharField(max_length=30, null=True)
+    units_sold = models.BigIntegerField(default=0)
+    active_players = models.BigIntegerField(default=0)
+    rating_sum = models.BigIntegerField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"Rollup state of game {self.game_id}"
+
+
+class GameReview(models.Model):
+    """One user's review of a game; a game has any number of them, a user one per game."""
+    game = models.ForeignKey(Game, on_delete=models.CASCADE, related_name="reviews")
+    user = models.ForeignKey(
+        "CustomUser", on_delete=models.SET_NULL, null=True, blank=True, related_name="game_reviews"
+    )
+    rating = models.PositiveSmallIntegerField(validators=[MinValueValidator(1), MaxValueValidator(10)])
+    text = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    # Set on the copy of a legacy ``Game.review`` row (game_site.reviews)
+    imported_from = models.ForeignKey(
+        Review, on_delete=models.CASCADE, null=True, blank=True, related_name="+"
+    )
+
+    class Meta:
+        ordering = ("-created_at", "-id")
+        indexes = [
+            # Keyset pagination of one game's reviews, newest first
+            models.Index(fields=["game", "-created_at", "-id"], name="gamereview_game_created"),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=("game", "imported_from"),
+                condition=models.Q(imported_from__isnull=False),
+                name="gamereview_game_imported",
+            ),
+            # One review per user and game – posting again edits it
+            models.UniqueConstraint(
+                fields=("game", "user"),
+                condition=models.Q(imported_from__isnull=True),
+                name="gamereview_game_user",
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        # The Game aggregates are updated by the post_save receiver – keep
+        # the row and the aggregate in one transaction.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.game_id}: {self.rating}/10"
+
+
+class PlayerCountSample(models.Model):
+    """
+    One player-count reading of a game, as reported by its servers.
+    Lives in the telemetry database (game_site.db_routers), hence the
+    unenforced game reference; written in batches by game_site.player_counts.
+    """
+    game = models.ForeignKey(Game, on_delete=models.DO_NOTHING, db_constraint=False, related_name="+")
+    recorded_at = models.DateTimeField()
+    active_players = models.PositiveIntegerField()
+    registered_players = models.PositiveIntegerField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Bucket recomputation: one game range-scanned by time
+            models.Index(fields=["game", "recorded_at"], name="playersample_game_time"),
+            # Retention deletes
+            models.Index(fields=["recorded_at"], name="playersample_time"),
+        ]
 
+    def __str__(self):
+        return f"{self.game_id} @ {self.recorded_at}: {self.active_players}"
+
+
+class PlayerCountRollup(models.Model):
+    """
+    Player counts of one game downsampled into a minute / hour / day
+    bucket.  Sum, count, min and max rather than an average, so every
+    resolution is computed from the one below it.
+    """
+    MINUTE, HOUR, DAY = 60, 3600, 86400
+    RESOLUTIONS = [(MINUTE, "minute"), (HOUR, "hour"), (DAY, "day")]
+
+    game = models.ForeignKey(Game, on_delete=models.DO_NOTHING, db_constraint=False, related_name="+")
+    resolution = models.PositiveIntegerField(choices=RESOLUTIONS)
+    bucket_start = models.DateTimeField()
+    samples = models.PositiveIntegerField()
+    active_sum = models.BigIntegerField()
+    active_min = models.PositiveIntegerField()
+    active_max = models.PositiveIntegerField()
+    registered_max = models.PositiveIntegerField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            # Also the index for "one game's series at one resolution"
+            models.UniqueConstraint(
+                fields=("game", "resolution", "bucket_start"), name="playerrollup_bucket"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["resolution", "bucket_start"], name="playerrollup_retention"),
+        ]
+
+    @property
+    def active_avg(self):
+        return self.active_sum / self.samples if self.samples else None
+
+    def __str__(self):
+        return f"{self.game_id} {self.get_resolution_display()} {self.bucket_start}"
+
+
+class GameEvent(models.Model):
+    """
+    One entry of a game's append-only event log (match started, patch
+    deployed, server crashed, …).  Lives in the telemetry database and is
+    written in batches by game_site.game_events; rows are never updated.
+    """
+    game = models.ForeignKey(Game, on_delete=models.DO_NOTHING, db_constraint=False, related_name="+")
+    kind = models.CharField(max_length=40)
+    message = models.TextField(blank=True)
+    data = models.JSONField(null=True, blank=True)
+    occurred_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ("-occurred_at", "-id")
+        indexes = [
+            # Keyset pagination of one game's log, newest first
+            models.Index(fields=["game", "-occurred_at", "-id"], name="gameevent_game_time"),
+        ]
+
+    def __str__(self):
+        return f"{self.game_id} {self.kind} @ {self.occurred_at}"
+
+
+class Job(models.Model):
+    """
+    A unit of background work run by ``manage.py run_jobs``
+    (game_site.jobs): the name of a registered handler plus its JSON
+    arguments, with status, attempts and progress for polling.
+    """
+    QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+    STATUSES = [(QUEUED, "Queued"), (RUNNING, "Running"), (SUCCEEDED, "Succeeded"), (FAILED, "Failed")]
+
+    name = models.CharField(max_length=100)
+    args = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUSES, default=QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    # Not claimed before this time – set to now + backoff after a failed attempt
+    run_after = models.DateTimeField(default=timezone.now)
+    progress_done = models.PositiveIntegerField(default=0)
+    progress_total = models.PositiveIntegerField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_by = models.ForeignKey(
+        "CustomUser", on_delete=models.SET_NULL, null=True, blank=True, related_name="jobs"
+    )
+    created_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Refreshed by the worker while the job runs; a stale one means the worker died
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    worker = models.CharField(max_length=100, blank=True)
+
+    class Meta:
+        ordering = ("-created_at", "-id")
+        indexes = [
+            # The worker's "next due job" query
+            models.Index(fields=["status", "run_after", "id"], name="job_due"),
+        ]
+
+    def __str__(self):
+        return f"#{self.pk} {self.name} ({self.status})"
+
+
+class OutboxEvent(models.Model):
+    """
+    A catalog mutation recorded in the transaction that made it and handed
+    to the consumers of game_site.outbox after commit.  ``game_id`` is a
+    plain integer – the event outlives a deleted game.
+    """
+    kind = models.CharField(max_length=40)
+    game_id = models.IntegerField(null=True, blank=True)
+    data = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    # Set once every consumer handled the event
+    dispatched_at = models.DateTimeField(null=True, blank=True)
+    # Consumers that handled it – a retry goes to the others only
+    delivered_to = models.JSONField(default=list, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [
+            # The sweeper's "oldest undelivered events" scan
+            models.Index(fields=["id"], condition=models.Q(dispatched_at__isnull=True), name="outbox_pending"),
+            # Retention deletes
+            models.Index(fields=["created_at"], name="outbox_created"),
+        ]
+
+    def __str__(self):
+        return f"#{self.pk} {self.kind} {self.game_id or ''}".rstrip()
@@ -0,0 +1,297 @@
+# --------------------------------------------------------------
+# game_site/outbox.py
+# --------------------------------------------------------------
+"""
+Catalog event bus with a transactional outbox.
+
+Every write path – ``games_view`` / ``update_game`` / ``delete_game``,
+``GameViewSet``, the admin, the background jobs – ends in a model save or
+delete, and the receivers in ``game_site.signals`` turn those into
+``OutboxEvent`` rows inside the same transaction:
+
+    game.created                    {"game_name"}
+    game.updated                    {"game_name", "features"}  – the similarity
+                                    feature fields that changed
+    game.deleted                    {"game_name", "similar_lists"}
+    game.rating                     {}  – reviews changed the aggregates
+    game.credits                    {}  – its developer / publisher changed
+    lookup.changed                  {"table"}  (no game) – not for the
+                                    telemetry tables, written too often
+
+After commit the events of the transaction are dispatched in batches of
+``OUTBOX_BATCH_SIZE`` to the consumers registered with ``@consumer``.  A
+consumer gets the ``Event``s of the kinds it subscribed to, oldest first,
+and must be idempotent: delivery is at least once.  Each event remembers
+the consumers that handled it (``delivered_to``) and is marked dispatched
+once all of its consumers did; when one raises, the batch stays pending
+and ``manage.py dispatch_outbox`` (the sweeper) delivers it again – to the
+consumers that failed only – once it is ``OUTBOX_RETRY_SECONDS`` old, up
+to ``OUTBOX_MAX_ATTEMPTS`` times (then it waits in the admin with its
+error).  The sweeper also picks up the events of a
+process that died between commit and dispatch, and deletes dispatched
+events after ``OUTBOX_RETENTION_HOURS``.
+
+The in-memory consumers (indexes, caches) only patch the process that
+dispatches; other processes catch up through their TTLs, as before.
+"""
+import logging
+import threading
+import traceback
+from datetime import timedelta
+from typing import NamedTuple
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import (
+    catalog_index,
+    catalog_stream,
+    fuzzy,
+    game_events,
+    jobs,
+    page_cache,
+    player_counts,
+    rollups,
+    similarity,
+    suggest,
+)
+from .db_routers import primary_alias
+from .db_utils import IN_CHUNK
+from .models import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+GAME_ROW_KINDS = ("game.created", "game.updated", "game.deleted")
+
+
+class Event(NamedTuple):
+    id: int
+    kind: str
+    game_id: int
+    data: dict
+
+
+CONSUMERS = {}
+
+
+def consumer(name, kinds=None):
+    """
+    Register the decorated function as the consumer ``name``; it is called
+    with a list of ``Event``s of ``kinds`` (every kind by default).
+    """
+    def decorator(fn):
+        fn.kinds = frozenset(kinds) if kinds is not None else None
+        CONSUMERS[name] = fn
+        return fn
+    return decorator
+
+
+# -----------------------------------------------------------------
+#  Recording (inside the writing transaction)
+# -----------------------------------------------------------------
+# Ids recorded by this thread and not dispatched yet
+_recorded = threading.local()
+
+
+def _alias():
+    return primary_alias(OutboxEvent)
+
+
+def record(kind, game_id=None, data=None):
+    """
+    Add an event to the outbox in the current transaction; it is dispatched
+    after commit (and dropped with a rollback).
+    """
+    event = OutboxEvent.objects.using(_alias()).create(kind=kind, game_id=game_id, data=data or {})
+    pending = _pending()
+    pending.append(event.pk)
+    # Every record registers the flush – the first one to run after commit
+    # takes all of them, so a transaction is dispatched as one batch.  Ids
+    # left behind by a rollback are simply not found.
+    transaction.on_commit(_flush, using=_alias())
+    return event
+
+
+def _pending():
+    pending = getattr(_recorded, "ids", None)
+    if pending is None:
+        pending = _recorded.ids = []
+    return pending
+
+
+def _flush():
+    pending = _pending()
+    if not pending:
+        return
+    ids, pending[:] = list(pending), []
+    try:
+        dispatch(ids)
+    except Exception:
+        # The writer's response must not fail over it – the sweeper retries
+        logger.exception("Dispatching %s outbox events failed", len(ids))
+
+
+# -----------------------------------------------------------------
+#  Dispatching
+# -----------------------------------------------------------------
+def _batch_size():
+    return getattr(settings, "OUTBOX_BATCH_SIZE", 500)
+
+
+def dispatch(ids):
+    """Deliver the pending events among ``ids``.  Returns how many were dispatched."""
+    ids = sorted(set(ids))
+    size = min(_batch_size(), IN_CHUNK)
+    done = 0
+    for start in range(0, len(ids), size):
+        events = (
+            OutboxEvent.objects.using(_alias())
+            .filter(pk__in=ids[start:start + size], dispatched_at__isnull=True)
+            .order_by("pk")
+        )
+        done += _deliver(list(events))
+    return done
+
+
+def _subscribed(fn, kind):
+    return fn.kinds is None or kind in fn.kinds
+
+
+def _deliver(rows):
+    if not rows:
+        return 0
+    delivered = {row.pk: set(row.delivered_to) for row in rows}
+    pks = [row.pk for row in rows]
+    failed = []
+    for name, fn in CONSUMERS.items():
+        batch = [
+            Event(row.pk, row.kind, row.game_id, row.data)
+            for row in rows
+            if _subscribed(fn, row.kind) and name not in delivered[row.pk]
+        ]
+        if not batch:
+            continue
+        try:
+            fn(batch)
+        except Exception:
+            logger.exception("Outbox consumer %r failed on events %s..%s", name, pks[0], pks[-1])
+            failed.append(f"{name}: {traceback.format_exc()[-2000:]}")
+        else:
+            for event in batch:
+                delivered[event.id].add(name)
+    now, error = timezone.now(), "\n".join(failed)[-5000:]
+    done = 0
+    for row in rows:
+        row.delivered_to = sorted(delivered[row.pk])
+        row.attempts += 1
+        if all(name in delivered[row.pk] for name, fn in CONSUMERS.items() if _subscribed(fn, row.kind)):
+            row.dispatched_at, row.error = now, ""
+            done += 1
+        else:
+            row.error = error
+    OutboxEvent.objects.using(_alias()).bulk_update(rows, ["delivered_to", "attempts", "dispatched_at", "error"])
+    return done
+
+
+def sweep():
+    """
+    Deliver the events still pending after ``OUTBOX_RETRY_SECONDS`` (and
+    fewer than ``OUTBOX_MAX_ATTEMPTS`` tries) and delete the dispatched
+    ones past their retention.  Returns ``(dispatched, deleted)``.
+    """
+    now = timezone.now()
+    retry = timedelta(seconds=getattr(settings, "OUTBOX_RETRY_SECONDS", 30))
+    max_attempts = getattr(settings, "OUTBOX_MAX_ATTEMPTS", 10)
+    events = OutboxEvent.objects.using(_alias())
+    dispatched, after = 0, 0
+    while True:
+        rows = list(
+            events.filter(
+                dispatched_at__isnull=True, pk__gt=after, created_at__lte=now - retry, attempts__lt=max_attempts
+            )
+            .order_by("pk")[:min(_batch_size(), IN_CHUNK)]
+        )
+        if not rows:
+            break
+        dispatched += _deliver(rows)
+        after = rows[-1].pk
+    deleted = 0
+    hours = getattr(settings, "OUTBOX_RETENTION_HOURS", 24)
+    if hours is not None:
+        deleted, _ = events.filter(
+            dispatched_at__isnull=False, created_at__lt=now - timedelta(hours=hours)
+        ).delete()
+    return dispatched, deleted
+
+
+# -----------------------------------------------------------------
+#  Consumers
+# -----------------------------------------------------------------
+def _game_ids(events):
+    return {e.game_id for e in events if e.game_id is not None}
+
+
+@consumer("catalog_index", kinds=(*GAME_ROW_KINDS, "game.rating", "lookup.changed"))
+def _catalog_index(events):
+    if any(e.kind == "lookup.changed" and e.data.get("table") == "system_requirements" for e in events):
+        # Every game using the row may now pass or fail the hardware filters
+        catalog_index.invalidate()
+    else:
+        catalog_index.refresh_games(_game_ids(events))
+
+
+@consumer("fuzzy", kinds=(*GAME_ROW_KINDS, "game.credits"))
+def _fuzzy(events):
+    fuzzy.refresh_games(_game_ids(events))
+
+
+@consumer("suggest", kinds=GAME_ROW_KINDS)
+def _suggest(events):
+    suggest.refresh_games(_game_ids(events))
+
+
+@consumer("rollups", kinds=GAME_ROW_KINDS)
+def _rollups(events):
+    rollups.refresh_games(_game_ids(events))
+
+
+def _features_changed(event):
+    # Events recorded before "features" existed count as changed
+    return event.kind == "game.created" or event.data.get("features", similarity.FEATURE_FIELDS)
+
+
+@consumer("similarity", kinds=GAME_ROW_KINDS)
+def _similarity(events):
+    # A rename does not move a game among its neighbours
+    saved = {e.game_id for e in events if e.kind != "game.deleted" and _features_changed(e)}
+    # Lists that named a deleted game lost it with the CASCADE
+    lists = {pk for e in events if e.kind == "game.deleted" for pk in e.data.get("similar_lists", ())}
+    if saved or lists:
+        # Loads the whole feature matrix – not in the request that saved the game
+        jobs.enqueue("similarity.refresh", {"ids": sorted(saved), "lists": sorted(lists)})
+
+
+@consumer("telemetry", kinds=("game.deleted",))
+def _telemetry(events):
+    # The series / log rows point at the game without a database constraint
+    for pk in _game_ids(events):
+        player_counts.delete_game(pk)
+        game_events.delete_game(pk)
+
+
+@consumer("page_cache")
+def _page_cache(events):
+    # One new generation for the whole batch – after the indexes it is built from
+    page_cache.bump_generation()
+
+
+@consumer("catalog_stream", kinds=GAME_ROW_KINDS)
+def _catalog_stream(events):
+    # Keyed by the outbox row, so a redelivered event is not published twice
+    for e in events:
+        key = f"outbox-{e.id}"
+        if e.kind == "game.deleted":
+            catalog_stream.game_deleted(e.game_id, key=key)
+        else:
+            catalog_stream.game_saved(e.game_id, e.data.get("game_name"), e.kind == "game.created", key=key)
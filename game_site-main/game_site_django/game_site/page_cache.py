@@ -0,0 +1,123 @@
+# --------------------------------------------------------------
+# game_site/page_cache.py
+# --------------------------------------------------------------
+"""
+Whole-response cache for the anonymous catalog pages – the home page
+(``games_view_main``) and ``GET /api/games/`` – and the per-game detail
+payloads, both in ``game_site.tiered_cache`` namespaces ("pages" and
+"games").
+
+Detail payloads are keyed per game; ``game_details`` reads a batch of them
+(``/api/games/batch/``) with one multi-get and builds the misses together.
+
+Pages are keyed on the page and the normalized catalog parameters
+(search / fuzzy / genre / platform / store / hardware / sort –
+``catalog_params``).
+A consumer of ``game_site.outbox`` bumps the version of both namespaces
+– the catalog *generation* – after every committed change to a game, a
+review or a lookup row, which orphans every cached entry at
+once.  Player counts written by ``game_site.player_counts`` do not bump
+it – the "Players" column may lag by up to ``CATALOG_PAGE_CACHE_SECONDS``,
+as may a page built from a lagging read replica.
+
+Authenticated requests never get a cached page (whitelist column /
+filter), and requests pinned to the primary after a write never read
+from the cache at all.  A page whose rendering used the CSRF token is
+served to its own request only and never stored – the token belongs to
+one visitor.  A miss under load is built once – see the
+stampede protection of ``game_site.tiered_cache``.
+"""
+import hashlib
+from urllib.parse import urlencode
+
+from django.conf import settings
+
+from . import db_routers
+from .tiered_cache import namespace
+
+pages = namespace("pages")
+details = namespace("games")
+
+# Catalog parameters a cached page depends on (``whitelisted`` only
+# applies to signed-in users, who are never served from the cache)
+KEY_PARAMS = ("search", "fuzzy", "genre", "platform", "store", "max_ram", "cpu_tier", "gpu_tier", "sort")
+
+
+def generation():
+    """Current catalog generation."""
+    return pages.version()
+
+
+def bump_generation():
+    """Invalidate every cached catalog page and game detail."""
+    pages.bump()
+    details.bump()
+
+
+def cacheable(request):
+    """Whether the response to ``request`` may come from / go into the cache."""
+    return (
+        request.method in ("GET", "HEAD")
+        and not request.user.is_authenticated
+        and not db_routers.pinned_to_primary()
+        and _ttl() > 0
+    )
+
+
+def _ttl():
+    return getattr(settings, "CATALOG_PAGE_CACHE_SECONDS", 60)
+
+
+def page_key(page, params=None):
+    """Cache key of ``page`` for the catalog ``params``."""
+    params = params or {}
+    values = {name: params.get(name) for name in KEY_PARAMS}
+    if not values["search"]:
+        values["fuzzy"] = False
+    normalized = urlencode(sorted(
+        (name, str(value)) for name, value in values.items() if value
+    ))
+    return f"{page}:{hashlib.sha1(normalized.encode()).hexdigest()}"
+
+
+class _PerVisitor(Exception):
+    """Raised out of a build to keep its page out of the cache."""
+
+    def __init__(self, content, build):
+        super().__init__("page holds a CSRF token")
+        self.content, self.build = content, build
+
+
+def get_or_build(key, build, request):
+    """The cached page ``key``; ``build()`` renders it for ``request`` on a miss."""
+    def checked():
+        content = build()
+        if request.META.get("CSRF_COOKIE_NEEDS_UPDATE"):
+            raise _PerVisitor(content, checked)
+        return content
+
+    try:
+        return pages.get_or_set(key, checked, _ttl())
+    except _PerVisitor as exc:
+        # A coalesced caller was handed another visitor's page – render its own
+        return exc.content if exc.build is checked else build()
+
+
+def game_detail(key, build):
+    """
+    A cached per-game payload (never user-specific); ``build()`` computes
+    it on a miss.  Pinned requests bypass the cache.
+    """
+    if db_routers.pinned_to_primary() or _ttl() <= 0:
+        return build()
+    return details.get_or_set(key, build, _ttl())
+
+
+def game_details(keys, build_many):
+    """
+    Several per-game payloads at once – ``{key: payload}``: one multi-get
+    of the cache, ``build_many(missing keys)`` for the misses.
+    """
+    if db_routers.pinned_to_primary() or _ttl() <= 0:
+        return build_many(list(keys))
+    return details.get_many_or_set(keys, build_many, _ttl())
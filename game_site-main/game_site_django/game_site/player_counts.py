@@ -0,0 +1,403 @@
+# --------------------------------------------------------------
+# game_site/player_counts.py
+# --------------------------------------------------------------
+"""
+Player-count history reported by game servers (``POST /api/player-counts/``).
+
+Samples are appended to a per-process ``SampleBuffer`` and written in
+batches – when it holds ``PLAYER_COUNT_FLUSH_SIZE`` samples, when its
+oldest sample is ``PLAYER_COUNT_FLUSH_SECONDS`` old (a timer, so a quiet
+server's last samples are not held back), and at interpreter exit.  One
+flush (``write_samples()``) is:
+
+    1. one ``bulk_create`` of the raw ``PlayerCountSample`` rows
+    2. every minute bucket the batch touched recomputed from the raw
+       samples, then the touched hour buckets from the minutes and the
+       day buckets from the hours (``PlayerCountRollup``, upserted)
+    3. each game's newest sample copied into its ``OnlineStatus`` row –
+       the snapshot the catalog sorts by – with ``bulk_update``
+    4. one batched ``rollups.refresh_games()`` for the games whose active
+       player count changed, instead of a signal per row
+
+Buckets are always recomputed from the level below, never incremented, so
+a flush is idempotent and late samples simply land in their bucket.
+Samples older than ``PLAYER_COUNT_MAX_SAMPLE_AGE`` are rejected: their
+raw neighbours may already be pruned.  ``prune()`` (``manage.py
+prune_player_counts``) applies ``PLAYER_COUNT_RETENTION_DAYS``.
+"""
+import atexit
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Count, Max, Min, Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import catalog_index, lookups, rollups
+from .db_routers import primary_alias
+from .db_utils import IN_CHUNK, chunked
+from .models import Game, OnlineStatus, PlayerCountRollup, PlayerCountSample
+
+logger = logging.getLogger(__name__)
+
+# Resolution name → bucket width in seconds, finest first
+RESOLUTIONS = {name: seconds for seconds, name in PlayerCountRollup.RESOLUTIONS}
+
+# Accepted clock skew of a game server running ahead of ours
+MAX_FUTURE_SKEW = timedelta(seconds=60)
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+_RAW_AGGREGATES = {
+    "samples": Count("pk"),
+    "active_sum": Sum("active_players"),
+    "active_min": Min("active_players"),
+    "active_max": Max("active_players"),
+    "registered_max": Max("registered_players"),
+}
+_ROLLUP_AGGREGATES = {
+    "samples": Sum("samples"),
+    "active_sum": Sum("active_sum"),
+    "active_min": Min("active_min"),
+    "active_max": Max("active_max"),
+    "registered_max": Max("registered_max"),
+}
+
+
+def bucket_start(moment, resolution):
+    """Start of the ``resolution``-second bucket (aligned to the epoch) holding ``moment``."""
+    step = timedelta(seconds=resolution)
+    return _EPOCH + (moment - _EPOCH) // step * step
+
+
+# -----------------------------------------------------------------
+#  Parsing
+# -----------------------------------------------------------------
+def _count(item, field, required=True):
+    value = item.get(field)
+    if value is None and not required:
+        return None
+    if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+        raise ValueError(f"{field} must be a non-negative integer")
+    return value
+
+
+def parse_samples(items, now=None):
+    """
+    ``[{"game", "active_players", "registered_players"?, "recorded_at"?}, …]``
+    → ``[(game_id, recorded_at, active, registered), …]``.  Raises
+    ``ValueError`` naming the first bad item.
+    """
+    now = now or timezone.now()
+    oldest = now - timedelta(seconds=getattr(settings, "PLAYER_COUNT_MAX_SAMPLE_AGE", 3600))
+    samples = []
+    for i, item in enumerate(items):
+        try:
+            if not isinstance(item, dict):
+                raise ValueError("must be an object")
+            game_id = item.get("game")
+            if isinstance(game_id, bool) or not isinstance(game_id, int):
+                raise ValueError("game must be a game id")
+            recorded_at = item.get("recorded_at")
+            if recorded_at is None:
+                recorded_at = now
+            else:
+                recorded_at = parse_datetime(str(recorded_at))
+                if recorded_at is None:
+                    raise ValueError("recorded_at must be an ISO 8601 date-time")
+                if timezone.is_naive(recorded_at):
+                    recorded_at = timezone.make_aware(recorded_at, dt_timezone.utc)
+                if not oldest <= recorded_at <= now + MAX_FUTURE_SKEW:
+                    raise ValueError("recorded_at is too old or in the future")
+            samples.append((
+                game_id,
+                recorded_at,
+                _count(item, "active_players"),
+                _count(item, "registered_players", required=False),
+            ))
+        except ValueError as exc:
+            raise ValueError(f"samples[{i}]: {exc}") from None
+    return samples
+
+
+# -----------------------------------------------------------------
+#  Writing a batch
+# -----------------------------------------------------------------
+def _recompute(resolution, keys):
+    """Recompute the ``resolution`` buckets ``{(game id, bucket start)}`` from the level below."""
+    finer = [seconds for seconds in RESOLUTIONS.values() if seconds < resolution]
+    games_by_start = {}
+    for game_id, start in keys:
+        games_by_start.setdefault(start, set()).add(game_id)
+    rows = []
+    for start, game_ids in games_by_start.items():
+        end = start + timedelta(seconds=resolution)
+        for chunk in chunked(game_ids):
+            if finer:
+                source = PlayerCountRollup.objects.filter(
+                    resolution=finer[-1], bucket_start__gte=start, bucket_start__lt=end
+                )
+                aggregates = _ROLLUP_AGGREGATES
+            else:
+                source = PlayerCountSample.objects.filter(recorded_at__gte=start, recorded_at__lt=end)
+                aggregates = _RAW_AGGREGATES
+            grouped = source.filter(game_id__in=chunk).order_by().values("game_id").annotate(**aggregates)
+            rows.extend(
+                PlayerCountRollup(resolution=resolution, bucket_start=start, **values)
+                for values in grouped
+            )
+    PlayerCountRollup.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=["game", "resolution", "bucket_start"],
+        update_fields=list(_RAW_AGGREGATES),
+    )
+
+
+def _sync_snapshots(latest):
+    """
+    Copy ``latest`` (``{game id: (recorded_at, active, registered)}``) into
+    the games' ``OnlineStatus`` rows.  Games without a row of their own –
+    none, or one shared with other games through the edit form – get a
+    new one.  Returns ``({game id: new OnlineStatus}, changed game ids)``.
+    """
+    status_of, shared = {}, set()
+    for chunk in chunked(latest):
+        status_of.update(
+            Game.objects.filter(pk__in=chunk).values_list("pk", "online_status_id")
+        )
+    status_ids = {pk for pk in status_of.values() if pk is not None}
+    for chunk in chunked(status_ids):
+        shared.update(
+            Game.objects.filter(online_status_id__in=chunk)
+            .order_by()
+            .values("online_status_id")
+            .annotate(n=Count("pk"))
+            .filter(n__gt=1)
+            .values_list("online_status_id", flat=True)
+        )
+    statuses = {}
+    for chunk in chunked(status_ids - shared):
+        statuses.update(OnlineStatus.objects.in_bulk(chunk))
+
+    updated, created, changed = [], {}, set()
+    for game_id, (recorded_at, active, registered) in latest.items():
+        if game_id not in status_of:
+            continue
+        status = statuses.get(status_of[game_id])
+        if status is None:
+            created[game_id] = OnlineStatus(
+                active_players=active, registered_players=registered or 0, sampled_at=recorded_at
+            )
+            changed.add(game_id)
+        elif status.sampled_at is None or status.sampled_at < recorded_at:
+            if status.active_players != active:
+                changed.add(game_id)
+            status.active_players = active
+            if registered is not None:
+                status.registered_players = registered
+            status.sampled_at = recorded_at
+            updated.append(status)
+    OnlineStatus.objects.bulk_update(
+        updated, ["active_players", "registered_players", "sampled_at"], batch_size=IN_CHUNK
+    )
+    OnlineStatus.objects.bulk_create(created.values())
+    return created, changed
+
+
+def write_samples(samples):
+    """
+    Persist ``[(game_id, recorded_at, active, registered), …]`` as
+    described in the module docstring.  Samples of games that do not
+    exist (any more) are dropped.  Returns the number of samples written.
+    """
+    known = set()
+    for chunk in chunked({s[0] for s in samples}):
+        known.update(Game.objects.filter(pk__in=chunk).values_list("pk", flat=True))
+    samples = [s for s in samples if s[0] in known]
+    if not samples:
+        return 0
+
+    latest = {}
+    for game_id, recorded_at, active, registered in samples:
+        if game_id not in latest or latest[game_id][0] <= recorded_at:
+            latest[game_id] = (recorded_at, active, registered)
+
+    with transaction.atomic(using=primary_alias(PlayerCountSample)):
+        PlayerCountSample.objects.bulk_create(
+            PlayerCountSample(
+                game_id=game_id, recorded_at=recorded_at,
+                active_players=active, registered_players=registered,
+            )
+            for game_id, recorded_at, active, registered in samples
+        )
+        keys = {(game_id, recorded_at) for game_id, recorded_at, *_ in samples}
+        for resolution in RESOLUTIONS.values():
+            keys = {(game_id, bucket_start(moment, resolution)) for game_id, moment in keys}
+            _recompute(resolution, keys)
+        created, changed = _sync_snapshots(latest)
+
+    # Game may live in another database than the telemetry rows – point
+    # the games at their new rows once those are committed.
+    if created:
+        Game.objects.bulk_update(
+            [Game(pk=game_id, online_status=status) for game_id, status in created.items()],
+            ["online_status"],
+            batch_size=IN_CHUNK,
+        )
+    lookups.invalidate("online_status")
+    rollups.refresh_games(changed)
+    catalog_index.refresh_games(changed)
+    return len(samples)
+
+
+# -----------------------------------------------------------------
+#  Per-process buffer
+# -----------------------------------------------------------------
+class SampleBuffer:
+    """
+    Samples waiting to be written.  The request that fills the buffer
+    writes it; requests arriving during that write queue behind it on
+    ``_flush_lock``, which keeps the buffer from growing without bound.
+    Samples that no request pushes out are written by a timer started
+    with the oldest of them.
+    """
+
+    def __init__(self, write=write_samples):
+        self._write = write
+        self._samples = []
+        self._oldest = None
+        self._timer = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._samples)
+
+    def add(self, samples):
+        """Buffer ``samples`` and flush if the buffer became due."""
+        size = getattr(settings, "PLAYER_COUNT_FLUSH_SIZE", 5000)
+        age = getattr(settings, "PLAYER_COUNT_FLUSH_SECONDS", 5)
+        with self._lock:
+            if not self._samples:
+                self._oldest = time.monotonic()
+            self._samples.extend(samples)
+            due = len(self._samples) >= size or time.monotonic() - self._oldest >= age
+            if not due:
+                self._start_timer(age)
+        if due:
+            self.flush()
+
+    def _start_timer(self, age):
+        # Called with the lock held.  Started lazily: a thread started
+        # before a fork would not survive it.
+        if self._samples and (self._timer is None or not self._timer.is_alive()):
+            delay = max(0, self._oldest + age - time.monotonic())
+            self._timer = threading.Timer(delay, self._flush_due)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush_due(self):
+        age = getattr(settings, "PLAYER_COUNT_FLUSH_SECONDS", 5)
+        try:
+            with self._lock:
+                # A request may have flushed meanwhile; the samples now
+                # waiting can be younger than this timer
+                due = bool(self._samples) and time.monotonic() - self._oldest >= age
+            if due:
+                self.flush()
+        except Exception:
+            logger.exception("Writing buffered player counts failed")
+        finally:
+            connections.close_all()
+            with self._lock:
+                self._timer = None
+                self._start_timer(age)
+
+    def flush(self):
+        """Write everything buffered.  Returns the number of samples written."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._samples = self._samples, []
+            if not batch:
+                return 0
+            try:
+                return self._write(batch)
+            except Exception:
+                # Keep them for the next flush, ahead of newer samples
+                with self._lock:
+                    self._samples[:0] = batch
+                    self._oldest = time.monotonic()
+                raise
+
+
+buffer = SampleBuffer()
+atexit.register(buffer.flush)
+
+
+def ingest(samples):
+    buffer.add(samples)
+
+
+# -----------------------------------------------------------------
+#  Reading and retention
+# -----------------------------------------------------------------
+def series(game_id, resolution, since, until=None):
+    """``[{"t", "avg", "min", "max", "samples"}, …]`` oldest first."""
+    buckets = PlayerCountRollup.objects.filter(
+        game_id=game_id, resolution=RESOLUTIONS[resolution], bucket_start__gte=since
+    )
+    if until is not None:
+        buckets = buckets.filter(bucket_start__lt=until)
+    return [
+        {
+            "t": bucket.bucket_start,
+            "avg": round(bucket.active_avg, 1),
+            "min": bucket.active_min,
+            "max": bucket.active_max,
+            "samples": bucket.samples,
+        }
+        for bucket in buckets.order_by("bucket_start")
+    ]
+
+
+def _delete_before(queryset, field, cutoff, step):
+    """Delete ``field < cutoff`` in ``step``-wide slices, oldest first, one short write each."""
+    oldest = queryset.filter(**{f"{field}__lt": cutoff}).order_by(field).values_list(field, flat=True).first()
+    deleted = 0
+    while oldest is not None and oldest < cutoff:
+        oldest = min(oldest + step, cutoff)
+        deleted += queryset.filter(**{f"{field}__lt": oldest}).delete()[0]
+    return deleted
+
+
+def prune(now=None):
+    """Apply ``PLAYER_COUNT_RETENTION_DAYS``.  Returns ``{level: rows deleted}``."""
+    now = now or timezone.now()
+    retention = getattr(settings, "PLAYER_COUNT_RETENTION_DAYS", {})
+    deleted = {}
+    days = retention.get("raw")
+    if days is not None:
+        deleted["raw"] = _delete_before(
+            PlayerCountSample.objects.all(), "recorded_at", now - timedelta(days=days), timedelta(hours=1)
+        )
+    for name, seconds in RESOLUTIONS.items():
+        days = retention.get(name)
+        if days is not None:
+            deleted[name] = _delete_before(
+                PlayerCountRollup.objects.filter(resolution=seconds),
+                "bucket_start",
+                now - timedelta(days=days),
+                timedelta(seconds=seconds * 1000),
+            )
+    return deleted
+
+
+def delete_game(game_id):
+    """Drop the series of a deleted game."""
+    PlayerCountSample.objects.filter(game_id=game_id).delete()
+    PlayerCountRollup.objects.filter(game_id=game_id).delete()
@@ -0,0 +1,273 @@
+# --------------------------------------------------------------
+# game_site/prerender.py
+# --------------------------------------------------------------
+"""
+Static snapshots of the anonymous catalog for a plain file server or CDN
+(``manage.py prerender_catalog``), written under ``PRERENDER_ROOT``:
+
+    index.html, index.json                 home page, default sort
+    catalog/<query>.html / .json           home page with filters / a sort,
+                                           e.g. catalog/genre-3_sort-rating.html
+    games/<id>.json                        game detail (``/game/<id>/json/``)
+    manifest.json                          query string / game id → files
+
+Catalog pages cover every sort of the unfiltered page, then the genre /
+platform / store combinations that have games – single filters first,
+the largest first – up to ``PRERENDER_MAX_PAGES`` pages.  The HTML is
+what ``games_view_main`` renders for an anonymous visitor, the JSON its
+rows.
+
+Regeneration is incremental.  Every page keeps a *dependency set* of
+keys – ``game:<id>`` for each game it shows, ``<table>:<id>`` for each
+lookup row it names, ``<table>:*`` for a whole table (the filter bar's
+lists) – and a fingerprint of every key is kept in the state file
+(``.prerender-state.json``).  A run recomputes the fingerprints from
+the database and re-renders only the pages whose dependency set
+contains a changed key, or whose list of games changed (a game that
+now matches the filters); pages and games that are gone are deleted.
+"""
+import hashlib
+import json
+import os
+import tempfile
+from collections import Counter
+from itertools import combinations
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpRequest, QueryDict
+from django.utils import timezone
+from django.utils.http import urlencode
+
+from . import catalog_index, lookups
+from .catalog import catalog_params, game_detail_data
+from .db_routers import primary_alias
+from .db_utils import chunked
+from .models import Game, OnlineStatus, SalesHistory
+
+STATE_FILE = ".prerender-state.json"
+STATE_VERSION = 1
+
+FILTERS = ("genre", "platform", "store")
+SORTS = ("", "name", "rating", "players")
+
+# Lookup tables the game detail payload names (catalog.game_detail_data)
+DETAIL_TABLES = (
+    "genre", "platform", "store", "developer", "publisher", "dlc",
+    "game_mode", "license", "system_requirements", "award", "language",
+)
+
+
+def root():
+    return Path(getattr(settings, "PRERENDER_ROOT", Path(settings.BASE_DIR) / "prerendered"))
+
+
+def _fingerprint(values):
+    return hashlib.blake2b(repr(values).encode(), digest_size=8).hexdigest()
+
+
+def _write(path, content):
+    """Replace ``path`` atomically – a file server never sends half a page."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            out.write(content)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _json(data):
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def _request(query):
+    """An anonymous GET of the home page with ``query``."""
+    request = HttpRequest()
+    request.method = "GET"
+    request.path = request.path_info = "/"
+    request.GET = QueryDict(query)
+    request.META.update(QUERY_STRING=query, SERVER_NAME="localhost", SERVER_PORT="80")
+    request.user = AnonymousUser()
+    return request
+
+
+# -----------------------------------------------------------------
+#  Fingerprints of the data the pages are built from
+# -----------------------------------------------------------------
+def _chunked_values(model, ids, *fields):
+    ids = sorted(set(ids) - {None})
+    rows = {}
+    qs = model.objects.using(primary_alias(model))
+    for chunk in chunked(ids):
+        rows.update((pk, values) for pk, *values in qs.filter(pk__in=chunk).values_list("pk", *fields))
+    return rows
+
+
+def _game_rows():
+    """``{pk: {column: value}}`` of every game, with its player count and sales."""
+    columns = [f.attname for f in Game._meta.concrete_fields]
+    rows = [
+        dict(zip(columns, values))
+        for values in Game.objects.using(primary_alias(Game)).values_list(*columns).iterator(chunk_size=2000)
+    ]
+    players = _chunked_values(OnlineStatus, (r["online_status_id"] for r in rows), "active_players")
+    sales = _chunked_values(SalesHistory, (r["sales_history_id"] for r in rows), "units_sold")
+    for row in rows:
+        row["players"] = players.get(row["online_status_id"])
+        row["sales"] = sales.get(row["sales_history_id"])
+    return {row["id"]: row for row in rows}
+
+
+def fingerprints(games):
+    """``{dependency key: fingerprint}`` of the games and the lookup rows they name."""
+    current = {f"game:{pk}": _fingerprint(sorted(row.items())) for pk, row in games.items()}
+    for table in DETAIL_TABLES:
+        model = lookups.LOOKUP_TABLES[table].model
+        columns = [f.attname for f in model._meta.concrete_fields]
+        rows = model.objects.using(primary_alias(model)).order_by("pk").values_list(*columns)
+        prints = [(values[0], _fingerprint(values)) for values in rows]
+        current.update((f"{table}:{pk}", fp) for pk, fp in prints)
+        current[f"{table}:*"] = _fingerprint(prints)
+    return current
+
+
+# -----------------------------------------------------------------
+#  Pages
+# -----------------------------------------------------------------
+def _slug(query):
+    return query.replace("=", "-").replace("&", "_")
+
+
+def plan_catalog(index, max_pages):
+    """Query strings of the catalog pages to render, most important first."""
+    live = index.live
+    columns = {name: getattr(index, name)[live].tolist() for name in FILTERS}
+    combos = []
+    for n in range(1, len(FILTERS) + 1):
+        for names in combinations(FILTERS, n):
+            counts = Counter(zip(*(columns[name] for name in names)))
+            combos.extend(
+                (n, -count, names, values) for values, count in counts.items()
+            )
+    combos.sort()
+    queries = [urlencode({"sort": sort}) if sort else "" for sort in SORTS]
+    for _, _, names, values in combos:
+        for sort in SORTS:
+            if len(queries) >= max_pages:
+                return queries
+            params = list(zip(names, values)) + ([("sort", sort)] if sort else [])
+            queries.append(urlencode(params))
+    return queries
+
+
+def _catalog_files(query):
+    if not query:
+        return ["index.html", "index.json"]
+    return [f"catalog/{_slug(query)}.html", f"catalog/{_slug(query)}.json"]
+
+
+def _render_catalog(query, params):
+    # Late import – views imports half the project
+    from .views import _render_home
+
+    request = _request(query)
+    rows = catalog_index.catalog_rows(params, request.user)
+    html = _render_home(request, params).content
+    data = [
+        {
+            "id": row.id,
+            "game_name": row.game_name,
+            "genre": row.genre,
+            "platform": row.platform,
+            "store": row.store,
+            "rating_mean": row.rating_mean,
+            "active_players": row.online_status.active_players if row.online_status else None,
+        }
+        for row in rows
+    ]
+    return html, _json(data)
+
+
+def run(max_pages=None, full=False, details=True, out=None):
+    """
+    Bring the snapshots under ``root()`` up to date; ``full`` re-renders
+    everything.  Returns counts of the pages rendered, unchanged and
+    deleted.
+    """
+    base = root()
+    max_pages = max_pages or getattr(settings, "PRERENDER_MAX_PAGES", 1000)
+    state_path = base / STATE_FILE
+    state = {}
+    if state_path.exists() and not full:
+        state = json.loads(state_path.read_text())
+        if state.get("version") != STATE_VERSION:
+            state = {}
+    old_prints, old_pages = state.get("fingerprints", {}), state.get("pages", {})
+
+    # Fresh snapshots – the loaded ones may predate the last writes
+    lookups.invalidate()
+    catalog_index.invalidate()
+    games = _game_rows()
+    current = fingerprints(games)
+    changed = {key for key in current.keys() | old_prints.keys() if current.get(key) != old_prints.get(key)}
+    index = catalog_index.get_index()
+
+    pages, stats = {}, Counter()
+
+    def keep_or_render(key, deps, ids, render, files):
+        old = old_pages.get(key)
+        pages[key] = {"files": files, "deps": sorted(deps), "ids": ids}
+        if not full and old and old["ids"] == ids and old["files"] == files and not changed & deps:
+            stats["unchanged"] += 1
+            return
+        for path, content in zip(files, render()):
+            _write(base / path, content)
+        stats["rendered"] += 1
+        if out:
+            out(f"rendered {files[0]}")
+
+    for query in plan_catalog(index, max_pages):
+        params = catalog_params(_request(query))
+        ids = index.query(params, None)
+        rows = [index.row_of[pk] for pk in ids]
+        deps = {f"game:{pk}" for pk in ids} | {f"{table}:*" for table in FILTERS}
+        for table in FILTERS:
+            deps |= {f"{table}:{pk}" for pk in set(getattr(index, table)[rows].tolist())}
+        keep_or_render(
+            f"catalog:{query}", deps, ids, lambda q=query, p=params: _render_catalog(q, p), _catalog_files(query)
+        )
+
+    if details:
+        for pk, row in games.items():
+            deps = {f"game:{pk}"} | {
+                f"{table}:{row[f'{table}_id']}" for table in DETAIL_TABLES if row[f"{table}_id"] is not None
+            }
+            keep_or_render(
+                f"game:{pk}", deps, [pk], lambda pk=pk: [_json(game_detail_data(pk))], [f"games/{pk}.json"]
+            )
+
+    # Pages that dropped out of the plan or whose game is gone
+    for key, old in old_pages.items():
+        if key not in pages:
+            for path in old["files"]:
+                (base / path).unlink(missing_ok=True)
+            stats["deleted"] += 1
+
+    if stats["rendered"] or stats["deleted"] or not state:
+        manifest = {
+            "generated_at": timezone.now().isoformat(),
+            "catalog": {
+                key.split(":", 1)[1]: dict(zip(("html", "json"), page["files"]))
+                for key, page in pages.items() if key.startswith("catalog:")
+            },
+            "games": {
+                key.split(":", 1)[1]: page["files"][0] for key, page in pages.items() if key.startswith("game:")
+            },
+        }
+        _write(base / "manifest.json", _json(manifest))
+    _write(state_path, _json({"version": STATE_VERSION, "fingerprints": current, "pages": pages}))
+    return {name: stats[name] for name in ("rendered", "unchanged", "deleted")}
@@ -0,0 +1,278 @@
+# --------------------------------------------------------------
+# game_site/recommendations.py
+# --------------------------------------------------------------
+"""
+Item-to-item recommendations from whitelist co-occurrence.
+
+The whitelist through table is an implicit-feedback matrix ``X`` (users ×
+games).  ``C = Xᵀ X`` counts, for every pair of games, how many users
+whitelisted both; its diagonal is each game's whitelist count.
+
+    rebuild()        chunked batch job: accumulates C from user-id ranges
+                     of the through table with SciPy sparse products and
+                     rewrites ``GameCooccurrence``
+    apply_toggle()   incremental update for one user adding / removing
+                     games (wired to ``m2m_changed`` in game_site.signals)
+    recommend()      sparse dot product of the user's whitelist with the
+                     cached rows of C, cosine-normalized:
+
+        score(j) = Σ_{i ∈ whitelist} C[i, j] / sqrt(C[i, i] · C[j, j])
+
+Rows are cached in process (``RowCache``), truncated to the
+``ROW_LIMIT`` strongest neighbours, and dropped when an update touches
+them, so serving cost depends on the whitelist size – not on the number
+of users.
+"""
+import threading
+import time
+
+import numpy as np
+import scipy.sparse as sp
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+
+from .db_utils import chunked
+from .models import CustomUser, Game, GameCooccurrence
+
+# Neighbours kept per cached row – the long tail never reaches a top-N
+ROW_LIMIT = 200
+
+# Users per chunk in the batch job
+USER_CHUNK = 5000
+
+Through = CustomUser.whitelisted_games.through
+
+
+# -----------------------------------------------------------------
+#  Batch job
+# -----------------------------------------------------------------
+def cooccurrence_matrix(pairs_chunks, n_games):
+    """
+    Accumulate ``C = Xᵀ X`` from chunks of ``(user_rows, game_cols)``
+    arrays; user rows only need to be unique *within* a chunk.
+    """
+    C = sp.csr_matrix((n_games, n_games), dtype=np.int64)
+    for users, games in pairs_chunks:
+        if not len(users):
+            continue
+        _, user_rows = np.unique(users, return_inverse=True)
+        X = sp.csr_matrix(
+            (np.ones(len(games), dtype=np.int64), (user_rows.reshape(-1), games)),
+            shape=(user_rows.max() + 1, n_games),
+        )
+        C = C + (X.T @ X)
+    return C.tocoo()
+
+
+def rebuild(user_chunk=USER_CHUNK, batch_size=5000, progress=None):
+    """Recompute the whole ``GameCooccurrence`` table.  Returns its row count."""
+    game_ids = np.array(Game.objects.order_by("pk").values_list("pk", flat=True), dtype=np.int64)
+    col_of = {int(pk): i for i, pk in enumerate(game_ids)}
+    user_ids = list(Through.objects.order_by().values_list("customuser_id", flat=True).distinct())
+    user_ids.sort()
+
+    def chunks():
+        for start in range(0, len(user_ids), user_chunk):
+            lo, hi = user_ids[start], user_ids[min(start + user_chunk, len(user_ids)) - 1]
+            rows = Through.objects.filter(customuser_id__gte=lo, customuser_id__lte=hi).values_list(
+                "customuser_id", "game_id"
+            )
+            users, games = [], []
+            for user_id, game_id in rows.iterator(chunk_size=batch_size):
+                users.append(user_id)
+                games.append(col_of[game_id])
+            if progress:
+                progress(min(start + user_chunk, len(user_ids)), len(user_ids))
+            yield np.array(users, dtype=np.int64), np.array(games, dtype=np.int64)
+
+    C = cooccurrence_matrix(chunks(), len(game_ids))
+    with transaction.atomic():
+        GameCooccurrence.objects.all().delete()
+        objs = (
+            GameCooccurrence(game_id=int(game_ids[r]), other_id=int(game_ids[c]), count=int(v))
+            for r, c, v in zip(C.row, C.col, C.data)
+            if v > 0
+        )
+        GameCooccurrence.objects.bulk_create(objs, batch_size=batch_size)
+    row_cache.clear()
+    return int((C.data > 0).sum())
+
+
+# -----------------------------------------------------------------
+#  Incremental updates
+# -----------------------------------------------------------------
+def apply_toggle(user_id, game_ids, added):
+    """
+    ``user_id`` added (``added=True``) or removed ``game_ids`` from the
+    whitelist.  Must run *after* the through rows changed.
+    """
+    game_ids = set(game_ids)
+    if not game_ids:
+        return
+    current = set(Through.objects.filter(customuser_id=user_id).values_list("game_id", flat=True))
+    # Pairs with everything else on the list plus the diagonal (popularity);
+    # pairs among the toggled games themselves are counted from both sides.
+    others = current | game_ids if added else current
+    pairs = {(g, h) for g in game_ids for h in others | {g}}
+    pairs |= {(h, g) for g, h in pairs}
+    if not added:
+        pairs |= {(g, h) for g in game_ids for h in game_ids}
+    delta = 1 if added else -1
+
+    with transaction.atomic():
+        by_game = {}
+        for g, h in pairs:
+            by_game.setdefault(g, set()).add(h)
+        for g, hs in by_game.items():
+            for chunk in chunked(hs):
+                qs = GameCooccurrence.objects.filter(game_id=g, other_id__in=chunk)
+                if added:
+                    existing = set(qs.values_list("other_id", flat=True))
+                    qs.update(count=F("count") + delta)
+                    GameCooccurrence.objects.bulk_create(
+                        [GameCooccurrence(game_id=g, other_id=h, count=1) for h in set(chunk) - existing],
+                        ignore_conflicts=True,
+                    )
+                else:
+                    qs.filter(count__lte=1).delete()
+                    qs.update(count=F("count") + delta)
+    row_cache.invalidate({g for g, _ in pairs}, {g: delta for g in game_ids})
+
+
+# -----------------------------------------------------------------
+#  Serving
+# -----------------------------------------------------------------
+class RowCache:
+    """
+    Per-process cache of co-occurrence rows
+    (``game_id → (other ids, counts)``) and of the diagonal – every game's
+    whitelist count – as two sorted arrays.
+    """
+
+    def __init__(self):
+        self._rows = {}
+        self._popularity = None
+        self._lock = threading.Lock()
+
+    def ttl(self):
+        return getattr(settings, "RECOMMENDATION_ROW_TTL", 300)
+
+    def rows(self, game_ids):
+        now = time.monotonic()
+        ttl = self.ttl()
+        rows, missing = {}, []
+        for g in game_ids:
+            entry = self._rows.get(g)
+            if entry is None or now - entry[0] > ttl:
+                missing.append(g)
+            else:
+                rows[g] = entry[1]
+        if missing:
+            loaded = self._load_rows(missing)
+            with self._lock:
+                for g, row in loaded.items():
+                    self._rows[g] = (now, row)
+            rows.update(loaded)
+        return rows
+
+    def _load_rows(self, game_ids):
+        raw = {g: ([], []) for g in game_ids}
+        for chunk in chunked(game_ids):
+            qs = GameCooccurrence.objects.filter(game_id__in=chunk).exclude(other_id=F("game_id"))
+            for g, h, count in qs.values_list("game_id", "other_id", "count"):
+                raw[g][0].append(h)
+                raw[g][1].append(count)
+        rows = {}
+        for g, (others, counts) in raw.items():
+            others = np.array(others, dtype=np.int64)
+            counts = np.array(counts, dtype=np.float64)
+            if len(counts) > ROW_LIMIT:
+                top = np.argpartition(-counts, ROW_LIMIT - 1)[:ROW_LIMIT]
+                others, counts = others[top], counts[top]
+            rows[g] = (others, counts)
+        return rows
+
+    def popularity(self, ids):
+        """Whitelist counts of ``ids`` (0 for games nobody whitelisted)."""
+        entry = self._popularity
+        if entry is None or time.monotonic() - entry[0] > self.ttl():
+            pairs = GameCooccurrence.objects.filter(other_id=F("game_id")).order_by("game_id")
+            data = np.array(list(pairs.values_list("game_id", "count")), dtype=np.int64).reshape(-1, 2)
+            entry = self._popularity = (time.monotonic(), data[:, 0], data[:, 1].astype(np.float64))
+        _, known, counts = entry
+        pos = np.searchsorted(known, ids)
+        pos = np.minimum(pos, max(len(known) - 1, 0))
+        if not len(known):
+            return np.zeros(len(ids))
+        return np.where(known[pos] == ids, counts[pos], 0.0)
+
+    def invalidate(self, game_ids, popularity_delta=None):
+        """
+        Drop the rows of ``game_ids``.  ``popularity_delta`` (``{game id:
+        change}``) is applied to the cached diagonal in place when every id
+        is already known there; otherwise the diagonal is reloaded.
+        """
+        with self._lock:
+            for g in game_ids:
+                self._rows.pop(g, None)
+            entry = self._popularity
+            if entry is None or not popularity_delta:
+                self._popularity = None
+                return
+            loaded_at, known, counts = entry
+            ids = np.fromiter(popularity_delta, dtype=np.int64)
+            pos = np.searchsorted(known, ids).clip(max=max(len(known) - 1, 0))
+            if not len(known) or (known[pos] != ids).any():
+                self._popularity = None
+                return
+            counts = counts.copy()
+            counts[pos] += np.fromiter(popularity_delta.values(), dtype=np.float64)
+            self._popularity = (loaded_at, known, counts)
+
+    def clear(self):
+        with self._lock:
+            self._rows.clear()
+            self._popularity = None
+
+
+row_cache = RowCache()
+
+
+def score(whitelist, rows, popularity_of):
+    """
+    Sparse dot product of a whitelist with co-occurrence ``rows``.
+    ``popularity_of(ids)`` returns the diagonal counts of ``ids``.
+    Returns ``(candidate ids, scores)``, whitelist excluded, unsorted.
+    """
+    whitelist = np.fromiter(whitelist, dtype=np.int64)
+    own = popularity_of(whitelist)
+    parts_ids, parts_scores = [], []
+    for g, popularity in zip(whitelist.tolist(), own):
+        others, counts = rows.get(g, (None, None))
+        if others is None or not len(others) or popularity <= 0:
+            continue
+        parts_ids.append(others)
+        parts_scores.append(counts / np.sqrt(popularity))
+    if not parts_ids:
+        return np.empty(0, dtype=np.int64), np.empty(0)
+    ids, inverse = np.unique(np.concatenate(parts_ids), return_inverse=True)
+    totals = np.bincount(inverse.reshape(-1), weights=np.concatenate(parts_scores))
+    keep = ~np.isin(ids, whitelist)
+    ids, totals = ids[keep], totals[keep]
+    pops = popularity_of(ids)
+    return ids, totals / np.sqrt(np.where(pops > 0, pops, 1.0))
+
+
+def recommend(whitelist, limit=20):
+    """``[(game_id, score), ...]`` best first for a set of whitelisted ids."""
+    whitelist = set(whitelist)
+    if not whitelist:
+        return []
+    ids, scores = score(whitelist, row_cache.rows(whitelist), row_cache.popularity)
+    if len(ids) > limit:
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        ids, scores = ids[top], scores[top]
+    # Best first; ties by lower game id for a stable order
+    order = np.lexsort((ids, -scores))
+    return [(int(ids[i]), float(scores[i])) for i in order]
@@ -0,0 +1,82 @@
+# --------------------------------------------------------------
+# game_site/replica.py
+# --------------------------------------------------------------
+"""
+Local read-replica stand-in: a second SQLite file refreshed from the
+primary with the SQLite online backup API (``manage.py sync_replica``).
+
+After every copy the sync time is written into the replica itself
+(``replica_meta`` table), so any process can compute the replication lag
+without shared memory.
+"""
+import sqlite3
+import time
+
+from django.conf import settings
+
+from .db_routers import PRIMARY_DB, REPLICA_DB
+
+META_TABLE = "replica_meta"
+
+
+def _db_path(alias):
+    return str(settings.DATABASES[alias]["NAME"])
+
+
+def sync_replica(pages=-1, step_sleep=0.0):
+    """
+    Copy the primary into the replica file.
+
+    ``pages`` / ``step_sleep`` are passed through to ``Connection.backup``
+    so a large database can be copied in slices without starving writers.
+    Returns the time the copy took in seconds.
+    """
+    started = time.time()
+    src = sqlite3.connect(_db_path(PRIMARY_DB))
+    dst = sqlite3.connect(_db_path(REPLICA_DB), timeout=30)
+    try:
+        src.backup(dst, pages=pages, sleep=step_sleep)
+        dst.execute(
+            f"CREATE TABLE IF NOT EXISTS {META_TABLE} "
+            "(id INTEGER PRIMARY KEY CHECK (id = 1), synced_at REAL NOT NULL)"
+        )
+        # The snapshot reflects the primary as of the start of the copy
+        dst.execute(
+            f"INSERT OR REPLACE INTO {META_TABLE} (id, synced_at) VALUES (1, ?)",
+            (started,),
+        )
+        dst.commit()
+    finally:
+        dst.close()
+        src.close()
+    return time.time() - started
+
+
+def replica_status():
+    """
+    Returns:
+        {
+            "configured": <bool>,
+            "last_sync": <unix time | None>,
+            "lag_seconds": <float | None>   # None → never synced
+        }
+    """
+    if REPLICA_DB not in settings.DATABASES:
+        return {"configured": False, "last_sync": None, "lag_seconds": None}
+
+    synced_at = None
+    try:
+        conn = sqlite3.connect(f"file:{_db_path(REPLICA_DB)}?mode=ro", uri=True)
+        try:
+            row = conn.execute(f"SELECT synced_at FROM {META_TABLE} WHERE id = 1").fetchone()
+            synced_at = row[0] if row else None
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        pass
+
+    return {
+        "configured": True,
+        "last_sync": synced_at,
+        "lag_seconds": None if synced_at is None else round(time.time() - synced_at, 3),
+    }
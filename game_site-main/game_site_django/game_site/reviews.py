@@ -0,0 +1,98 @@
+# --------------------------------------------------------------
+# game_site/reviews.py
+# --------------------------------------------------------------
+"""
+Rating aggregates of ``Game`` from its ``GameReview`` rows.
+
+Every insert, update and delete of a review runs one ``UPDATE`` on its
+game that adjusts ``review_count`` / ``review_sum`` with ``F()`` and
+recomputes ``rating_mean`` and the Bayesian average
+
+    rating_bayes = (C · m + review_sum) / (C + review_count)
+
+from the new values in the same statement, so concurrent reviews of one
+game never lose an update.  ``m`` / ``C`` are ``settings.REVIEW_PRIOR_MEAN``
+and ``REVIEW_PRIOR_WEIGHT``: a game with few reviews is pulled towards the
+prior, which makes ``rating_bayes`` a fair sort key.
+
+``recompute()`` (``manage.py rebuild_review_stats``) derives all four
+columns from the reviews again – after changing the prior or bulk edits.
+
+The legacy single ``Game.review`` is mirrored into one ``GameReview`` per
+game (``imported_from``) by ``sync_legacy_review()``.
+"""
+from django.conf import settings
+from django.db.models import Count, F, FloatField, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Cast, Coalesce
+
+from .models import Game, GameReview
+
+
+def prior():
+    """``(mean, weight)`` of the Bayesian prior."""
+    return (
+        float(getattr(settings, "REVIEW_PRIOR_MEAN", 6.0)),
+        float(getattr(settings, "REVIEW_PRIOR_WEIGHT", 5)),
+    )
+
+
+def _aggregate_columns(count, total):
+    """Column values for a game whose review count / sum become ``count`` / ``total``."""
+    mean, weight = prior()
+    total_f = Cast(total, FloatField())
+    return {
+        "review_count": count,
+        "review_sum": total,
+        # SQL division by zero is NULL – exactly "no reviews yet"
+        "rating_mean": total_f / Cast(count, FloatField()),
+        "rating_bayes": (Value(weight * mean) + total_f) / (Value(weight) + count),
+    }
+
+
+def apply_delta(game_id, count_delta, sum_delta):
+    """Add ``count_delta`` reviews with ``sum_delta`` rating points to one game."""
+    if not count_delta and not sum_delta:
+        return
+    Game.objects.filter(pk=game_id).update(
+        **_aggregate_columns(F("review_count") + count_delta, F("review_sum") + sum_delta)
+    )
+
+
+def recompute(games=None):
+    """Recompute the aggregates of ``games`` (a Game queryset; all by default)."""
+    games = Game.objects.all() if games is None else games
+    reviews = GameReview.objects.filter(game=OuterRef("pk")).order_by().values("game")
+    count = Coalesce(Subquery(reviews.annotate(n=Count("pk")).values("n")), 0)
+    total = Coalesce(
+        Subquery(reviews.annotate(s=Sum("rating")).values("s"), output_field=IntegerField()), 0
+    )
+    return games.update(**_aggregate_columns(count, total))
+
+
+# --------------------------------------------------------------
+#  Legacy Game.review → GameReview
+# --------------------------------------------------------------
+def legacy_rating(legacy):
+    """A legacy ``Review``'s rating, clamped to GameReview's 1–10."""
+    return min(max(legacy.rating, 1), 10)
+
+
+def sync_legacy_review(game):
+    """Make ``game``'s imported review match its ``review`` FK."""
+    imported = GameReview.objects.filter(game=game, imported_from__isnull=False)
+    for review in imported.exclude(imported_from_id=game.review_id):
+        review.delete()
+    if game.review_id is not None and not imported.filter(imported_from_id=game.review_id).exists():
+        legacy = game.review
+        GameReview.objects.create(
+            game=game, rating=legacy_rating(legacy), text=legacy.text, imported_from=legacy
+        )
+
+
+def sync_legacy_rating(legacy):
+    """A legacy ``Review`` was edited – update its copies."""
+    rating = legacy_rating(legacy)
+    for review in GameReview.objects.filter(imported_from=legacy):
+        if (review.rating, review.text) != (rating, legacy.text):
+            review.rating, review.text = rating, legacy.text
+            review.save(update_fields=["rating", "text"])
@@ -0,0 +1,232 @@
+# --------------------------------------------------------------
+# game_site/rollups.py
+# --------------------------------------------------------------
+"""
+Catalog analytics behind ``/api/stats/``: games, units sold, active
+players and review ratings summed per genre, platform, publisher and
+publisher country.
+
+Every game's current contribution is remembered in ``GameRollupState``.
+``refresh_games()`` reads the games again, diffs each against its state
+row and applies only the differences to ``CatalogRollup`` with ``F()``
+updates – so it is idempotent and can be called for any change that might
+affect a game (a save, a renamed publisher country, a new sales figure, a
+new review, a deleted game).  game_site.outbox calls it after a game's
+change is committed, the receivers in game_site.signals in the same
+transaction as a change to a publisher.  Sales and player-count rows change
+far more often: their receivers only add the games to ``dirty``, and one
+batched refresh follows ``ROLLUP_FLUSH_SECONDS`` later.  ``rebuild()``
+(``manage.py build_rollups``) recomputes both tables from scratch.
+"""
+import atexit
+import logging
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F
+
+from .catalog import attach_telemetry
+from .db_utils import chunked
+from .models import CatalogRollup, Game, GameRollupState
+
+logger = logging.getLogger(__name__)
+
+# Rollup dimension → GameRollupState column holding the game's key
+DIMENSIONS = {
+    "genre": "genre_id",
+    "platform": "platform_id",
+    "publisher": "publisher_id",
+    "country": "country",
+}
+
+# Summed columns (``games`` is the count of contributing games)
+MEASURES = ("games", "units_sold", "active_players", "rating_sum", "rating_count")
+
+
+def _contributions(game_ids=None):
+    """
+    ``{game id: unsaved GameRollupState}`` for ``game_ids`` (every game
+    when ``None``).  Ids that no longer exist are simply missing.
+    """
+    if game_ids is None:
+        game_ids = Game.objects.order_by("pk").values_list("pk", flat=True)
+    states = {}
+    for chunk in chunked(game_ids):
+        games = list(
+            Game.objects.filter(pk__in=chunk)
+            .select_related("publisher")
+            .only(
+                "genre", "platform", "publisher__country", "review_sum", "review_count",
+                "sales_history", "online_status",
+            )
+        )
+        attach_telemetry(games, fields=("sales_history", "online_status"))
+        for game in games:
+            states[game.pk] = GameRollupState(
+                game_id=game.pk,
+                genre_id=game.genre_id,
+                platform_id=game.platform_id,
+                publisher_id=game.publisher_id,
+                country=game.publisher.country if game.publisher else None,
+                units_sold=game.sales_history.units_sold if game.sales_history else 0,
+                active_players=game.online_status.active_players if game.online_status else 0,
+                rating_sum=game.review_sum,
+                rating_count=game.review_count,
+            )
+    return states
+
+
+def _measures(state):
+    return (1, state.units_sold, state.active_players, state.rating_sum, state.rating_count)
+
+
+def _add(deltas, state, sign):
+    values = _measures(state)
+    for dimension, column in DIMENSIONS.items():
+        key = getattr(state, column)
+        if key is None or key == "":
+            continue
+        total = deltas[(dimension, str(key))]
+        for i, value in enumerate(values):
+            total[i] += sign * value
+
+
+def _apply(deltas):
+    for (dimension, key), delta in deltas.items():
+        if not any(delta):
+            continue
+        changes = {m: F(m) + d for m, d in zip(MEASURES, delta) if d}
+        row = CatalogRollup.objects.filter(dimension=dimension, key=key)
+        if not row.update(**changes):
+            CatalogRollup.objects.create(
+                dimension=dimension, key=key, **dict(zip(MEASURES, delta))
+            )
+        elif delta[0] < 0:
+            row.filter(games__lte=0).delete()
+
+
+def refresh_games(game_ids):
+    """Bring the rollups up to date for ``game_ids`` (saved, changed or deleted)."""
+    game_ids = set(game_ids) - {None}
+    if not game_ids:
+        return
+    current = _contributions(game_ids)
+    deltas = defaultdict(lambda: [0] * len(MEASURES))
+    with transaction.atomic():
+        previous = {}
+        for chunk in chunked(game_ids):
+            previous.update(GameRollupState.objects.select_for_update().in_bulk(chunk))
+        changed, gone = [], []
+        for pk in game_ids:
+            old, new = previous.get(pk), current.get(pk)
+            if old is not None and new is not None and _measures(old) == _measures(new) and all(
+                getattr(old, c) == getattr(new, c) for c in DIMENSIONS.values()
+            ):
+                continue
+            if old is not None:
+                _add(deltas, old, -1)
+            if new is not None:
+                _add(deltas, new, +1)
+                changed.append(new)
+            else:
+                gone.append(pk)
+        _apply(deltas)
+        if changed:
+            fields = [f.name for f in GameRollupState._meta.concrete_fields if not f.primary_key]
+            GameRollupState.objects.bulk_create(
+                changed, update_conflicts=True, unique_fields=["game_id"], update_fields=fields
+            )
+        for chunk in chunked(gone):
+            GameRollupState.objects.filter(pk__in=chunk).delete()
+
+
+# -----------------------------------------------------------------
+#  Telemetry changes – one batched refresh instead of one per write
+# -----------------------------------------------------------------
+class DirtyGames:
+    """
+    Games whose sales or player counts changed.  The first ``add()``
+    starts a timer; ``ROLLUP_FLUSH_SECONDS`` later one ``refresh_games()``
+    covers every game added meanwhile.  Marks of a process that dies are
+    lost – the "rollups.rebuild" job repairs the tables.
+    """
+
+    def __init__(self, refresh=refresh_games):
+        self._refresh = refresh
+        self._games = set()
+        self._timer = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._games)
+
+    def add(self, game_ids):
+        game_ids = set(game_ids) - {None}
+        if game_ids:
+            with self._lock:
+                self._games |= game_ids
+                self._start_timer()
+
+    def _start_timer(self):
+        # Called with the lock held.  Started lazily: a thread started
+        # before a fork would not survive it.
+        if self._games and (self._timer is None or not self._timer.is_alive()):
+            self._timer = threading.Timer(getattr(settings, "ROLLUP_FLUSH_SECONDS", 10), self._flush_due)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """Refresh the rollups of every game added so far.  Returns their number."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._games = self._games, set()
+            if not batch:
+                return 0
+            try:
+                self._refresh(batch)
+            except Exception:
+                # Keep them for the next flush
+                with self._lock:
+                    self._games |= batch
+                raise
+            return len(batch)
+
+    def _flush_due(self):
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Refreshing the catalog rollups failed")
+        finally:
+            connections.close_all()
+            with self._lock:
+                self._timer = None
+                # Failed, or new games arrived during the refresh
+                self._start_timer()
+
+
+dirty = DirtyGames()
+atexit.register(dirty.flush)
+
+
+def rebuild(batch_size=2000):
+    """Recompute both tables from the whole catalog.  Returns the number of games."""
+    states = _contributions()
+    deltas = defaultdict(lambda: [0] * len(MEASURES))
+    for state in states.values():
+        _add(deltas, state, +1)
+    with transaction.atomic():
+        CatalogRollup.objects.all().delete()
+        GameRollupState.objects.all().delete()
+        CatalogRollup.objects.bulk_create(
+            (
+                CatalogRollup(dimension=dimension, key=key, **dict(zip(MEASURES, values)))
+                for (dimension, key), values in deltas.items()
+                if values[0] > 0
+            ),
+            batch_size=batch_size,
+        )
+        GameRollupState.objects.bulk_create(states.values(), batch_size=batch_size)
+    return len(states)
@@ -2,7 +2,10 @@
 # game_site/serializers.py
 # --------------------------------------------------------------
 from rest_framework import serializers
-from .models import Game, Genre, Platform, Store
+
+from accounts.user_cache import whitelist_ids
+from . import cover_art
+from .models import Game, GameEvent, GameReview, Job
 
 
 # ------------------------------------------------------
@@ -15,6 +18,7 @@ class GameSerializer(serializers.ModelSerializer):
     platform_name = serializers.SerializerMethodField()
     store_name = serializers.SerializerMethodField()
     is_whitelisted = serializers.SerializerMethodField()
+    cover = serializers.SerializerMethodField()
 
     class Meta:
         model = Game
@@ -28,6 +32,10 @@ class GameSerializer(serializers.ModelSerializer):
             "platform_name",
             "store_name",
          "is_whitelisted",
+            "review_count",
+            "rating_mean",
+            "rating_bayes",
+            "cover",
           # … any other fields you already expose …
         )
         read_only_fields = (
@@ -36,6 +44,10 @@ class GameSerializer(serializers.ModelSerializer):
           "platform_name",
             "store_name",
           "is_whitelisted",
+            "review_count",
+            "rating_mean",
+            "rating_bayes",
+            "cover",
         )
 
     # ---------------------------------------------------------------
@@ -55,9 +67,57 @@ class GameSerializer(serializers.ModelSerializer):
     # -----------------------------------------------------------------
     def get_is_whitelisted(self, obj):
         request = self.context.get("request")
-        if not request or not request.user.is_authenticated:
+        if not request:
             return False
-        return obj in request.user.whitelisted_games.all()
+        # Cached id set – no query per row (see accounts.user_cache)
+        return obj.pk in whitelist_ids(request.user)
+
+    # -----------------------------------------------------------------
+    # Cover art – original and thumbnail URLs (game_site.cover_art)
+    # -----------------------------------------------------------------
+    def get_cover(self, obj):
+        return cover_art.urls(obj.cover)
+
+# -----------------------------------------------------------------
+#  Reviews of one game – the game comes from the URL
+# -----------------------------------------------------------------
+class GameReviewSerializer(serializers.ModelSerializer):
+    user = serializers.CharField(source="user.username", read_only=True, default=None)
+
+    class Meta:
+        model = GameReview
+        fields = ("id", "user", "rating", "text", "created_at")
+        read_only_fields = ("id", "user", "created_at")
+
+
+# -----------------------------------------------------------------
+class GameEventSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = GameEvent
+        fields = ("id", "kind", "message", "data", "occurred_at")
+
+
+# -----------------------------------------------------------------
+class JobSerializer(serializers.ModelSerializer):
+    """A background job as polled by its client; ``progress`` is ``{"done", "total", "percent"}``."""
+    progress = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Job
+        fields = (
+            "id", "name", "args", "status", "attempts", "max_attempts", "progress",
+            "result", "error", "created_at", "started_at", "finished_at",
+        )
+        read_only_fields = fields
+
+    def get_progress(self, job):
+        total = job.progress_total
+        return {
+            "done": job.progress_done,
+            "total": total,
+            "percent": round(100 * job.progress_done / total, 1) if total else None,
+        }
+
 
 # -----------------------------------------------------------------
 class SimpleNameSerializer(serializers.ModelSerializer):
@@ -68,25 +128,28 @@ class SimpleNameSerializer(serializers.ModelSerializer):
             "name": <human‑readable string>,
             "legacy_name": <same as name>
         }
+
+    Abstract – use ``simple_name_serializer()`` to get a concrete class
+    bound to one model, so each view‑set owns its own ``Meta``.
     """
-    name = serializers.SerializerMethodField()
-    legacy_name = serializers.ReadOnlyField(source="legacy_source")
+    name = serializers.CharField(read_only=True)
+    legacy_name = serializers.CharField(read_only=True)
 
     class Meta:
-        model = None               # will be set by each view‑set
+        model = None
         fields = ("id", "name", "legacy_name")
         read_only_fields = fields
 
-    def get_name(self, obj):
-        if isinstance(obj, Genre):
-            return obj.Genre_Name
-        if isinstance(obj, Platform):
-            return obj.Platform_Name
-        if isinstance(obj, Store):
-            return obj.Store_Name
-        return str(obj)
-
-    @property
-    def legacy_source(self):
-        # Re‑use the same logic as `get_name` for the legacy field
-        return self.get_name(self.instance)
\ No newline at end of file
+
+def simple_name_serializer(model, name_field):
+    """Build a ``SimpleNameSerializer`` subclass for ``model``."""
+    meta = type("Meta", (SimpleNameSerializer.Meta,), {"model": model})
+    return type(
+        f"{model.__name__}NameSerializer",
+        (SimpleNameSerializer,),
+        {
+            "Meta": meta,
+            "name": serializers.CharField(source=name_field, read_only=True),
+            "legacy_name": serializers.CharField(source=name_field, read_only=True),
+        },
+    )
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -49,8 +50,7 @@ MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
-    'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'game_site.middleware.ReplicaPinningMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -88,6 +88,158 @@ DATABASES = {
     }
 }
 
+# Database profile – "dev" (default) keeps the plain SQLite file above,
+# "production" switches on WAL journaling, tuned pragmas and persistent
+# connections:  GAME_SITE_DB_PROFILE=production python manage.py runserver
+GAME_SITE_DB_PROFILE = os.environ.get('GAME_SITE_DB_PROFILE', 'dev')
+
+# Pragmas executed on every new SQLite connection in the production profile.
+SQLITE_PRODUCTION_PRAGMAS = {
+    'journal_mode': 'WAL',        # readers no longer block on a writer
+    'synchronous': 'NORMAL',      # safe with WAL, one fsync per checkpoint
+    'cache_size': -64000,         # negative = KiB -> ~64 MB page cache
+    'mmap_size': 268435456,       # 256 MB memory-mapped I/O
+    'busy_timeout': 5000,         # ms to wait for a lock before "database is locked"
+    'temp_store': 'MEMORY',
+}
+
+if GAME_SITE_DB_PROFILE == 'production':
+    DATABASES['default'].update({
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'init_command': ''.join(
+                f'PRAGMA {name}={value};'
+                for name, value in SQLITE_PRODUCTION_PRAGMAS.items()
+            ),
+            # BEGIN IMMEDIATE: a transaction takes the write lock when it
+            # starts and waits up to busy_timeout for it.  Under the default
+            # DEFERRED mode, a transaction that reads and then writes gets
+            # "database is locked" at once when another writer got in
+            # between – SQLite cannot wait that out.  Trade-off: every
+            # atomic() block takes the write lock, read-only ones included,
+            # so such blocks run one at a time.  Reads outside atomic()
+            # (autocommit) are not affected and run alongside the writer
+            # under WAL.
+            'transaction_mode': 'IMMEDIATE',
+        },
+    })
+
+# Optional read replica – path of a second SQLite file kept current by
+# `python manage.py sync_replica`.  Catalog reads go there (see
+# game_site.db_routers); writes and read‑your‑writes stay on 'default'.
+GAME_SITE_REPLICA_DB = os.environ.get('GAME_SITE_REPLICA_DB')
+
+if GAME_SITE_REPLICA_DB:
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': GAME_SITE_REPLICA_DB,
+        'TEST': {'MIRROR': 'default'},
+    }
+
+# Optional telemetry database – OnlineStatus, GameLog and SalesHistory move
+# to their own SQLite file so their frequent writes do not lock the catalog.
+# Create it with `migrate --database telemetry`, then `move_telemetry`.
+GAME_SITE_TELEMETRY_DB = os.environ.get('GAME_SITE_TELEMETRY_DB')
+
+if GAME_SITE_TELEMETRY_DB:
+    DATABASES['telemetry'] = {
+        **DATABASES['default'],
+        'NAME': GAME_SITE_TELEMETRY_DB,
+    }
+
+DATABASE_ROUTERS = [
+    'game_site.db_routers.TelemetryRouter',
+    'game_site.db_routers.PrimaryReplicaRouter',
+]
+
+# Seconds a client keeps reading from the primary after it wrote
+REPLICA_PIN_SECONDS = 5
+
+
+# Cache – per-process memory by default; point this at a shared backend
+# (Redis / Memcached) when running several workers.  GAME_SITE_CACHE_DIR
+# selects a file-based cache that the workers of one host share.  It is
+# the L2 tier of game_site.tiered_cache.
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'game-site',
+    }
+}
+if os.environ.get('GAME_SITE_CACHE_DIR'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ['GAME_SITE_CACHE_DIR'],
+    }
+
+# game_site.tiered_cache: L1 entries per namespace and process, seconds a
+# process trusts its copy of a namespace version, the early-refresh
+# weight (0 = never early) and seconds a miss waits for another process
+# building the same entry.
+CACHE_L1_MAX_ENTRIES = 1000
+CACHE_VERSION_CHECK_SECONDS = 1.0
+CACHE_EARLY_REFRESH_BETA = 1.0
+CACHE_COALESCE_WAIT = 5.0
+
+# Sessions, the user row and the whitelist (accounts.user_cache) are read
+# from the cache only when every worker shares it: a logout, password
+# change or whitelist edit must reach the other workers' cached copies,
+# which per-process memory cannot do.  GAME_SITE_SINGLE_PROCESS=1 allows
+# the per-process cache when only one server process runs.  Otherwise
+# sessions and users come from the database, as in stock Django.
+USER_CACHE_ENABLED = (
+    CACHES['default']['BACKEND'] != 'django.core.cache.backends.locmem.LocMemCache'
+    or os.environ.get('GAME_SITE_SINGLE_PROCESS') == '1'
+)
+if USER_CACHE_ENABLED:
+    SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+AUTHENTICATION_BACKENDS = ['accounts.backends.CachedModelBackend']
+
+# Seconds a cached user row / whitelist id set may live (entries are also
+# invalidated immediately by a version bump on every change).
+USER_CACHE_TIMEOUT = 300
+
+# Anonymous home page / GET /api/games/ and game details
+# (game_site.page_cache): seconds a cached response may live – changes bump
+# the catalog generation at once, player counts show up after at most this
+# long.  0 disables the cache.
+CATALOG_PAGE_CACHE_SECONDS = 60
+
+
+# Django REST framework – sliding-window throttles (game_site.throttling)
+REST_FRAMEWORK = {
+    'DEFAULT_THROTTLE_CLASSES': [
+        'game_site.throttling.UserThrottle',
+        'game_site.throttling.IPThrottle',
+        'game_site.throttling.EndpointThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        # every API client
+        'user': '600/min',
+        'ip': '1200/min',
+        # per endpoint (view-set `throttle_scope` / @throttle(scope))
+        'games': '240/min',
+        'lookups': '120/min',
+        'suggest': '600/min',   # one request per keystroke
+        'stats': '120/min',
+        'player_counts': '1200/min',   # per game server (token) / IP
+        'game_events': '1200/min',
+        'jobs': '120/min',   # polling included
+        'catalog_stream': '30/min',   # SSE (re)connects
+        'cover_upload': '30/hour',
+        'login': '10/min',
+        'whitelist': '60/min',
+    },
+}
+
+# Counter store for the throttles – LocalCounterStore (per process) or
+# CacheCounterStore (shared through CACHES, for several workers).
+THROTTLE_STORE = 'game_site.throttling.LocalCounterStore'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -135,3 +287,109 @@ LOGIN_REDIRECT_URL = "home"
 LOGOUT_REDIRECT_URL = "home"
 
 AUTH_USER_MODEL = 'game_site.CustomUser'
+
+# Seconds an in-memory lookup table snapshot (game_site.lookups) may be
+# served before it is reloaded, even without a change signal.
+LOOKUP_CACHE_TTL = 300
+
+# Seconds before the fuzzy-search trigram index (game_site.fuzzy) is rebuilt
+# to pick up writes made by other worker processes.
+FUZZY_INDEX_TTL = 300
+
+# Same for the title autocomplete index (game_site.suggest).
+SUGGEST_INDEX_TTL = 300
+
+# Same for the columnar catalog index behind the home page (game_site.catalog_index).
+CATALOG_INDEX_TTL = 300
+
+# Catalog change stream (game_site.catalog_stream, GET /api/catalog/events/):
+# broker class, events kept for clients resuming with Last-Event-ID, seconds
+# between heartbeats and seconds before a stream ends (the client reconnects).
+CATALOG_STREAM_BROKER = 'game_site.catalog_stream.InProcessBroker'
+CATALOG_STREAM_BACKLOG = 1000
+CATALOG_STREAM_HEARTBEAT = 15
+CATALOG_STREAM_MAX_SECONDS = 300
+
+# Cover art (game_site.cover_art, POST /api/games/<pk>/cover/): originals and
+# thumbnails live under COVER_ART_ROOT (GAME_SITE_MEDIA_DIR), thumbnails are
+# rendered by COVER_ART_WORKERS processes.  Behind nginx / Apache set
+# COVER_ART_SENDFILE_HEADER to 'X-Accel-Redirect' / 'X-Sendfile' and map
+# COVER_ART_SENDFILE_PREFIX to COVER_ART_ROOT (an internal location).
+COVER_ART_ROOT = Path(os.environ.get('GAME_SITE_MEDIA_DIR', BASE_DIR / 'media')) / 'covers'
+COVER_ART_THUMBNAIL_SIZES = (128, 256, 512)
+COVER_ART_MAX_BYTES = 10 * 1024 * 1024
+COVER_ART_MAX_PIXELS = 40_000_000
+COVER_ART_WORKERS = 2
+COVER_ART_SENDFILE_HEADER = None
+COVER_ART_SENDFILE_PREFIX = '/protected/covers/'
+
+# Static catalog snapshots (game_site.prerender, `manage.py prerender_catalog`):
+# output directory (GAME_SITE_PRERENDER_DIR) and how many home page filter /
+# sort combinations are rendered.
+PRERENDER_ROOT = Path(os.environ.get('GAME_SITE_PRERENDER_DIR', BASE_DIR / 'prerendered'))
+PRERENDER_MAX_PAGES = 1000
+
+# Bayesian prior of Game.rating_bayes (game_site.reviews): a game's reviews
+# are averaged together with REVIEW_PRIOR_WEIGHT virtual reviews rated
+# REVIEW_PRIOR_MEAN.  Run `manage.py rebuild_review_stats` after a change.
+REVIEW_PRIOR_MEAN = 6.0
+REVIEW_PRIOR_WEIGHT = 5
+
+# Catalog rollups (game_site.rollups, /api/stats/): sales and player-count
+# changes are applied in one batch FLUSH_SECONDS after the first of them.
+ROLLUP_FLUSH_SECONDS = 10
+
+# Player-count history (game_site.player_counts).  Ingested samples are
+# buffered per process and written once FLUSH_SIZE of them are waiting or the
+# oldest is FLUSH_SECONDS old (a timer thread, so no new request is needed).
+# Samples older than MAX_SAMPLE_AGE seconds are rejected, so keep the raw
+# retention well above it.  Retention is in days
+# (None = forever); `manage.py prune_player_counts` applies it.
+PLAYER_COUNT_FLUSH_SIZE = 5000
+PLAYER_COUNT_FLUSH_SECONDS = 5
+PLAYER_COUNT_MAX_SAMPLE_AGE = 3600
+PLAYER_COUNT_RETENTION_DAYS = {
+    'raw': 2,
+    'minute': 14,
+    'hour': 365,
+    'day': None,
+}
+
+# Shared secret game servers send in the X-Ingest-Token header of
+# POST /api/player-counts/ and /api/game-events/ (staff users may post
+# without it).
+PLAYER_COUNT_INGEST_TOKEN = os.environ.get('GAME_SITE_INGEST_TOKEN')
+
+# Game event log (game_site.game_events): events are queued in memory and
+# written by a background thread in batches of BATCH_SIZE, at least every
+# FLUSH_SECONDS.  A request whose events do not fit into the QUEUE_SIZE queue
+# waits up to PUT_TIMEOUT seconds for room, then gets HTTP 503.
+GAME_EVENT_QUEUE_SIZE = 100000
+GAME_EVENT_BATCH_SIZE = 2000
+GAME_EVENT_FLUSH_SECONDS = 1.0
+GAME_EVENT_PUT_TIMEOUT = 2.0
+
+# Background jobs (game_site.jobs, `manage.py run_jobs`).  A failed attempt
+# is retried after RETRY_BACKOFF · 2^(attempt-1) seconds; the worker refreshes
+# the heartbeat of its running jobs every HEARTBEAT_SECONDS, and a running job
+# without one for STALE_SECONDS is handed to another worker.
+JOB_RETRY_BACKOFF = 30
+JOB_HEARTBEAT_SECONDS = 30
+JOB_STALE_SECONDS = 300
+
+# Catalog outbox (game_site.outbox).  Events are dispatched after commit in
+# batches of BATCH_SIZE; `manage.py dispatch_outbox` retries the ones still
+# pending after RETRY_SECONDS, at most MAX_ATTEMPTS times, and deletes
+# dispatched events after RETENTION_HOURS (None = keep them).
+OUTBOX_BATCH_SIZE = 500
+OUTBOX_RETRY_SECONDS = 30
+OUTBOX_MAX_ATTEMPTS = 10
+OUTBOX_RETENTION_HOURS = 24
+
+# Admin changelists of large tables (game_site.admin): an unfiltered list
+# whose highest primary key reaches EXACT_COUNT_LIMIT shows that as its
+# (estimated) size instead of running COUNT(*) over the table.
+ADMIN_EXACT_COUNT_LIMIT = 10000
+
+# GET /api/games/batch/?ids=… (game_site.api_views): most game ids per request.
+GAME_BATCH_MAX_IDS = 100
@@ -0,0 +1,362 @@
+# --------------------------------------------------------------
+# game_site/signals.py
+# --------------------------------------------------------------
+"""
+Model signal receivers that keep the in-process caches coherent.
+Connected from ``GameSiteConfig.ready()``.
+"""
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+
+from . import (
+    catalog_index,
+    catalog_stream,
+    lookups,
+    outbox,
+    recommendations,
+    reviews,
+    rollups,
+)
+from .db_routers import is_telemetry_model
+from .similarity import FEATURE_FIELDS
+from .models import (
+    CustomUser,
+    Developer,
+    Game,
+    GameLog,
+    GameReview,
+    OnlineStatus,
+    Publisher,
+    Review,
+    SalesHistory,
+    SimilarGame,
+)
+
+
+def _invalidate_lookup(sender, **kwargs):
+    lookups.invalidate(lookups.TABLE_FOR_MODEL[sender])
+
+
+for _model in lookups.TABLE_FOR_MODEL:
+    post_save.connect(_invalidate_lookup, sender=_model, dispatch_uid=f"lookup-save-{_model.__name__}")
+    post_delete.connect(_invalidate_lookup, sender=_model, dispatch_uid=f"lookup-delete-{_model.__name__}")
+
+
+# --------------------------------------------------------------
+#  SET_NULL for the cross-database telemetry foreign keys
+# --------------------------------------------------------------
+_TELEMETRY_FK = {
+    OnlineStatus: "online_status",
+    GameLog: "game_log",
+    SalesHistory: "sales_history",
+}
+
+
+def _null_telemetry_references(sender, instance, **kwargs):
+    field = _TELEMETRY_FK[sender]
+    Game.objects.filter(**{f"{field}_id": instance.pk}).update(**{field: None})
+
+
+for _model in _TELEMETRY_FK:
+    post_delete.connect(_null_telemetry_references, sender=_model, dispatch_uid=f"telemetry-null-{_model.__name__}")
+
+
+# --------------------------------------------------------------
+#  Whitelist co-occurrence – updated in the same transaction
+# --------------------------------------------------------------
+def _cooccurrence_whitelist_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action in ("pre_remove", "pre_clear"):
+        # remove() reports the ids it was given, clear() none – keep the ones really on the list
+        if reverse:
+            rows = sender.objects.filter(game_id=instance.pk)
+            present = rows.values_list("customuser_id", flat=True)
+        else:
+            rows = sender.objects.filter(customuser_id=instance.pk)
+            present = rows.values_list("game_id", flat=True)
+        if action == "pre_remove":
+            present = present.filter(**{"customuser_id__in" if reverse else "game_id__in": pk_set})
+        instance._whitelist_removing = set(present)
+        return
+    if action == "post_add":
+        changed, added = pk_set, True
+    elif action in ("post_remove", "post_clear"):
+        changed, added = instance.__dict__.pop("_whitelist_removing", set()), False
+    else:
+        return
+    if reverse:
+        for user_id in changed:
+            recommendations.apply_toggle(user_id, {instance.pk}, added)
+    else:
+        recommendations.apply_toggle(instance.pk, changed, added)
+
+
+def _cooccurrence_user_deleting(sender, instance, **kwargs):
+    instance._whitelist_removing = set(instance.whitelisted_games.values_list("pk", flat=True))
+
+
+def _cooccurrence_user_deleted(sender, instance, **kwargs):
+    recommendations.apply_toggle(instance.pk, instance.__dict__.pop("_whitelist_removing", set()), False)
+
+
+def _cooccurrence_game_deleted(sender, instance, **kwargs):
+    # Its rows went with the CASCADE, but cached rows of other games still name it
+    recommendations.row_cache.clear()
+
+
+m2m_changed.connect(
+    _cooccurrence_whitelist_changed,
+    sender=CustomUser.whitelisted_games.through,
+    dispatch_uid="cooccurrence-whitelist",
+)
+pre_delete.connect(_cooccurrence_user_deleting, sender=CustomUser, dispatch_uid="cooccurrence-user-pre-delete")
+post_delete.connect(_cooccurrence_user_deleted, sender=CustomUser, dispatch_uid="cooccurrence-user-delete")
+post_delete.connect(_cooccurrence_game_deleted, sender=Game, dispatch_uid="cooccurrence-game-delete")
+
+
+# --------------------------------------------------------------
+#  Columnar catalog index (home page) – player counts, patched after commit
+#  (OnlineStatus may live in the telemetry database, outside the outbox's
+#  transaction; game and review changes arrive through game_site.outbox)
+# --------------------------------------------------------------
+def _catalog_index_players_saved(sender, instance, **kwargs):
+    pks = set(Game.objects.filter(online_status=instance.pk).values_list("pk", flat=True))
+    transaction.on_commit(lambda: catalog_index.refresh_games(pks))
+
+
+def _catalog_index_players_deleting(sender, instance, **kwargs):
+    # The games are set to NULL without a Game post_save – remember them
+    games = Game.objects.filter(online_status=instance.pk)
+    instance._catalog_index_games = set(games.values_list("pk", flat=True))
+
+
+def _catalog_index_players_deleted(sender, instance, **kwargs):
+    pks = instance.__dict__.pop("_catalog_index_games", set())
+    transaction.on_commit(lambda: catalog_index.refresh_games(pks))
+
+
+post_save.connect(_catalog_index_players_saved, sender=OnlineStatus, dispatch_uid="catalog-index-players-save")
+pre_delete.connect(_catalog_index_players_deleting, sender=OnlineStatus, dispatch_uid="catalog-index-players-pre-delete")
+post_delete.connect(_catalog_index_players_deleted, sender=OnlineStatus, dispatch_uid="catalog-index-players-delete")
+
+
+# --------------------------------------------------------------
+#  Catalog rollups (/api/stats/) – rows the games point at: a publisher in
+#  the same transaction, telemetry rows batched after commit (game changes
+#  arrive through game_site.outbox)
+# --------------------------------------------------------------
+# Rows whose values a game contributes → the Game FK pointing at them
+_ROLLUP_FK = {
+    SalesHistory: "sales_history",
+    OnlineStatus: "online_status",
+    Publisher: "publisher",
+}
+
+
+def _refresh_rollups(sender, instance, games):
+    if is_telemetry_model(sender):
+        # Not a CatalogRollup write in the primary per sales / player-count write
+        transaction.on_commit(lambda: rollups.dirty.add(games), using=instance._state.db)
+    else:
+        rollups.refresh_games(games)
+
+
+def _rollup_source_saved(sender, instance, **kwargs):
+    games = Game.objects.filter(**{_ROLLUP_FK[sender]: instance.pk})
+    _refresh_rollups(sender, instance, set(games.values_list("pk", flat=True)))
+
+
+def _rollup_source_deleting(sender, instance, **kwargs):
+    # The games are set to NULL without a Game post_save – remember them
+    games = Game.objects.filter(**{_ROLLUP_FK[sender]: instance.pk})
+    instance._rollup_games = set(games.values_list("pk", flat=True))
+
+
+def _rollup_source_deleted(sender, instance, **kwargs):
+    _refresh_rollups(sender, instance, instance.__dict__.pop("_rollup_games", set()))
+
+
+for _model in _ROLLUP_FK:
+    post_save.connect(_rollup_source_saved, sender=_model, dispatch_uid=f"rollup-source-save-{_model.__name__}")
+    pre_delete.connect(_rollup_source_deleting, sender=_model, dispatch_uid=f"rollup-source-pre-delete-{_model.__name__}")
+    post_delete.connect(_rollup_source_deleted, sender=_model, dispatch_uid=f"rollup-source-delete-{_model.__name__}")
+
+
+# --------------------------------------------------------------
+#  Rating aggregates on Game – same transaction as the review
+# --------------------------------------------------------------
+def _review_saving(sender, instance, **kwargs):
+    instance._review_before = (
+        GameReview.objects.filter(pk=instance.pk).values_list("game_id", "rating").first()
+        if instance.pk is not None
+        else None
+    )
+
+
+def _review_saved(sender, instance, **kwargs):
+    before = instance.__dict__.pop("_review_before", None)
+    if before is None:
+        reviews.apply_delta(instance.game_id, 1, instance.rating)
+    elif before[0] != instance.game_id:
+        reviews.apply_delta(before[0], -1, -before[1])
+        reviews.apply_delta(instance.game_id, 1, instance.rating)
+    else:
+        reviews.apply_delta(instance.game_id, 0, instance.rating - before[1])
+    rollups.refresh_games({instance.game_id, before[0] if before else None})
+
+
+def _review_deleted(sender, instance, **kwargs):
+    reviews.apply_delta(instance.game_id, -1, -instance.rating)
+    rollups.refresh_games({instance.game_id})
+
+
+def _legacy_review_game_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        reviews.sync_legacy_review(instance)
+
+
+def _legacy_review_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        reviews.sync_legacy_rating(instance)
+
+
+pre_save.connect(_review_saving, sender=GameReview, dispatch_uid="review-pre-save")
+post_save.connect(_review_saved, sender=GameReview, dispatch_uid="review-save")
+post_delete.connect(_review_deleted, sender=GameReview, dispatch_uid="review-delete")
+post_save.connect(_legacy_review_game_saved, sender=Game, dispatch_uid="legacy-review-game-save")
+post_save.connect(_legacy_review_saved, sender=Review, dispatch_uid="legacy-review-save")
+
+
+# --------------------------------------------------------------
+#  Catalog change stream (SSE) – whitelist counts, published after commit
+#  (game changes arrive through game_site.outbox)
+# --------------------------------------------------------------
+def _stream_whitelist_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "pre_clear" and not reverse:
+        # clear() reports no ids – remember the user's games
+        rows = sender.objects.filter(customuser_id=instance.pk)
+        instance._stream_whitelist_games = set(rows.values_list("game_id", flat=True))
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if reverse:
+        games = {instance.pk}
+    elif action == "post_clear":
+        games = instance.__dict__.pop("_stream_whitelist_games", set())
+    else:
+        games = set(pk_set or ())
+    if games:
+        transaction.on_commit(lambda: catalog_stream.whitelist_changed(games))
+
+
+def _stream_user_deleting(sender, instance, **kwargs):
+    instance._stream_whitelist_games = set(instance.whitelisted_games.values_list("pk", flat=True))
+
+
+def _stream_user_deleted(sender, instance, **kwargs):
+    games = instance.__dict__.pop("_stream_whitelist_games", set())
+    if games:
+        transaction.on_commit(lambda: catalog_stream.whitelist_changed(games))
+
+
+m2m_changed.connect(
+    _stream_whitelist_changed,
+    sender=CustomUser.whitelisted_games.through,
+    dispatch_uid="stream-whitelist",
+)
+pre_delete.connect(_stream_user_deleting, sender=CustomUser, dispatch_uid="stream-user-pre-delete")
+post_delete.connect(_stream_user_deleted, sender=CustomUser, dispatch_uid="stream-user-delete")
+
+
+# --------------------------------------------------------------
+#  Catalog outbox (game_site.outbox) – recorded in the same transaction,
+#  dispatched to the caches, search indexes, rollups, … after commit
+# --------------------------------------------------------------
+_FEATURE_COLUMNS = tuple(f"{field}_id" for field in FEATURE_FIELDS)
+
+
+def _outbox_game_saving(sender, instance, raw=False, **kwargs):
+    # The similarity features as stored – a save that keeps them skips the recompute
+    instance._features_before = (
+        Game.objects.filter(pk=instance.pk).values_list(*_FEATURE_COLUMNS).first()
+        if instance.pk is not None and not raw
+        else None
+    )
+
+
+def _outbox_game_saved(sender, instance, created, **kwargs):
+    before = instance.__dict__.pop("_features_before", None)
+    if created:
+        outbox.record("game.created", instance.pk, {"game_name": instance.game_name})
+        return
+    if before is None:
+        features = list(FEATURE_FIELDS)
+    else:
+        after = (getattr(instance, column) for column in _FEATURE_COLUMNS)
+        features = [field for field, old, new in zip(FEATURE_FIELDS, before, after) if old != new]
+    outbox.record("game.updated", instance.pk, {"game_name": instance.game_name, "features": features})
+
+
+def _outbox_game_deleting(sender, instance, **kwargs):
+    # The CASCADE removes the rows that point at this game – remember whose lists they were
+    instance._similar_lists = sorted(
+        SimilarGame.objects.filter(similar=instance).values_list("game_id", flat=True)
+    )
+
+
+def _outbox_game_deleted(sender, instance, **kwargs):
+    outbox.record("game.deleted", instance.pk, {
+        "game_name": instance.game_name,
+        "similar_lists": instance.__dict__.pop("_similar_lists", []),
+    })
+
+
+def _outbox_review_changed(sender, instance, **kwargs):
+    # The rating aggregates change through an UPDATE, without a Game post_save
+    outbox.record("game.rating", instance.game_id)
+
+
+_CREDIT_FK = {Developer: "developer", Publisher: "publisher"}
+
+
+def _outbox_credits_saved(sender, instance, **kwargs):
+    # A renamed developer / publisher changes the credits text of their games
+    games = Game.objects.filter(**{_CREDIT_FK[sender]: instance.pk})
+    for pk in games.values_list("pk", flat=True):
+        outbox.record("game.credits", pk)
+
+
+def _outbox_credits_deleting(sender, instance, **kwargs):
+    # SET_NULL updates the games without a Game post_save – remember them
+    games = Game.objects.filter(**{_CREDIT_FK[sender]: instance.pk})
+    instance._credit_games = list(games.values_list("pk", flat=True))
+
+
+def _outbox_credits_deleted(sender, instance, **kwargs):
+    for pk in instance.__dict__.pop("_credit_games", []):
+        outbox.record("game.credits", pk)
+
+
+def _outbox_lookup_changed(sender, **kwargs):
+    outbox.record("lookup.changed", data={"table": lookups.TABLE_FOR_MODEL[sender]})
+
+
+pre_save.connect(_outbox_game_saving, sender=Game, dispatch_uid="outbox-game-pre-save")
+post_save.connect(_outbox_game_saved, sender=Game, dispatch_uid="outbox-game-save")
+pre_delete.connect(_outbox_game_deleting, sender=Game, dispatch_uid="outbox-game-pre-delete")
+post_delete.connect(_outbox_game_deleted, sender=Game, dispatch_uid="outbox-game-delete")
+post_save.connect(_outbox_review_changed, sender=GameReview, dispatch_uid="outbox-review-save")
+post_delete.connect(_outbox_review_changed, sender=GameReview, dispatch_uid="outbox-review-delete")
+for _model in _CREDIT_FK:
+    post_save.connect(_outbox_credits_saved, sender=_model, dispatch_uid=f"outbox-credits-save-{_model.__name__}")
+    pre_delete.connect(_outbox_credits_deleting, sender=_model, dispatch_uid=f"outbox-credits-pre-delete-{_model.__name__}")
+    post_delete.connect(_outbox_credits_deleted, sender=_model, dispatch_uid=f"outbox-credits-delete-{_model.__name__}")
+# Every lookup row a catalog page renders – except the telemetry rows: an
+# event per sales / player-count write would take the primary's write lock
+# that the telemetry database keeps them away from.  The pages let those
+# numbers lag (game_site.page_cache), the index and rollups have receivers
+# of their own.
+for _model in lookups.TABLE_FOR_MODEL:
+    if is_telemetry_model(_model):
+        continue
+    post_save.connect(_outbox_lookup_changed, sender=_model, dispatch_uid=f"outbox-lookup-save-{_model.__name__}")
+    post_delete.connect(_outbox_lookup_changed, sender=_model, dispatch_uid=f"outbox-lookup-delete-{_model.__name__}")
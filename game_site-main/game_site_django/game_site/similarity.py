@@ -0,0 +1,192 @@
+# --------------------------------------------------------------
+# game_site/similarity.py
+# --------------------------------------------------------------
+"""
+"More like this" engine behind ``/api/games/<id>/similar/``.
+
+Each game is encoded as a sparse row vector with one column per
+(field, value) pair of its ``FEATURE_FIELDS`` foreign keys, weighted by
+``sqrt(FEATURE_WEIGHTS[field])`` and L2-normalized, so the dot product of
+two rows is their cosine similarity over the shared fields.  A batch of
+games is scored against the whole catalog with a single SciPy sparse
+matrix product; the top-k of every row is taken with ``argpartition``
+over that row's non-zero entries only.
+
+Results are stored in ``SimilarGame``; ``refresh_for_games`` recomputes
+only the lists that can change after some games were created or edited.
+It loads the whole matrix, so the outbox leaves it to the
+``similarity.refresh`` job – and skips it when no feature field changed.
+"""
+import numpy as np
+import scipy.sparse as sp
+from django.conf import settings
+from django.db import transaction
+
+from .db_utils import chunked
+from .models import Game, SimilarGame
+
+# Game FK → weight of a match on that field
+FEATURE_WEIGHTS = {
+    "genre": 3.0,
+    "developer": 2.0,
+    "publisher": 1.5,
+    "game_mode": 1.0,
+    "platform": 1.0,
+    "rating": 1.0,
+    "store": 0.5,
+    "language": 0.5,
+}
+FEATURE_FIELDS = tuple(FEATURE_WEIGHTS)
+
+# Games scored per sparse product – bounds the size of the result matrix
+BATCH_SIZE = 1024
+
+
+def top_k():
+    return getattr(settings, "SIMILAR_GAMES_TOP_K", 10)
+
+
+class FeatureMatrix:
+    """
+    Normalized sparse feature rows of every game, row order = ``ids``
+    (ascending primary key).
+    """
+
+    def __init__(self, ids, codes):
+        n_games, n_fields = codes.shape
+        valid = codes >= 0
+        # Compact (field, FK id) → column numbers
+        columns = np.empty_like(codes)
+        offset = 0
+        for f in range(n_fields):
+            values, inverse = np.unique(codes[:, f], return_inverse=True)
+            columns[:, f] = inverse.reshape(-1) + offset
+            offset += len(values)
+        weights = np.sqrt([FEATURE_WEIGHTS[f] for f in FEATURE_FIELDS])
+        rows, fields = np.nonzero(valid)
+        X = sp.csr_matrix(
+            (weights[fields], (rows, columns[rows, fields])), shape=(n_games, offset)
+        )
+        norms = np.sqrt(np.asarray(X.multiply(X).sum(axis=1)).ravel())
+        self.X = sp.diags(1.0 / np.where(norms > 0, norms, 1.0)) @ X
+        self.XT = self.X.T.tocsr()
+        self.ids = ids
+        self.row_of = {int(pk): i for i, pk in enumerate(ids)}
+
+    @classmethod
+    def load(cls):
+        rows = list(
+            Game.objects.order_by("pk").values_list("pk", *(f"{f}_id" for f in FEATURE_FIELDS))
+        )
+        if not rows:
+            return cls(np.empty(0, dtype=np.int64), np.empty((0, len(FEATURE_FIELDS)), dtype=np.int64))
+        data = np.array([[-1 if v is None else v for v in row] for row in rows], dtype=np.int64)
+        return cls(data[:, 0], data[:, 1:])
+
+    def scores(self, rows):
+        """
+        Sparse ``(len(rows), n_games)`` cosine similarities of ``rows``
+        (matrix indices) against every game, self-matches removed.
+        """
+        sim = (self.X[rows] @ self.XT).tocsr()
+        batch = np.arange(len(rows))
+        diagonal = np.asarray(sim[batch, rows]).ravel()
+        sim = sim - sp.csr_matrix((diagonal, (batch, rows)), shape=sim.shape)
+        sim.eliminate_zeros()
+        return sim
+
+    def top_k(self, rows, k):
+        """``[(game_id, [(similar_id, score), ...]), ...]`` for ``rows``."""
+        sim = self.scores(rows)
+        result = []
+        for i, row in enumerate(rows):
+            start, end = sim.indptr[i], sim.indptr[i + 1]
+            data, cols = sim.data[start:end], sim.indices[start:end]
+            if len(data) > k:
+                keep = np.argpartition(-data, k - 1)[:k]
+                data, cols = data[keep], cols[keep]
+            # Best first; ties by lower game id for a stable order
+            order = np.lexsort((self.ids[cols], -data))
+            result.append(
+                (int(self.ids[row]), [(int(self.ids[cols[j]]), float(data[j])) for j in order])
+            )
+        return result
+
+
+def _store(results):
+    game_ids = [game_id for game_id, _ in results]
+    with transaction.atomic():
+        SimilarGame.objects.filter(game_id__in=game_ids).delete()
+        SimilarGame.objects.bulk_create(
+            SimilarGame(game_id=game_id, similar_id=sim_id, score=score, rank=rank)
+            for game_id, neighbours in results
+            for rank, (sim_id, score) in enumerate(neighbours)
+        )
+
+
+def rebuild_all(batch_size=BATCH_SIZE, progress=None):
+    """Recompute every game's neighbours.  Returns the number of games."""
+    matrix = FeatureMatrix.load()
+    k = top_k()
+    with transaction.atomic():
+        SimilarGame.objects.all().delete()
+        for start in range(0, len(matrix.ids), batch_size):
+            rows = np.arange(start, min(start + batch_size, len(matrix.ids)))
+            _store(matrix.top_k(rows, k))
+            if progress:
+                progress(rows[-1] + 1, len(matrix.ids))
+    return len(matrix.ids)
+
+
+def affected_by(game_id, matrix):
+    """
+    Game ids whose stored list may change because ``game_id`` was saved:
+    the game itself, every list that currently contains it, and every game
+    for which its new score reaches the current k-th neighbour.
+    """
+    affected = set(SimilarGame.objects.filter(similar_id=game_id).values_list("game_id", flat=True))
+    row = matrix.row_of.get(game_id)
+    if row is None:
+        return affected
+    affected.add(game_id)
+
+    sim = matrix.scores(np.array([row]))
+    candidates, scores = sim.indices, sim.data
+    candidate_ids = matrix.ids[candidates].tolist()
+    kth = {}
+    for chunk in chunked(candidate_ids):
+        kth.update(
+            SimilarGame.objects.filter(game_id__in=chunk, rank=top_k() - 1).values_list("game_id", "score")
+        )
+    # Enters a full list when it reaches the k-th score; a short list takes any match
+    threshold = np.array([kth.get(int(pk), 0.0) for pk in matrix.ids[candidates]])
+    enters = candidates[scores >= threshold]
+    affected.update(int(pk) for pk in matrix.ids[enters])
+    return affected
+
+
+def refresh_games(game_ids, matrix=None, batch_size=BATCH_SIZE):
+    """Recompute and store the neighbours of ``game_ids`` only."""
+    matrix = matrix or FeatureMatrix.load()
+    rows = np.array(sorted(matrix.row_of[g] for g in game_ids if g in matrix.row_of), dtype=np.int64)
+    k = top_k()
+    for start in range(0, len(rows), batch_size):
+        _store(matrix.top_k(rows[start:start + batch_size], k))
+    return len(rows)
+
+
+def refresh_for_games(game_ids, lists=()):
+    """
+    Incremental update after ``game_ids`` were created or edited, plus the
+    lists ``lists`` (which lost a deleted game).
+    """
+    matrix = FeatureMatrix.load()
+    affected = set(lists)
+    for game_id in game_ids:
+        affected |= affected_by(game_id, matrix)
+    return refresh_games(affected, matrix)
+
+
+def refresh_for_game(game_id):
+    """Incremental update after ``game_id`` was created or edited."""
+    return refresh_for_games([game_id])
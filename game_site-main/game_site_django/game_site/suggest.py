@@ -0,0 +1,187 @@
+# --------------------------------------------------------------
+# game_site/suggest.py
+# --------------------------------------------------------------
+"""
+Prefix autocomplete for the search box (``/api/games/suggest/?q=``).
+
+Every game contributes one entry per word of its normalized title – the
+title from that word on ("the witcher 3", "witcher 3", "3") – to a sorted
+list of keys with a parallel ``array('q')`` of game ids.  A query is two
+``bisect`` calls for the key range ``[q, q + "\\x7f")`` followed by a top-k
+by popularity (whitelist count, the co-occurrence diagonal kept by
+game_site.recommendations) over the ids in that range.
+
+Writes patch the loaded index in place (game_site.outbox); the index is
+reloaded after ``settings.SUGGEST_INDEX_TTL`` seconds to pick up writes of
+other workers.
+"""
+import bisect
+import threading
+import time
+from array import array
+
+import numpy as np
+from django.conf import settings
+
+from .db_utils import chunked
+from .fuzzy import normalize
+from .models import Game
+from .recommendations import row_cache
+
+# Sorts after every character normalize() keeps
+_HIGH = "\x7f"
+
+
+def title_keys(title):
+    """Index keys of a normalized title – one per word it can be found by."""
+    words = title.split()
+    return [" ".join(words[i:]) for i in range(len(words))]
+
+
+class SuggestIndex:
+    """Sorted keys, their game ids and whether the key starts the title."""
+
+    def __init__(self):
+        self.keys = []
+        self.ids = array("q")
+        self.starts = array("b")
+        self.names = {}
+        self.entries = {}
+        self.loaded_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    @classmethod
+    def load(cls):
+        return cls.from_titles(Game.objects.values_list("pk", "game_name").iterator(chunk_size=2000))
+
+    @classmethod
+    def from_titles(cls, titles):
+        """Build from ``(game id, title)`` pairs."""
+        index = cls()
+        rows = []
+        for pk, name in titles:
+            index.names[pk] = name
+            keys = title_keys(normalize(name))
+            index.entries[pk] = keys
+            rows.extend((key, pk, i == 0) for i, key in enumerate(keys))
+        rows.sort()
+        index.keys = [key for key, _, _ in rows]
+        index.ids = array("q", (pk for _, pk, _ in rows))
+        index.starts = array("b", (start for _, _, start in rows))
+        return index
+
+    # ---- incremental updates ----
+    def _remove(self, pk):
+        self.names.pop(pk, None)
+        for key in self.entries.pop(pk, ()):
+            position = bisect.bisect_left(self.keys, key)
+            while position < len(self.keys) and self.keys[position] == key:
+                if self.ids[position] == pk:
+                    del self.keys[position], self.ids[position], self.starts[position]
+                    break
+                position += 1
+
+    def _add(self, pk, name):
+        self.names[pk] = name
+        keys = self.entries[pk] = title_keys(normalize(name))
+        for i, key in enumerate(keys):
+            position = bisect.bisect_right(self.keys, key)
+            self.keys.insert(position, key)
+            self.ids.insert(position, pk)
+            self.starts.insert(position, i == 0)
+
+    def refresh(self, pks):
+        """Re-read ``pks``; ids that no longer exist are dropped."""
+        pks = sorted(set(pks))
+        found = {}
+        for chunk in chunked(pks):
+            found.update(Game.objects.filter(pk__in=chunk).values_list("pk", "game_name"))
+        with self.lock:
+            for pk in pks:
+                if pk in found and self.names.get(pk) == found[pk]:
+                    continue
+                self._remove(pk)
+                if pk in found:
+                    self._add(pk, found[pk])
+
+    def remove(self, pk):
+        with self.lock:
+            self._remove(pk)
+
+    # ---- queries ----
+    def suggest(self, query, limit=10, popularity=None):
+        """
+        ``[(game_id, name), ...]`` – most popular first, title-start matches
+        before word matches.  ``popularity(ids)`` defaults to the whitelist
+        counts cached by game_site.recommendations.
+        """
+        query = normalize(query)
+        if not query:
+            return []
+        with self.lock:
+            lo = bisect.bisect_left(self.keys, query)
+            hi = bisect.bisect_left(self.keys, query + _HIGH, lo)
+            if lo == hi:
+                return []
+            ids = np.array(self.ids[lo:hi], dtype=np.int64)
+            starts = np.array(self.starts[lo:hi], dtype=np.int8)
+            names = self.names
+
+        popularity = (popularity or row_cache.popularity)(ids)
+        # A game may match through several words – keep its best entry only
+        rank = popularity * 2 + starts
+        if len(ids) > 4 * limit:
+            best = np.argpartition(-rank, 4 * limit - 1)[:4 * limit]
+            ids, rank = ids[best], rank[best]
+        # Best first; ties keep the alphabetical key order (= lower index)
+        order = np.lexsort((np.arange(len(ids)), -rank))
+        result, seen = [], set()
+        for i in order.tolist():
+            pk = int(ids[i])
+            if pk not in seen:
+                seen.add(pk)
+                result.append((pk, names.get(pk, "")))
+                if len(result) == limit:
+                    break
+        return result
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def _ttl():
+    return getattr(settings, "SUGGEST_INDEX_TTL", 300)
+
+
+def get_index():
+    """The process-wide index, (re)loaded when missing or older than the TTL."""
+    global _index
+    index = _index
+    if index is None or time.monotonic() - index.loaded_at > _ttl():
+        with _index_lock:
+            if _index is None or time.monotonic() - _index.loaded_at > _ttl():
+                _index = SuggestIndex.load()
+            index = _index
+    return index
+
+
+def suggest(query, limit=10):
+    return get_index().suggest(query, limit)
+
+
+def refresh_games(pks):
+    """Patch the loaded index after ``pks`` were saved (no-op when not loaded)."""
+    if _index is not None and pks:
+        _index.refresh(pks)
+
+
+def remove_game(pk):
+    if _index is not None:
+        _index.remove(pk)
+
+
+def invalidate():
+    global _index
+    with _index_lock:
+        _index = None
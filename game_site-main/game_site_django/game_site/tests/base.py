@@ -0,0 +1,72 @@
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from ..models import CustomUser, Developer, Game, Genre, Platform, Store
+
+# ``databases`` of tests that write telemetry rows – with the telemetry
+# database when it is configured (GAME_SITE_TELEMETRY_DB)
+TELEMETRY_DATABASES = {"default", "telemetry"} & set(settings.DATABASES)
+
+
+class CatalogTestCase(TestCase):
+    """Three genres, platforms and stores, a developer and a superuser; ``add_games()`` adds games."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.genres = [
+            Genre.objects.create(genre_ID=i, Genre_Name=f"Genre {i}", Genre_Popularity="high") for i in range(3)
+        ]
+        cls.platforms = [Platform.objects.create(platform_ID=i, Platform_Name=f"Platform {i}") for i in range(3)]
+        cls.stores = [Store.objects.create(store_ID=i, Store_Name=f"Store {i}") for i in range(3)]
+        cls.developer = Developer.objects.create(
+            developer_ID=1, first_name="Ada", last_name="Lovelace", gender="f", country="UK"
+        )
+        cls.admin_user = CustomUser.objects.create_superuser("admin", "admin@example.com", "pw")
+
+    def add_games(self, n):
+        start = Game.objects.count()
+        Game.objects.bulk_create(
+            Game(
+                game_name=f"Game {start + i}",
+                genre=self.genres[i % 3],
+                platform=self.platforms[i % 3],
+                store=self.stores[i % 3],
+                developer=self.developer,
+            )
+            for i in range(n)
+        )
+
+    def new_game(self, name="New game"):
+        return Game.objects.create(
+            game_name=name,
+            genre=self.genres[0],
+            platform=self.platforms[0],
+            store=self.stores[0],
+            developer=self.developer,
+        )
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response, [q["sql"] for q in queries.captured_queries]
+
+
+def catalog_params(**values):
+    """``catalog.catalog_params()`` of a query string with ``values``."""
+    params = {
+        "search": "", "fuzzy": False, "genre": "", "platform": "", "store": "", "whitelisted": None,
+        "max_ram": "", "cpu_tier": "", "gpu_tier": "", "sort": "",
+    }
+    params.update(values)
+    return params
+
+
+def throttle_rates(**rates):
+    """``REST_FRAMEWORK`` with some rates replaced – DRF reloads its settings on override."""
+    return {
+        **settings.REST_FRAMEWORK,
+        "DEFAULT_THROTTLE_RATES": {**settings.REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"], **rates},
+    }
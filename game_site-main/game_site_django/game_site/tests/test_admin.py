@@ -0,0 +1,61 @@
+from django.test import override_settings
+from django.urls import reverse
+
+from ..models import Game
+from .base import CatalogTestCase
+
+
+class AdminQueryCountTests(CatalogTestCase):
+    """The Game admin's query count does not grow with the catalog."""
+
+    def setUp(self):
+        self.client.force_login(self.admin_user)
+        # The first request caches the session's user
+        self.client.get(reverse("admin:index"))
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        url = reverse("admin:game_site_game_changelist")
+        self.add_games(10)
+        _, small = self.get(url)
+        self.add_games(190)
+        response, large = self.get(url)
+        self.assertEqual(len(small), len(large))
+        self.assertLessEqual(len(large), 15)
+        self.assertEqual(len(response.context["cl"].result_list), 100)
+
+    def test_search_queries_do_not_grow_with_rows(self):
+        url = reverse("admin:game_site_game_changelist") + "?q=game"
+        self.add_games(20)
+        _, small = self.get(url)
+        self.add_games(200)
+        response, large = self.get(url)
+        self.assertEqual(len(small), len(large))
+        self.assertEqual(response.context["cl"].result_count, 220)
+
+    def test_search_by_id(self):
+        self.add_games(20)
+        game = Game.objects.last()
+        response, _ = self.get(reverse("admin:game_site_game_changelist") + f"?q={game.pk}")
+        self.assertIn(game, response.context["cl"].result_list)
+
+    def test_change_form_loads_no_lookup_tables(self):
+        self.add_games(5)
+        game = Game.objects.first()
+        _, queries = self.get(reverse("admin:game_site_game_change", args=[game.pk]))
+        self.assertLessEqual(len(queries), 15)
+        # The autocomplete widgets load their selected row only
+        self.assertFalse([sql for sql in queries if 'FROM "game_site_genre"' in sql and "WHERE" not in sql])
+
+    @override_settings(ADMIN_EXACT_COUNT_LIMIT=0)
+    def test_unfiltered_changelist_is_not_counted(self):
+        self.add_games(30)
+        response, queries = self.get(reverse("admin:game_site_game_changelist"))
+        self.assertFalse([sql for sql in queries if "COUNT(*)" in sql and 'FROM "game_site_game"' in sql])
+        self.assertGreaterEqual(response.context["cl"].result_count, 30)
+
+    @override_settings(ADMIN_EXACT_COUNT_LIMIT=0)
+    def test_filtered_changelist_is_counted_exactly(self):
+        self.add_games(30)
+        url = reverse("admin:game_site_game_changelist") + f"?genre__id__exact={self.genres[0].pk}"
+        response, _ = self.get(url)
+        self.assertEqual(response.context["cl"].result_count, 10)
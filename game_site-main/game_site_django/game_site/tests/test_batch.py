@@ -0,0 +1,39 @@
+from django.urls import reverse
+
+from .. import page_cache
+from ..models import Game
+from .base import CatalogTestCase
+
+
+class GameBatchTests(CatalogTestCase):
+    """``/api/games/batch/``: requested order, one query for the misses, none for cached games."""
+
+    def setUp(self):
+        # Ids repeat between tests – drop payloads cached by earlier ones
+        page_cache.bump_generation()
+        self.add_games(30)
+        self.ids = list(Game.objects.order_by("-pk").values_list("pk", flat=True))
+
+    def batch(self, ids):
+        return self.get(reverse("game-batch") + "?ids=" + ",".join(map(str, ids)))
+
+    def test_order_and_missing_ids(self):
+        response, _ = self.batch([self.ids[2], 999999, self.ids[0], self.ids[2]])
+        self.assertEqual([game["id"] for game in response.json()["games"]], [self.ids[2], self.ids[0]])
+        self.assertEqual(response.json()["missing"], [999999])
+
+    def test_payload_matches_detail_view(self):
+        response, _ = self.batch([self.ids[0]])
+        detail = self.client.get(reverse("game_detail_json", args=[self.ids[0]])).json()
+        self.assertEqual(response.json()["games"][0], {"id": self.ids[0], **detail})
+
+    def test_queries_do_not_grow_with_ids(self):
+        _, few = self.batch(self.ids[:3])
+        _, many = self.batch(self.ids[3:])
+        self.assertEqual(len(few), len(many))
+        _, cached = self.batch(self.ids)
+        self.assertFalse([sql for sql in cached if 'FROM "game_site_game"' in sql])
+
+    def test_invalid_ids(self):
+        self.assertEqual(self.client.get(reverse("game-batch") + "?ids=1,x").status_code, 400)
+        self.assertEqual(self.client.get(reverse("game-batch")).status_code, 400)
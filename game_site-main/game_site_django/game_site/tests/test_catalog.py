@@ -0,0 +1,83 @@
+from unittest import mock
+
+from django.contrib.auth.models import AnonymousUser
+from django.db import connections, router
+from django.test.utils import CaptureQueriesContext
+
+from .. import catalog
+from ..models import Game, GameLog, OnlineStatus, SalesHistory
+from .base import TELEMETRY_DATABASES, CatalogTestCase, catalog_params
+
+# Active players of the games, in id order – None: no OnlineStatus row
+PLAYERS = [10, None, 30, 10, 0, None, 30]
+
+
+class TelemetryTests(CatalogTestCase):
+    """Telemetry rows are batch-loaded per model, wherever they live; games without them sort last."""
+
+    databases = TELEMETRY_DATABASES
+
+    def setUp(self):
+        for i, players in enumerate(PLAYERS):
+            game = self.new_game(f"Game {i}")
+            if players is not None:
+                game.online_status = OnlineStatus.objects.create(active_players=players, registered_players=100)
+                game.sales_history = SalesHistory.objects.create(units_sold=1000 * i)
+                game.save()
+        self.games = list(Game.objects.order_by("pk"))
+        self.telemetry = connections[router.db_for_read(OnlineStatus)]
+
+    def test_attach_one_query_per_model(self):
+        games = list(Game.objects.order_by("pk"))
+        with CaptureQueriesContext(self.telemetry) as queries:
+            catalog.attach_telemetry(games)
+        # No game has a GameLog – no query for it
+        self.assertEqual(len(queries), 2)
+        with self.assertNumQueries(0, using=self.telemetry.alias):
+            players = [g.online_status and g.online_status.active_players for g in games]
+            sales = [g.sales_history and g.sales_history.units_sold for g in games]
+            logs = [g.game_log for g in games]
+        self.assertEqual(players, PLAYERS)
+        self.assertEqual(sales, [None if p is None else 1000 * i for i, p in enumerate(PLAYERS)])
+        self.assertEqual(logs, [None] * len(PLAYERS))
+
+    def test_attach_skips_loaded_and_missing_rows(self):
+        game = self.games[0]
+        game.game_log = GameLog.objects.create(log_ID=1, log_description="Patched")
+        game.save()
+        # A dangling id (the row was deleted in the telemetry database)
+        Game.objects.filter(pk=self.games[1].pk).update(sales_history_id=999)
+        games = list(Game.objects.order_by("pk"))
+        loaded = games[0].online_status
+        catalog.attach_telemetry(games, fields=("online_status", "sales_history"))
+        self.assertIs(games[0].online_status, loaded)
+        self.assertIsNone(games[1].sales_history)
+        # Not among ``fields`` – left to load on access
+        self.assertFalse(Game._meta.get_field("game_log").is_cached(games[0]))
+        self.assertEqual(games[0].game_log.log_description, "Patched")
+
+    def players_order(self):
+        return [g.pk for g in catalog.catalog_games(catalog_params(sort="players"), AnonymousUser())]
+
+    def expected_players_order(self):
+        counted = sorted((-p, i) for i, p in enumerate(PLAYERS) if p is not None)
+        return [self.games[i].pk for _, i in counted] + [
+            self.games[i].pk for i, p in enumerate(PLAYERS) if p is None
+        ]
+
+    def test_players_sort_joined(self):
+        if catalog.telemetry_separate():
+            self.skipTest("The telemetry database is separate – no join")
+        self.assertEqual(self.players_order(), self.expected_players_order())
+
+    def test_players_sort_separate(self):
+        # The cross-database path: sorted in Python after the batched load
+        with mock.patch.object(catalog, "telemetry_separate", return_value=True):
+            self.assertEqual(self.players_order(), self.expected_players_order())
+
+    def test_detail_payloads(self):
+        details = catalog.game_details_data([g.pk for g in self.games])
+        self.assertEqual(details[self.games[2].pk]["players"], 30)
+        self.assertEqual(details[self.games[2].pk]["sales"], 2000)
+        self.assertEqual(details[self.games[1].pk]["players"], "–")
+        self.assertEqual(details[self.games[1].pk]["sales"], "")
@@ -0,0 +1,134 @@
+import itertools
+import threading
+import time
+from unittest import mock
+
+from django.contrib.auth.models import AnonymousUser
+
+from .. import catalog_index, lookups
+from ..catalog import catalog_games
+from ..models import Game, OnlineStatus, SystemRequirement
+from .base import TELEMETRY_DATABASES, CatalogTestCase, catalog_params
+
+NAMES = ["alpha", "Beta", "beta", "Gamma", "delta", "Alpha two", "Ëpsilon", "zeta", "Beta"]
+RATINGS = [3.0, 4.5, 4.5, 2.0, 4.5, 3.0, 1.0, 5.0, 2.0]
+PLAYERS = [10, None, 30, 10, None, 0, 30, None, 5]
+# RAM, CPU, GPU – the last one not recognised (game_site.hardware)
+REQUIREMENTS = [("8 GB", "Intel Core i5-8400", "GTX 1060"), ("16 GB", "Ryzen 7 5800X", "RTX 3070"), ("lots", "?", "?")]
+
+CHOICES = {
+    "search": ["", "alpha", "BETA", "ë", "zz"],
+    "genre": ["", "1", "x"],
+    "whitelisted": [None, "yes", "no"],
+    "max_ram": ["", "8 GB"],
+    "sort": ["", "name", "rating", "players", "bogus"],
+}
+
+
+class CatalogIndexTests(CatalogTestCase):
+    """The index answers every search / filter / sort like ``catalog.catalog_games``."""
+
+    databases = TELEMETRY_DATABASES
+
+    def setUp(self):
+        lookups.invalidate()
+        catalog_index.invalidate()
+        self.addCleanup(catalog_index.invalidate)
+        requirements = [
+            SystemRequirement.objects.create(
+                requirement_ID=i, operating_system="Windows", ram=ram, processor=cpu, gpu=gpu
+            )
+            for i, (ram, cpu, gpu) in enumerate(REQUIREMENTS)
+        ] + [None]
+        for i, name in enumerate(NAMES):
+            game = self.new_game(name)
+            status = None
+            if PLAYERS[i] is not None:
+                status = OnlineStatus.objects.create(active_players=PLAYERS[i], registered_players=100)
+            Game.objects.filter(pk=game.pk).update(
+                genre=self.genres[i % 3],
+                platform=self.platforms[i % 2],
+                store=self.stores[i % 3],
+                rating_bayes=RATINGS[i],
+                online_status=status,
+                system_requirements=requirements[i % 4],
+            )
+        self.games = list(Game.objects.order_by("pk"))
+        self.admin_user.whitelisted_games.set(self.games[::3])
+
+    def assert_same(self, **fixed):
+        keys = [key for key in CHOICES if key not in fixed]
+        for values in itertools.product(*(CHOICES[key] for key in keys)):
+            params = catalog_params(**fixed, **dict(zip(keys, values)))
+            if params["genre"] in ("1", "x"):
+                params["genre"] = str(self.genres[1].pk) if params["genre"] == "1" else "x"
+            for user in (AnonymousUser(), self.admin_user):
+                with self.subTest(params=params, user=user):
+                    self.assertEqual(
+                        [row.pk for row in catalog_index.catalog_rows(params, user)],
+                        [game.pk for game in catalog_games(params, user)],
+                    )
+
+    def test_every_filter_and_sort(self):
+        self.assert_same()
+
+    def test_platform_store_and_tiers(self):
+        for fixed in (
+            {"platform": str(self.platforms[1].pk)},
+            {"store": str(self.stores[2].pk)},
+            {"cpu_tier": "Ryzen 7 5800X", "gpu_tier": "GTX 1060"},
+            {"gpu_tier": "0"},
+        ):
+            with self.subTest(fixed=fixed):
+                self.assert_same(search="", whitelisted=None, **fixed)
+
+    def test_rows(self):
+        game = self.games[2]
+        rows = catalog_index.catalog_rows(catalog_params(sort="name"), AnonymousUser())
+        row = next(row for row in rows if row.pk == game.pk)
+        self.assertEqual(row.game_name, "beta")
+        self.assertEqual(row.genre, str(game.genre))
+        self.assertEqual(row.online_status.active_players, 30)
+        self.assertIsNone(next(row for row in rows if row.pk == self.games[1].pk).online_status)
+
+    def test_refresh_after_save_and_delete(self):
+        catalog_index.get_index()
+        renamed, rerated, deleted = self.games[0], self.games[3], self.games[4]
+        renamed.game_name = "Omega"
+        renamed.save()
+        Game.objects.filter(pk=rerated.pk).update(rating_bayes=9.0, genre=self.genres[1])
+        OnlineStatus.objects.filter(pk=self.games[2].online_status_id).update(active_players=99)
+        deleted_pk = deleted.pk
+        deleted.delete()
+        added = self.new_game("alpha three")
+        catalog_index.refresh_games({renamed.pk, rerated.pk, deleted_pk, added.pk, self.games[2].pk})
+        self.assert_same()
+
+    def test_refresh_reads_in_order(self):
+        # A refresh that read the database first applies first – a later one
+        # waits, so the older read can never overwrite the newer one
+        index = catalog_index.get_index()
+        game = self.games[0]
+        values = catalog_index._read_games({game.pk})[game.pk]
+        reading, release, reads = threading.Event(), threading.Event(), []
+
+        def read(pks):
+            reads.append(pks)
+            if len(reads) == 1:
+                reading.set()
+                release.wait(5)
+                return {game.pk: ("Old", *values[1:])}
+            return {game.pk: ("New", *values[1:])}
+
+        with mock.patch.object(catalog_index, "_read_games", read):
+            first = threading.Thread(target=index.refresh, args=({game.pk},))
+            first.start()
+            self.assertTrue(reading.wait(5))
+            second = threading.Thread(target=index.refresh, args=({game.pk},))
+            second.start()
+            time.sleep(0.05)
+            self.assertEqual(len(reads), 1)
+            release.set()
+            first.join(5)
+            second.join(5)
+        self.assertEqual(index.names[index.row_of[game.pk]], "New")
@@ -0,0 +1,70 @@
+import json
+from unittest import mock
+
+from django.test import override_settings
+from django.urls import reverse
+
+from .. import catalog_stream, throttling
+from .base import TELEMETRY_DATABASES, CatalogTestCase
+
+
+@override_settings(CATALOG_STREAM_HEARTBEAT=0.01, CATALOG_STREAM_MAX_SECONDS=0.05)
+class CatalogStreamTests(CatalogTestCase):
+    """``/api/catalog/events/``: resume, heartbeats and the event payloads."""
+
+    databases = TELEMETRY_DATABASES
+
+    def setUp(self):
+        throttling.get_store().clear()
+        self.broker = catalog_stream.InProcessBroker()
+        patcher = mock.patch.object(catalog_stream, "_broker", self.broker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def stream(self, **headers):
+        response = self.client.get(reverse("catalog_events"), **headers)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        return b"".join(response.streaming_content).decode()
+
+    def events(self, body):
+        """``[(id, kind, data), ...]`` of an SSE body."""
+        events = []
+        for block in body.split("\n\n"):
+            fields = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+            if "event" in fields:
+                events.append((fields["id"], fields["event"], json.loads(fields["data"])))
+        return events
+
+    def test_resume_from_last_event_id(self):
+        first = self.broker.publish("game.created", {"id": 1, "game_name": "One"})
+        self.broker.publish("game.deleted", {"id": 2})
+        events = self.events(self.stream(HTTP_LAST_EVENT_ID=first))
+        self.assertEqual([(kind, data) for _, kind, data in events], [("game.deleted", {"id": 2})])
+        self.assertEqual(events[0][0], self.broker.last_id())
+
+    def test_unknown_last_event_id_resets(self):
+        self.broker.publish("game.deleted", {"id": 2})
+        events = self.events(self.stream(HTTP_LAST_EVENT_ID="earlier-process-7"))
+        self.assertEqual([(kind, data) for _, kind, data in events], [("reset", {})])
+
+    def test_heartbeat(self):
+        body = self.stream()
+        self.assertTrue(body.startswith(f"retry: {catalog_stream.RETRY_MS}\n\n"))
+        self.assertIn(": ping\n\n", body)
+        self.assertEqual(self.events(body), [])
+
+    def test_payloads(self):
+        start = self.broker.last_id()
+        with self.captureOnCommitCallbacks(execute=True):
+            game = self.new_game("Streamed")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.admin_user.whitelisted_games.add(game)
+        pk = game.pk
+        with self.captureOnCommitCallbacks(execute=True):
+            game.delete()
+        events = self.events(self.stream(HTTP_LAST_EVENT_ID=start))
+        self.assertEqual([(kind, data) for _, kind, data in events], [
+            ("game.created", {"id": pk, "game_name": "Streamed"}),
+            ("game.whitelist_count", {"id": pk, "whitelist_count": 1}),
+            ("game.deleted", {"id": pk}),
+        ])
@@ -0,0 +1,188 @@
+import hashlib
+import importlib.util
+import io
+import tempfile
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from unittest import mock, skipUnless
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from django.urls import reverse
+
+from .. import cover_art, recommendations, throttling
+from ..models import CoverArt, Game, SimilarGame
+from .base import CatalogTestCase
+
+
+class CoverQueryTests(CatalogTestCase):
+    """Lists of games with cover art load the covers in the same query."""
+
+    def setUp(self):
+        self.add_games(6)
+        for i, game in enumerate(Game.objects.order_by("pk")):
+            game.cover = CoverArt.objects.create(
+                sha256=f"{i:064x}", format="png", width=10, height=10, size_bytes=100
+            )
+            game.save()
+        self.games = list(Game.objects.order_by("pk"))
+
+    def cover_queries(self, url):
+        _, queries = self.get(url)
+        return [sql for sql in queries if 'FROM "game_site_coverart"' in sql]
+
+    def test_similar(self):
+        game = self.games[0]
+        SimilarGame.objects.bulk_create(
+            SimilarGame(game=game, similar=other, score=0.5, rank=rank) for rank, other in enumerate(self.games[1:])
+        )
+        response = self.client.get(reverse("game-similar", args=[game.pk]))
+        self.assertEqual(len(response.json()), 5)
+        self.assertIsNotNone(response.json()[0]["cover"])
+        self.assertEqual(self.cover_queries(reverse("game-similar", args=[game.pk])), [])
+
+    def test_recommendations(self):
+        self.client.force_login(self.admin_user)
+        ranked = [(game.pk, 1.0) for game in self.games]
+        with mock.patch.object(recommendations, "recommend", return_value=ranked):
+            self.assertEqual(len(self.client.get(reverse("recommendation-list")).json()), 6)
+            self.assertEqual(self.cover_queries(reverse("recommendation-list")), [])
+
+
+def fake_probe(path, max_pixels):
+    if Path(path).read_bytes().startswith(b"not"):
+        raise ValueError("Not a valid image.")
+    return "PNG", 2, 1
+
+
+def fake_thumbnail(src, dest, size, max_pixels):
+    Path(dest).parent.mkdir(parents=True, exist_ok=True)
+    Path(dest).write_bytes(b"webp %d" % size)
+    return dest
+
+
+class BrokenPool:
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_exception(BrokenProcessPool("A child process terminated abruptly"))
+        return future
+
+
+class UploadTests(CatalogTestCase):
+    """Uploads are stored once per sha256; pool timeouts and dead workers answer 503, bad images 400."""
+
+    def setUp(self):
+        self.root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.root.cleanup)
+        settings = override_settings(COVER_ART_ROOT=self.root.name, COVER_ART_THUMBNAIL_SIZES=(64, 128))
+        settings.enable()
+        self.addCleanup(settings.disable)
+        throttling.get_store().clear()
+        self.addCleanup(throttling.get_store().clear)
+        self.client.force_login(self.admin_user)
+        self.add_games(2)
+        self.games = list(Game.objects.order_by("pk"))
+
+    def use_pool(self, pool, probe=fake_probe, thumbnail=fake_thumbnail):
+        # The imaging functions run in the test process – a thread pool in place of the process pool
+        for patcher in (
+            mock.patch.object(cover_art, "_executor", return_value=pool),
+            mock.patch.object(cover_art.imaging, "probe", probe),
+            mock.patch.object(cover_art.imaging, "thumbnail", thumbnail),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def use_threads(self, **fakes):
+        pool = ThreadPoolExecutor(2)
+        self.addCleanup(pool.shutdown)
+        self.use_pool(pool, **fakes)
+
+    def upload(self, game, data, name="cover.png"):
+        return self.client.post(
+            reverse("game-cover", args=[game.pk]), {"image": SimpleUploadedFile(name, data)}
+        )
+
+    def test_store_dedupes_and_serves_thumbnail(self):
+        self.use_threads()
+        data = b"image bytes"
+        first = self.upload(self.games[0], data)
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(self.upload(self.games[1], data).status_code, 201)
+
+        cover = CoverArt.objects.get()
+        self.assertEqual(cover.sha256, hashlib.sha256(data).hexdigest())
+        self.assertEqual(set(Game.objects.values_list("cover", flat=True)), {cover.pk})
+        self.assertEqual(cover_art.original_path(cover.sha256, "png").read_bytes(), data)
+        self.assertEqual(list((Path(self.root.name) / "tmp").iterdir()), [])
+
+        urls = first.json()["cover"]
+        self.assertEqual(urls["width"], 2)
+        response = self.client.get(urls["thumbnails"]["128"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "image/webp")
+        self.assertEqual(b"".join(response.streaming_content), b"webp 128")
+
+    def test_missing_thumbnail_rendered_on_request(self):
+        self.use_threads()
+        self.upload(self.games[0], b"image bytes")
+        cover = CoverArt.objects.get()
+        cover_art.thumbnail_path(cover.sha256, 64).unlink()
+        response = self.client.get(reverse("cover_thumbnail", args=[cover.sha256, 64]))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(cover_art.thumbnail_path(cover.sha256, 64).exists())
+
+    def test_invalid_image(self):
+        self.use_threads()
+        response = self.upload(self.games[0], b"not an image")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("image", response.json())
+        self.assertFalse(CoverArt.objects.exists())
+
+    def test_timeout(self):
+        def slow_probe(path, max_pixels):
+            time.sleep(0.5)
+            return fake_probe(path, max_pixels)
+
+        self.use_threads(probe=slow_probe)
+        with mock.patch.object(cover_art, "RENDER_TIMEOUT", 0.05):
+            response = self.upload(self.games[0], b"image bytes")
+        self.assertEqual(response.status_code, 503)
+        self.assertIn("Retry-After", response)
+        self.assertFalse(CoverArt.objects.exists())
+
+    def test_broken_pool(self):
+        self.use_pool(BrokenPool())
+        with mock.patch.object(cover_art, "_discard_pool") as discard:
+            response = self.upload(self.games[0], b"image bytes")
+        self.assertEqual(response.status_code, 503)
+        self.assertIn("Retry-After", response)
+        discard.assert_called_once_with()
+
+    def test_thumbnail_unavailable(self):
+        self.use_threads()
+        self.upload(self.games[0], b"image bytes")
+        cover = CoverArt.objects.get()
+        cover_art.thumbnail_path(cover.sha256, 64).unlink()
+        self.use_pool(BrokenPool())
+        with mock.patch.object(cover_art, "_discard_pool"):
+            response = self.client.get(reverse("cover_thumbnail", args=[cover.sha256, 64]))
+        self.assertEqual(response.status_code, 503)
+        self.assertIn("Retry-After", response)
+
+    @skipUnless(importlib.util.find_spec("PIL"), "Pillow is not installed")
+    def test_png_through_process_pool(self):
+        from PIL import Image
+
+        self.addCleanup(cover_art._discard_pool)
+
+        data = io.BytesIO()
+        Image.new("RGB", (300, 200), "red").save(data, "PNG")
+        response = self.upload(self.games[0], data.getvalue())
+        self.assertEqual(response.status_code, 201)
+        cover = CoverArt.objects.get()
+        self.assertEqual((cover.format, cover.width, cover.height), ("png", 300, 200))
+        with Image.open(cover_art.thumbnail_path(cover.sha256, 128)) as thumb:
+            self.assertEqual((thumb.format, thumb.size), ("WEBP", (128, 85)))
@@ -0,0 +1,78 @@
+from django.urls import reverse
+
+from .. import fuzzy, page_cache
+from ..models import Game, Publisher
+from .base import TELEMETRY_DATABASES, CatalogTestCase
+
+TITLES = ["The Witcher 3", "Witness", "Pokémon: X", "Portal 2", "Zork: Grand Inquisitor", "Bethesda Quest"]
+
+
+class FuzzySearchTests(CatalogTestCase):
+    """``?fuzzy=1`` finds titles despite typos, matches credits, and follows renames."""
+
+    databases = TELEMETRY_DATABASES
+
+    def setUp(self):
+        fuzzy.invalidate()
+        self.addCleanup(fuzzy.invalidate)
+        page_cache.bump_generation()
+        self.publisher = Publisher.objects.create(publisher_ID=1, publisher_name="Bethesda Softworks", country="US")
+        self.games = {}
+        for title in TITLES:
+            game = self.new_game(title)
+            game.developer = None
+            game.save()
+            self.games[title] = game.pk
+        Game.objects.filter(pk=self.games["The Witcher 3"]).update(publisher=self.publisher)
+
+    def found(self, query):
+        return [pk for pk, _ in fuzzy.search(query)]
+
+    def test_typo(self):
+        self.assertEqual(self.found("witcer")[0], self.games["The Witcher 3"])
+        self.assertEqual(self.found("portl"), [self.games["Portal 2"]])
+        self.assertEqual(self.found("zork inquisiter"), [self.games["Zork: Grand Inquisitor"]])
+        self.assertEqual(self.found("xyzzy"), [])
+
+    def test_accents_and_case(self):
+        self.assertEqual(self.found("POKEMON")[0], self.games["Pokémon: X"])
+        self.assertEqual(self.found("pokémon")[0], self.games["Pokémon: X"])
+
+    def test_credits(self):
+        results = dict(fuzzy.search("bethesda"))
+        # A title match outranks the same match on the credits
+        self.assertEqual(self.found("bethesda"), [self.games["Bethesda Quest"], self.games["The Witcher 3"]])
+        self.assertEqual(results[self.games["The Witcher 3"]], fuzzy.CREDITS_WEIGHT)
+
+    def test_short_queries(self):
+        # Nothing left to make trigrams of
+        self.assertEqual(fuzzy.search(""), [])
+        self.assertEqual(fuzzy.search("?!"), [])
+        # Shorter than a word – matched inside the titles all the same
+        self.assertEqual(set(self.found("wi")), {self.games["The Witcher 3"], self.games["Witness"]})
+        self.assertEqual(self.found("x"), [self.games["Pokémon: X"]])
+
+    def test_refresh_after_rename_and_delete(self):
+        fuzzy.get_index()
+        with self.captureOnCommitCallbacks(execute=True):
+            game = Game.objects.get(pk=self.games["Portal 2"])
+            game.game_name = "Half-Life"
+            game.save()
+        self.assertEqual(self.found("portal"), [])
+        self.assertEqual(self.found("halflife"), [game.pk])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.publisher.publisher_name = "Arkane"
+            self.publisher.save()
+        self.assertEqual(self.found("arkane"), [self.games["The Witcher 3"]])
+        self.assertEqual(self.found("bethesda"), [self.games["Bethesda Quest"]])
+        with self.captureOnCommitCallbacks(execute=True):
+            game.delete()
+        self.assertEqual(self.found("half life"), [])
+
+    def test_pages_rank_by_match(self):
+        self.client.force_login(self.admin_user)
+        expected = self.found("witcer")
+        for url in (reverse("home"), reverse("games")):
+            with self.subTest(url=url):
+                response = self.client.get(url, {"search": "witcer", "fuzzy": "1"})
+                self.assertEqual([game.pk for game in response.context["games"]], expected)
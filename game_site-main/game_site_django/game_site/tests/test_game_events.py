@@ -0,0 +1,171 @@
+import threading
+from datetime import timedelta
+from unittest import mock
+
+from django.test import SimpleTestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import game_events, throttling
+from ..models import GameEvent
+from .base import TELEMETRY_DATABASES, CatalogTestCase
+
+
+def events(n, kind="match_end"):
+    return [(1, kind, f"#{i}", None, None) for i in range(n)]
+
+
+class EventWriterTests(SimpleTestCase):
+    """The writer thread writes full batches at once, the rest on time, and retries a failed insert."""
+
+    def setUp(self):
+        self.batches = []
+        self.written = threading.Event()
+        self.writers = []
+        self.addCleanup(lambda: [writer.close() for writer in self.writers])
+
+    def write(self, batch):
+        self.batches.append(batch)
+        self.written.set()
+        return len(batch)
+
+    def writer(self, write=None, **options):
+        writer = game_events.EventWriter(write=write or self.write, **options)
+        self.writers.append(writer)
+        return writer
+
+    def test_full_batch_is_written_at_once(self):
+        writer = self.writer(batch_size=3, flush_seconds=3600)
+        writer.put(events(2))
+        self.assertFalse(self.written.wait(0.1))
+        writer.put(events(2))
+        self.assertTrue(self.written.wait(5))
+        self.assertEqual(len(self.batches[0]), 3)
+        self.assertTrue(writer.flush(5))
+        self.assertEqual([len(batch) for batch in self.batches], [3, 1])
+
+    def test_partial_batch_is_written_on_time(self):
+        writer = self.writer(batch_size=100, flush_seconds=0.05)
+        writer.put(events(1))
+        self.assertTrue(self.written.wait(5))
+        self.assertEqual(self.batches, [events(1)])
+        self.assertEqual(len(writer), 0)
+
+    def test_full_queue_rejects_all_or_nothing(self):
+        release = threading.Event()
+
+        def blocked(batch):
+            release.wait(5)
+            return len(batch)
+
+        writer = self.writer(write=blocked, capacity=3, batch_size=100, flush_seconds=3600)
+        writer.put(events(2))
+        with self.assertRaises(game_events.QueueFull):
+            writer.put(events(2), timeout=0.05)
+        with self.assertRaises(game_events.QueueFull):
+            writer.put(events(4), timeout=5)   # never fits – not waited for
+        self.assertEqual(len(writer), 2)
+        self.assertEqual(writer.stats["rejected"], 6)
+        release.set()
+
+    def test_failed_insert_is_retried(self):
+        attempts = []
+
+        def flaky(batch):
+            attempts.append(batch)
+            if len(attempts) < 3:
+                raise RuntimeError("database is locked")
+            return self.write(batch)
+
+        writer = self.writer(write=flaky, batch_size=2, flush_seconds=3600)
+        with mock.patch.object(game_events, "RETRY_DELAYS", (0, 0, 0)):
+            writer.put(events(2))
+            self.assertTrue(self.written.wait(5))
+        self.assertEqual(self.batches, [events(2)])
+        self.assertEqual(len(attempts), 3)
+        self.assertEqual(writer.stats["written"], 2)
+        self.assertEqual(writer.stats["dropped"], 0)
+
+    def test_batch_dropped_after_last_attempt(self):
+        def down(batch):
+            raise RuntimeError("database is down")
+
+        writer = self.writer(write=down, batch_size=2, flush_seconds=3600)
+        with mock.patch.object(game_events, "RETRY_DELAYS", (0,)), self.assertLogs(game_events.logger, "ERROR"):
+            writer.put(events(2))
+            self.assertTrue(writer.flush(5))
+        self.assertEqual(writer.stats["dropped"], 2)
+
+    def test_close_writes_the_rest(self):
+        writer = self.writer(batch_size=100, flush_seconds=3600)
+        writer.put(events(3))
+        writer.close()
+        self.assertEqual(self.batches, [events(3)])
+        writer.put(events(1))   # no thread left – written by the caller
+        self.assertEqual(self.batches, [events(3), events(1)])
+
+
+class GameEventApiTests(CatalogTestCase):
+    """``POST /api/game-events/`` validates the payload, queues it, and answers 503 when the queue is full."""
+
+    databases = TELEMETRY_DATABASES
+
+    def setUp(self):
+        throttling.get_store().clear()
+        self.addCleanup(throttling.get_store().clear)
+        self.client.force_login(self.admin_user)
+        self.game = self.new_game()
+
+    def post(self, payload):
+        return self.client.post(reverse("game-event-list"), payload, content_type="application/json")
+
+    def test_accepted(self):
+        with mock.patch.object(game_events, "ingest") as ingest:
+            response = self.post({"events": [
+                {"game": self.game.pk, "kind": "match_end", "data": {"score": 3}},
+                {"game": self.game.pk, "kind": "patch", "message": "1.2", "occurred_at": "2025-01-01T12:00:05"},
+            ]})
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json(), {"accepted": 2})
+        (queued,), _ = ingest.call_args
+        self.assertEqual([event[:4] for event in queued], [
+            (self.game.pk, "match_end", "", {"score": 3}),
+            (self.game.pk, "patch", "1.2", None),
+        ])
+        self.assertEqual(queued[1][4].isoformat(), "2025-01-01T12:00:05+00:00")
+
+    def test_bad_payloads(self):
+        future = (timezone.now() + timedelta(hours=1)).isoformat()
+        for payload, error in (
+            ({"events": "match_end"}, "Expected a list"),
+            ({"events": [42]}, "events[0]: must be an object"),
+            ({"events": [{"game": "1", "kind": "x"}]}, "game must be a game id"),
+            ({"events": [{"game": True, "kind": "x"}]}, "game must be a game id"),
+            ({"events": [{"game": 1, "kind": ""}]}, "kind must be"),
+            ({"events": [{"game": 1, "kind": "x" * 41}]}, "kind must be"),
+            ({"events": [{"game": 1, "kind": "x", "message": 5}]}, "message must be"),
+            ({"events": [{"game": 1, "kind": "x", "occurred_at": "yesterday"}]}, "ISO 8601"),
+            ({"events": [{"game": 1, "kind": "x", "occurred_at": "2025-13-01T00:00:00"}]}, "ISO 8601"),
+            ({"events": [{"game": 1, "kind": "x"}, {"game": 1, "kind": "x", "occurred_at": future}]},
+             "events[1]: occurred_at is in the future"),
+        ):
+            with self.subTest(payload=payload), mock.patch.object(game_events, "ingest") as ingest:
+                response = self.post(payload)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(error, response.json()["events"])
+                ingest.assert_not_called()
+
+    def test_queue_full(self):
+        with mock.patch.object(game_events, "ingest", side_effect=game_events.QueueFull):
+            response = self.post({"events": [{"game": self.game.pk, "kind": "match_end"}]})
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "1")
+
+    def test_write_events_drops_unknown_games(self):
+        now = timezone.now()
+        written = game_events.write_events([
+            (self.game.pk, "match_end", "", None, now),
+            (self.game.pk + 1000, "match_end", "", None, now),
+        ])
+        self.assertEqual(written, 1)
+        self.assertEqual(list(GameEvent.objects.values_list("game_id", flat=True)), [self.game.pk])
@@ -0,0 +1,162 @@
+from django.test import SimpleTestCase
+from django.urls import reverse
+
+from .. import hardware, throttling
+from ..models import Game, SystemRequirement
+from .base import CatalogTestCase
+
+RAM = [
+    ("8 GB", 8192),
+    ("8GB", 8192),
+    ("Minimum 4 GB RAM", 4096),
+    ("4g", 4096),
+    ("512MB", 512),
+    ("512 mb", 512),
+    ("1.5 GB", 1536),
+    ("1,5 GB", 1536),
+    ("2 TB", 2 * 1024 * 1024),
+    ("16", 16384),     # a bare number is gigabytes…
+    ("1024", 1024),    # …unless it can only be megabytes
+    ("0 GB", None),
+    ("lots", None),
+    ("", None),
+    (None, None),
+]
+
+CPUS = [
+    ("Core 2 Duo", 1),
+    ("Athlon 64", 1),
+    ("AMD FX-8350", 1),
+    ("Pentium 4", 1),
+    ("Core i3", 3),
+    ("Intel Core i5-8400", 5),
+    ("Intel i7", 7),
+    ("i7-9700K", 7),
+    ("AMD Ryzen 5 3600", 5),
+    ("Ryzen 9", 9),
+    ("Xeon E5", 6),
+    ("Apple M1", 6),
+    ("M2 Pro", 8),
+    ("M3 Max", 9),
+    ("Intel Core Ultra 7", 8),
+    ("Threadripper 3990X", 10),
+    ("Unknown CPU", None),
+    ("", None),
+    (None, None),
+]
+
+GPUS = [
+    ("Intel UHD 620", 1),
+    ("Integrated graphics", 1),
+    ("Radeon Graphics", 1),
+    ("Vega 8", 1),
+    ("GT 730", 1),
+    ("GTX 750 Ti", 1),
+    ("GeForce GT 1030", 2),
+    ("GTX 1050", 3),
+    ("GTX 970", 4),
+    ("GTX 1660", 4),
+    ("GTX 980 Ti", 5),
+    ("gtx1080", 6),
+    ("RTX 3060", 6),
+    ("RTX 2080", 7),
+    ("RTX 4090", 10),
+    ("RTX 5090", 10),
+    ("RX 470", 3),
+    ("RX 580", 4),
+    ("RX 5500", 4),
+    ("RX 6700 XT", 7),
+    ("RX 9070", 7),
+    ("RX 7900 XTX", 10),
+    ("Arc A770", 6),
+    ("Voodoo 3", None),
+    ("GTX 1030x", None),
+    ("", None),
+    (None, None),
+]
+
+
+class HardwareParsingTests(SimpleTestCase):
+    """RAM in megabytes and CPU / GPU tiers from the free text of the requirements."""
+
+    def assert_table(self, parse, table):
+        for text, expected in table:
+            with self.subTest(text=text):
+                self.assertEqual(parse(text), expected)
+
+    def test_parse_ram(self):
+        self.assert_table(hardware.parse_ram, RAM)
+
+    def test_cpu_tier(self):
+        self.assert_table(hardware.cpu_tier, CPUS)
+
+    def test_gpu_tier(self):
+        self.assert_table(hardware.gpu_tier, GPUS)
+
+    def test_gt_below_gtx(self):
+        # A GT card is at least a class below the GTX cards of its generation
+        for gt, gtx in (("GT 1030", "GTX 1050"), ("GT 1030", "GTX 1060"), ("GT 640", "GTX 660")):
+            with self.subTest(gt=gt):
+                self.assertLess(hardware.gpu_tier(gt), hardware.gpu_tier(gtx))
+
+
+class CompatibilityApiTests(CatalogTestCase):
+    """``GET /api/compatibility/`` lists the games a machine meets the requirements of."""
+
+    def setUp(self):
+        throttling.get_store().clear()
+        self.addCleanup(throttling.get_store().clear)
+        self.games = {}
+        for name, ram, cpu, gpu in (
+            ("low", "4 GB", "Intel Core i3", "GT 1030"),
+            ("mid", "8 GB", "Intel Core i5-8400", "GTX 1050"),
+            ("high", "16 GB", "Ryzen 7 5800X", "RTX 3070"),
+            ("unknown", "lots", "?", "?"),
+        ):
+            requirement = SystemRequirement.objects.create(
+                requirement_ID=len(self.games), operating_system="Windows", ram=ram, processor=cpu, gpu=gpu
+            )
+            game = self.new_game(name)
+            Game.objects.filter(pk=game.pk).update(system_requirements=requirement)
+            self.games[name] = game.pk
+        self.new_game("no requirements")
+
+    def machine(self, **params):
+        return self.client.get(reverse("compatibility-list"), params)
+
+    def test_machines(self):
+        for params, names in (
+            ({"ram": "8GB"}, ["low", "mid"]),
+            ({"ram": "64 GB"}, ["low", "mid", "high"]),
+            ({"cpu": "Ryzen 5"}, ["low", "mid"]),
+            ({"cpu": "5"}, ["low", "mid"]),
+            ({"gpu": "GT 1030"}, ["low"]),
+            ({"gpu": "GTX 1050"}, ["low", "mid"]),
+            ({"ram": "16GB", "cpu": "Ryzen 5", "gpu": "RTX 3060"}, ["low", "mid"]),
+            ({"ram": "16GB", "cpu": "Ryzen 9", "gpu": "RTX 4090"}, ["low", "mid", "high"]),
+            ({"ram": "2 GB"}, []),
+        ):
+            with self.subTest(params=params):
+                response = self.machine(**params)
+                self.assertEqual(response.status_code, 200)
+                expected = [self.games[name] for name in names]
+                self.assertEqual(response.json()["games"], expected)
+                self.assertEqual(response.json()["count"], len(expected))
+
+    def test_machine_echoed(self):
+        response = self.machine(ram="16GB", cpu="Ryzen 5", gpu="RTX 3060")
+        self.assertEqual(response.json()["machine"], {"ram_mb": 16384, "cpu_tier": 5, "gpu_tier": 6})
+        self.assertEqual(self.machine(gpu="7").json()["machine"], {"ram_mb": None, "cpu_tier": None, "gpu_tier": 7})
+
+    def test_bad_machines(self):
+        self.assertEqual(self.machine().status_code, 400)
+        self.assertEqual(self.machine(ram=" ").status_code, 400)
+        for params, errors in (
+            ({"gpu": "Voodoo 3"}, {"gpu"}),
+            ({"ram": "lots", "cpu": "Ryzen 5"}, {"ram"}),
+            ({"ram": "lots", "cpu": "?", "gpu": "?"}, {"ram", "cpu", "gpu"}),
+        ):
+            with self.subTest(params=params):
+                response = self.machine(**params)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(set(response.json()), errors)
@@ -0,0 +1,83 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .. import jobs
+from ..models import Job
+
+
+@override_settings(JOB_RETRY_BACKOFF=30, JOB_STALE_SECONDS=300)
+class JobQueueTests(TestCase):
+    """Jobs are claimed oldest first and once, retried with backoff and failed after max_attempts."""
+
+    def setUp(self):
+        self.calls = []
+        patcher = mock.patch.dict(jobs.HANDLERS)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        @jobs.handler("test.flaky", max_attempts=3)
+        def flaky(ctx, fail=0):
+            self.calls.append(ctx.job.attempts)
+            if ctx.job.attempts <= fail:
+                raise RuntimeError("try again")
+            return {"attempt": ctx.job.attempts}
+
+    def make_due(self, job):
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+
+    def test_claim(self):
+        later = jobs.enqueue("test.flaky", delay=60)
+        first, second = jobs.enqueue("test.flaky"), jobs.enqueue("test.flaky")
+        claimed = jobs.claim("w1")
+        self.assertEqual(
+            (claimed.pk, claimed.status, claimed.worker, claimed.attempts), (first.pk, Job.RUNNING, "w1", 1)
+        )
+        self.assertEqual(jobs.claim("w2").pk, second.pk)
+        self.assertIsNone(jobs.claim("w3"))       # ``later`` is not due yet
+        self.make_due(later)
+        self.assertEqual(jobs.claim("w3").pk, later.pk)
+
+    def test_success(self):
+        job = jobs.enqueue("test.flaky")
+        jobs.claim("w1")
+        self.assertEqual(jobs.run(job.pk), Job.SUCCEEDED)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.result, job.error), (Job.SUCCEEDED, {"attempt": 1}, ""))
+        self.assertIsNotNone(job.finished_at)
+
+    def test_retry_with_backoff_then_fail(self):
+        job = jobs.enqueue("test.flaky", {"fail": 3})
+        for attempt, backoff in ((1, 30), (2, 60)):
+            jobs.claim("w1")
+            with self.assertLogs("game_site.jobs", "ERROR"):
+                self.assertEqual(jobs.run(job.pk), Job.QUEUED)
+            job.refresh_from_db()
+            self.assertEqual(job.attempts, attempt)
+            self.assertIn("try again", job.error)
+            self.assertAlmostEqual((job.run_after - timezone.now()).total_seconds(), backoff, delta=5)
+            self.assertIsNone(jobs.claim("w1"))   # backing off
+            self.make_due(job)
+        jobs.claim("w1")
+        with self.assertLogs("game_site.jobs", "ERROR"):
+            self.assertEqual(jobs.run(job.pk), Job.FAILED)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 3))
+        self.assertIsNotNone(job.finished_at)
+        self.assertEqual(self.calls, [1, 2, 3])
+        self.assertIsNone(jobs.claim("w1"))
+
+    def test_stale_job_is_requeued_or_failed(self):
+        retried, exhausted = jobs.enqueue("test.flaky"), jobs.enqueue("test.flaky")
+        jobs.claim("w1")
+        jobs.claim("w1")
+        Job.objects.filter(pk=exhausted.pk).update(attempts=3)
+        Job.objects.update(heartbeat_at=timezone.now() - timedelta(seconds=600))
+        self.assertEqual(jobs.requeue_stale(), 2)
+        retried.refresh_from_db()
+        exhausted.refresh_from_db()
+        self.assertEqual((retried.status, retried.worker), (Job.QUEUED, ""))
+        self.assertEqual(exhausted.status, Job.FAILED)
+        self.assertEqual(jobs.claim("w2").pk, retried.pk)
@@ -0,0 +1,36 @@
+from django.urls import reverse
+
+from .. import lookups
+from .base import CatalogTestCase
+
+
+class NameListTests(CatalogTestCase):
+    """/api/genres/ and friends come from the lookup snapshot and keep ``legacy_name``."""
+
+    def setUp(self):
+        # Pks repeat between tests – drop the snapshots and cached responses
+        lookups.invalidate()
+
+    def test_list_and_retrieve(self):
+        response, _ = self.get(reverse("genre-list"))
+        self.assertEqual(
+            response.json(),
+            [{"id": g.pk, "name": g.Genre_Name, "legacy_name": g.Genre_Name} for g in self.genres],
+        )
+        response, _ = self.get(reverse("store-detail", args=[self.stores[1].pk]))
+        self.assertEqual(response.json(), {"id": self.stores[1].pk, "name": "Store 1", "legacy_name": "Store 1"})
+        self.assertEqual(self.client.get(reverse("platform-detail", args=[99])).status_code, 404)
+        self.assertEqual(self.client.get(reverse("platform-detail", args=["x"])).status_code, 404)
+
+    def test_served_from_snapshot(self):
+        lookups.get_table("platform")
+        _, queries = self.get(reverse("platform-list"))
+        self.assertEqual([sql for sql in queries if "game_site_platform" in sql], [])
+
+    def test_rename_is_visible(self):
+        self.get(reverse("genre-list"))
+        genre = self.genres[0]
+        genre.Genre_Name = "Renamed"
+        genre.save()
+        response, _ = self.get(reverse("genre-list"))
+        self.assertEqual(response.json()[0]["legacy_name"], "Renamed")
@@ -0,0 +1,93 @@
+from unittest import mock
+
+from django.db import transaction
+from django.test import override_settings
+
+from .. import catalog_stream, outbox
+from ..models import Genre, OnlineStatus, OutboxEvent, SalesHistory
+from .base import TELEMETRY_DATABASES, CatalogTestCase
+
+
+class OutboxTests(CatalogTestCase):
+    """Events are dispatched once after commit, dropped with a rollback and retried per consumer."""
+
+    databases = TELEMETRY_DATABASES
+
+    def setUp(self):
+        # setUpTestData's lookup rows recorded events whose commit never came
+        OutboxEvent.objects.all().delete()
+        outbox._pending().clear()
+        self.calls = {"first": [], "second": []}
+        self.failing = True
+        consumers = {"first": self.consume("first"), "second": self.consume("second")}
+        patcher = mock.patch.dict(outbox.CONSUMERS, consumers, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def consume(self, name):
+        def fn(events):
+            if name == "second" and self.failing:
+                raise RuntimeError("consumer down")
+            self.calls[name].append([(e.kind, e.game_id) for e in events])
+        fn.kinds = None
+        return fn
+
+    def test_rollback_drops_events(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                self.new_game()
+                raise RuntimeError
+        self.assertFalse(OutboxEvent.objects.exists())
+        self.assertEqual(self.calls, {"first": [], "second": []})
+
+    def test_dispatched_once_after_commit(self):
+        self.failing = False
+        with self.captureOnCommitCallbacks(execute=True):
+            game = self.new_game()
+            self.assertEqual(self.calls["first"], [])
+        self.assertEqual(self.calls["first"], [[("game.created", game.pk)]])
+        self.assertEqual(self.calls["second"], [[("game.created", game.pk)]])
+        event = OutboxEvent.objects.get()
+        self.assertIsNotNone(event.dispatched_at)
+        self.assertEqual(event.delivered_to, ["first", "second"])
+        with override_settings(OUTBOX_RETRY_SECONDS=0):
+            self.assertEqual(outbox.sweep(), (0, 0))
+        self.assertEqual(len(self.calls["first"]), 1)
+
+    def test_sweep_retries_failed_consumer_only(self):
+        with self.assertLogs("game_site.outbox", "ERROR"), self.captureOnCommitCallbacks(execute=True):
+            game = self.new_game()
+        event = OutboxEvent.objects.get()
+        self.assertIsNone(event.dispatched_at)
+        self.assertEqual(event.delivered_to, ["first"])
+        self.assertIn("consumer down", event.error)
+
+        self.failing = False
+        with override_settings(OUTBOX_RETRY_SECONDS=0):
+            self.assertEqual(outbox.sweep(), (1, 0))
+        self.assertEqual(self.calls["first"], [[("game.created", game.pk)]])
+        self.assertEqual(self.calls["second"], [[("game.created", game.pk)]])
+        event.refresh_from_db()
+        self.assertIsNotNone(event.dispatched_at)
+        self.assertEqual((event.attempts, event.error), (2, ""))
+
+    def test_stream_publishes_an_event_once(self):
+        broker = catalog_stream.InProcessBroker()
+        with mock.patch.object(catalog_stream, "_broker", broker):
+            events = [outbox.Event(7, "game.updated", 3, {"game_name": "Renamed"})]
+            outbox._catalog_stream(events)
+            outbox._catalog_stream(events)
+        self.assertEqual(
+            [(e.kind, e.data) for e in broker.read(f"{broker.epoch}-0", 0)],
+            [("game.updated", {"id": 3, "game_name": "Renamed"})],
+        )
+
+    def test_lookup_rows_record_events_telemetry_rows_do_not(self):
+        Genre.objects.create(genre_ID=9, Genre_Name="New", Genre_Popularity="low")
+        status = OnlineStatus.objects.create(active_players=1, registered_players=2)
+        status.active_players = 3
+        status.save()
+        SalesHistory.objects.create(units_sold=10)
+        self.assertEqual(
+            list(OutboxEvent.objects.values_list("kind", "data")), [("lookup.changed", {"table": "genre"})]
+        )
@@ -0,0 +1,122 @@
+import threading
+from unittest import mock
+
+from django.middleware.csrf import get_token
+from django.test import RequestFactory
+from django.urls import reverse
+
+from .. import catalog_index, lookups, page_cache, throttling, views
+from ..models import Game
+from .base import CatalogTestCase
+
+
+class PageCacheTests(CatalogTestCase):
+    """Anonymous catalog pages come from the cache until a catalog write; other requests never do."""
+
+    def setUp(self):
+        page_cache.bump_generation()
+        lookups.invalidate()
+        catalog_index.invalidate()
+        self.addCleanup(catalog_index.invalidate)
+        throttling.get_store().clear()
+        self.addCleanup(throttling.get_store().clear)
+        self.add_games(3)
+        patcher = mock.patch.object(views, "_render_home", wraps=views._render_home)
+        self.render = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_anonymous_served_from_cache(self):
+        first = self.client.get(reverse("home"), {"sort": "name"})
+        second = self.client.get(reverse("home"), {"sort": "name"})
+        self.assertEqual(self.render.call_count, 1)
+        self.assertEqual(second.content, first.content)
+        self.assertContains(second, "Game 2")
+        # Same parameters, other spelling – same entry; other parameters – their own
+        self.client.get(reverse("home"), {"sort": "name", "fuzzy": "1", "genre": ""})
+        self.assertEqual(self.render.call_count, 1)
+        self.client.get(reverse("home"), {"sort": "rating"})
+        self.assertEqual(self.render.call_count, 2)
+
+    def test_authenticated_never_cached(self):
+        self.client.get(reverse("home"))
+        self.client.force_login(self.admin_user)
+        self.client.get(reverse("home"))
+        self.client.get(reverse("home"))
+        self.assertEqual(self.render.call_count, 3)
+        # …and what it rendered was not stored for anonymous visitors either
+        self.client.logout()
+        self.assertNotContains(self.client.get(reverse("home")), 'name="whitelist"')
+
+    def test_pinned_request_bypasses_cache(self):
+        self.client.get(reverse("home"))
+        with mock.patch("game_site.db_routers.pinned_to_primary", return_value=True):
+            self.client.get(reverse("home"))
+        self.assertEqual(self.render.call_count, 2)
+
+    def test_catalog_write_invalidates(self):
+        self.assertNotContains(self.client.get(reverse("home")), "Renamed")
+        with self.captureOnCommitCallbacks(execute=True):
+            game = Game.objects.first()
+            game.game_name = "Renamed"
+            game.save()
+        self.assertContains(self.client.get(reverse("home")), "Renamed")
+        self.assertEqual(self.render.call_count, 2)
+
+    def test_api_list(self):
+        url = reverse("game-list")
+        self.assertEqual(len(self.client.get(url).json()), 3)
+        with self.assertNumQueries(0):
+            self.assertEqual(len(self.client.get(url).json()), 3)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.new_game()
+        self.assertEqual(len(self.client.get(url).json()), 4)
+        self.client.force_login(self.admin_user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.new_game()
+        self.assertEqual(len(self.client.get(url).json()), 5)
+
+    def test_csrf_token_page_not_stored(self):
+        factory = RequestFactory()
+        builds = []
+
+        def page(request):
+            builds.append(request)
+            return f"<input value='{get_token(request)}'>".encode()
+
+        pages = []
+        for _ in range(2):
+            request = factory.get("/")
+            pages.append(page_cache.get_or_build("csrf-test", lambda: page(request), request))
+        self.assertEqual(len(builds), 2)
+        self.assertNotEqual(pages[0], pages[1])
+        # A page without the token is stored as usual
+        for _ in range(2):
+            page_cache.get_or_build("plain", lambda: builds.append(None) or b"page", factory.get("/"))
+        self.assertEqual(len(builds), 3)
+
+    def test_csrf_page_not_handed_to_coalesced_caller(self):
+        factory = RequestFactory()
+        building, release = threading.Event(), threading.Event()
+        results = {}
+
+        def leader():
+            request = factory.get("/")
+
+            def build():
+                building.set()
+                release.wait(5)
+                return get_token(request).encode()
+
+            results["leader"] = page_cache.get_or_build("csrf-flight", build, request)
+
+        thread = threading.Thread(target=leader)
+        thread.start()
+        self.assertTrue(building.wait(5))
+        follower = factory.get("/")
+        timer = threading.Timer(0.1, release.set)
+        timer.start()
+        content = page_cache.get_or_build("csrf-flight", lambda: b"own page", follower)
+        thread.join(5)
+        self.assertEqual(content, b"own page")
+        self.assertNotEqual(results["leader"], b"own page")
+        self.assertEqual(page_cache.get_or_build("csrf-flight", lambda: b"stored", factory.get("/")), b"stored")
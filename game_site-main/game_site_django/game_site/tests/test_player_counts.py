@@ -0,0 +1,48 @@
+import threading
+
+from django.test import SimpleTestCase, override_settings
+
+from .. import player_counts
+
+
+@override_settings(PLAYER_COUNT_FLUSH_SIZE=100, PLAYER_COUNT_FLUSH_SECONDS=0.05)
+class SampleBufferTests(SimpleTestCase):
+    """The buffer writes by size on ingest, and by age without any further ingest."""
+
+    def setUp(self):
+        self.batches = []
+        self.written = threading.Event()
+        self.buffer = player_counts.SampleBuffer(write=self.write)
+
+    def write(self, batch):
+        self.batches.append(batch)
+        self.written.set()
+        return len(batch)
+
+    def test_full_buffer_is_written_by_the_request(self):
+        self.buffer.add([(1, None, 5, None)] * 100)
+        self.assertEqual([len(batch) for batch in self.batches], [100])
+        self.assertEqual(len(self.buffer), 0)
+
+    def test_quiet_buffer_is_written_by_the_timer(self):
+        self.buffer.add([(1, None, 5, None)])
+        self.assertEqual(self.batches, [])
+        self.assertTrue(self.written.wait(5))
+        self.assertEqual(self.batches, [[(1, None, 5, None)]])
+        self.assertEqual(len(self.buffer), 0)
+
+    def test_failed_write_is_retried_by_the_timer(self):
+        attempts = []
+
+        def write(batch):
+            attempts.append(batch)
+            if len(attempts) == 1:
+                raise RuntimeError("database is locked")
+            return self.write(batch)
+
+        self.buffer = player_counts.SampleBuffer(write=write)
+        with self.assertLogs("game_site.player_counts", "ERROR"):
+            self.buffer.add([(1, None, 5, None)])
+            self.assertTrue(self.written.wait(5))
+        self.assertEqual(len(attempts), 2)
+        self.assertEqual(self.batches, [[(1, None, 5, None)]])
@@ -0,0 +1,113 @@
+import json
+import tempfile
+from pathlib import Path
+
+from django.test import override_settings
+
+from .. import catalog_index, lookups, prerender
+from ..models import Game
+from .base import CatalogTestCase
+
+
+class PrerenderTests(CatalogTestCase):
+    """A run re-renders only the pages whose games or lookup rows changed; ``full=True`` all of them."""
+
+    def setUp(self):
+        self.root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.root.cleanup)
+        settings = override_settings(PRERENDER_ROOT=Path(self.root.name))
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.addCleanup(catalog_index.invalidate)
+        self.addCleanup(lookups.invalidate)
+        self.add_games(6)
+        self.games = list(Game.objects.order_by("pk"))
+
+    def run_prerender(self, **options):
+        rendered = []
+        stats = prerender.run(out=lambda line: rendered.append(line.split(" ", 1)[1]), **options)
+        self.assertEqual(stats["rendered"], len(rendered))
+        return stats, set(rendered)
+
+    def pages(self):
+        return json.loads((Path(self.root.name) / prerender.STATE_FILE).read_text())["pages"]
+
+    def showing(self, game):
+        """First files of the pages that list ``game``."""
+        return {page["files"][0] for page in self.pages().values() if game.pk in page["ids"]}
+
+    def test_first_run_renders_everything(self):
+        stats, rendered = self.run_prerender()
+        self.assertEqual(stats, {"rendered": len(self.pages()), "unchanged": 0, "deleted": 0})
+        base = Path(self.root.name)
+        self.assertIn("index.html", rendered)
+        self.assertEqual(len(json.loads((base / "index.json").read_text())), 6)
+        manifest = json.loads((base / "manifest.json").read_text())
+        self.assertEqual(manifest["catalog"][""], {"html": "index.html", "json": "index.json"})
+        self.assertEqual(set(manifest["games"]), {str(game.pk) for game in self.games})
+        for files in manifest["catalog"].values():
+            self.assertTrue((base / files["html"]).exists())
+
+    def test_nothing_changed(self):
+        self.run_prerender()
+        stats, rendered = self.run_prerender()
+        self.assertEqual(rendered, set())
+        self.assertEqual(stats["unchanged"], len(self.pages()))
+
+    def test_only_pages_of_changed_game(self):
+        self.run_prerender()
+        game = self.games[2]
+        expected = self.showing(game)
+        Game.objects.filter(pk=game.pk).update(game_name="Renamed")
+        stats, rendered = self.run_prerender()
+        self.assertEqual(rendered, expected)
+        self.assertIn(f"games/{game.pk}.json", rendered)
+        self.assertEqual(stats["unchanged"], len(self.pages()) - len(expected))
+        self.assertIn("Renamed", (Path(self.root.name) / "index.html").read_text())
+
+    def test_game_moving_between_filters(self):
+        self.run_prerender()
+        game = self.games[0]
+        before = self.showing(game)
+        Game.objects.filter(pk=game.pk).update(store=self.stores[1])
+        _, rendered = self.run_prerender()
+        # The pages it left and the ones it joined
+        self.assertEqual(rendered, before | self.showing(game))
+        self.assertIn(f"games/{game.pk}.json", rendered)
+        self.assertIn(f"catalog/store-{self.stores[1].pk}.html", rendered)
+
+    def test_lookup_row_change(self):
+        self.run_prerender()
+        genre = self.genres[1]
+        genre.Genre_Name = "Renamed genre"
+        genre.save()
+        _, rendered = self.run_prerender()
+        # Every catalog page names the genres in its filter bar; details only for that genre's games
+        catalog = {page["files"][0] for key, page in self.pages().items() if key.startswith("catalog:")}
+        details = {f"games/{game.pk}.json" for game in self.games if game.genre_id == genre.pk}
+        self.assertEqual(rendered, catalog | details)
+
+    def test_deleted_game(self):
+        self.run_prerender()
+        game = self.games[5]
+        Game.objects.filter(pk=game.pk).delete()
+        stats, _ = self.run_prerender()
+        self.assertGreaterEqual(stats["deleted"], 1)
+        self.assertFalse((Path(self.root.name) / f"games/{game.pk}.json").exists())
+        self.assertNotIn(str(game.pk), json.loads((Path(self.root.name) / "manifest.json").read_text())["games"])
+
+    def test_full_rebuild(self):
+        self.run_prerender()
+        stats, rendered = self.run_prerender(full=True)
+        self.assertEqual(stats, {"rendered": len(self.pages()), "unchanged": 0, "deleted": 0})
+        self.assertEqual(len(rendered), len(self.pages()))
+
+    def test_max_pages(self):
+        stats, _ = self.run_prerender(max_pages=6, details=False)
+        self.assertEqual(stats["rendered"], 6)
+        # Every sort of the unfiltered page first, then the filters
+        self.assertEqual(list(self.pages())[:4], ["catalog:", "catalog:sort=name", "catalog:sort=rating",
+                                                  "catalog:sort=players"])
+        stats, _ = self.run_prerender(max_pages=5, details=False)
+        self.assertEqual(stats, {"rendered": 0, "unchanged": 5, "deleted": 1})
+        self.assertEqual(len(list(Path(self.root.name, "catalog").glob("*.html"))), 4)
@@ -0,0 +1,97 @@
+import numpy as np
+from django.urls import reverse
+
+from .. import recommendations, throttling
+from ..models import CustomUser, Game, GameCooccurrence
+from .base import CatalogTestCase
+
+# Whitelists (indexes into the games) – the first user is the one asking
+WHITELISTS = [{0}, {0, 1, 2}, {0, 1}, {1, 3}, {0, 4}, {5}, set()]
+
+
+class RecommendationTests(CatalogTestCase):
+    """The co-occurrence table is ``Xᵀ X`` whether rebuilt or kept up to date; the API ranks by cosine."""
+
+    def setUp(self):
+        recommendations.row_cache.clear()
+        self.addCleanup(recommendations.row_cache.clear)
+        throttling.get_store().clear()
+        self.addCleanup(throttling.get_store().clear)
+        self.add_games(7)
+        self.games = list(Game.objects.order_by("pk"))
+        self.users = [self.admin_user] + [
+            CustomUser.objects.create_user(f"user{i}")
+            for i in range(1, len(WHITELISTS))
+        ]
+        for user, whitelist in zip(self.users, WHITELISTS):
+            user.whitelisted_games.set([self.games[i] for i in whitelist])
+
+    def expected_counts(self):
+        column = {game.pk: i for i, game in enumerate(self.games)}
+        X = np.zeros((len(self.users), len(self.games)), dtype=np.int64)
+        for row, user in enumerate(self.users):
+            for game_id in user.whitelisted_games.values_list("pk", flat=True):
+                X[row, column[game_id]] = 1
+        C = X.T @ X
+        return {
+            (self.games[i].pk, self.games[j].pk): int(C[i, j])
+            for i, j in zip(*np.nonzero(C))
+        }
+
+    def table(self):
+        return {(g, h): count for g, h, count in GameCooccurrence.objects.values_list("game", "other", "count")}
+
+    def test_incremental_updates_match_rebuild(self):
+        # Built by the m2m receivers as the whitelists were set up
+        self.assertEqual(self.table(), self.expected_counts())
+        self.users[1].whitelisted_games.remove(self.games[1])
+        self.users[3].whitelisted_games.add(self.games[0], self.games[5])
+        self.games[2].whitelisted_by.add(self.users[6])
+        self.users[4].whitelisted_games.clear()
+        self.assertEqual(self.table(), self.expected_counts())
+
+    def test_rebuild(self):
+        GameCooccurrence.objects.all().delete()
+        rows = recommendations.rebuild(user_chunk=2, batch_size=3)
+        self.assertEqual(self.table(), self.expected_counts())
+        self.assertEqual(rows, len(self.expected_counts()))
+
+    def recommended(self, user, **params):
+        self.client.force_login(user)
+        response = self.client.get(reverse("recommendation-list"), params)
+        self.assertEqual(response.status_code, 200)
+        return [(item["id"], item["score"]) for item in response.json()]
+
+    def test_ranking(self):
+        counts = self.expected_counts()
+        own = self.games[0].pk
+        # score(j) = C[0, j] / sqrt(C[0, 0] · C[j, j]) for a whitelist of one
+        expected = sorted(
+            (-count / np.sqrt(counts[own, own] * counts[other, other]), other)
+            for (game, other), count in counts.items()
+            if game == own and other != own
+        )
+        self.assertEqual(
+            self.recommended(self.admin_user),
+            [(other, round(-score, 4)) for score, other in expected],
+        )
+
+    def test_own_whitelist_excluded(self):
+        user = self.users[1]
+        ids = [pk for pk, _ in self.recommended(user)]
+        self.assertEqual(ids, [self.games[3].pk, self.games[4].pk])
+        self.assertFalse(set(ids) & set(user.whitelisted_games.values_list("pk", flat=True)))
+
+    def test_limit(self):
+        self.assertEqual(len(self.recommended(self.admin_user, limit=1)), 1)
+        self.client.force_login(self.admin_user)
+        self.assertEqual(self.client.get(reverse("recommendation-list"), {"limit": "x"}).status_code, 400)
+
+    def test_empty_whitelist(self):
+        self.assertEqual(self.recommended(self.users[6]), [])
+
+    def test_nobody_else_whitelisted_the_games(self):
+        self.assertEqual(self.recommended(self.users[5]), [])
+
+    def test_anonymous(self):
+        self.assertEqual(self.client.get(reverse("recommendation-list")).status_code, 403)
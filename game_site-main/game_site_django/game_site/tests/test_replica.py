@@ -0,0 +1,54 @@
+from unittest import mock
+
+from django.contrib.sessions.models import Session
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.utils import timezone
+
+from .. import db_routers
+from ..middleware import PIN_COOKIE, ReplicaPinningMiddleware
+from ..models import CustomUser, Game, Genre
+from .base import CatalogTestCase
+
+
+@mock.patch.object(db_routers, "replica_configured", return_value=True)
+class ReplicaPinTests(CatalogTestCase):
+    """Catalog writes pin a request to the primary; session and account bookkeeping does not."""
+
+    def run_request(self, write):
+        """Run ``write`` inside a GET through the pinning middleware; ``(pinned, response)``."""
+        pinned = []
+
+        def view(request):
+            db_routers.route_reads_to_replica()
+            write()
+            pinned.append(db_routers.PrimaryReplicaRouter().db_for_read(Game) == db_routers.PRIMARY_DB)
+            return HttpResponse()
+
+        response = ReplicaPinningMiddleware(view)(RequestFactory().get("/"))
+        return pinned[0], response
+
+    def test_catalog_write_pins(self, _):
+        pinned, response = self.run_request(
+            lambda: Genre.objects.create(genre_ID=9, Genre_Name="New", Genre_Popularity="low")
+        )
+        self.assertTrue(pinned)
+        self.assertIn(PIN_COOKIE, response.cookies)
+
+    def test_whitelist_write_pins(self, _):
+        game = self.new_game()
+        pinned, _ = self.run_request(lambda: self.admin_user.whitelisted_games.add(game))
+        self.assertTrue(pinned)
+
+    def test_session_and_last_login_do_not_pin(self, _):
+        def write():
+            Session.objects.create(session_key="k" * 32, session_data="", expire_date=timezone.now())
+            CustomUser.objects.filter(pk=self.admin_user.pk).update(last_login=timezone.now())
+
+        pinned, response = self.run_request(write)
+        self.assertFalse(pinned)
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_unsafe_method_pins(self, _):
+        response = ReplicaPinningMiddleware(lambda request: HttpResponse())(RequestFactory().post("/"))
+        self.assertIn(PIN_COOKIE, response.cookies)
@@ -0,0 +1,54 @@
+from django.db import IntegrityError, transaction
+from django.urls import reverse
+
+from ..models import CustomUser, Game, GameReview
+from .base import CatalogTestCase
+
+
+class ReviewTests(CatalogTestCase):
+    """Rating aggregates follow every review insert, update and delete; one review per user."""
+
+    def setUp(self):
+        self.game = self.new_game()
+
+    def aggregates(self):
+        self.game.refresh_from_db()
+        return self.game.review_count, self.game.review_sum, self.game.rating_mean
+
+    def post(self, user, rating):
+        self.client.force_login(user)
+        return self.client.post(
+            reverse("game-reviews", args=[self.game.pk]), {"rating": rating}, content_type="application/json"
+        )
+
+    def test_insert_update_delete(self):
+        other = CustomUser.objects.create_user("other", "other@example.com", "pw")
+        first = GameReview.objects.create(game=self.game, user=self.admin_user, rating=8)
+        GameReview.objects.create(game=self.game, user=other, rating=4)
+        self.assertEqual(self.aggregates(), (2, 12, 6.0))
+        first.rating = 10
+        first.save()
+        self.assertEqual(self.aggregates(), (2, 14, 7.0))
+        first.delete()
+        self.assertEqual(self.aggregates(), (1, 4, 4.0))
+
+    def test_second_post_replaces_review(self):
+        self.assertEqual(self.post(self.admin_user, 3).status_code, 201)
+        response = self.post(self.admin_user, 9)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(self.game.reviews.values_list("rating", flat=True)), [9])
+        self.assertEqual(self.aggregates(), (1, 9, 9.0))
+
+    def test_one_review_per_user(self):
+        GameReview.objects.create(game=self.game, user=self.admin_user, rating=5)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            GameReview.objects.create(game=self.game, user=self.admin_user, rating=6)
+
+    def test_save_of_deleted_game_inserts_it_again(self):
+        GameReview.objects.create(game=self.game, user=self.admin_user, rating=5)
+        stale = Game.objects.get(pk=self.game.pk)
+        Game.objects.filter(pk=self.game.pk).delete()
+        stale.game_name = "Back again"
+        stale.save()
+        self.assertEqual(Game.objects.get(pk=stale.pk).game_name, "Back again")
+        self.assertEqual(self.aggregates(), (0, 0, None))
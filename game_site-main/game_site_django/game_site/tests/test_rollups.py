@@ -0,0 +1,81 @@
+import threading
+from unittest import mock
+
+from django.db import connection, router, transaction
+from django.test import SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from .. import rollups
+from ..models import CatalogRollup, Game, SalesHistory
+from .base import TELEMETRY_DATABASES, CatalogTestCase
+
+
+class RollupTests(CatalogTestCase):
+    """Sales writes reach the rollups in one batch after commit, not a rollup write each."""
+
+    databases = TELEMETRY_DATABASES
+
+    def setUp(self):
+        patcher = mock.patch.object(rollups, "dirty", rollups.DirtyGames())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.sales = SalesHistory.objects.create(units_sold=10)
+        self.game = self.new_game()
+        Game.objects.filter(pk=self.game.pk).update(sales_history=self.sales.pk)
+        rollups.rebuild()
+
+    def units_sold(self):
+        return CatalogRollup.objects.get(dimension="genre", key=str(self.genres[0].pk)).units_sold
+
+    def telemetry_commit(self):
+        return self.captureOnCommitCallbacks(using=router.db_for_write(SalesHistory), execute=True)
+
+    def test_sales_write_is_batched(self):
+        self.assertEqual(self.units_sold(), 10)
+        with CaptureQueriesContext(connection) as queries, self.telemetry_commit():
+            self.sales.units_sold = 25
+            self.sales.save()
+        self.assertFalse([q["sql"] for q in queries.captured_queries if "rollup" in q["sql"].lower()])
+        self.assertEqual(len(rollups.dirty), 1)
+        self.assertEqual(self.units_sold(), 10)
+        self.assertEqual(rollups.dirty.flush(), 1)
+        self.assertEqual(self.units_sold(), 25)
+
+    def test_rolled_back_write_marks_nothing(self):
+        with self.telemetry_commit():
+            with self.assertRaises(RuntimeError), transaction.atomic(using=router.db_for_write(SalesHistory)):
+                self.sales.units_sold = 25
+                self.sales.save()
+                raise RuntimeError
+        self.assertEqual(len(rollups.dirty), 0)
+
+    def test_deleted_sales_row(self):
+        with self.telemetry_commit():
+            self.sales.delete()
+        self.assertEqual(rollups.dirty.flush(), 1)
+        self.assertEqual(self.units_sold(), 0)
+
+
+@override_settings(ROLLUP_FLUSH_SECONDS=0.05)
+class DirtyGamesTests(SimpleTestCase):
+    """The timer refreshes the marked games once; a failed refresh keeps them."""
+
+    def test_timer_refreshes_once(self):
+        batches, done = [], threading.Event()
+        dirty = rollups.DirtyGames(refresh=lambda games: (batches.append(games), done.set()))
+        dirty.add([1, 2])
+        dirty.add([2, 3, None])
+        self.assertTrue(done.wait(5))
+        self.assertEqual(batches, [{1, 2, 3}])
+        self.assertEqual(len(dirty), 0)
+
+    @override_settings(ROLLUP_FLUSH_SECONDS=3600)
+    def test_failed_refresh_keeps_games(self):
+        def refresh(games):
+            raise RuntimeError("database is locked")
+
+        dirty = rollups.DirtyGames(refresh=refresh)
+        dirty.add([1])
+        with self.assertRaises(RuntimeError):
+            dirty.flush()
+        self.assertEqual(len(dirty), 1)
@@ -0,0 +1,30 @@
+from .. import jobs, outbox
+from ..models import Job, OutboxEvent, SimilarGame
+from .base import CatalogTestCase
+
+
+class SimilarityEventTests(CatalogTestCase):
+    """Saves record the similarity features they changed; recomputes go to the job queue."""
+
+    def update_event(self, game, **changes):
+        for field, value in changes.items():
+            setattr(game, field, value)
+        game.save()
+        event = OutboxEvent.objects.filter(kind="game.updated", game_id=game.pk).latest("pk")
+        return outbox.Event(event.pk, event.kind, event.game_id, event.data)
+
+    def test_rename_skips_recompute(self):
+        event = self.update_event(self.new_game(), game_name="Renamed")
+        self.assertEqual(event.data["features"], [])
+        outbox._similarity([event])
+        self.assertFalse(Job.objects.filter(name="similarity.refresh").exists())
+
+    def test_feature_change_queues_recompute(self):
+        game, other = self.new_game(), self.new_game("Other")
+        event = self.update_event(game, genre=self.genres[1])
+        self.assertEqual(event.data["features"], ["genre"])
+        outbox._similarity([event])
+        job = Job.objects.get(name="similarity.refresh")
+        self.assertEqual(job.args, {"ids": [game.pk], "lists": []})
+        self.assertEqual(jobs.HANDLERS[job.name](None, **job.args), {"games": 2})
+        self.assertEqual(list(SimilarGame.objects.filter(game=game).values_list("similar_id", flat=True)), [other.pk])
@@ -0,0 +1,78 @@
+from django.urls import reverse
+
+from .. import recommendations, suggest, throttling
+from ..models import CustomUser, Game
+from .base import TELEMETRY_DATABASES, CatalogTestCase
+
+TITLES = ["The Witcher 3", "Witness", "Pokémon: X", "Star Wars: Star Fox", "Wit and Wisdom", "Portal"]
+
+
+class SuggestTests(CatalogTestCase):
+    """``/api/games/suggest/`` completes title and word prefixes, popular games first."""
+
+    databases = TELEMETRY_DATABASES
+
+    def setUp(self):
+        suggest.invalidate()
+        self.addCleanup(suggest.invalidate)
+        recommendations.row_cache.clear()
+        self.addCleanup(recommendations.row_cache.clear)
+        throttling.get_store().clear()
+        self.addCleanup(throttling.get_store().clear)
+        self.games = {title: self.new_game(title).pk for title in TITLES}
+
+    def suggested(self, q, **params):
+        response = self.client.get(reverse("game-suggest"), {"q": q, **params})
+        self.assertEqual(response.status_code, 200)
+        return [item["game_name"] for item in response.json()]
+
+    def test_prefixes(self):
+        # Title starts before word starts, then in key order
+        self.assertEqual(self.suggested("wit"), ["Wit and Wisdom", "Witness", "The Witcher 3"])
+        self.assertEqual(self.suggested("witc"), ["The Witcher 3"])
+        self.assertEqual(self.suggested("the witcher 3"), ["The Witcher 3"])
+        self.assertEqual(self.suggested("wits"), [])
+        self.assertEqual(self.suggested(""), [])
+        self.assertEqual(self.suggested("!?"), [])
+
+    def test_case_and_unicode(self):
+        for q in ("WIT", "Wit"):
+            self.assertEqual(self.suggested(q)[0], "Wit and Wisdom")
+        for q in ("poké", "POKE", "pokemon x"):
+            self.assertEqual(self.suggested(q), ["Pokémon: X"])
+
+    def test_game_matching_several_words_listed_once(self):
+        self.assertEqual(self.suggested("star"), ["Star Wars: Star Fox"])
+
+    def test_limit(self):
+        for i in range(30):
+            self.new_game(f"Witch {i:02d}")
+        self.assertEqual(len(self.suggested("wit")), 10)
+        self.assertEqual(len(self.suggested("wit", limit=2)), 2)
+        self.assertEqual(len(self.suggested("wit", limit=100)), 25)
+        self.assertEqual(len(self.suggested("wit", limit=0)), 1)
+        response = self.client.get(reverse("game-suggest"), {"q": "wit", "limit": "x"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_popular_first(self):
+        fans = [CustomUser.objects.create_user(f"fan{i}") for i in range(2)]
+        for fan in fans:
+            fan.whitelisted_games.add(self.games["The Witcher 3"])
+        fans[0].whitelisted_games.add(self.games["Witness"])
+        self.assertEqual(self.suggested("wit"), ["The Witcher 3", "Witness", "Wit and Wisdom"])
+
+    def test_updates_after_save_and_delete(self):
+        self.suggested("wit")   # loads the index
+        with self.captureOnCommitCallbacks(execute=True):
+            game = Game.objects.get(pk=self.games["Portal"])
+            game.game_name = "Witchfire"
+            game.save()
+            added = self.new_game("Wizardry")
+        self.assertEqual(self.suggested("witch"), ["Witchfire", "The Witcher 3"])
+        self.assertEqual(self.suggested("port"), [])
+        self.assertEqual(self.suggested("wiz"), ["Wizardry"])
+        with self.captureOnCommitCallbacks(execute=True):
+            Game.objects.get(pk=self.games["Witness"]).delete()
+            added.delete()
+        self.assertEqual(self.suggested("wit"), ["Wit and Wisdom", "Witchfire", "The Witcher 3"])
+        self.assertEqual(self.suggested("wiz"), [])
@@ -0,0 +1,38 @@
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+
+from .. import throttling
+from .base import CatalogTestCase, throttle_rates
+
+
+class ThrottleTests(CatalogTestCase):
+    """Sliding-window throttles answer 429 with ``Retry-After``; stores clear only their own counters."""
+
+    def setUp(self):
+        throttling.get_store().clear()
+        self.addCleanup(throttling.get_store().clear)
+
+    @override_settings(REST_FRAMEWORK=throttle_rates(games="2/min"))
+    def test_api_endpoint_throttled(self):
+        url = reverse("game-list")
+        self.assertEqual([self.client.get(url).status_code for _ in range(2)], [200, 200])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 429)
+        self.assertTrue(0 < int(response["Retry-After"]) <= 120)
+
+    @override_settings(REST_FRAMEWORK=throttle_rates(login="1/min"))
+    def test_plain_view_throttled(self):
+        self.assertEqual(self.client.post("/accounts/login/").status_code, 400)
+        response = self.client.post("/accounts/login/")
+        self.assertEqual(response.status_code, 429)
+        self.assertTrue(0 < int(response["Retry-After"]) <= 120)
+
+    def test_cache_store_clear_keeps_other_keys(self):
+        store = throttling.CacheCounterStore(prefix="test-throttle")
+        cache.set("unrelated", 1)
+        self.assertEqual(store.hit("k", 1, 60, now=0), (True, 0.0))
+        self.assertFalse(store.hit("k", 1, 60, now=1)[0])
+        store.clear()
+        self.assertEqual(store.hit("k", 1, 60, now=2), (True, 0.0))
+        self.assertEqual(cache.get("unrelated"), 1)
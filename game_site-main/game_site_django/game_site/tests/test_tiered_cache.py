@@ -0,0 +1,134 @@
+import threading
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from .. import tiered_cache
+
+
+class TieredCacheTests(SimpleTestCase):
+    """Misses fill L2 and L1, concurrent misses build once, and early refreshes never make anyone wait."""
+
+    def setUp(self):
+        # A namespace of its own per test; a second instance plays another process
+        self.name = f"test-{self._testMethodName}"
+        self.ns = tiered_cache.Namespace(self.name)
+        self.builds = []
+
+    def build(self, value="value"):
+        def build():
+            self.builds.append(value)
+            return value
+        return build
+
+    def full_key(self, key):
+        return f"tc:{self.name}:{self.ns.version()}:{key}"
+
+    def outcomes(self, ns=None):
+        return {name: row["count"] for name, row in (ns or self.ns).stats().items()
+                if name in ("l1", "l2", "coalesced", "miss")}
+
+    def test_miss_fills_l2_and_l1(self):
+        self.assertEqual(self.ns.get_or_set("k", self.build(), 60), "value")
+        self.assertEqual(cache.get(self.full_key("k"))[0], "value")
+        self.assertEqual(self.ns.get_or_set("k", self.build(), 60), "value")
+        other = tiered_cache.Namespace(self.name)
+        self.assertEqual(other.get_or_set("k", self.build(), 60), "value")
+        self.assertEqual(other.get_or_set("k", self.build(), 60), "value")
+        self.assertEqual(self.builds, ["value"])
+        self.assertEqual(self.outcomes(), {"l1": 1, "l2": 0, "coalesced": 0, "miss": 1})
+        self.assertEqual(self.outcomes(other), {"l1": 1, "l2": 1, "coalesced": 0, "miss": 0})
+
+    @override_settings(CACHE_L1_MAX_ENTRIES=2)
+    def test_l1_keeps_recently_used(self):
+        for key in ("a", "b"):
+            self.ns.get_or_set(key, self.build(key), 60)
+        self.ns.get_or_set("a", self.build(), 60)
+        self.ns.get_or_set("c", self.build("c"), 60)
+        self.assertEqual(list(self.ns._l1), [self.full_key("a"), self.full_key("c")])
+
+    def test_many(self):
+        self.ns.get_or_set(1, self.build("one"), 60)
+        found = self.ns.get_many_or_set([1, 2, 3], lambda keys: {k: f"built {k}" for k in keys if k != 3}, 60)
+        self.assertEqual(found, {1: "one", 2: "built 2"})
+        other = tiered_cache.Namespace(self.name)
+        self.assertEqual(other.get_many_or_set([2], lambda keys: self.fail("built again"), 60), {2: "built 2"})
+
+    def test_bump(self):
+        self.ns.get_or_set("k", self.build("old"), 60)
+        other = tiered_cache.Namespace(self.name)
+        other.bump()
+        self.assertEqual(other.get_or_set("k", self.build("new"), 60), "new")
+        # Other processes see the new version once they look again
+        with override_settings(CACHE_VERSION_CHECK_SECONDS=0):
+            self.assertEqual(self.ns.get_or_set("k", self.build(), 60), "new")
+
+    def test_early_refresh(self):
+        self.ns.get_or_set("k", self.build("old"), 60)
+        with mock.patch.object(tiered_cache.Namespace, "_refresh_early", return_value=True):
+            self.assertEqual(self.ns.get_or_set("k", self.build("new"), 60), "new")
+        self.assertEqual(self.ns.get_or_set("k", self.build(), 60), "new")
+        self.assertEqual(self.ns.stats()["early_refreshes"], 1)
+
+    def test_early_refresh_keeps_value_while_another_process_builds(self):
+        self.ns.get_or_set("k", self.build("old"), 60)
+        cache.add(f"{self.full_key('k')}:building", 1, 10)
+        started = time.monotonic()
+        with mock.patch.object(tiered_cache.Namespace, "_refresh_early", return_value=True), \
+                mock.patch.object(tiered_cache, "POLL_INTERVAL", 5):
+            self.assertEqual(self.ns.get_or_set("k", self.build("new"), 60), "old")
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(self.builds, ["old"])
+        self.assertEqual(self.outcomes()["l1"], 1)
+
+    @override_settings(CACHE_COALESCE_WAIT=5)
+    def test_miss_waits_for_another_process(self):
+        full_key = self.full_key("k")
+        cache.add(f"{full_key}:building", 1, 10)
+        # The other process stores its result a moment later
+        timer = threading.Timer(0.1, lambda: cache.set(full_key, ("theirs", time.time() + 60, 0.1), 60))
+        timer.start()
+        self.addCleanup(timer.cancel)
+        with mock.patch.object(tiered_cache, "POLL_INTERVAL", 0.01):
+            self.assertEqual(self.ns.get_or_set("k", self.build("ours"), 60), "theirs")
+        self.assertEqual(self.builds, [])
+        self.assertEqual(self.outcomes()["coalesced"], 1)
+
+    def test_concurrent_misses_build_once(self):
+        building, release = threading.Event(), threading.Event()
+        results = []
+
+        def slow():
+            building.set()
+            release.wait(5)
+            self.builds.append("value")
+            return "value"
+
+        threads = [
+            threading.Thread(target=lambda: results.append(self.ns.get_or_set("k", slow, 60)))
+            for _ in range(4)
+        ]
+        threads[0].start()
+        self.assertTrue(building.wait(5))
+        for thread in threads[1:]:
+            thread.start()
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(results, ["value"] * 4)
+        self.assertEqual(self.builds, ["value"])
+        self.assertEqual(self.outcomes()["coalesced"], 3)
+
+    def test_failed_build_is_not_stored(self):
+        def fail():
+            raise RuntimeError("database is down")
+
+        with self.assertRaises(RuntimeError):
+            self.ns.get_or_set("k", fail, 60)
+        self.assertIsNone(cache.get(self.full_key("k")))
+        self.assertIsNone(cache.get(f"{self.full_key('k')}:building"))
+        self.assertEqual(self.ns.get_or_set("k", self.build(), 60), "value")
+        self.assertEqual(self.ns.stats()["errors"], 1)
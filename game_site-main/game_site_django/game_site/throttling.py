@@ -0,0 +1,272 @@
+# --------------------------------------------------------------
+# game_site/throttling.py
+# --------------------------------------------------------------
+"""
+Rate limiting with sliding-window counters.
+
+A sliding-window counter keeps two integers per key – hits in the current
+fixed window and hits in the previous one – and estimates the rolling
+count as ``prev * (1 - elapsed / window) + curr``.  That is O(1) memory
+and O(1) work per request, unlike DRF's default throttles which keep (and
+re-pickle) a list of timestamps per client.
+
+Counters live in a pluggable store (``settings.THROTTLE_STORE``):
+
+    LocalCounterStore   in-process dict – default, single worker
+    CacheCounterStore   Django cache   – shared between workers
+
+Rates come from ``REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"]`` for both the
+DRF throttle classes and the ``throttle()`` decorator used on plain Django
+views.  A rejected request gets HTTP 429 with a ``Retry-After`` header.
+"""
+import math
+import threading
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import JsonResponse
+from django.utils.module_loading import import_string
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+DURATIONS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_rate(rate):
+    """``"100/min"`` → ``(100, 60)``; ``None`` → ``(None, None)``."""
+    if rate is None:
+        return None, None
+    num, period = rate.split("/")
+    return int(num), DURATIONS[period[0]]
+
+
+def _retry_after(prev, curr, limit, elapsed, window):
+    """Seconds until the estimate drops below ``limit`` again."""
+    if curr < limit and prev:
+        # prev * (1 - f) + curr = limit - 1  →  solve for the window fraction f
+        fraction = 1 - (limit - 1 - curr) / prev
+        return max(0.0, fraction * window - elapsed)
+    # The current window alone is full – wait until it becomes "previous"
+    # and has decayed far enough.
+    rest = window - elapsed
+    if curr:
+        rest += window * max(0.0, 1 - (limit - 1) / curr)
+    return rest
+
+
+# -----------------------------------------------------------------
+#  Counter stores
+# -----------------------------------------------------------------
+class LocalCounterStore:
+    """Per-process counters: ``key → [window index, current, previous, window]``."""
+    PRUNE_EVERY = 10000
+
+    def __init__(self):
+        self._counters = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+
+    def hit(self, key, limit, window, now=None):
+        """
+        Count one request for ``key``.
+        Returns ``(allowed, retry_after_seconds)``.
+        """
+        now = time.time() if now is None else now
+        index = int(now // window)
+        elapsed = now - index * window
+        with self._lock:
+            entry = self._counters.get(key)
+            if entry is None:
+                entry = self._counters[key] = [index, 0, 0, window]
+            elif entry[0] != index:
+                entry[2] = entry[1] if entry[0] == index - 1 else 0
+                entry[0], entry[1] = index, 0
+
+            prev, curr = entry[2], entry[1]
+            if prev * (1 - elapsed / window) + curr + 1 > limit:
+                return False, _retry_after(prev, curr, limit, elapsed, window)
+            entry[1] = curr + 1
+
+            self._hits += 1
+            if self._hits % self.PRUNE_EVERY == 0:
+                self._prune(now)
+        return True, 0.0
+
+    def _prune(self, now):
+        # Entries older than one full window no longer affect any estimate
+        stale = [k for k, (i, _, _, w) in self._counters.items() if i < int(now // w) - 1]
+        for k in stale:
+            del self._counters[k]
+
+    def clear(self):
+        with self._lock:
+            self._counters.clear()
+
+
+class CacheCounterStore:
+    """
+    Counters in a Django cache, one key per (client, window index), so
+    every worker sharing the cache backend enforces the same limit.
+
+    Keys carry ``prefix`` and a version number kept in the cache itself;
+    ``clear()`` bumps the version, which orphans this store's counters
+    (they expire on their own) and leaves every other cache entry alone.
+    """
+
+    def __init__(self, alias="default", prefix="throttle"):
+        self.alias = alias
+        self.prefix = prefix
+        self.version_key = f"{prefix}:version"
+
+    @property
+    def cache(self):
+        # Backends are per thread – look it up on every use
+        return caches[self.alias]
+
+    def _version(self):
+        version = self.cache.get(self.version_key)
+        if version is None:
+            self.cache.add(self.version_key, 1, timeout=None)
+            version = self.cache.get(self.version_key, 1)
+        return version
+
+    def hit(self, key, limit, window, now=None):
+        now = time.time() if now is None else now
+        index = int(now // window)
+        elapsed = now - index * window
+        base = f"{self.prefix}:{self._version()}:{key}"
+        curr_key, prev_key = f"{base}:{index}", f"{base}:{index - 1}"
+        values = self.cache.get_many([curr_key, prev_key])
+        prev, curr = values.get(prev_key, 0), values.get(curr_key, 0)
+        if prev * (1 - elapsed / window) + curr + 1 > limit:
+            return False, _retry_after(prev, curr, limit, elapsed, window)
+        # Two windows of lifetime – the key is still needed as "previous"
+        if not self.cache.add(curr_key, 1, timeout=2 * window):
+            try:
+                self.cache.incr(curr_key)
+            except ValueError:
+                self.cache.set(curr_key, 1, timeout=2 * window)
+        return True, 0.0
+
+    def clear(self):
+        self._version()
+        try:
+            self.cache.incr(self.version_key)
+        except ValueError:
+            # Evicted between the two calls – any fresh version will do
+            self.cache.set(self.version_key, int(time.time()), timeout=None)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """The process-wide counter store named by ``settings.THROTTLE_STORE``."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                path = getattr(settings, "THROTTLE_STORE", "game_site.throttling.LocalCounterStore")
+                _store = import_string(path)()
+    return _store
+
+
+def get_rate(scope):
+    return api_settings.DEFAULT_THROTTLE_RATES.get(scope)
+
+
+# -----------------------------------------------------------------
+#  DRF throttle classes
+# -----------------------------------------------------------------
+class SlidingWindowThrottle(BaseThrottle):
+    """
+    Base class – sub-classes set ``scope`` and implement ``get_key``.
+    A scope without a configured rate is not throttled.
+    """
+    scope = None
+
+    def get_key(self, request, view):
+        raise NotImplementedError
+
+    def get_scope(self, view):
+        return self.scope
+
+    def allow_request(self, request, view):
+        scope = self.get_scope(view)
+        limit, window = parse_rate(get_rate(scope)) if scope else (None, None)
+        if limit is None:
+            return True
+        key = self.get_key(request, view)
+        if key is None:
+            return True
+        allowed, self._wait = get_store().hit(f"{scope}:{key}", limit, window)
+        return allowed
+
+    def wait(self):
+        return math.ceil(getattr(self, "_wait", 0.0))
+
+
+class UserThrottle(SlidingWindowThrottle):
+    """Per user – anonymous clients are keyed by IP."""
+    scope = "user"
+
+    def get_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return f"u{request.user.pk}"
+        return f"ip{self.get_ident(request)}"
+
+
+class IPThrottle(SlidingWindowThrottle):
+    """Per client IP, regardless of login – caps many accounts on one host."""
+    scope = "ip"
+
+    def get_key(self, request, view):
+        return self.get_ident(request)
+
+
+class EndpointThrottle(UserThrottle):
+    """Per client *and* endpoint; the rate comes from ``view.throttle_scope``."""
+
+    def get_scope(self, view):
+        return getattr(view, "throttle_scope", None)
+
+
+# -----------------------------------------------------------------
+#  Plain Django views
+# -----------------------------------------------------------------
+def throttle(scope, by="ip"):
+    """
+    Decorator for function views.  ``by="ip"`` keys on the client address,
+    ``by="user"`` on the user id (falling back to the address).
+
+        @throttle("login")
+        def api_login(request): ...
+    """
+    ident = BaseThrottle()
+
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            limit, window = parse_rate(get_rate(scope))
+            if limit is not None:
+                user = getattr(request, "user", None)
+                if by == "user" and user is not None and user.is_authenticated:
+                    key = f"u{user.pk}"
+                else:
+                    key = f"ip{ident.get_ident(request)}"
+                allowed, wait = get_store().hit(f"{scope}:{key}", limit, window)
+                if not allowed:
+                    response = JsonResponse(
+                        {"detail": "Request was throttled."},
+                        status=429,
+                    )
+                    response["Retry-After"] = str(math.ceil(wait))
+                    return response
+            return view(request, *args, **kwargs)
+
+        return wrapped
+
+    return decorator
@@ -0,0 +1,364 @@
+# --------------------------------------------------------------
+# game_site/tiered_cache.py
+# --------------------------------------------------------------
+"""
+Two-tier read-through cache for the catalog reads.
+
+    L1  per-process LRU – no I/O, ``CACHE_L1_MAX_ENTRIES`` per namespace
+    L2  the Django cache (``CACHES["default"]``) – shared by the workers
+        when it is a file / Redis / Memcached backend
+
+Usage::
+
+    games = namespace("games")
+    data = games.get_or_set(pk, lambda: expensive(pk), ttl=60)
+    many = games.get_many_or_set(pks, lambda missing: expensive_many(missing), ttl=60)
+    games.bump()                    # every entry of "games" is stale now
+
+Invalidation is by version key, like ``accounts.user_cache``: entries are
+stored under the namespace's current version, ``bump()`` increments it in
+L2 and orphans them all.  A process re-reads the version at most every
+``CACHE_VERSION_CHECK_SECONDS``; its own bumps apply immediately.
+
+Stampede protection:
+
+* probabilistic early refresh ("XFetch") – as an entry nears its expiry,
+  a caller is increasingly likely to rebuild it ahead of time, weighted
+  by how long the last build took, while everybody else keeps getting
+  the current value;
+* request coalescing – concurrent misses of one key in a process wait
+  for a single build, and across processes the first one takes a short
+  lock entry in L2 (``cache.add``) while the others wait up to
+  ``CACHE_COALESCE_WAIT`` seconds for its result.  Only a miss waits: an
+  early refresh that finds another process building keeps the current
+  value.
+
+Values come back shared (L1 hands out the same object to every caller) –
+never mutate them.  ``stats()`` reports per-namespace hit rates and
+latencies of this process (``GET /api/cache/``).
+"""
+import math
+import random
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+# Seconds between two looks at L2 while another process builds the value
+POLL_INTERVAL = 0.05
+
+_MISSING = object()
+
+
+class _Flight:
+    """One in-process build that concurrent callers of the same key wait for."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class Namespace:
+    """Cached entries of one kind, their version key and their metrics."""
+
+    def __init__(self, name):
+        self.name = name
+        self._l1 = OrderedDict()   # full key → (value, expires_at, build seconds)
+        self._flights = {}
+        self._lock = threading.Lock()
+        self._version = None
+        self._version_read_at = 0.0
+        self._reset_counters()
+
+    # -------------------------------------------------------------
+    #  Versions
+    # -------------------------------------------------------------
+    @property
+    def _version_key(self):
+        return f"tc:{self.name}:version"
+
+    def version(self):
+        """Current version of the namespace (memoized for a moment)."""
+        interval = getattr(settings, "CACHE_VERSION_CHECK_SECONDS", 1.0)
+        if self._version is None or time.monotonic() - self._version_read_at >= interval:
+            version = cache.get(self._version_key)
+            if version is None:
+                # Start from the clock so an evicted counter never reuses an old version
+                cache.add(self._version_key, time.time_ns(), None)
+                version = cache.get(self._version_key)
+            self._version, self._version_read_at = version, time.monotonic()
+        return self._version
+
+    def bump(self):
+        """Invalidate every entry of the namespace, in every process."""
+        try:
+            version = cache.incr(self._version_key)
+        except ValueError:
+            version = time.time_ns()
+            cache.set(self._version_key, version, None)
+        with self._lock:
+            self._version, self._version_read_at = version, time.monotonic()
+            self._l1.clear()
+
+    # -------------------------------------------------------------
+    #  Reads
+    # -------------------------------------------------------------
+    def get_or_set(self, key, build, ttl):
+        """
+        The value cached under ``key``; ``build()`` computes (and the
+        caches keep) it for ``ttl`` seconds on a miss.  Exceptions raised
+        by ``build`` reach the caller and nothing is stored.
+        """
+        start = time.perf_counter()
+        full_key = f"tc:{self.name}:{self.version()}:{key}"
+
+        entry = self._l1_get(full_key)
+        tier = "l1"
+        if entry is None:
+            entry = cache.get(full_key)
+            tier = "l2"
+            if entry is not None:
+                self._l1_set(full_key, entry)
+
+        if entry is not None and not self._refresh_early(entry):
+            self._record(tier, start)
+            return entry[0]
+
+        if entry is not None:
+            # Early refresh – one caller rebuilds, the rest keep the current value
+            with self._lock:
+                if full_key in self._flights:
+                    self._record(tier, start)
+                    return entry[0]
+                flight = self._flights[full_key] = _Flight()
+            self._count("early_refreshes")
+            return self._build(full_key, flight, build, ttl, start, current=(entry, tier))
+
+        with self._lock:
+            flight = self._flights.get(full_key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[full_key] = _Flight()
+        if not leader:
+            flight.done.wait()
+            self._record("coalesced", start)
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+        return self._build(full_key, flight, build, ttl, start)
+
+    def get_many_or_set(self, keys, build_many, ttl):
+        """
+        ``{key: value}`` for ``keys``: L1 first, one ``cache.get_many()``
+        for the rest, and one ``build_many(missing keys)`` → ``{key: value}``
+        for what is still missing, stored with one ``cache.set_many()``.
+        Keys ``build_many`` leaves out are left out of the result and
+        nothing is stored for them.  Batches get neither coalescing nor
+        early refresh – their entries simply expire.
+        """
+        start = time.perf_counter()
+        prefix = f"tc:{self.name}:{self.version()}:"
+        found, outcomes = {}, {}
+        for key in keys:
+            entry = self._l1_get(prefix + str(key))
+            if entry is not None:
+                found[key], outcomes[key] = entry[0], "l1"
+        wanted = [key for key in keys if key not in found]
+        if wanted:
+            entries = cache.get_many([prefix + str(key) for key in wanted])
+            for key in wanted:
+                entry = entries.get(prefix + str(key))
+                if entry is not None:
+                    self._l1_set(prefix + str(key), entry)
+                    found[key], outcomes[key] = entry[0], "l2"
+
+        build_seconds = 0.0
+        missing = [key for key in keys if key not in found]
+        if missing:
+            built_at = time.perf_counter()
+            try:
+                built = build_many(missing)
+            except BaseException:
+                self._count("errors")
+                raise
+            build_seconds = time.perf_counter() - built_at
+            if built:
+                each = build_seconds / len(built)
+                entries = {prefix + str(key): (value, time.time() + ttl, each) for key, value in built.items()}
+                cache.set_many(entries, ttl)
+                for full_key, entry in entries.items():
+                    self._l1_set(full_key, entry)
+                found.update(built)
+            outcomes.update(dict.fromkeys(missing, "miss"))
+        self._record_many(outcomes.values(), start, build_seconds)
+        return found
+
+    def _build(self, full_key, flight, build, ttl, start, current=None):
+        # ``current`` – the (still valid) entry and its tier of an early refresh
+        lock_key = f"{full_key}:building"
+        wait = getattr(settings, "CACHE_COALESCE_WAIT", 5.0)
+        try:
+            if not cache.add(lock_key, 1, max(1, int(wait) + 1)):
+                if current is not None:
+                    # Another process refreshes it already
+                    entry, tier = current
+                    flight.value = entry[0]
+                    self._record(tier, start)
+                    return flight.value
+                entry = self._wait_for_other_process(full_key, lock_key, wait)
+                if entry is not None:
+                    self._l1_set(full_key, entry)
+                    flight.value = entry[0]
+                    self._record("coalesced", start)
+                    return flight.value
+                built_at = time.perf_counter()
+                flight.value = build()
+            else:
+                try:
+                    built_at = time.perf_counter()
+                    flight.value = build()
+                    entry = (flight.value, time.time() + ttl, time.perf_counter() - built_at)
+                    cache.set(full_key, entry, ttl)
+                    self._l1_set(full_key, entry)
+                finally:
+                    cache.delete(lock_key)
+            self._record("miss", start, build_seconds=time.perf_counter() - built_at)
+            return flight.value
+        except BaseException as exc:
+            flight.error = exc
+            self._count("errors")
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(full_key, None)
+            flight.done.set()
+
+    @staticmethod
+    def _wait_for_other_process(full_key, lock_key, wait):
+        deadline = time.monotonic() + wait
+        while time.monotonic() < deadline:
+            time.sleep(POLL_INTERVAL)
+            entry = cache.get(full_key)
+            if entry is not None:
+                return entry
+            if cache.get(lock_key) is None:
+                # The builder gave up (or stored nothing) – build it here
+                return None
+        return None
+
+    @staticmethod
+    def _refresh_early(entry):
+        _, expires_at, build_seconds = entry
+        beta = getattr(settings, "CACHE_EARLY_REFRESH_BETA", 1.0)
+        # -log(U) is exponentially distributed: rarely far ahead, often close
+        return time.time() - build_seconds * beta * math.log(1.0 - random.random()) >= expires_at
+
+    # -------------------------------------------------------------
+    #  L1 – LRU
+    # -------------------------------------------------------------
+    def _l1_get(self, full_key):
+        with self._lock:
+            entry = self._l1.get(full_key)
+            if entry is None:
+                return None
+            if entry[1] <= time.time():
+                del self._l1[full_key]
+                return None
+            self._l1.move_to_end(full_key)
+            return entry
+
+    def _l1_set(self, full_key, entry):
+        limit = getattr(settings, "CACHE_L1_MAX_ENTRIES", 1000)
+        with self._lock:
+            self._l1[full_key] = entry
+            self._l1.move_to_end(full_key)
+            while len(self._l1) > limit:
+                self._l1.popitem(last=False)
+
+    # -------------------------------------------------------------
+    #  Metrics
+    # -------------------------------------------------------------
+    def _reset_counters(self):
+        self._counters = dict.fromkeys(("early_refreshes", "errors"), 0)
+        # outcome → [count, total seconds, max seconds]
+        self._latency = {outcome: [0, 0.0, 0.0] for outcome in ("l1", "l2", "coalesced", "miss")}
+        self._build_seconds = 0.0
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def _record(self, outcome, start, build_seconds=0.0):
+        seconds = time.perf_counter() - start
+        with self._lock:
+            row = self._latency[outcome]
+            row[0] += 1
+            row[1] += seconds
+            row[2] = max(row[2], seconds)
+            self._build_seconds += build_seconds
+
+    def _record_many(self, outcomes, start, build_seconds):
+        # A batch's time is shared evenly by its keys
+        outcomes = list(outcomes)
+        if not outcomes:
+            return
+        seconds = (time.perf_counter() - start) / len(outcomes)
+        with self._lock:
+            for outcome in outcomes:
+                row = self._latency[outcome]
+                row[0] += 1
+                row[1] += seconds
+                row[2] = max(row[2], seconds)
+            self._build_seconds += build_seconds
+
+    def stats(self):
+        """Hit rate, per-outcome request latency and build time in this process."""
+        with self._lock:
+            latency = {k: list(v) for k, v in self._latency.items()}
+            counters = dict(self._counters)
+            build_seconds = self._build_seconds
+            l1_entries = len(self._l1)
+        requests = sum(row[0] for row in latency.values())
+        hits = latency["l1"][0] + latency["l2"][0] + latency["coalesced"][0]
+        return {
+            "requests": requests,
+            "hit_rate": round(hits / requests, 4) if requests else None,
+            **{
+                outcome: {
+                    "count": count,
+                    "avg_ms": round(total / count * 1000, 3) if count else None,
+                    "max_ms": round(peak * 1000, 3),
+                }
+                for outcome, (count, total, peak) in latency.items()
+            },
+            **counters,
+            "avg_build_ms": (
+                round(build_seconds / latency["miss"][0] * 1000, 3) if latency["miss"][0] else None
+            ),
+            "l1_entries": l1_entries,
+        }
+
+    def reset_stats(self):
+        with self._lock:
+            self._reset_counters()
+
+
+NAMESPACES = {}
+_registry_lock = threading.Lock()
+
+
+def namespace(name):
+    """The process-wide ``Namespace`` called ``name``, created on first use."""
+    ns = NAMESPACES.get(name)
+    if ns is None:
+        with _registry_lock:
+            ns = NAMESPACES.setdefault(name, Namespace(name))
+    return ns
+
+
+def stats():
+    """``{namespace: stats}`` of every namespace used in this process."""
+    return {name: ns.stats() for name, ns in sorted(NAMESPACES.items())}
@@ -23,6 +23,9 @@ urlpatterns = [
     path('', views.games_view_main, name="home"),
     path('game/<int:game_id>/json/', views.game_detail_json, name='game_detail_json'),
     path("whitelist/<int:game_id>/", views.toggle_whitelist, name="toggle_whitelist"),
+    path('api/catalog/events/', views.catalog_events, name="catalog_events"),
+    path('covers/<slug:sha256>.<slug:ext>', views.cover_original, name="cover_original"),
+    path('covers/<slug:sha256>/<int:size>.webp', views.cover_thumbnail, name="cover_thumbnail"),
     path('api/', include('game_site.api_urls')),
 
     # -----------------------------------------------------------------
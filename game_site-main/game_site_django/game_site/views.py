@@ -25,13 +25,19 @@ from .models import (
     Award,
     Language,
 )
-from django.http import JsonResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 # If you prefer the ModelForm route, uncomment the next line:
 # from .forms import GameForm
 from django.contrib.auth.decorators import login_required
-from django.views.decorators.http import require_POST
+from django.views.decorators.http import require_GET, require_POST
 from django.http import HttpResponseRedirect
 from django.urls import reverse
+from accounts.user_cache import whitelist_ids
+from . import catalog_index, catalog_stream, cover_art, page_cache
+from .catalog import catalog_games, catalog_params, game_detail_data
+from .db_routers import route_reads_to_replica
+from .throttling import throttle
 
 
 
@@ -92,6 +98,7 @@ def api_login(request):
 @csrf_exempt
 @login_required
 @require_POST
+@throttle("whitelist", by="user")
 def toggle_whitelist(request, game_id):
     """
     Add or remove ``game_id`` from the current user’s whitelist.
@@ -101,7 +108,7 @@ def toggle_whitelist(request, game_id):
     game = get_object_or_404(Game, pk=game_id)
 
     # Toggle – if it’s already there we remove it, otherwise we add it
-    if game in request.user.whitelisted_games.all():
+    if game.pk in whitelist_ids(request.user):
         request.user.whitelisted_games.remove(game)
     else:
         request.user.whitelisted_games.add(game)
@@ -113,33 +120,46 @@ def toggle_whitelist(request, game_id):
     return redirect("home")   # fallback
 
 
+@require_GET
+@throttle("catalog_stream")
+def catalog_events(request):
+    """
+    GET /api/catalog/events/ → ``text/event-stream`` of catalog changes
+    (game created / updated / deleted, whitelist counts).  Reconnecting
+    clients resume with the ``Last-Event-ID`` header (or
+    ``?last_event_id=``); see game_site.catalog_stream.
+    """
+    last_event_id = request.headers.get("Last-Event-ID") or request.GET.get("last_event_id")
+    # The server decides how the stream is consumed – don't make it buffer
+    if isinstance(request, ASGIRequest):
+        content = catalog_stream.astream(last_event_id)
+    else:
+        content = catalog_stream.stream(last_event_id)
+    response = StreamingHttpResponse(content, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"   # nginx: pass events through at once
+    return response
+
+
+@require_GET
+def cover_original(request, sha256, ext):
+    """Uploaded cover image – immutable, served by sendfile (game_site.cover_art)."""
+    return cover_art.serve_original(request, sha256, ext)
+
+
+@require_GET
+def cover_thumbnail(request, sha256, size):
+    """WebP thumbnail of a cover, rendered on first request when missing."""
+    return cover_art.serve_thumbnail(request, sha256, size)
+
+
 def game_detail_json(request, game_id):
-    game = get_object_or_404(Game, id=game_id)
-    
-    data = {
-        "name": game.game_name,
-        "genre": game.genre.Genre_Name if game.genre else "",
-        "platform": game.platform.Platform_Name if game.platform else "",
-        "store": game.store.Store_Name if game.store else "",
-        "developer": str(game.developer) if game.developer else "",
-        "publisher": str(game.publisher) if game.publisher else "",
-        "dlc": str(game.dlc) if game.dlc else "None",
-        "mode": game.game_mode.mode_name if game.game_mode else "",
-        "license": game.license.license_name if game.license else "",
-        "system_requirements": {
-            "os": game.system_requirements.operating_system if game.system_requirements else "",
-            "cpu": game.system_requirements.processor if game.system_requirements else "",
-            "ram": game.system_requirements.ram if game.system_requirements else "",
-            "gpu": game.system_requirements.gpu if game.system_requirements else "",
-        },
-        "rating": game.review.rating if game.review else "–",
-        "players": game.online_status.active_players if game.online_status else "–",
-        "award": game.award.award_name if game.award else "–",
-        "language": game.language.language_name if game.language else "",
-        "sales": game.sales_history.units_sold if game.sales_history else "",
-    }
+    route_reads_to_replica()
+    # The payload is the same for everybody – shared through the "games" cache
+    data = page_cache.game_detail(f"json:{game_id}", lambda: game_detail_data(game_id))
     return JsonResponse(data)
 
+
 def games_view(request):
     """
     Handles:
@@ -226,46 +246,15 @@ def games_view(request):
 # 2️⃣  GET – list games (use the same logic as games_view_main)
 # -------------------------------------------------
 # Base queryset with the related objects needed for sorting
-    games_qs = Game.objects.select_related(
-        "genre", "platform", "store", "rating", "online_status"
-    ).all()
+    route_reads_to_replica()
 
     # ---- Query‑string parameters (search / filters / sort / whitelist) ----
-    search_term      = request.GET.get("search", "").strip()
-    genre_filter     = request.GET.get("genre", "")
-    platform_filter  = request.GET.get("platform", "")
-    store_filter     = request.GET.get("store", "")
-    whitelisted      = request.GET.get("whitelisted")
-    sort_by          = request.GET.get("sort", "")
-
-    # ---- Searching ----
-    if search_term:
-        games_qs = games_qs.filter(game_name__icontains=search_term)
-
-    # ---- Filtering ----
-    if genre_filter:
-        games_qs = games_qs.filter(genre_id=genre_filter)
-    if platform_filter:
-        games_qs = games_qs.filter(platform_id=platform_filter)
-    if store_filter:
-        games_qs = games_qs.filter(store_id=store_filter)
-
-    if whitelisted == "yes":
-        games_qs = games_qs.filter(whitelisted_by=request.user)
-    elif whitelisted == "no":
-        games_qs = games_qs.exclude(whitelisted_by=request.user)
-
-    # ---- Sorting ----
-    if sort_by == "name":
-        games_qs = games_qs.order_by("game_name")
-    elif sort_by == "rating":
-        games_qs = games_qs.order_by("-review__rating")
-    elif sort_by == "players":
-        games_qs = games_qs.order_by("-online_status__active_players")
+    params = catalog_params(request)
+    games = catalog_games(params, request.user)
 
     # ---- Context (keep existing look‑ups + extra vars for the filter bar) ----
     context = {
-        "games": games_qs,
+        "games": games,
         "genres": Genre.objects.all(),
         "platforms": Platform.objects.all(),
         "stores": Store.objects.all(),
@@ -287,12 +276,16 @@ def games_view(request):
         "awards": Award.objects.all(),
         "languages": Language.objects.all(),
         # extra variables needed by the filter/search bar
-        "search": search_term,
-        "selected_genre": genre_filter,
-        "selected_platform": platform_filter,
-        "selected_store": store_filter,
-        "sort_by": sort_by,
-        "whitelisted": whitelisted,
+        "search": params["search"],
+        "fuzzy": params["fuzzy"],
+        "selected_genre": params["genre"],
+        "selected_platform": params["platform"],
+        "selected_store": params["store"],
+        "max_ram": params["max_ram"],
+        "cpu_tier": params["cpu_tier"],
+        "gpu_tier": params["gpu_tier"],
+        "sort_by": params["sort"],
+        "whitelisted": params["whitelisted"],
     }
     return render(request, "games.html", context)
     
@@ -301,60 +294,48 @@ def games_view_main(request):
     Home page – lists all games with optional:
       • search by name
       • filter by genre / platform / store
+      • "can I run it": the user's RAM / CPU / GPU (game_site.catalog.hardware_limits)
       • sort by name, rating, or player count
     """
-    # Start with all games
-    games_qs = Game.objects.select_related(
-        "genre", "platform", "store", "rating", "online_status"
-    ).all()
-
-    # Get query parameters
-    search_term = request.GET.get("search", "").strip()
-    genre_filter = request.GET.get("genre", "")
-    platform_filter = request.GET.get("platform", "")
-    store_filter = request.GET.get("store", "")
-    whitelisted = request.GET.get("whitelisted")
-    sort_by = request.GET.get("sort", "")
-
-    # --- Searching ---
-    if search_term:
-        games_qs = games_qs.filter(game_name__icontains=search_term)
-
-    # --- Filtering ---
-    if genre_filter:
-        games_qs = games_qs.filter(genre_id=genre_filter)
-    if platform_filter:
-        games_qs = games_qs.filter(platform_id=platform_filter)
-    if store_filter:
-        games_qs = games_qs.filter(store_id=store_filter)
-    if whitelisted == "yes":
-        # Show only games that the current user has whitelisted
-        games_qs = games_qs.filter(whitelisted_by=request.user)
-    elif whitelisted == "no":
-        # Exclude the games the user has whitelisted
-        games_qs = games_qs.exclude(whitelisted_by=request.user)
-
-    # --- Sorting ---
-    if sort_by == "name":
-        games_qs = games_qs.order_by("game_name")
-    elif sort_by == "rating":
-        # Sort by the numeric Review rating if exists, else 0
-        games_qs = games_qs.order_by("-review__rating")
-    elif sort_by == "players":
-        games_qs = games_qs.order_by("-online_status__active_players")
+    # Read from the replica when one is configured
+    route_reads_to_replica()
+
+    # Search / filter / sort – shared with games_view (game_site.catalog)
+    params = catalog_params(request)
+
+    # Anonymous visitors all see the same page – serve it from the cache
+    if page_cache.cacheable(request):
+        content = page_cache.get_or_build(
+            page_cache.page_key("home", params),
+            lambda: _render_home(request, params).content,
+            request,
+        )
+        return HttpResponse(content)
+    return _render_home(request, params)
+
+
+def _render_home(request, params):
+    # Filtered and sorted in memory – no SQL for the game rows
+    games = catalog_index.catalog_rows(params, request.user)
 
     # --- Context for template ---
     context = {
-        "games": games_qs,
+        "games": games,
         "genres": Genre.objects.all(),
         "platforms": Platform.objects.all(),
         "stores": Store.objects.all(),
-        "search": search_term,
-        "selected_genre": genre_filter,
-        "selected_platform": platform_filter,
-        "selected_store": store_filter,
-        "sort_by": sort_by,
-        "whitelisted": whitelisted,
+        "search": params["search"],
+        "fuzzy": params["fuzzy"],
+        "selected_genre": params["genre"],
+        "selected_platform": params["platform"],
+        "selected_store": params["store"],
+        "max_ram": params["max_ram"],
+        "cpu_tier": params["cpu_tier"],
+        "gpu_tier": params["gpu_tier"],
+        "sort_by": params["sort"],
+        "whitelisted": params["whitelisted"],
+        # ids for the whitelist checkboxes (cached – no query per row)
+        "whitelist_ids": whitelist_ids(request.user),
     }
 
     return render(request, "home.html", context)